@@ -4,21 +4,99 @@ import json
 import usb_cdc
 from imu_bno055 import BNO055IMU
 from GPS_LatLon import get_lat_lon
+try:
+    # Optional reliable link (copy transport.py to the Pico to enable)
+    from transport import PicoTransport, TransportLink
+except ImportError:
+    TransportLink = None
+try:
+    # Optional waypoint navigation (copy nav_geometry.py and route.json to the Pico to enable)
+    from nav_geometry import Navigator
+except ImportError:
+    Navigator = None
+try:
+    # Optional state engine with command gating (copy fse.py to the Pico to enable)
+    from fse import FSE, PLATFORM, E_BOOT_OK, E_CALIB_START, E_CALIB_DONE, E_FAULT
+except ImportError:
+    FSE = None
+try:
+    # Optional motion-aware telemetry rate (copy report_rate.py to the Pico to enable)
+    from report_rate import ReportRate
+except ImportError:
+    ReportRate = None
 
 # --- Config ---
 ROLL_LPF_ALPHA = 0.30
 GPS_STABLE_SAMPLES = 3
 GPS_MAX_WAIT_S = 300
-TELEMETRY_PERIOD_S = 0.5
+TELEMETRY_MIN_S = 0.5               # fixed period without report_rate.py; fastest rate with it
+TELEMETRY_MAX_S = 30.0              # slowest heartbeat when parked
+MOTION_BAND_M = 3.0                 # GPS drift band: smaller position changes are noise
+HEADING_CHANGE_DEG = 10.0
+TILT_CHANGE_DEG = 15.0
 PRINT_PERIOD_S = 0.5
 OFFSET_FILE = "imu_offsets.bin"
+ROUTE_FILE = "route.json"          # [[lat, lon], ...]
+ARRIVE_RADIUS_M = 2.0
+
+_link = TransportLink(PicoTransport()) if TransportLink else None
 
 def _send_to_pi(obj: dict):
+    if _link:
+        _link.send(obj)
+        return
     if not usb_cdc.data:
         return
     line = json.dumps(obj, separators=(",", ":")) + "\n"
     usb_cdc.data.write(line.encode("utf-8"))
 
+def _load_navigator():
+    if not Navigator:
+        return None
+    try:
+        with open(ROUTE_FILE, "r") as f:
+            route = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return _make_navigator(route, ROUTE_FILE)
+
+def _make_navigator(route, source):
+    if not (Navigator and route):
+        return None
+    nav = Navigator(route, arrive_radius_m=ARRIVE_RADIUS_M)
+    print(f"[NAV] Route loaded from {source}: {len(route)} waypoints, {nav.route.total_m:.0f} m")
+    return nav
+
+def _make_rate():
+    if not ReportRate:
+        return None
+    return ReportRate(min_s=TELEMETRY_MIN_S, max_s=TELEMETRY_MAX_S, move_m=MOTION_BAND_M,
+                      heading_deg=HEADING_CHANGE_DEG, tilt_deg=TILT_CHANGE_DEG)
+
+def _handle_command(fse, line):
+    """
+    Receive gating for a Pi command line {"cmd":..,"seq":..}; answers with a mission:M ack.
+    An admitted WPSET carrying "route": [[lat, lon], ...] (e.g. a RETURN_HOME path the Pi
+    planned) returns that route so the caller drives it instead of route.json.
+    """
+    try:
+        msg = json.loads(line)
+        name = str(msg.get("cmd"))
+    except (ValueError, AttributeError):
+        return
+    if name == "EMERGENCY_STOP":
+        name = "ESTOP"
+    ok, reason = fse.command_name(name)
+    print(f"[FSE] {name}: {'OK' if ok else 'REJECT'} ({reason})")
+    _send_to_pi({
+        "v": 1, "type": "mission:M", "ts": time.monotonic(),
+        "ms": {"ack_cmd": name, "ack_seq": msg.get("seq"), "status": "OK" if ok else "REJECT",
+               "msg": reason, "state": fse.state_name}
+    })
+    if ok and name == "WPSET":
+        return msg.get("route")
+    return None
+
 def _wait_for_imu_calibration(imu: BNO055IMU):
     print("[STARTUP] Initializing IMU...")
     imu.initialize(mode_name="NDOF_FMC_OFF", ext_crystal=True)
@@ -78,15 +156,24 @@ def main():
     print("=== AMU Pico Startup ===")
     lat, lon = None, None
 
+    fse = FSE(PLATFORM) if FSE else None
+    if fse:
+        fse.fire(E_BOOT_OK)
+        fse.fire(E_CALIB_START)
+
     # 1) IMU calibration
     imu = BNO055IMU(debug=False)
     _wait_for_imu_calibration(imu)
+    if fse:
+        fse.fire(E_CALIB_DONE)
 
     # 2) GPS fix
     try:
         lat, lon = _wait_for_gps_fix()
     except TimeoutError as e:
         print(f"[STARTUP] {e}. Stopping here.")
+        if fse:
+            fse.fire(E_FAULT)
         while True:
             time.sleep(1)
 
@@ -94,6 +181,10 @@ def main():
     _send_to_pi({"v": 1, "type": "hello", "role": "pico", "status": "ready"})
     print("[RUN] Sensors ready. Starting telemetry stream to Pi...")
 
+    navigator = _load_navigator()
+    nav = None
+    rate = _make_rate()
+
     last_tx = 0.0
     last_print = 0.0
     while True:
@@ -102,15 +193,39 @@ def main():
         coords = get_lat_lon()
         if coords:
             lat, lon = coords
+            if navigator:
+                nav = navigator.update(lat, lon, heading)
+        if _link:
+            cmd = _link.poll()
+            if cmd and fse:
+                route = _handle_command(fse, cmd)
+                if route:
+                    navigator = _make_navigator(route, "Pi") or navigator
+                    nav = None
+                if rate:
+                    rate.alert()
         now = time.monotonic()
-        if now - last_tx >= TELEMETRY_PERIOD_S:
+        if rate:
+            # state: platform state plus the waypoint being driven to (arrival counts as a change)
+            why = rate.update(now, lat, lon, heading, roll, pitch,
+                              (fse.state_name if fse else None, nav["wp_idx"] if nav else None))
+        else:
+            why = "period" if now - last_tx >= TELEMETRY_MIN_S else None
+        if why:
             last_tx = now
-            _send_to_pi({
+            frame = {
                 "v": 1, "type": "telemetry", "ts": now,
                 "imu": {"heading": heading, "compass": compass, "roll": roll, "pitch": pitch},
                 "gps": {"lat": lat, "lon": lon},
                 "calib": {"sys": sys, "gyro": gyro, "accel": accel, "mag": mag}
-            })
+            }
+            if nav:
+                frame["nav"] = nav
+            if fse:
+                frame["fse"] = fse.state_name
+            if rate:
+                frame["why"] = why
+            _send_to_pi(frame)
         if now - last_print >= PRINT_PERIOD_S:
             last_print = now
             if (lat is not None) and (lon is not None):
@@ -0,0 +1,106 @@
+# bno055_emu.py — Register-map emulator for the Bosch BNO055 (I2C 0x28)
+# Author: Steven Westermire (Maddog / Gunny)
+#
+# Implements the page-0 registers imu_bno055.py touches: chip IDs, OPR_MODE,
+# Euler angles (16 LSB/deg), raw mag, CALIB_STAT and the 22-byte offset block.
+# Fusion outputs follow a RouteMotion so heading agrees with the GPS fake.
+import math
+import time
+
+BNO055_ADDR = 0x28
+CHIP_ID_REG = 0x00
+MAG_X_LSB = 0x0E
+EULER_REG = 0x1A
+CALIB_STAT_REG = 0x35
+SYS_STAT_REG = 0x39
+OPR_MODE_REG = 0x3D
+ACC_OFF_X_LSB = 0x55
+OFFSETS_LEN = 22
+CONFIGMODE = 0x00
+FUSION_MODES = (0x08, 0x09, 0x0A, 0x0B, 0x0C)
+
+
+def _put16(regs, reg, value):
+    value = int(value) & 0xFFFF
+    regs[reg] = value & 0xFF
+    regs[reg + 1] = value >> 8
+
+
+class BNO055Emulator:
+    """
+    I2C device model: write(bytes) sets the register pointer (first byte) and
+    stores any following bytes; read(n) returns n bytes from the pointer.
+    Calibration climbs to 3/3/3/3 after `calib_after_s` in a fusion mode, or
+    almost immediately once an offset blob has been restored.
+    """
+
+    def __init__(self, motion=None, calib_after_s=20.0, noise_deg=0.3):
+        self.motion = motion
+        self.calib_after_s = calib_after_s
+        self.noise_deg = noise_deg
+        self.regs = bytearray(0x80)
+        self.regs[0x00:0x04] = bytes([0xA0, 0xFB, 0x32, 0x0F])
+        self.ptr = 0
+        self.mode = CONFIGMODE
+        self._fusion_since = None
+        self._offsets_restored = False
+        self.reads = 0
+        self.writes = 0
+
+    # ---- I2C transactions ----
+    def write(self, data):
+        self.writes += 1
+        if not data:
+            return
+        self.ptr = data[0]
+        for i, b in enumerate(data[1:]):
+            self._store(self.ptr + i, b)
+
+    def read(self, n):
+        self.reads += 1
+        self._refresh(time.monotonic())
+        return bytes(self.regs[self.ptr:self.ptr + n])
+
+    # ---- Register behaviour ----
+    def _store(self, reg, value):
+        if reg >= len(self.regs):
+            return
+        self.regs[reg] = value
+        if reg == OPR_MODE_REG:
+            self.mode = value & 0x0F
+            if self.mode in FUSION_MODES:
+                if self._fusion_since is None:
+                    self._fusion_since = time.monotonic()
+            else:
+                self._fusion_since = None
+        elif ACC_OFF_X_LSB <= reg < ACC_OFF_X_LSB + OFFSETS_LEN and self.mode == CONFIGMODE:
+            self._offsets_restored = True
+
+    def _calib_byte(self, now):
+        if self._fusion_since is None:
+            return self.regs[CALIB_STAT_REG]
+        ramp = 1.0 if self._offsets_restored else self.calib_after_s
+        frac = min(1.0, (now - self._fusion_since) / ramp) if ramp > 0 else 1.0
+        gyr = 3 if frac > 0.1 else 1
+        acc = min(3, int(frac * 4))
+        mag = min(3, int(frac * 3.5))
+        sys_ = 3 if frac >= 1.0 else min(gyr, acc, mag)
+        return (sys_ << 6) | (gyr << 4) | (acc << 2) | mag
+
+    def _refresh(self, now):
+        self.regs[CALIB_STAT_REG] = self._calib_byte(now)
+        if self.mode not in FUSION_MODES:
+            return
+        heading = self.motion.state(now)[2] if self.motion else (now * 6.0) % 360.0
+        wobble = math.sin(now * 1.7)
+        heading = (heading + self.noise_deg * wobble) % 360.0
+        roll = 2.0 * math.sin(now * 0.9)
+        pitch = 1.0 * math.sin(now * 0.4)
+        _put16(self.regs, EULER_REG, round(heading * 16))
+        _put16(self.regs, EULER_REG + 2, round(roll * 16))
+        _put16(self.regs, EULER_REG + 4, round(pitch * 16))
+        # Earth field rotated by heading, ~40 uT at 16 LSB/uT
+        h = math.radians(heading)
+        _put16(self.regs, MAG_X_LSB, round(640 * math.cos(h)))
+        _put16(self.regs, MAG_X_LSB + 2, round(-640 * math.sin(h)))
+        _put16(self.regs, MAG_X_LSB + 4, -560)
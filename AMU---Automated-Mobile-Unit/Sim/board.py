@@ -0,0 +1,18 @@
+# board.py — CPython stand-in for the CircuitPython `board` module (Raspberry Pi Pico)
+# Author: Steven Westermire (Maddog / Gunny)
+
+
+class Pin:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"board.{self.name}"
+
+
+for _n in range(29):
+    globals()[f"GP{_n}"] = Pin(f"GP{_n}")
+
+LED = GP25  # noqa: F821 (defined in the loop above)
+A0, A1, A2 = GP26, GP27, GP28  # noqa: F821
+board_id = "raspberry_pi_pico_sim"
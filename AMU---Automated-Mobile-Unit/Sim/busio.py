@@ -0,0 +1,136 @@
+# busio.py — CPython stand-in for CircuitPython `busio` (I2C + UART)
+# Author: Steven Westermire (Maddog / Gunny)
+#
+# Devices are looked up in module-level registries so a harness can attach
+# fakes before the Pico modules are imported:
+#   busio.I2C_DEVICES[0x28] = BNO055Emulator(...)
+#   busio.UART_SOURCES["GP5"] = NMEAGenerator(...)      # keyed by RX pin
+# When nothing is attached, a BNO055 at 0x28 and a GPS on GP5 following the
+# default route are created on first use, so imports "just work".
+import time
+
+I2C_DEVICES = {}
+UART_SOURCES = {}
+_default_motion = None
+
+
+def _motion():
+    global _default_motion
+    if _default_motion is None:
+        from motion import RouteMotion
+        _default_motion = RouteMotion()
+    return _default_motion
+
+
+def _pin_name(pin):
+    return getattr(pin, "name", str(pin))
+
+
+class I2C:
+    def __init__(self, scl=None, sda=None, *, frequency=100000, timeout=255):
+        self.scl, self.sda, self.frequency = scl, sda, frequency
+        self._locked = False
+        if not I2C_DEVICES:
+            from bno055_emu import BNO055_ADDR, BNO055Emulator
+            I2C_DEVICES[BNO055_ADDR] = BNO055Emulator(motion=_motion())
+
+    def try_lock(self):
+        if self._locked:
+            return False
+        self._locked = True
+        return True
+
+    def unlock(self):
+        self._locked = False
+
+    def scan(self):
+        return sorted(I2C_DEVICES)
+
+    def _device(self, address):
+        dev = I2C_DEVICES.get(address)
+        if dev is None:
+            raise OSError(19, f"No I2C device at address: 0x{address:x}")
+        return dev
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        self._device(address).write(bytes(buffer[start:end]))
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        end = len(buffer) if end is None else end
+        data = self._device(address).read(end - start)
+        buffer[start:start + len(data)] = data
+
+    def writeto_then_readfrom(self, address, out_buffer, in_buffer, *,
+                              out_start=0, out_end=None, in_start=0, in_end=None):
+        self.writeto(address, out_buffer, start=out_start, end=out_end)
+        self.readfrom_into(address, in_buffer, start=in_start, end=in_end)
+
+    def deinit(self):
+        self._locked = False
+
+
+class UART:
+    """
+    Byte-paced UART: readline() blocks (in virtual time) until a newline
+    arrives or `timeout` expires, matching busio semantics (None on timeout).
+    """
+
+    def __init__(self, tx=None, rx=None, *, baudrate=9600, bits=8, parity=None,
+                 stop=1, timeout=1, receiver_buffer_size=64):
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.rx_name = _pin_name(rx)
+        self._buf = bytearray()
+        self.written = bytearray()
+        self.source = UART_SOURCES.get(self.rx_name)
+        if self.source is None and self.rx_name == "GP5":
+            from nmea_uart import NMEAGenerator
+            self.source = UART_SOURCES[self.rx_name] = NMEAGenerator(_motion(), baudrate=baudrate)
+
+    def _pull(self):
+        if self.source is not None:
+            self._buf.extend(self.source.pop(time.monotonic()))
+
+    @property
+    def in_waiting(self):
+        self._pull()
+        return len(self._buf)
+
+    def _wait_for(self, ready):
+        deadline = time.monotonic() + self.timeout
+        self._pull()
+        while not ready():
+            due = self.source.next_due() if self.source is not None else None
+            if due is None or due > deadline:
+                time.sleep(max(0.0, deadline - time.monotonic()))
+                self._pull()
+                return ready()
+            time.sleep(max(0.0, due - time.monotonic()))
+            self._pull()
+        return True
+
+    def readline(self):
+        if not self._wait_for(lambda: b"\n" in self._buf):
+            return None
+        i = self._buf.find(b"\n")
+        out = bytes(self._buf[:i + 1])
+        del self._buf[:i + 1]
+        return out
+
+    def read(self, nbytes=None):
+        n = nbytes or 1
+        if not self._wait_for(lambda: len(self._buf) >= n) and not self._buf:
+            return None
+        out = bytes(self._buf[:n])
+        del self._buf[:n]
+        return out
+
+    def write(self, buf):
+        self.written.extend(buf)
+        return len(buf)
+
+    def reset_input_buffer(self):
+        self._buf.clear()
+
+    def deinit(self):
+        pass
@@ -0,0 +1,52 @@
+# motion.py — Simple route-following motion model shared by the sensor fakes
+# Author: Steven Westermire (Maddog / Gunny)
+#
+# Position and heading are pure functions of virtual time, so the GPS and IMU
+# emulators agree with each other without sharing state.
+import math
+import time
+
+EARTH_R_M = 6371000.0
+
+DEFAULT_ROUTE = [
+    (33.686377, -117.789653),
+    (33.685965, -117.790052),
+    (33.685647, -117.789599),
+    (33.686268, -117.788997),
+    (33.686559, -117.789462),
+    (33.686377, -117.789653),
+]
+
+
+class RouteMotion:
+    """Drive a closed route at constant speed, pausing `dwell_s` at each waypoint."""
+
+    def __init__(self, route=None, speed_mps=0.8, dwell_s=5.0):
+        self.route = list(route or DEFAULT_ROUTE)
+        self.speed = speed_mps
+        self.dwell = dwell_s
+        lat0 = math.radians(self.route[0][0])
+        self._m_per_deg_lat = math.pi * EARTH_R_M / 180.0
+        self._m_per_deg_lon = self._m_per_deg_lat * math.cos(lat0)
+        self.legs = []  # (start, end, length_m, bearing_deg, duration_s)
+        for a, b in zip(self.route, self.route[1:]):
+            dn = (b[0] - a[0]) * self._m_per_deg_lat
+            de = (b[1] - a[1]) * self._m_per_deg_lon
+            length = math.hypot(dn, de)
+            bearing = math.degrees(math.atan2(de, dn)) % 360.0
+            self.legs.append((a, b, length, bearing, length / speed_mps + dwell_s))
+        self.period = sum(leg[4] for leg in self.legs) or 1.0
+
+    def state(self, t=None):
+        """Return (lat, lon, heading_deg, speed_mps) at virtual time t."""
+        t = (time.monotonic() if t is None else t) % self.period
+        for a, b, length, bearing, duration in self.legs:
+            if t < duration:
+                drive = duration - self.dwell
+                if t >= drive:
+                    return b[0], b[1], bearing, 0.0
+                f = t / drive if drive > 0 else 1.0
+                return a[0] + (b[0] - a[0]) * f, a[1] + (b[1] - a[1]) * f, bearing, self.speed
+            t -= duration
+        last = self.legs[-1]
+        return last[1][0], last[1][1], last[3], 0.0
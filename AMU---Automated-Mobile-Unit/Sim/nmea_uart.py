@@ -0,0 +1,151 @@
+# nmea_uart.py — Scripted NMEA/UBX sources for the fake GPS UART (NEO-6M)
+# Author: Steven Westermire (Maddog / Gunny)
+#
+# A source exposes next_due() -> virtual time of its next chunk (or None) and
+# pop(now) -> bytes due by `now`. busio.UART paces reads against these, so a
+# 9600-baud burst arrives line by line just as it would from the module.
+import math
+import random
+import time
+
+KNOTS_PER_MPS = 1.943844
+
+
+def nmea_checksum(body: str) -> str:
+    cs = 0
+    for ch in body:
+        cs ^= ord(ch)
+    return f"{cs:02X}"
+
+
+def nmea(body: str) -> bytes:
+    return f"${body}*{nmea_checksum(body)}\r\n".encode("ascii")
+
+
+def ubx_frame(msg_class: int, msg_id: int, payload: bytes = b"") -> bytes:
+    """Build a UBX binary frame (sync 0xB5 0x62, little-endian length, Fletcher checksum)."""
+    body = bytes([msg_class, msg_id, len(payload) & 0xFF, len(payload) >> 8]) + payload
+    ck_a = ck_b = 0
+    for b in body:
+        ck_a = (ck_a + b) & 0xFF
+        ck_b = (ck_b + ck_a) & 0xFF
+    return b"\xb5\x62" + body + bytes([ck_a, ck_b])
+
+
+def _fmt_lat(lat):
+    hemi = "N" if lat >= 0 else "S"
+    lat = abs(lat)
+    deg = int(lat)
+    return f"{deg:02d}{(lat - deg) * 60.0:08.5f}", hemi
+
+
+def _fmt_lon(lon):
+    hemi = "E" if lon >= 0 else "W"
+    lon = abs(lon)
+    deg = int(lon)
+    return f"{deg:03d}{(lon - deg) * 60.0:08.5f}", hemi
+
+
+class ScriptedSource:
+    """
+    Replay a fixed script. Entries are bytes (sent back to back at the UART
+    byte rate) or (t_offset_s, bytes) pairs. loop=True repeats every period_s.
+    """
+
+    def __init__(self, entries, baudrate=9600, loop=False, period_s=None, start=None):
+        self.byte_s = 10.0 / baudrate
+        self.loop = loop
+        self._script = []
+        t = 0.0
+        for e in entries:
+            if isinstance(e, tuple):
+                t, chunk = float(e[0]), e[1]
+            else:
+                chunk = e
+            if isinstance(chunk, str):
+                chunk = chunk.encode("ascii")
+            t += len(chunk) * self.byte_s
+            self._script.append((t, chunk))
+        self.period = period_s or (self._script[-1][0] if self._script else 1.0)
+        self._start = time.monotonic() if start is None else start
+        self._i = 0
+
+    def next_due(self):
+        if self._i >= len(self._script):
+            if not self.loop or not self._script:
+                return None
+            self._i = 0
+            self._start += self.period
+        return self._start + self._script[self._i][0]
+
+    def pop(self, now):
+        out = bytearray()
+        while True:
+            due = self.next_due()
+            if due is None or due > now:
+                return bytes(out)
+            out.extend(self._script[self._i][1])
+            self._i += 1
+
+
+class NMEAGenerator:
+    """
+    Live NEO-6M style output: a 1 Hz burst of GGA/GSA/RMC/VTG/GLL from a
+    RouteMotion with Gaussian position noise. `ubx_every` > 0 interleaves a
+    UBX NAV-POSLLH frame every N bursts (binary noise the NMEA parser must skip).
+    `fix_after_s` keeps RMC/GLL void and GGA empty until the receiver "locks".
+    """
+
+    def __init__(self, motion, baudrate=9600, noise_m=1.5, fix_after_s=5.0, ubx_every=0, seed=0):
+        self.motion = motion
+        self.byte_s = 10.0 / baudrate
+        self.noise_m = noise_m
+        self.fix_after_s = fix_after_s
+        self.ubx_every = ubx_every
+        self.rng = random.Random(seed)
+        self._t0 = time.monotonic()
+        self._burst = 0
+        self._queue = []  # (due, bytes)
+
+    def _make_burst(self, t):
+        lat, lon, heading, speed = self.motion.state(t)
+        if self.noise_m:
+            lat += self.rng.gauss(0.0, self.noise_m) / 111320.0
+            lon += self.rng.gauss(0.0, self.noise_m) / (111320.0 * math.cos(math.radians(lat)))
+        secs = int(t) % 86400
+        hms = f"{secs // 3600:02d}{secs // 60 % 60:02d}{secs % 60:02d}.00"
+        fixed = (t - self._t0) >= self.fix_after_s
+        la, ns = _fmt_lat(lat)
+        lo, ew = _fmt_lon(lon)
+        if fixed:
+            lines = [
+                nmea(f"GPGGA,{hms},{la},{ns},{lo},{ew},1,08,0.9,30.0,M,-34.0,M,,"),
+                nmea("GPGSA,A,3,04,05,09,12,17,20,25,29,1.6,0.9,1.3"),
+                nmea(f"GPRMC,{hms},A,{la},{ns},{lo},{ew},{speed * KNOTS_PER_MPS:.3f},{heading:.2f},191026,,,A"),
+                nmea(f"GPVTG,{heading:.2f},T,,M,{speed * KNOTS_PER_MPS:.3f},N,{speed * 3.6:.3f},K,A"),
+                nmea(f"GPGLL,{la},{ns},{lo},{ew},{hms},A,A"),
+            ]
+        else:
+            lines = [
+                nmea(f"GPGGA,{hms},,,,,0,00,99.99,,,,,,"),
+                nmea(f"GPRMC,{hms},V,,,,,,,191026,,,N"),
+                nmea(f"GPGLL,,,,,{hms},V,N"),
+            ]
+        self._burst += 1
+        if self.ubx_every and self._burst % self.ubx_every == 0:
+            lines.insert(1, ubx_frame(0x01, 0x02, bytes(28)))
+        due = t
+        for line in lines:
+            due += len(line) * self.byte_s
+            self._queue.append((due, line))
+
+    def next_due(self):
+        if not self._queue:
+            self._make_burst(self._t0 + self._burst * 1.0)
+        return self._queue[0][0]
+
+    def pop(self, now):
+        out = bytearray()
+        while self.next_due() <= now:
+            out.extend(self._queue.pop(0)[1])
+        return bytes(out)
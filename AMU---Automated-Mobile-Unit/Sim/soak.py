@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: soak.py
+Description: Runs the unmodified Pico firmware (Sensors/main.py + imu_bno055.py +
+             GPS_LatLon.py + transport.py) on CPython against the fakes in this
+             directory, wired through a fake USB CDC pipe to the real Pi bridge,
+             under a virtual clock. A 24-hour endurance run takes minutes.
+
+Usage:  python3 soak.py --hours 24 [--speed N] [--loss 0.01] [--fresh-calib] [--trace-mem]
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import argparse
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+SENSORS_DIR = os.path.join(SIM_DIR, "..", "Sensors")
+USB_COMM_DIR = os.path.join(SIM_DIR, "..", "..", "Raspberry Pi", "USB_Comm")
+
+# Fakes must shadow any real board/busio/usb_cdc, so they go first
+sys.path[:0] = [SIM_DIR, SENSORS_DIR, USB_COMM_DIR]
+
+from vclock import SoakComplete, VirtualClock  # noqa: E402
+
+
+class _Sink:
+    """Swallows the firmware's console prints (a 24 h run prints ~500k lines)."""
+
+    def __init__(self):
+        self.lines = 0
+
+    def write(self, s):
+        self.lines += s.count("\n")
+        return len(s)
+
+    def flush(self):
+        pass
+
+
+class SoakStats:
+    def __init__(self):
+        self.by_type = {}
+        self.max_age_s = 0.0
+        self.max_gap_s = 0.0
+        self._last_telemetry = None
+
+    def on_frame(self, frame):
+        kind = frame.get("type", "?")
+        self.by_type[kind] = self.by_type.get(kind, 0) + 1
+        now = time.monotonic()
+        if "ts" in frame:
+            self.max_age_s = max(self.max_age_s, now - frame["ts"])
+            if self._last_telemetry is not None:
+                self.max_gap_s = max(self.max_gap_s, frame["ts"] - self._last_telemetry)
+            self._last_telemetry = frame["ts"]
+
+
+def _load_firmware():
+    spec = importlib.util.spec_from_file_location("pico_main", os.path.join(SENSORS_DIR, "main.py"))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def run_soak(hours=24.0, speed=None, loss=0.0, seed=0, ubx_every=0,
+             fresh_calib=False, trace_mem=False, verbose=False):
+    clock = VirtualClock(speed=speed).install()
+    wall_start = time.perf_counter()  # perf_counter is not patched
+
+    import busio
+    import usb_cdc
+    from bno055_emu import BNO055_ADDR, BNO055Emulator
+    from motion import RouteMotion
+    from nmea_uart import NMEAGenerator
+    from pi_bridge import PiBridge
+
+    motion = RouteMotion()
+    imu_emu = BNO055Emulator(motion=motion)
+    busio.I2C_DEVICES[BNO055_ADDR] = imu_emu
+    busio.UART_SOURCES["GP5"] = NMEAGenerator(motion, ubx_every=ubx_every, seed=seed)
+    usb_cdc.set_loss(loss, loss, seed)
+
+    stats = SoakStats()
+    bridge = PiBridge(usb_cdc.host, verbose=False)
+    bridge.on_frame = stats.on_frame
+
+    def service_pi(now):
+        n = 0
+        while usb_cdc.host.in_waiting and n < 256:
+            bridge.service_once()
+            n += 1
+        if n == 0:
+            bridge.service_once()
+
+    clock.hooks.append(service_pi)
+    clock.deadline = hours * 3600.0
+
+    workdir = tempfile.mkdtemp(prefix="amu_soak_")
+    if not fresh_calib:
+        shutil.copy(os.path.join(SENSORS_DIR, "imu_offsets.bin"), workdir)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+
+    if trace_mem:
+        import tracemalloc
+        tracemalloc.start()
+        mem_marks = []
+        clock.hooks.append(lambda now: mem_marks.append((now, tracemalloc.get_traced_memory()[0]))
+                           if not mem_marks or now - mem_marks[-1][0] >= 3600.0 else None)
+
+    sink = _Sink()
+    real_stdout = sys.stdout
+    firmware = None
+    try:
+        sys.stdout = real_stdout if verbose else sink
+        firmware = _load_firmware()
+        firmware.main()
+    except SoakComplete:
+        pass
+    finally:
+        sys.stdout = real_stdout
+        clock.uninstall()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    wall = time.perf_counter() - wall_start
+    virt = clock.t
+    print(f"[Soak] virtual {virt / 3600.0:.2f} h in {wall:.1f} s wall ({virt / max(wall, 1e-9):.0f}x real time)")
+    print(f"[Soak] frames delivered: {bridge.frames}  by type: {stats.by_type}")
+    print(f"[Soak] duplicates: {bridge.receiver.duplicates}  skipped seqs: {bridge.receiver.skipped}  "
+          f"console lines: {sink.lines}")
+    print(f"[Soak] max telemetry gap: {stats.max_gap_s:.2f} s  max frame age at Pi: {stats.max_age_s * 1000:.1f} ms")
+    print(f"[Soak] IMU I2C reads: {imu_emu.reads}")
+    link = getattr(firmware, "_link", None) if firmware else None
+    if link:
+        print(f"[Soak] TransportLink stats: {link.stats}  pending: {link.pending()}")
+    if trace_mem:
+        import tracemalloc
+        tracemalloc.stop()
+        if len(mem_marks) >= 2:
+            print(f"[Soak] traced heap: {mem_marks[1][1] / 1024:.1f} KiB @1h -> "
+                  f"{mem_marks[-1][1] / 1024:.1f} KiB @{mem_marks[-1][0] / 3600.0:.0f}h")
+    return bridge, stats
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Accelerated-time Pico soak test on CPython")
+    ap.add_argument("--hours", type=float, default=24.0)
+    ap.add_argument("--speed", type=float, default=None, help="x real time (default: as fast as possible)")
+    ap.add_argument("--loss", type=float, default=0.0, help="USB CDC line loss probability, each direction")
+    ap.add_argument("--ubx-every", type=int, default=0, help="inject a UBX frame every N GPS bursts")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--fresh-calib", action="store_true", help="start without imu_offsets.bin")
+    ap.add_argument("--trace-mem", action="store_true", help="track heap growth per virtual hour (slower)")
+    ap.add_argument("--verbose", action="store_true", help="show the firmware console output")
+    a = ap.parse_args()
+    run_soak(a.hours, a.speed, a.loss, a.seed, a.ubx_every, a.fresh_calib, a.trace_mem, a.verbose)
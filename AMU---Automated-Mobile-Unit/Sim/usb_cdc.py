@@ -0,0 +1,78 @@
+# usb_cdc.py — CPython stand-in for CircuitPython `usb_cdc`
+# Author: Steven Westermire (Maddog / Gunny)
+#
+# `data` is the Pico end of an in-memory pipe; `host` is the Pi end and looks
+# like a pyserial port, so pi_bridge.PiBridge can be wired straight to it.
+# Optional loss lets a soak exercise TransportLink retransmits.
+import random
+
+
+class _PipeEnd:
+    def __init__(self, name):
+        self.name = name
+        self._rx = bytearray()
+        self.peer = None
+        self.loss = 0.0
+        self.rng = random.Random(0)
+        self.bytes_out = 0
+        self.lines_dropped = 0
+        self.is_open = True
+        self.timeout = 0
+
+    def __bool__(self):
+        return True
+
+    # --- writer side ---
+    def write(self, data):
+        data = bytes(data)
+        self.bytes_out += len(data)
+        if self.loss and self.rng.random() < self.loss:
+            self.lines_dropped += 1
+            return len(data)
+        self.peer._rx.extend(data)
+        return len(data)
+
+    # --- reader side ---
+    @property
+    def in_waiting(self):
+        return len(self._rx)
+
+    def read(self, n=1):
+        out = bytes(self._rx[:n])
+        del self._rx[:n]
+        return out
+
+    def readline(self):
+        i = self._rx.find(b"\n")
+        if i < 0:
+            # Non-blocking pipe: behave like a serial port whose timeout expired
+            return b"" if self.name == "host" else None
+        out = bytes(self._rx[:i + 1])
+        del self._rx[:i + 1]
+        return out
+
+    def reset_input_buffer(self):
+        self._rx.clear()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+
+data = _PipeEnd("pico")
+host = _PipeEnd("host")
+data.peer, host.peer = host, data
+console = None
+
+
+def enable(console=True, data=True):
+    pass
+
+
+def set_loss(pico_to_pi=0.0, pi_to_pico=0.0, seed=0):
+    """Drop whole writes with the given probabilities (deterministic per seed)."""
+    data.loss, host.loss = pico_to_pi, pi_to_pico
+    data.rng, host.rng = random.Random(seed), random.Random(seed + 1)
+
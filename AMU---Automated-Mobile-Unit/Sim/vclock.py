@@ -0,0 +1,58 @@
+# vclock.py — Virtual clock for running Pico code on CPython faster than real time
+# Author: Steven Westermire (Maddog / Gunny)
+#
+# install() patches time.monotonic/time.sleep/time.time so the unmodified Pico
+# modules see virtual time. sleep() advances the clock instantly (speed=None)
+# or at `speed` x real time, and runs hooks so simulated peers (Pi bridge,
+# sensors) get serviced between Pico ticks without threads.
+import time
+
+
+class SoakComplete(Exception):
+    """Raised from sleep() once the clock passes its deadline."""
+
+
+class VirtualClock:
+    def __init__(self, start=0.0, speed=None, epoch=1760000000.0):
+        self.t = float(start)
+        self.speed = speed          # None = as fast as possible
+        self.epoch = epoch          # wall-clock value reported at t == 0
+        self.deadline = None
+        self.hooks = []             # callables(now) run after every advance
+        self._saved = None
+
+    def monotonic(self):
+        return self.t
+
+    def monotonic_ns(self):
+        return int(self.t * 1e9)
+
+    def time(self):
+        return self.epoch + self.t
+
+    def sleep(self, dt):
+        if dt > 0:
+            if self.speed:
+                self._saved[1](dt / self.speed)
+            self.t += dt
+        for hook in self.hooks:
+            hook(self.t)
+        if self.deadline is not None and self.t >= self.deadline:
+            raise SoakComplete(self.t)
+
+    def advance_to(self, t):
+        self.sleep(max(0.0, t - self.t))
+
+    def install(self):
+        if self._saved is None:
+            self._saved = (time.monotonic, time.sleep, time.time, time.monotonic_ns)
+            time.monotonic = self.monotonic
+            time.sleep = self.sleep
+            time.time = self.time
+            time.monotonic_ns = self.monotonic_ns
+        return self
+
+    def uninstall(self):
+        if self._saved is not None:
+            time.monotonic, time.sleep, time.time, time.monotonic_ns = self._saved
+            self._saved = None
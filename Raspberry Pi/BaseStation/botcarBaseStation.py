@@ -7,23 +7,83 @@ Description: LoRa base station listener that ACKs botCar messages and logs missi
 Restores mission logging and fixes parsing; minimal changes to preserve baseline behavior.
 """
 
+import itertools
 import os
+import sys
 import time
 from datetime import datetime
 
 import serial
 import yaml
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Common"))
+from at_command import ATEngine, format_setup
+from ack_scheduler import AckScheduler, ChannelEstimator
+from adr import DEFAULT_LADDER, RateController, normalize
+from airtime_meter import AirtimeMeter, message_kind
+from assignment import AssistDispatcher, CostModel, Incident
+from dashboard import DashboardServer, FleetView
+from downlink import DownlinkQueue, parse_dn_ack
+from fleet_index import FleetIndex
+from lora_airtime import DEFAULT_PARAMETER, RFParams
+from metrics import RSSI_BUCKETS, SNR_BUCKETS, Registry, timed
+from node_registry import NodeRegistry
+from radio_pool import RadioPool, radio_specs
+from rylr998 import PRIO_ACK, PRIO_HIGH, RYLR998
+from receive import ADMIT, DECISIONS, QuarantineStore, ReceivePipeline, build_validators
+from serial_capture import maybe_tap
+from tracing import TraceLog, format_pong
+
 
 # ---------------- Configuration ----------------
 CONFIG_FILE = "baseStation_config.yaml"
 DEFAULTS = {
+    "NetworkID": 6,
+    "Band": 915000000,
+    "Base_Address": 1,
+    "Radio_Setup": "Y",       # apply NetworkID/Band/Base_Address at startup (writes only what differs)
+    "AT_Timeout": 0.3,        # seconds to wait for each AT reply
     "Serial_Port": "/dev/ttyS0",
+    "Radios": [],             # several modules: [{Name, Serial_Port, NetworkID, Band, ...}], one process each
     "Baud_Rate": 115200,
     "Timeout": 1,             # seconds
     "Retry_Count": 3,
     "Mission_Logging": "Y",   # ON by default to match baseline behavior
     "Log_Directory": "./logs",
+    "Trace_Logging": "N",     # per-hop latency trace (see ../Common/tracing.py)
+    "Serial_Capture": "N",    # record raw LoRa UART traffic for replay (../Tools/serial_replay.py)
+    "Fleet_Grid_M": 50,       # spatial index cell size (metres) for nearest-unit / geofence queries
+    "Geofences": {},          # name: [[lat, lon], ...] polygons; enter/exit events are logged
+    "Node_Stale_S": 120,      # registry: units silent this long are not dispatched
+    "Assist_Dispatch": "Y",   # min-cost ASSIST assignment on PR:<id>:ASSIST requests
+    "Assist_Speed_MPS": 0.8,  # unit speed used for ETA costs
+    "Receive_Validators": "length,seq_window,coords,state",  # checks run before any ACK (+ "registration", opt-in)
+    "Receive_Seq_Window": 16,       # waypoint index may move at most this far from the last admitted one
+    "Receive_Max_Speed_MPS": 15,    # position jumps implying a faster unit are quarantined
+    "Quarantine_Max_Records": 1000, # on-disk quarantine bound (two rolling files)
+    "Receive_Stats_S": 300,         # print/log receive stats this often (0 = only on exit)
+    "LoRa_Parameter": DEFAULT_PARAMETER,  # module's AT+PARAMETER (SF,BW,CR,preamble), for airtime estimates
+    "Ack_Scheduling": "N",    # Y: ACKs in predicted gaps between units' periodic FS frames (needs units with a Pico link)
+    "Ack_Max_Hold_S": 0.5,    # an ACK is never held longer than this
+    "Ack_Guard_S": 0.05,      # margin kept clear around each predicted frame
+    "Duty_Cycle_Pct": 0,      # transmit budget in % of Airtime_Window_S (0 = no limit); ACKs are never held
+    "Airtime_Window_S": 3600, # sliding window for airtime totals and the duty-cycle budget
+    "Metrics_Port": 9108,     # Prometheus /metrics on this port (0 = off)
+    "Metrics_Bind": "127.0.0.1",
+    "Dashboard_Port": 8088,   # live fleet page + WebSocket updates; 0 = off
+    "Dashboard_Bind": "127.0.0.1",
+    "Dashboard_Tick_S": 0.5,  # browser updates are coalesced into one diff per tick
+    "Dashboard_Commands": "N",  # Y: POST /api/command {"node", "type", "payload"} issues DN commands
+    "Downlink_Window": 2,     # DN commands in flight per unit (EMERGENCY_STOP is never held)
+    "Downlink_Retry_S": 5,    # first ACKDN timeout; doubles per attempt
+    "Downlink_Attempts": 3,   # sends per command before it is reported failed
+    "ADR": "N",               # fleet-wide adaptive data rate (units need adr: true)
+    "ADR_Profiles": list(DEFAULT_LADDER),  # AT+PARAMETER profiles ADR may choose from
+    "ADR_Margin_DB": 10,      # required SNR margin above the SF's demodulation floor (worst unit)
+    "ADR_Interval_S": 60,     # how often the rate is re-evaluated
+    "ADR_Hold_S": 300,        # minimum time between speed-ups
+    "ADR_Switch_Delay_S": 5,  # units and base switch this long after the DR command goes out
+    "ADR_Fallback_S": 300,    # nothing heard this long on a non-default profile -> back to LoRa_Parameter
 }
 
 def load_config(path: str) -> dict:
@@ -38,12 +98,55 @@ def load_config(path: str) -> dict:
 
 cfg = load_config(CONFIG_FILE)
 
+NETWORK_ID      = int(cfg["NetworkID"])
+BAND            = int(cfg["Band"])
+BASE_ADDRESS    = int(cfg["Base_Address"])
+RADIO_SETUP     = str(cfg["Radio_Setup"]).strip().upper() == "Y"
+AT_TIMEOUT      = float(cfg["AT_Timeout"])
 SERIAL_PORT     = cfg["Serial_Port"]
+RADIOS          = radio_specs(cfg["Radios"], cfg)
 BAUD_RATE       = int(cfg["Baud_Rate"])
 TIMEOUT         = float(cfg["Timeout"])
 RETRY_COUNT     = int(cfg["Retry_Count"])
 MISSION_LOGGING = str(cfg["Mission_Logging"]).strip().upper() == "Y"
 LOG_DIR         = cfg["Log_Directory"]
+TRACE_LOGGING   = str(cfg["Trace_Logging"]).strip().upper() == "Y"
+SERIAL_CAPTURE  = str(cfg["Serial_Capture"]).strip().upper() == "Y"
+FLEET_GRID_M    = float(cfg["Fleet_Grid_M"])
+GEOFENCES       = cfg["Geofences"] or {}
+NODE_STALE_S    = float(cfg["Node_Stale_S"])
+ASSIST_DISPATCH = str(cfg["Assist_Dispatch"]).strip().upper() == "Y"
+ASSIST_SPEED    = float(cfg["Assist_Speed_MPS"])
+RX_VALIDATORS   = cfg["Receive_Validators"] or ""
+RX_SEQ_WINDOW   = int(cfg["Receive_Seq_Window"])
+RX_MAX_SPEED    = float(cfg["Receive_Max_Speed_MPS"])
+QUARANTINE_MAX  = int(cfg["Quarantine_Max_Records"])
+RX_STATS_S      = float(cfg["Receive_Stats_S"])
+LORA_PARAMETER  = str(cfg["LoRa_Parameter"])
+ACK_SCHEDULING  = str(cfg["Ack_Scheduling"]).strip().upper() == "Y"
+ACK_MAX_HOLD_S  = float(cfg["Ack_Max_Hold_S"])
+ACK_GUARD_S     = float(cfg["Ack_Guard_S"])
+DUTY_CYCLE_PCT  = float(cfg["Duty_Cycle_Pct"])
+AIRTIME_WINDOW  = float(cfg["Airtime_Window_S"])
+METRICS_PORT    = int(cfg["Metrics_Port"])
+METRICS_BIND    = str(cfg["Metrics_Bind"])
+DASHBOARD_PORT  = int(cfg["Dashboard_Port"] or 0)
+DASHBOARD_BIND  = str(cfg["Dashboard_Bind"])
+DASHBOARD_TICK  = float(cfg["Dashboard_Tick_S"])
+DASHBOARD_CMDS  = str(cfg["Dashboard_Commands"]).strip().upper() == "Y"
+DN_WINDOW       = int(cfg["Downlink_Window"])
+DN_RETRY_S      = float(cfg["Downlink_Retry_S"])
+DN_ATTEMPTS     = int(cfg["Downlink_Attempts"])
+ADR_ENABLED     = str(cfg["ADR"]).strip().upper() == "Y"
+ADR_PROFILES    = cfg["ADR_Profiles"] or list(DEFAULT_LADDER)
+ADR_MARGIN_DB   = float(cfg["ADR_Margin_DB"])
+ADR_INTERVAL_S  = float(cfg["ADR_Interval_S"])
+ADR_HOLD_S      = float(cfg["ADR_Hold_S"])
+ADR_SWITCH_S    = float(cfg["ADR_Switch_Delay_S"])
+ADR_FALLBACK_S  = float(cfg["ADR_Fallback_S"])
+if RADIOS and ADR_ENABLED:
+    print("[BaseStation] ADR needs a single radio (one profile per channel); disabled with Radios.")
+    ADR_ENABLED = False
 
 # ---------------- Logging setup ----------------
 os.makedirs(LOG_DIR, exist_ok=True)  # ensure ./logs exists
@@ -54,16 +157,327 @@ if MISSION_LOGGING:
     log_file = os.path.join(LOG_DIR, f"mission_log_{ts_stamp}.txt")
     print(f"[BaseStation] Mission logging enabled. Log file: {log_file}")
 
+# ---------------- Metrics (../Common/metrics.py) ----------------
+metrics = Registry()
+live = {}  # radio / rx queue of the running listen loop, read at scrape time
+M_RX = metrics.counter("rx_frames_total", "Frames received by token type and Receive decision", ("type", "decision"))
+M_TX = metrics.counter("tx_frames_total", "AT+SEND commands completed by token type and result", ("type", "result"))
+M_TX_LAT = metrics.histogram("tx_latency_seconds", "Queue to module reply per AT+SEND", ("type",))
+M_RSSI = metrics.histogram("rssi_dbm", "RSSI of admitted frames per unit", ("node",), RSSI_BUCKETS)
+M_SNR = metrics.histogram("snr_db", "SNR of admitted frames per unit", ("node",), SNR_BUCKETS)
+M_LOG = metrics.histogram("log_write_seconds", "Mission log append time", buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1))
+M_DN = metrics.counter("downlink_commands_total", "DN commands finished by type and result", ("type", "result"))
+M_DN_LAT = metrics.histogram("downlink_latency_seconds", "DN command issue to unit ACKDN", ("type",))
+M_DN_RETRY = metrics.counter("downlink_retries_total", "DN re-sends after an ACKDN timeout", ("type",))
+metrics.gauge("downlink_pending", "DN commands queued or awaiting ACKDN", fn=lambda: downlink.pending())
+metrics.gauge("tx_queue_depth", "Commands waiting in the radio TX queue", fn=lambda: live["radio"].depth())
+metrics.gauge("rx_queue_depth", "+RCV lines waiting for the listen loop", fn=lambda: live["rx"].q.qsize())
+metrics.gauge("ack_pending", "ACKs held by the ACK scheduler", fn=lambda: len(acks.pending) if acks else 0)
+metrics.gauge("units_registered", "Units in the node registry", fn=lambda: len(registry.nodes))
+metrics.counter_fn("radio_timeouts_total", "AT commands with no module reply", lambda: live["radio"].timeouts)
+metrics.counter_fn("radio_deferred_total", "Sends held by the duty-cycle budget", lambda: live["radio"].deferred)
+metrics.gauge("lora_sf", "Spreading factor in use", fn=lambda: rf.sf)
+metrics.gauge("channel_utilization", "Airtime share heard + sent over the airtime window",
+              fn=lambda: meter.utilization()["channel"])
+metrics.gauge("radio_channel_utilization", "Airtime share per radio (Radios)", ("radio",),
+              fn=lambda: {n: s.get("utilization", 0) for n, s in zip(live["radio"].names, live["radio"].stats)})
+metrics.counter_fn("radio_rx_frames_total", "+RCV lines per radio (Radios)",
+                   lambda: dict(zip(live["radio"].names, live["radio"].rx_frames)), ("radio",))
+
+def on_tx_done(fut) -> None:
+    kind = message_kind(fut.payload) if fut.payload is not None else "AT"
+    M_TX.labels(kind, "ok" if fut.error is None else "error").inc()
+    M_TX_LAT.observe(fut.t_done - fut.t_queued, M_TX_LAT.labels(kind))
+
 def write_log(line: str) -> None:
     if MISSION_LOGGING and log_file:
-        with open(log_file, "a", buffering=1, encoding="utf-8") as f:
+        with timed(M_LOG), open(log_file, "a", buffering=1, encoding="utf-8") as f:
             f.write(line + "\n")
 
+tracer = TraceLog(LOG_DIR, "base", "base") if TRACE_LOGGING else None
+if tracer:
+    print(f"[BaseStation] Trace logging enabled. Trace file: {tracer.path}")
+
+# --------------- Fleet positions ---------------
+registry = NodeRegistry(stale_after_s=NODE_STALE_S)
+dispatcher = AssistDispatcher(registry, CostModel(speed_mps=ASSIST_SPEED)) if ASSIST_DISPATCH else None
+incident_seq = itertools.count(1)
+fleet = FleetIndex(cell_m=FLEET_GRID_M)
+geofences = []
+for _name, _poly in GEOFENCES.items():
+    try:
+        geofences.append(fleet.make_geofence(_name, _poly))
+    except Exception as e:
+        print(f"[BaseStation] Geofence '{_name}' ignored: {e}")
+fence_members = {}  # node_id -> set of geofence names the unit is inside
+
+def update_fleet(node_id: str, lat, lon, ts: str, src: str = "FS") -> None:
+    """Record a reported position and log geofence enter/exit transitions."""
+    try:
+        lat, lon = float(lat), float(lon)
+    except (TypeError, ValueError):
+        return
+    fleet.update(node_id, lat, lon)
+    registry.set_position(node_id, lat, lon, src=src)
+    if not geofences:
+        return
+    rec = fleet.nodes[node_id]
+    inside = {g.name for g in geofences if g.contains(rec[0], rec[1])}
+    before = fence_members.get(node_id, set())
+    for name in sorted(inside - before):
+        print(f"[BaseStation] Node {node_id} entered geofence '{name}'")
+        write_log(f"[{ts}] node_id={node_id}, type=GEOFENCE, event=ENTER, zone={name}, lat={lat}, lon={lon}")
+    for name in sorted(before - inside):
+        print(f"[BaseStation] Node {node_id} left geofence '{name}'")
+        write_log(f"[{ts}] node_id={node_id}, type=GEOFENCE, event=EXIT, zone={name}, lat={lat}, lon={lon}")
+    fence_members[node_id] = inside
+
+def nearest_units(lat: float, lon: float, k: int = 3, exclude=()):
+    """k closest units to a point as [(dist_m, node_id), ...] (for ASSIST dispatch)."""
+    return fleet.nearest(lat, lon, k, exclude=exclude)
+
+def units_in_zone(name: str):
+    """Node ids currently inside the named geofence."""
+    for g in geofences:
+        if g.name == name:
+            return fleet.within_polygon(g)
+    return []
+
+# --------------- ASSIST dispatch ---------------
+def send_to_node(radio, node_id: str, msg: str, priority: int = PRIO_HIGH):
+    """AT+SEND to the LoRa address the node was last heard from (falls back to its id)."""
+    addr = registry.address_of(node_id) or node_id
+    return radio.send(addr, msg, priority)
+
+def issue_assist_commands(cmds, ts: str) -> None:
+    """
+    Dispatcher output as downlink commands (ACKDN, retries): DN:ASSIST payload
+    <incident>:<lat>,<lon>, DN:CANCEL_ASSIST payload <incident>.
+    """
+    for kind, node_id, inc_id in cmds:
+        if kind == "ASSIST":
+            inc = dispatcher.incidents[inc_id]
+            payload = f"{inc_id}:{inc.lat:.6f},{inc.lon:.6f}"
+        else:
+            payload = inc_id
+        issue_command(node_id, kind, payload)
+        print(f"[BaseStation] {kind} -> Node {node_id} (incident {inc_id})")
+        write_log(f"[{ts}] node_id={node_id}, type={kind}, incident={inc_id}")
+
+def handle_priority(node_id: str, code: str, args: str, ts: str) -> None:
+    """PR:<id>:ASSIST[:<lat>,<lon>] opens an incident; PR:<id>:ASSIST_CLEAR closes that node's incidents."""
+    if code == "LOW_BATT" and args:
+        try:
+            registry.set_battery(node_id, float(args))
+        except ValueError:
+            pass
+    if not dispatcher:
+        return
+    if code == "ASSIST":
+        rec = registry.get(node_id)
+        try:
+            lat, lon = (float(x) for x in args.split(",", 1)) if args else (rec.lat, rec.lon)
+        except (TypeError, ValueError, AttributeError):
+            print(f"[BaseStation] ASSIST from Node {node_id} has no position; ignored")
+            return
+        inc = Incident(f"{node_id}-{next(incident_seq)}", lat, lon, exclude=(node_id,))
+        cmds = dispatcher.add_incident(inc)
+        print(f"[BaseStation] Incident {inc.incident_id} at {lat:.6f},{lon:.6f} "
+              f"({'solved' if cmds else 'no unit available'} in {dispatcher.solve_s * 1e3:.1f} ms)")
+        issue_assist_commands(cmds, ts)
+    elif code == "ASSIST_CLEAR":
+        for inc_id in [i for i in dispatcher.incidents if i.startswith(f"{node_id}-")]:
+            issue_assist_commands(dispatcher.close_incident(inc_id), ts)
+
+# --------------- Receive stage ---------------
+def build_receive_pipeline():
+    """Acquire/Validate/Decide chain for every +RCV line (see ../Common/receive.py)."""
+    validators = build_validators(RX_VALIDATORS, registry, RX_SEQ_WINDOW, RX_MAX_SPEED)
+    store = QuarantineStore(LOG_DIR, "base", QUARANTINE_MAX)
+    print(f"[BaseStation] Receive validators: {', '.join(v.name for v in validators) or 'none'}; "
+          f"quarantine: {store.path}")
+    return ReceivePipeline(parse_rcv, validators, store)
+
+def report_receive_stats(receive) -> None:
+    line = receive.format_stats()
+    print(f"[BaseStation] Receive: {line}")
+    write_log(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] type=RX_STATS, {line}")
+
+# --------------- ACK scheduling ---------------
+rf = RFParams.from_parameter(LORA_PARAMETER)
+# With Radios, each radio's worker schedules ACKs for its own channel
+acks = AckScheduler(ChannelEstimator(rf, guard_s=ACK_GUARD_S), ACK_MAX_HOLD_S) \
+    if ACK_SCHEDULING and not RADIOS else None
+
+# Airtime per unit / message type, shared with the radio driver
+meter = AirtimeMeter(rf, AIRTIME_WINDOW, duty_cycle=DUTY_CYCLE_PCT / 100.0)
+
+def report_airtime() -> None:
+    line = meter.format_report()
+    print(f"[BaseStation] Airtime: {line}")
+    write_log(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] type=AIRTIME, {line}")
+    if isinstance(live.get("radio"), RadioPool):
+        for line in live["radio"].format_report():
+            print(f"[BaseStation] Radio {line}")
+            write_log(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] type=RADIO_STATS, radio={line}")
+
+def send_ack(radio, src: int, ack_msg: str, node_id: str, now: float) -> None:
+    """ACK now, or queue it for the next predicted channel gap (see ../Common/ack_scheduler.py)."""
+    if isinstance(radio, RadioPool):
+        radio.send_ack(src, ack_msg, node_id)  # out the radio src was heard on, scheduled for its channel
+        return
+    if acks is None:
+        radio.send(src, ack_msg, PRIO_ACK)
+        return
+    acks.enqueue(src, ack_msg, node_id, now)
+    release_acks(radio, now)
+
+def release_acks(radio, now: float) -> None:
+    for dest, msg in acks.due(now):
+        radio.send(dest, msg, PRIO_ACK)
+
+def report_ack_stats(now: float) -> None:
+    s = acks.stats(now)
+    line = (f"released={s['released']}, coalesced={s['coalesced']}, forced={s['forced']}, "
+            f"mean_hold_ms={s['mean_hold_ms']:.1f}, channel_util={100 * s['utilization']:.1f}%")
+    print(f"[BaseStation] ACK scheduler: {line}")
+    write_log(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] type=ACK_STATS, {line}")
+
+# --------------- Adaptive data rate ---------------
+adr = RateController(ADR_PROFILES, LORA_PARAMETER, ADR_MARGIN_DB, hold_s=ADR_HOLD_S,
+                     active_s=NODE_STALE_S) if ADR_ENABLED else None
+adr_state = {"next": 0.0, "pending": None, "futs": [], "switch_at": None, "last_rx": time.monotonic()}
+
+def set_data_rate(radio, param: str, reason: str) -> None:
+    """Apply an AT+PARAMETER profile on the base radio and in every airtime model."""
+    global rf
+    rf = RFParams.from_parameter(param)
+    radio.submit(f"AT+PARAMETER={param}", PRIO_HIGH)
+    radio.rf = rf
+    meter.set_rf(rf)
+    if acks:
+        acks.est.set_rf(rf)
+    adr.commit(param)
+    print(f"[BaseStation] Data rate {param} ({rf}, {reason})")
+    write_log(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] type=ADR, parameter={param}, reason={reason}")
+
+def adr_tick(radio, now: float) -> None:
+    """Re-evaluate the fleet data rate; a change goes out as DR:<node>:<param>:<delay> to each active unit."""
+    st = adr_state
+    if st["pending"]:
+        if st["switch_at"] is None and all(f.done() for f in st["futs"]):
+            # Units switch delay_s after hearing their DR; the base after the last one went out
+            st["switch_at"] = max((f.t_done for f in st["futs"]), default=now) + ADR_SWITCH_S
+        if st["switch_at"] is not None and now >= st["switch_at"]:
+            set_data_rate(radio, st["pending"], f"{len(st['futs'])} unit(s) told")
+            st["pending"], st["futs"], st["switch_at"] = None, [], None
+        return
+    fallback = normalize(LORA_PARAMETER)
+    if adr.current != fallback and now - st["last_rx"] > ADR_FALLBACK_S:
+        set_data_rate(radio, fallback, f"nothing heard for {ADR_FALLBACK_S:g}s")
+        st["last_rx"] = now
+        return
+    if now < st["next"]:
+        return
+    st["next"] = now + ADR_INTERVAL_S
+    new = adr.decide(now)
+    if not new:
+        return
+    units = adr.active_units(now)
+    print(f"[BaseStation] ADR: {adr.current} -> {new} for {len(units)} unit(s)")
+    st["pending"] = new
+    st["futs"] = [send_to_node(radio, u, f"DR:{u}:{new}:{ADR_SWITCH_S:g}") for u in units]
+
+# --------------- Downlink commands ---------------
+downlink = DownlinkQueue(DN_WINDOW, DN_RETRY_S, DN_ATTEMPTS)
+
+def issue_command(node_id: str, kind: str, payload: str = ""):
+    """
+    Queue DN:<TYPE>:<node>:<seq>:<payload> for a unit (any thread). EMERGENCY_STOP goes
+    straight to the radio when the listen loop is running instead of waiting for its next pass.
+    """
+    cmd = downlink.issue(node_id, kind, payload)
+    print(f"[BaseStation] DN {cmd.kind} #{cmd.seq} queued for Node {cmd.node_id}"
+          f"{' (payload ' + cmd.payload + ')' if cmd.payload else ''}")
+    write_log(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] node_id={cmd.node_id}, type=DN_ISSUE, "
+              f"command={cmd.kind}, seq={cmd.seq}, payload={cmd.payload or 'N/A'}")
+    if cmd.urgent and "radio" in live:
+        send_downlink(live["radio"], time.monotonic())
+    return cmd
+
+def send_downlink(radio, now: float) -> None:
+    """First sends, retries and give-ups for DN commands (see ../Common/downlink.py)."""
+    send, failed = downlink.due(now)
+    for cmd in send:
+        send_to_node(radio, cmd.node_id, cmd.msg, PRIO_ACK if cmd.urgent else PRIO_HIGH)
+        if cmd.attempts > 1:
+            M_DN_RETRY.labels(cmd.kind).inc()
+            print(f"[BaseStation] DN {cmd.kind} #{cmd.seq} -> Node {cmd.node_id} retry {cmd.attempts - 1}")
+    for cmd in failed:
+        M_DN.labels(cmd.kind, "failed").inc()
+        print(f"[BaseStation] DN {cmd.kind} #{cmd.seq} to Node {cmd.node_id} failed after {cmd.attempts} attempts")
+        write_log(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] node_id={cmd.node_id}, type=DN_FAILED, "
+                  f"command={cmd.kind}, seq={cmd.seq}, attempts={cmd.attempts}")
+
+def handle_dn_ack(data: str, now: float, ts: str, rssi, snr) -> None:
+    ack = parse_dn_ack(data)
+    cmd = downlink.ack(*ack, now=now) if ack else None
+    if cmd is None:
+        return  # duplicate (a retry crossed the first ACKDN) or unknown seq
+    M_DN.labels(cmd.kind, "ok" if cmd.result == "OK" else "rejected").inc()
+    M_DN_LAT.observe(cmd.latency, M_DN_LAT.labels(cmd.kind))
+    print(f"[{ts}] Node {cmd.node_id} ACKDN {cmd.kind} #{cmd.seq}: {cmd.result} in {cmd.latency * 1e3:.0f} ms "
+          f"({cmd.attempts} attempt(s)), RSSI={rssi}, SNR={snr}")
+    write_log(f"[{ts}] node_id={cmd.node_id}, type=DN_ACK, command={cmd.kind}, seq={cmd.seq}, "
+              f"result={cmd.result}, latency_ms={cmd.latency * 1e3:.0f}, attempts={cmd.attempts}, "
+              f"RSSI={rssi}, SNR={snr}")
+
+def report_downlink_stats() -> None:
+    line = downlink.format_stats()
+    print(f"[BaseStation] Downlink: {line}")
+    write_log(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] type=DN_STATS, {line}")
+
+# --------------- Live dashboard ---------------
+def dashboard_status() -> dict:
+    """Base-level values shown above the fleet table."""
+    return {"sf": rf.sf, "profile": adr.current if adr else LORA_PARAMETER,
+            "channel": meter.utilization()["channel"], "units": len(registry.live())}
+
+def dashboard_command(node_id: str, kind: str, payload: str) -> dict:
+    cmd = issue_command(node_id, kind, payload)
+    return {"node": cmd.node_id, "type": cmd.kind, "seq": cmd.seq}
+
+dashboard = DashboardServer(FleetView(registry, dashboard_status),
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard"), DASHBOARD_TICK,
+                            on_command=dashboard_command if DASHBOARD_CMDS else None)
+metrics.gauge("dashboard_clients", "Browsers on the live dashboard", fn=lambda: len(dashboard.clients))
+
 # --------------- Serial / LoRa I/O ---------------
+def configure_radio(lora) -> bool:
+    """Apply Base_Address / NetworkID / Band, skipping settings the module already holds."""
+    engine = ATEngine(lora, timeout=AT_TIMEOUT,
+                      on_unsolicited=lambda line: print(f"[BaseStation] RX during setup ignored: {line}"))
+    settings = [
+        ("ADDRESS", BASE_ADDRESS),
+        ("NETWORKID", NETWORK_ID),
+        ("BAND", BAND),
+    ]
+    if ADR_ENABLED:
+        settings.append(("PARAMETER", normalize(LORA_PARAMETER)))  # start every run on the default profile
+    changed, errors, elapsed = engine.configure(settings)
+    for e in errors:
+        print(f"[BaseStation] Radio setup error: {e}")
+    print(f"[BaseStation] Radio configured: ADDRESS={BASE_ADDRESS}, NETWORKID={NETWORK_ID}, BAND={BAND} "
+          f"({format_setup(changed, errors, elapsed)})")
+    return not errors
+
 def setup_lora(port: str, baud: int):
     try:
         lora = serial.Serial(port, baud, timeout=TIMEOUT)
+        lora = maybe_tap(lora, SERIAL_CAPTURE, LOG_DIR, "base")
         print("[BaseStation] LoRa module initialized.")
+        if RADIO_SETUP:
+            configure_radio(lora)
         return lora
     except Exception as e:
         print(f"[BaseStation] Error initializing LoRa: {e}")
@@ -88,32 +502,99 @@ def parse_rcv(raw: str):
         return None
 
 
-def listen_for_botcar_transmissions(lora: serial.Serial):
+def listen_for_botcar_transmissions(lora, receive=None):
+    """
+    Receive loop. lora is a serial port (wrapped in an RYLR998 driver here) or a
+    running driver; all writes go through the driver's TX queue.
+    """
     print("[BaseStation] Listening for botCar transmissions...")
+    receive = receive or build_receive_pipeline()
+    next_stats = time.monotonic() + RX_STATS_S if RX_STATS_S > 0 else None
+    own_radio = not isinstance(lora, (RYLR998, RadioPool))
+    radio = RYLR998(lora, name="BaseStation", rf=rf, meter=meter, on_done=on_tx_done) if own_radio else lora
+    rx = radio.lines()
+    live["radio"], live["rx"] = radio, rx
+    if own_radio:
+        radio.start()
 
     while True:
         try:
-            line = lora.readline().decode(errors="ignore").strip()
+            wait = 0.05
+            if acks and acks.pending:
+                wait = min(wait, max(0.005, acks.next_due(time.monotonic()) - time.monotonic()))
+            line = rx.get(timeout=wait)
+            t_rx = time.monotonic()
+            if acks and acks.pending:
+                release_acks(radio, t_rx)
+            if adr:
+                adr_tick(radio, t_rx)
+            if downlink.active:
+                send_downlink(radio, t_rx)
+            if dispatcher and dispatcher.incidents:
+                issue_assist_commands(dispatcher.tick(), datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            if next_stats and t_rx >= next_stats:
+                report_receive_stats(receive)
+                if acks:
+                    report_ack_stats(t_rx)
+                report_airtime()
+                if downlink.issued:
+                    report_downlink_stats()
+                next_stats = t_rx + RX_STATS_S
             if not line:
-                time.sleep(0.05)
                 continue
 
-            pkt = parse_rcv(line)
-            if not pkt:
+            frame = receive.process(line, t_rx)
+            if frame is None:
                 # Ignore housekeeping (+OK, +ERR=...), or echoes
                 continue
 
-            src, length, data, rssi, snr = pkt
+            src, length, data, rssi, snr, tid = frame.src, frame.length, frame.data, frame.rssi, frame.snr, frame.tid
+            if acks:
+                # Every frame heard (admitted or not) tells us when its unit will transmit next
+                acks.est.observe_rx(frame.node_id or src, frame.kind, t_rx, length or len(data or ""))
+            M_RX.labels(frame.kind or "?", DECISIONS[frame.decision]).inc()
             ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            if tracer:
+                tracer.hop(tid, "base_rx", t_rx)
+
+            # Receive stage verdict: only admitted frames reach the ACK logic below
+            if frame.decision != ADMIT:
+                print(f"[BaseStation] {DECISIONS[frame.decision]} from {src} ({frame.reason}): '{data}'")
+                write_log(
+                    f"[{ts}] node_id={frame.node_id or 'N/A'}, type=RX_{DECISIONS[frame.decision]}, "
+                    f"reason={frame.reason}, data={data}, RSSI={rssi}, SNR={snr}, ACK=N/A"
+                )
+                continue
+            if frame.reason:
+                # Admitted, but a check noted something off (skipped MS state, waypoint seq resync)
+                print(f"[BaseStation] ANOMALY from {src} ({frame.reason}): '{data}'")
+                write_log(f"[{ts}] node_id={frame.node_id or 'N/A'}, type=RX_ANOMALY, "
+                          f"reason={frame.reason}, data={data}, RSSI={rssi}, SNR={snr}")
+            if frame.node_id is not None:
+                M_RSSI.observe(rssi, M_RSSI.labels(frame.node_id))
+                M_SNR.observe(snr, M_SNR.labels(frame.node_id))
+                if adr:
+                    adr.observe(frame.node_id, snr, t_rx)
+                    adr_state["last_rx"] = t_rx
+
+            # Clock-offset probe: "TP:<node_id>:<t0>" -> "TQ:<node_id>:<t0>:<t1>:<t2>"
+            if data.startswith("TP:"):
+                p = data.split(":")
+                if len(p) == 3:
+                    pong = format_pong(p[1], p[2], t_rx, time.monotonic())
+                    radio.send(src, pong, PRIO_ACK)  # timing probe: never held
+                    if acks:
+                        acks.est.observe_tx(time.monotonic(), len(pong))
+                continue
 
             # Registration payload: "REG:<node_id>"
             if data.startswith("REG:"):
                 node_id = data.split(":", 1)[1]
+                registry.register(node_id, src)
 
                 # Send ACKREG back to sender (src)
                 ack_msg = f"ACKREG:{node_id}"
-                ack_cmd = f"AT+SEND={src},{len(ack_msg)},{ack_msg}\r\n"
-                lora.write(ack_cmd.encode("utf-8"))
+                send_ack(radio, src, ack_msg, node_id, t_rx)
 
                 print(f"[{ts}] Registration from Node {node_id}: RSSI={rssi}, SNR={snr}")
                 print(f"[BaseStation] Sent ACK for registration: {ack_msg}")
@@ -122,6 +603,68 @@ def listen_for_botcar_transmissions(lora: serial.Serial):
                     f"lat=N/A, lon=N/A, RSSI={rssi}, SNR={snr}, ACK=Sent"
                 )
                 write_log(log_line)
+                if tracer:
+                    tracer.hop(tid, "base_log")
+
+            # Fused snapshot: "FS:<node_id>:<yaw>:<lat>,<lon>" (periodic telemetry, not ACKed)
+            elif data.startswith("FS:"):
+                p = data.split(":")
+                if len(p) >= 4:
+                    node_id, yaw = p[1], p[2]
+                    lat, lon = (p[3].split(",", 1) + ["N/A"])[:2]
+                    registry.heard(node_id, src, rssi, snr)
+                    update_fleet(node_id, lat, lon, ts)
+                    print(f"[{ts}] Node {node_id} FS: Yaw={yaw}, Lat={lat}, Lon={lon}, RSSI={rssi}, SNR={snr}")
+                    write_log(
+                        f"[{ts}] node_id={node_id}, type=FS, yaw={yaw}, "
+                        f"lat={lat}, lon={lon}, RSSI={rssi}, SNR={snr}, ACK=N/A"
+                    )
+                    if tracer:
+                        tracer.hop(tid, "base_log")
+                else:
+                    print(f"[BaseStation] Unexpected +RCV data format: '{line}'")
+
+            # Mission state: "MS:<node_id>:<state>:<code>[:detail]" (not ACKed)
+            elif data.startswith("MS:"):
+                p = data.split(":", 4)
+                if len(p) >= 4:
+                    node_id, state, code = p[1], p[2], p[3]
+                    registry.heard(node_id, src, rssi, snr)
+                    registry.set_state(node_id, state)
+                    print(f"[{ts}] Node {node_id} MS: State={state}, Code={code}, RSSI={rssi}, SNR={snr}")
+                    write_log(
+                        f"[{ts}] node_id={node_id}, type=MS, state={state}, code={code}, "
+                        f"RSSI={rssi}, SNR={snr}, ACK=N/A"
+                    )
+                    if tracer:
+                        tracer.hop(tid, "base_log")
+                else:
+                    print(f"[BaseStation] Unexpected +RCV data format: '{line}'")
+
+            # Downlink command ACK: "ACKDN:<node_id>:<seq>:<OK|REJ>" (not ACKed)
+            elif data.startswith("ACKDN:"):
+                registry.heard(frame.node_id, src, rssi, snr)
+                handle_dn_ack(data, t_rx, ts, rssi, snr)
+
+            # Priority / alert: "PR:<node_id>:<code>[:args]" -> "ACKPR:<node_id>:<code>"
+            elif data.startswith("PR:"):
+                p = data.split(":", 3)
+                if len(p) >= 3:
+                    node_id, code = p[1], p[2]
+                    args = p[3] if len(p) > 3 else ""
+                    ack_msg = f"ACKPR:{node_id}:{code}"
+                    send_ack(radio, src, ack_msg, node_id, t_rx)
+                    registry.heard(node_id, src, rssi, snr)
+                    print(f"[{ts}] Node {node_id} PR: Code={code}, Args={args or 'N/A'}, RSSI={rssi}, SNR={snr}")
+                    write_log(
+                        f"[{ts}] node_id={node_id}, type=PR, code={code}, args={args or 'N/A'}, "
+                        f"RSSI={rssi}, SNR={snr}, ACK=Sent"
+                    )
+                    if tracer:
+                        tracer.hop(tid, "base_log")
+                    handle_priority(node_id, code, args, ts)
+                else:
+                    print(f"[BaseStation] Unexpected +RCV data format: '{line}'")
 
             else:
                 # Waypoint payload: "<node_id>:<idx>:lat,lon"
@@ -130,11 +673,11 @@ def listen_for_botcar_transmissions(lora: serial.Serial):
                     node_id  = p[0]
                     wp_index = p[1]
                     lat, lon = (p[2].split(",", 1) + ["N/A"])[:2]
+                    registry.heard(node_id, src, rssi, snr)
 
                     # Send ACK back to sender
                     ack_msg = f"ACK:{node_id}:{wp_index}"
-                    ack_cmd = f"AT+SEND={src},{len(ack_msg)},{ack_msg}\r\n"
-                    lora.write(ack_cmd.encode("utf-8"))
+                    send_ack(radio, src, ack_msg, node_id, t_rx)
 
                     print(
                         f"[{ts}] Node {node_id} Waypoint {wp_index}: "
@@ -147,21 +690,72 @@ def listen_for_botcar_transmissions(lora: serial.Serial):
                         f"lat={lat}, lon={lon}, RSSI={rssi}, SNR={snr}, ACK=Sent"
                     )
                     write_log(log_line)
+                    # FS (a unit with its Pico link) is the live position; until a unit sends one, the
+                    # route point it just uploaded stands in so the fleet view and dispatch see it at all
+                    rec = registry.get(node_id)
+                    if rec is None or rec.pos_src != "FS":
+                        update_fleet(node_id, lat, lon, ts, "WP")
+                    if tracer:
+                        tracer.hop(tid, "base_log")
                 else:
                     # Unexpected payload format—skip but keep running
                     print(f"[BaseStation] Unexpected +RCV data format: '{line}'")
 
         except KeyboardInterrupt:
             print("[BaseStation] Stopped by user.")
+            report_receive_stats(receive)
+            if acks:
+                for dest, msg in acks.flush(time.monotonic()):
+                    radio.send(dest, msg, PRIO_ACK)
+                report_ack_stats(time.monotonic())
+            report_airtime()
+            if downlink.issued:
+                report_downlink_stats()
+            if receive.quarantine:
+                receive.quarantine.close()
+            if own_radio:
+                radio.stop()
             break
         except Exception as e:
             print(f"[BaseStation] Parse/IO error: {e}")
             time.sleep(0.2)
 
 
+def on_radio_handover(address: int, old: str, new: str) -> None:
+    print(f"[BaseStation] Address {address} now heard on radio {new} (was {old})")
+    write_log(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] type=RADIO, address={address}, radio={new}, was={old}")
+
+def start_radios():
+    """One worker process per Radios entry; sends are routed by the radio each address was last heard on."""
+    pool = RadioPool(RADIOS, on_done=on_tx_done, on_route=on_radio_handover, meter=meter)
+    print(f"[BaseStation] Starting {len(RADIOS)} radios: {', '.join(s['Name'] for s in RADIOS)}")
+    return pool.start()
+
+
 # -------------------- Main ----------------------
 if __name__ == "__main__":
-    lora = setup_lora(SERIAL_PORT, BAUD_RATE)
+    # Radio workers are forked first, while this process has a single thread
+    pool = start_radios() if RADIOS else None
+    if METRICS_PORT:
+        try:
+            metrics.serve(METRICS_PORT, METRICS_BIND)
+            print(f"[BaseStation] Metrics: http://{METRICS_BIND}:{METRICS_PORT}/metrics")
+        except OSError as e:
+            print(f"[BaseStation] Metrics endpoint not started: {e}")
+    if DASHBOARD_PORT:
+        try:
+            dashboard.start(DASHBOARD_PORT, DASHBOARD_BIND)
+            print(f"[BaseStation] Dashboard: http://{DASHBOARD_BIND}:{DASHBOARD_PORT}/")
+        except OSError as e:
+            print(f"[BaseStation] Dashboard not started: {e}")
+    if pool:
+        try:
+            listen_for_botcar_transmissions(pool)
+        finally:
+            pool.stop()
+            if tracer:
+                tracer.close()
+    lora = setup_lora(SERIAL_PORT, BAUD_RATE) if not pool else None
     if lora:
         try:
             listen_for_botcar_transmissions(lora)
@@ -170,3 +764,5 @@ if __name__ == "__main__":
                 lora.close()
             except Exception:
                 pass
+            if tracer:
+                tracer.close()
@@ -0,0 +1,106 @@
+// AMU fleet dashboard client: one snapshot, then per-tick diffs over /ws.
+// Rows are updated in place; the map is redrawn at most once per animation frame.
+"use strict";
+
+const units = {};        // node_id -> {fields..., row}
+const base = {};
+let seq = 0;
+let drawPending = false;
+
+const tbody = document.querySelector("#units tbody");
+const linkEl = document.getElementById("link");
+const baseEl = document.getElementById("base");
+const canvas = document.getElementById("map");
+const ctx = canvas.getContext("2d");
+
+function fmt(v, digits) {
+  if (v === null || v === undefined) return "";
+  return typeof v === "number" && digits !== undefined ? v.toFixed(digits) : String(v);
+}
+
+function renderRow(id) {
+  const u = units[id];
+  if (!u.row) {
+    u.row = document.createElement("tr");
+    for (let i = 0; i < 11; i++) u.row.appendChild(document.createElement("td"));
+    const rows = Array.from(tbody.children);
+    const after = rows.find(r => r.dataset.id.localeCompare(id, undefined, {numeric: true}) > 0);
+    u.row.dataset.id = id;
+    tbody.insertBefore(u.row, after || null);
+  }
+  const age = u.last_seen ? Math.max(0, Date.now() / 1000 - u.last_seen) : null;
+  const cells = [id, u.address, u.state, fmt(u.lat, 6), fmt(u.lon, 6), fmt(u.yaw, 0),
+                 u.rssi, u.snr, fmt(u.battery_v, 2), u.msgs, age === null ? "" : fmt(age, 0) + " s"];
+  cells.forEach((v, i) => { const s = fmt(v); if (u.row.children[i].textContent !== s) u.row.children[i].textContent = s; });
+  u.row.classList.toggle("stale", !!u.stale);
+}
+
+function apply(msg) {
+  if (msg.type === "snapshot") {
+    for (const id of Object.keys(units)) { if (units[id].row) units[id].row.remove(); delete units[id]; }
+    for (const [id, u] of Object.entries(msg.units)) { units[id] = u; renderRow(id); }
+    Object.assign(base, msg.base);
+  } else if (msg.type === "diff") {
+    if (msg.seq !== seq + 1) return false;          // missed a tick: reconnect for a fresh snapshot
+    for (const [id, ch] of Object.entries(msg.upd)) {
+      units[id] = Object.assign(units[id] || {}, ch);
+      renderRow(id);
+    }
+    for (const id of msg.del || []) { if (units[id] && units[id].row) units[id].row.remove(); delete units[id]; }
+    Object.assign(base, msg.base || {});
+  }
+  seq = msg.seq;
+  baseEl.textContent = Object.entries(base).map(([k, v]) => k + " " + fmt(v, typeof v === "number" && !Number.isInteger(v) ? 3 : undefined)).join("  ");
+  scheduleDraw();
+  return true;
+}
+
+function scheduleDraw() {
+  if (drawPending) return;
+  drawPending = true;
+  requestAnimationFrame(() => { drawPending = false; draw(); });
+}
+
+function draw() {
+  ctx.clearRect(0, 0, canvas.width, canvas.height);
+  const pts = Object.entries(units).filter(([, u]) => u.lat !== null && u.lat !== undefined);
+  if (!pts.length) return;
+  let [minLat, maxLat, minLon, maxLon] = [90, -90, 180, -180];
+  for (const [, u] of pts) {
+    minLat = Math.min(minLat, u.lat); maxLat = Math.max(maxLat, u.lat);
+    minLon = Math.min(minLon, u.lon); maxLon = Math.max(maxLon, u.lon);
+  }
+  // Equirectangular fit with 10% padding; lon scaled by cos(lat) so distances look right
+  const k = Math.cos((minLat + maxLat) / 2 * Math.PI / 180);
+  const spanX = Math.max((maxLon - minLon) * k, 1e-5), spanY = Math.max(maxLat - minLat, 1e-5);
+  const scale = 0.8 * Math.min(canvas.width / spanX, canvas.height / spanY);
+  const cx = (minLon + maxLon) / 2, cy = (minLat + maxLat) / 2;
+  ctx.font = "12px system-ui, sans-serif";
+  for (const [id, u] of pts) {
+    const x = canvas.width / 2 + (u.lon - cx) * k * scale;
+    const y = canvas.height / 2 - (u.lat - cy) * scale;
+    ctx.fillStyle = u.stale ? "#56606a" : (u.snr !== null && u.snr < 0 ? "#d9a441" : "#4fc36b");
+    ctx.beginPath(); ctx.arc(x, y, 5, 0, 2 * Math.PI); ctx.fill();
+    if (u.yaw !== null && u.yaw !== undefined) {
+      const a = u.yaw * Math.PI / 180;
+      ctx.strokeStyle = ctx.fillStyle;
+      ctx.beginPath(); ctx.moveTo(x, y); ctx.lineTo(x + 12 * Math.sin(a), y - 12 * Math.cos(a)); ctx.stroke();
+    }
+    ctx.fillStyle = "#d8dee4";
+    ctx.fillText(id, x + 8, y - 6);
+  }
+}
+
+function connect(delay) {
+  const ws = new WebSocket((location.protocol === "https:" ? "wss://" : "ws://") + location.host + "/ws");
+  ws.onopen = () => { linkEl.textContent = "live"; linkEl.className = "up"; delay = 1000; };
+  ws.onmessage = ev => { if (!apply(JSON.parse(ev.data))) ws.close(); };
+  ws.onclose = () => {
+    linkEl.textContent = "reconnecting"; linkEl.className = "down";
+    setTimeout(() => connect(Math.min(delay * 2, 15000)), delay);
+  };
+}
+
+// "Heard" ages tick even when nothing changes
+setInterval(() => Object.keys(units).forEach(renderRow), 1000);
+connect(1000);
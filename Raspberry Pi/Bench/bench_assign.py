@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: bench_assign.py
+Description: ASSIST assignment solver (Common/assignment.py): full Hungarian
+             solves at 50x50 and 500x500, one incremental incident on a 500-unit
+             solver, and the cost-matrix build from the node registry.
+             extra_info reports how much worse greedy dispatch is at 50x50.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import random
+
+from benchlib import add_paths, bench
+
+add_paths(("Raspberry Pi", "Common"))
+
+import assignment  # noqa: E402
+from assignment import CostModel, Hungarian, Incident, greedy, solve  # noqa: E402
+from node_registry import NodeRegistry  # noqa: E402
+
+CENTER = (33.686377, -117.789653)
+
+
+def _fleet(n_units, n_incidents, seed=5):
+    rng = random.Random(seed)
+    reg = NodeRegistry(stale_after_s=1e9)
+    for i in range(n_units):
+        reg.set_position(i, CENTER[0] + rng.uniform(-0.01, 0.01), CENTER[1] + rng.uniform(-0.012, 0.012), t=0.0)
+        reg.set_battery(i, rng.uniform(6.8, 8.4), t=0.0)
+        reg.set_state(i, rng.choice(("STANDBY", "PATROL", "PATROL", "RETURN_HOME")), t=0.0)
+    incidents = [Incident(f"i{k}", CENTER[0] + rng.uniform(-0.01, 0.01), CENTER[1] + rng.uniform(-0.012, 0.012),
+                          priority=rng.choice((1.0, 1.0, 2.0)), t=0.0) for k in range(n_incidents)]
+    return reg, incidents
+
+
+def _matrix(n):
+    reg, incidents = _fleet(n, n)
+    return CostModel().matrix(incidents, list(reg))
+
+
+@bench("assign.hungarian.50x50", group="assign")
+def bench_solve_50(benchmark):
+    cost = _matrix(50)
+    pairs = benchmark(solve, cost)
+    opt = sum(cost[r][c] for r, c in pairs)
+    gr = sum(cost[r][c] for r, c in greedy(cost))
+    benchmark.extra_info["greedy_excess_pct"] = round(100.0 * (gr - opt) / opt, 1)
+
+
+@bench("assign.cost_matrix.50x50", group="assign")
+def bench_cost_matrix_50(benchmark):
+    reg, incidents = _fleet(50, 50)
+    units = list(reg)
+    benchmark(CostModel().matrix, incidents, units)
+
+
+if assignment.np is not None:
+    @bench("assign.hungarian.500x500", group="assign")
+    def bench_solve_500(benchmark):
+        cost = assignment.np.asarray(_matrix(500))
+        benchmark.min_rounds = 3
+        benchmark(solve, cost)
+
+    @bench("assign.incremental_incident.500", group="assign")
+    def bench_incremental_500(benchmark):
+        cost = assignment.np.asarray(_matrix(500))
+        base = Hungarian(500)
+        for row in cost[:499]:
+            base.add_row(row)
+
+        def run():
+            h = base.copy()
+            h.add_row(cost[499])
+            return h
+
+        benchmark(run)
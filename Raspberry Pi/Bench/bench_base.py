@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: bench_base.py
+Description: BaseStation hot paths: +RCV parsing, the Receive stage (parse +
+             every validator) for one waypoint, and end-to-end packets/sec
+             through listen_for_botcar_transmissions over a loopback radio,
+             with ACKs sent immediately and through the ACK scheduler, and
+             over two radio worker processes (Common/radio_pool.py).
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+from benchlib import add_paths, bench, quiet
+
+add_paths(("Raspberry Pi", "Common"), ("Raspberry Pi", "BaseStation"))
+
+from radio_pool import RadioPool, radio_specs  # noqa: E402
+from radio_sim import SimModule, rcv_line  # noqa: E402
+
+E2E_PACKETS = 500
+
+SAMPLE_WP = "+RCV=2,25,2:3:33.686268,-117.788997,-42,11"
+SAMPLE_REG = "+RCV=2,5,REG:2,-40,12"
+
+
+def _base():
+    with quiet():
+        import botcarBaseStation
+    return botcarBaseStation
+
+
+def _traffic(n, first=2):
+    lines = []
+    for i in range(n):
+        node = first + i % 8
+        # Every unit registers first, as real units do (and as the opt-in registration check requires)
+        if i < 8 or i % 50 == 0:
+            lines.append(rcv_line(node, f"REG:{node}"))
+        else:
+            lines.append(rcv_line(node, f"{node}:{i}:33.686268,-117.788997", -40 - i % 30, 11 - i % 7))
+    return lines
+
+
+@bench("base.parse_rcv.waypoint", group="base")
+def bench_parse_rcv_waypoint(benchmark):
+    parse_rcv = _base().parse_rcv
+    benchmark(parse_rcv, SAMPLE_WP)
+
+
+@bench("base.parse_rcv.reject", group="base")
+def bench_parse_rcv_reject(benchmark):
+    parse_rcv = _base().parse_rcv
+    benchmark(parse_rcv, "+OK")
+
+
+@bench("base.receive.waypoint", group="base")
+def bench_receive_waypoint(benchmark):
+    base = _base()
+    with quiet():
+        receive = base.build_receive_pipeline()
+    base.registry.register("2", 2)
+    benchmark(receive.process, SAMPLE_WP)
+    assert receive.decisions[0] == receive.stage_n[0]
+
+
+@bench("base.e2e.loopback", group="base")
+def bench_e2e_loopback(benchmark):
+    base = _base()
+    traffic = _traffic(E2E_PACKETS)
+    saved, base.acks = base.acks, None  # every ACK straight to the radio
+
+    def run():
+        radio = SimModule(traffic, stop_when_empty=True)
+        with quiet():
+            base.listen_for_botcar_transmissions(radio)
+        return radio
+
+    try:
+        radio = benchmark(run)
+    finally:
+        base.acks = saved
+    assert sum(w.startswith(b"AT+SEND=") for w in radio.written) == E2E_PACKETS
+    benchmark.extra_info["packets_per_s"] = E2E_PACKETS / benchmark.stats["median"]
+
+
+@bench("base.e2e.ack_scheduled", group="base")
+def bench_e2e_ack_scheduled(benchmark):
+    # The burst arrives far faster than airtime allows, so most waypoint ACKs
+    # are coalesced per unit; every ACK is either sent or superseded.
+    base = _base()
+    traffic = _traffic(E2E_PACKETS)
+    saved = base.acks
+    runs = []
+
+    def run():
+        base.acks = base.AckScheduler(base.ChannelEstimator(base.rf, guard_s=base.ACK_GUARD_S), base.ACK_MAX_HOLD_S)
+        radio = SimModule(traffic, stop_when_empty=True)
+        with quiet():
+            base.listen_for_botcar_transmissions(radio)
+        runs.append((radio, base.acks))
+        return radio
+
+    try:
+        benchmark(run)
+    finally:
+        base.acks = saved
+    radio, acks = runs[-1]
+    sends = sum(w.startswith(b"AT+SEND=") for w in radio.written)
+    assert sends == acks.released and acks.released + acks.coalesced == E2E_PACKETS
+    benchmark.extra_info["packets_per_s"] = E2E_PACKETS / benchmark.stats["median"]
+    benchmark.extra_info["acks_sent"] = sends
+
+
+@bench("base.e2e.radio_pool_2", group="base")
+def bench_e2e_radio_pool(benchmark):
+    # Two worker processes, each replaying half the traffic from its own units;
+    # every ACK must leave through the radio that heard the frame.
+    base = _base()
+    specs = radio_specs([{"Name": "a", "NetworkID": 6}, {"Name": "b", "NetworkID": 7}],
+                        dict(base.cfg, Radio_Setup="N", Ack_Scheduling="N", Serial_Capture="N"))
+    half = E2E_PACKETS // 2
+    traffic = {"a": _traffic(half), "b": _traffic(half, first=20)}
+    saved, base.acks = base.acks, None
+    pools = []
+
+    def run():
+        pool = RadioPool(specs, opener=lambda spec: SimModule(traffic[spec["Name"]], stop_when_empty=True))
+        pool.start()
+        with quiet():
+            base.listen_for_botcar_transmissions(pool)
+            pool.stop()
+        pools.append(pool)
+
+    try:
+        benchmark(run)
+    finally:
+        base.acks = saved
+    pool = pools[-1]
+    assert [s["sent"] for s in pool.stats] == [half, half] and pool.handovers == 0
+    benchmark.extra_info["packets_per_s"] = E2E_PACKETS / benchmark.stats["median"]
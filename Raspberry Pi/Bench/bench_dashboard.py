@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: bench_dashboard.py
+Description: Live dashboard (Common/dashboard.py) per-tick cost on the server
+             thread: diffing a 500-unit registry where 10% of units reported
+             since the last tick, and the same tick encoded once and written
+             to 50 clients.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+from benchlib import add_paths, bench
+
+add_paths(("Raspberry Pi", "Common"))
+
+from dashboard import DashboardServer, FleetView, _Client  # noqa: E402
+from node_registry import NodeRegistry  # noqa: E402
+
+UNITS = 500
+CLIENTS = 50
+
+
+def _fleet():
+    reg = NodeRegistry(stale_after_s=120)
+    for n in range(UNITS):
+        reg.register(str(n), str(n), t=1000.0)
+        reg.set_position(str(n), 33.68 + n * 1e-4, -117.79, t=1000.0)
+    return reg
+
+
+def _reporting(reg):
+    """Each call: the next 10% of units send a waypoint."""
+    state = {"i": 0, "t": 1000.0}
+
+    def step():
+        state["t"] += 0.5
+        for _ in range(UNITS // 10):
+            n = str(state["i"] % UNITS)
+            state["i"] += 1
+            reg.heard(n, n, -70, 7, t=state["t"])
+            reg.set_position(n, 33.68 + state["i"] * 1e-6, -117.79, t=state["t"])
+        return state["t"]
+    return step
+
+
+@bench("dashboard.diff.500_units", group="dashboard")
+def bench_diff(benchmark):
+    reg = _fleet()
+    view = FleetView(reg)
+    view.diff(1000.0)
+    step = _reporting(reg)
+
+    def tick():
+        return view.diff(step())
+
+    msg = benchmark(tick)
+    benchmark.extra_info["units_per_diff"] = len(msg["upd"])
+
+
+class _Transport:
+    def get_write_buffer_size(self):
+        return 0
+
+
+class _Writer:
+    transport = _Transport()
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, data):
+        self.bytes += len(data)
+
+    def get_extra_info(self, name):
+        return None
+
+
+@bench("dashboard.tick.50_clients", group="dashboard")
+def bench_tick_fanout(benchmark):
+    reg = _fleet()
+    step = _reporting(reg)
+    t = {"now": 1000.0}
+    view = FleetView(reg, clock=lambda: t["now"])
+    server = DashboardServer(view, ".")
+    writers = [_Writer() for _ in range(CLIENTS)]
+    server.clients = {_Client(w) for w in writers}
+    view.diff()
+
+    def tick():
+        t["now"] = step()
+        server.tick()
+
+    benchmark(tick)
+    benchmark.extra_info["bytes_per_client_tick"] = writers[0].bytes // max(server.sent, 1)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: bench_fleet.py
+Description: BaseStation spatial index (Common/fleet_index.py) with 5000
+             simulated units spread over ~4 x 4 km: per-report update (same
+             cell and cell change), k-nearest, radius and polygon geofence
+             queries. The brute-force kNN scan is included for comparison.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import itertools
+import math
+import random
+
+from benchlib import add_paths, bench
+
+add_paths(("Raspberry Pi", "Common"))
+
+from fleet_index import FleetIndex  # noqa: E402
+
+N_NODES = 5000
+CENTER = (33.686377, -117.789653)
+ZONE = [[33.6800, -117.7950], [33.6930, -117.7950], [33.6930, -117.7830], [33.6850, -117.7860]]
+
+
+def _fleet():
+    rng = random.Random(7)
+    fleet = FleetIndex(cell_m=50.0)
+    positions = []
+    for i in range(N_NODES):
+        lat = CENTER[0] + rng.uniform(-0.018, 0.018)
+        lon = CENTER[1] + rng.uniform(-0.022, 0.022)
+        fleet.update(i, lat, lon, t=0.0)
+        positions.append((lat, lon))
+    return fleet, positions
+
+
+def _queries(n=64):
+    rng = random.Random(11)
+    return itertools.cycle([(CENTER[0] + rng.uniform(-0.015, 0.015), CENTER[1] + rng.uniform(-0.018, 0.018))
+                            for _ in range(n)])
+
+
+@bench("fleet.update.same_cell", group="fleet")
+def bench_update_same_cell(benchmark):
+    fleet, positions = _fleet()
+    lat, lon = positions[42]
+    benchmark(fleet.update, 42, lat + 1e-6, lon, 1.0)
+
+
+@bench("fleet.update.cell_change", group="fleet")
+def bench_update_cell_change(benchmark):
+    fleet, positions = _fleet()
+    lat, lon = positions[42]
+    hops = itertools.cycle([(lat, lon), (lat + 0.0006, lon + 0.0007)])  # ~70 m apart
+
+    def run():
+        a, b = next(hops)
+        fleet.update(42, a, b, 1.0)
+
+    benchmark(run)
+
+
+@bench("fleet.nearest.k5", group="fleet")
+def bench_nearest(benchmark):
+    fleet, _ = _fleet()
+    q = _queries()
+
+    def run():
+        lat, lon = next(q)
+        return fleet.nearest(lat, lon, 5)
+
+    benchmark(run)
+
+
+@bench("fleet.nearest.k5_bruteforce", group="fleet")
+def bench_nearest_brute(benchmark):
+    fleet, _ = _fleet()
+    q = _queries()
+    nodes = fleet.nodes
+
+    def run():
+        x, y = fleet.to_xy(*next(q))
+        return sorted((math.hypot(r[0] - x, r[1] - y), nid) for nid, r in nodes.items())[:5]
+
+    benchmark(run)
+
+
+@bench("fleet.within_radius.250m", group="fleet")
+def bench_radius(benchmark):
+    fleet, _ = _fleet()
+    q = _queries()
+
+    def run():
+        lat, lon = next(q)
+        return fleet.within_radius(lat, lon, 250.0)
+
+    benchmark(run)
+
+
+@bench("fleet.within_polygon.zone", group="fleet")
+def bench_polygon(benchmark):
+    fleet, _ = _fleet()
+    zone = fleet.make_geofence("zone", ZONE)
+    inside = benchmark(fleet.within_polygon, zone)
+    benchmark.extra_info["inside"] = len(inside)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: bench_fse.py
+Description: Finite state engine (Common/fse.py): event dispatch through the
+             flat transition table (events/sec), bitset command gating, and
+             the full receive path for an admitted, a rejected and an E-STOP
+             command. The same code runs on the Pico platform table.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+from benchlib import add_paths, bench
+
+add_paths(("Raspberry Pi", "Common"))
+
+from fse import (FSE, MC_GOTO_WAYPOINT, MC_HALT, MC_RESET, MC_START_PATROL, ME_HALT,  # noqa: E402
+                 ME_START_PATROL, MISSION, PLATFORM, E_BOOT_OK, E_HOLD, E_NAV_START, E_RESUME)
+
+CYCLE = 1000
+
+
+@bench("fse.fire.patrol_cycle_1000", group="fse")
+def bench_fire_cycle(benchmark):
+    fse = FSE(MISSION)
+    fire = fse.fire
+
+    def cycle():
+        for _ in range(CYCLE // 2):
+            fire(ME_START_PATROL)
+            fire(ME_HALT)
+
+    benchmark(cycle)
+    benchmark.extra_info["events_per_s"] = round(CYCLE / benchmark.stats["median"])
+
+
+@bench("fse.fire.platform_nav_hold", group="fse")
+def bench_fire_platform(benchmark):
+    fse = FSE(PLATFORM)
+    fse.fire(E_BOOT_OK)
+    fse.fire(E_NAV_START)
+
+    def hold_resume():
+        fse.fire(E_HOLD)
+        fse.fire(E_RESUME)
+
+    benchmark(hold_resume)
+
+
+@bench("fse.gate", group="fse")
+def bench_gate(benchmark):
+    fse = FSE(MISSION)
+    benchmark(fse.gate, MC_GOTO_WAYPOINT)
+
+
+@bench("fse.command.admitted", group="fse")
+def bench_command_admitted(benchmark):
+    fse = FSE(MISSION)
+    fse.fire(ME_START_PATROL)
+    # GOTO_WAYPOINT is legal in PATROL and maps to no event, so the state is stable
+    benchmark(fse.command, MC_GOTO_WAYPOINT)
+
+
+@bench("fse.command.rejected", group="fse")
+def bench_command_rejected(benchmark):
+    fse = FSE(MISSION)
+    benchmark(fse.command, MC_HALT)
+
+
+@bench("fse.command_name.estop_reset", group="fse")
+def bench_estop_reset(benchmark):
+    fse = FSE(MISSION)
+
+    def estop_reset():
+        fse.command_name("EMERGENCY_STOP")
+        fse.command(MC_RESET)
+        fse.command(MC_START_PATROL)
+
+    benchmark(estop_reset)
+    benchmark.extra_info["audit_entries"] = len(fse.audit())
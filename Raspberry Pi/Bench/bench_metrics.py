@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: bench_metrics.py
+Description: Metrics (Common/metrics.py) hot-path cost: a labelled counter
+             increment and a histogram observation as the RX/TX threads do
+             them, and one /metrics scrape for a 50-unit BaseStation.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+from benchlib import add_paths, bench
+
+add_paths(("Raspberry Pi", "Common"))
+
+from metrics import RSSI_BUCKETS, Registry  # noqa: E402
+
+UNITS = 50
+
+
+@bench("metrics.counter.labelled_inc", group="metrics")
+def bench_counter_inc(benchmark):
+    c = Registry().counter("rx_frames_total", "Frames", ("type", "decision"))
+
+    def inc():
+        c.labels("WP", "ADMIT").inc()
+
+    benchmark(inc)
+
+
+@bench("metrics.histogram.observe", group="metrics")
+def bench_histogram_observe(benchmark):
+    h = Registry().histogram("rssi_dbm", "RSSI", ("node",), RSSI_BUCKETS)
+    benchmark(lambda: h.observe(-73, h.labels("7")))
+
+
+@bench("metrics.render.50_units", group="metrics")
+def bench_render(benchmark):
+    reg = Registry()
+    rx = reg.counter("rx_frames_total", "Frames", ("type", "decision"))
+    rssi = reg.histogram("rssi_dbm", "RSSI", ("node",), RSSI_BUCKETS)
+    snr = reg.histogram("snr_db", "SNR", ("node",))
+    reg.gauge("tx_queue_depth", "Depth", fn=lambda: 0)
+    for n in range(UNITS):
+        for kind in ("WP", "FS", "REG", "MS"):
+            rx.labels(kind, "ADMIT").inc()
+        rssi.observe(-60 - n % 40, rssi.labels(str(n)))
+        snr.observe(n % 12, snr.labels(str(n)))
+    body = benchmark(reg.render)
+    benchmark.extra_info["bytes"] = len(body)
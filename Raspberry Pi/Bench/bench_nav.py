@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: bench_nav.py
+Description: Route geometry (Common/nav_geometry.py): leg table build at route
+             load, the per-tick Navigator.update that fills the SensorFrame nav
+             block, route_prep on a dense survey route, the RETURN_HOME planner
+             (distance-field build vs cached path query), and the NumPy batch
+             track analysis (skipped without NumPy).
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import math
+
+from benchlib import add_paths, bench
+
+add_paths(("Raspberry Pi", "Common"))
+
+import nav_geometry  # noqa: E402
+from nav_geometry import Navigator, RouteTable  # noqa: E402
+from path_planner import GridMap, ReturnHomePlanner  # noqa: E402
+from route_prep import prepare_route  # noqa: E402
+
+# 50-waypoint loop of roughly 2 km around the test field
+ROUTE = [[33.686377 + 0.003 * math.sin(k * 2 * math.pi / 50),
+          -117.789653 + 0.0036 * math.cos(k * 2 * math.pi / 50)] for k in range(50)]
+
+
+@bench("nav.route_table.build_50", group="nav")
+def bench_route_build(benchmark):
+    benchmark(RouteTable, ROUTE)
+
+
+@bench("nav.navigator.update", group="nav")
+def bench_navigator_update(benchmark):
+    nav = Navigator(RouteTable(ROUTE), loop=True)
+    # A fix partway along leg 0, slightly off the line; the unit never arrives
+    lat = (ROUTE[0][0] * 0.7 + ROUTE[1][0] * 0.3) + 0.00001
+    lon = ROUTE[0][1] * 0.7 + ROUTE[1][1] * 0.3
+    benchmark(nav.update, lat, lon, 95.0)
+
+
+@bench("nav.route_prep.survey_1000", group="nav")
+def bench_route_prep(benchmark):
+    # 1000-point survey trace of the loop (20 points per leg, closing point repeated)
+    survey = []
+    for k in range(50):
+        a, b = ROUTE[k], ROUTE[(k + 1) % 50]
+        for j in range(20):
+            t = j / 20
+            survey.append([a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t])
+    survey.append(survey[0])
+    pts, report = benchmark(prepare_route, survey, 1.0, 5, True, 2)
+    benchmark.extra_info["points_out"] = report["points_out"]
+    benchmark.extra_info["airtime_saved_s"] = round(report["airtime_saved_s"], 1)
+
+
+def _planner():
+    grid = GridMap(ROUTE[0], half_size_m=300, cell_m=2.0, clearance_m=0.5)
+    lat0, lon0 = ROUTE[0]
+    # Two building footprints between the far side of the loop and home
+    grid.add_keep_out("bldg_a", [[lat0 + 0.0008, lon0 - 0.0010], [lat0 + 0.0008, lon0 + 0.0010],
+                                 [lat0 + 0.0010, lon0 + 0.0010], [lat0 + 0.0010, lon0 - 0.0010]])
+    grid.add_keep_out("bldg_b", [[lat0 + 0.0016, lon0 - 0.0030], [lat0 + 0.0016, lon0 - 0.0005],
+                                 [lat0 + 0.0019, lon0 - 0.0005], [lat0 + 0.0019, lon0 - 0.0030]])
+    return ReturnHomePlanner(grid)
+
+
+@bench("nav.planner.field_build_300x300", group="nav")
+def bench_planner_build(benchmark):
+    planner = _planner()
+
+    def run():
+        planner.dist = None  # force a rebuild
+        return planner.distance_field()
+
+    benchmark.min_rounds = 3
+    benchmark(run)
+
+
+@bench("nav.planner.path_home_cached", group="nav")
+def bench_planner_path(benchmark):
+    planner = _planner()
+    planner.distance_field()
+    lat0, lon0 = ROUTE[0]
+    path = benchmark(planner.path_home, lat0 + 0.0025, lon0 - 0.0004)
+    benchmark.extra_info["waypoints"] = len(path)
+
+
+def bench_track_numpy(benchmark):
+    route = RouteTable(ROUTE)
+    n = 10000
+    lats = [ROUTE[i % 50][0] + 0.00002 * ((i * 7919) % 11 - 5) for i in range(n)]
+    lons = [ROUTE[i % 50][1] + 0.00002 * ((i * 104729) % 11 - 5) for i in range(n)]
+    benchmark(nav_geometry.track_against_route, route, lats, lons)
+    benchmark.extra_info["fixes"] = n
+
+
+if nav_geometry.np is not None:
+    bench("nav.track_against_route.numpy_10k", group="nav")(bench_track_numpy)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: bench_node.py
+Description: BotCarNode hot paths: ACK matching on the RX thread, the
+             exponential backoff computation, and one AT+SEND through the
+             RYLR998 driver (queue, writer thread, +OK on the reader thread),
+             plain and with the airtime meter attached.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import os
+
+from benchlib import add_paths, bench, quiet
+
+add_paths(("Raspberry Pi", "Common"), ("Raspberry Pi", "botCar"))
+
+from airtime_meter import AirtimeMeter  # noqa: E402
+from radio_sim import SimModule  # noqa: E402
+from rylr998 import RYLR998  # noqa: E402
+
+NODE_CONFIG = """\
+node_id: 2
+base_id: 1
+node_label: "AMU_BENCH"
+serial_port: "/dev/null-bench"
+mission_logging: false
+csv_logging: false
+log_directory: "./logs"
+retry_delay_min: 3
+retry_delay_max: 5
+max_retries: 3
+waypoints: []
+"""
+
+_node = None
+
+
+def _make_node():
+    global _node
+    if _node is None:
+        with open("bench_node_config.yaml", "w") as f:
+            f.write(NODE_CONFIG)
+        with quiet():
+            from _BotCarNode import BotCarNode
+            _node = BotCarNode(config_path=os.path.abspath("bench_node_config.yaml"))
+    return _node
+
+
+@bench("node.ack_match.hit", group="node")
+def bench_ack_match_hit(benchmark):
+    node = _make_node()
+    node.expected_ack = "ACK:2:14"
+    line = "+RCV=1,8,ACK:2:14,-41,10"
+
+    def run():
+        with quiet():
+            node._handle_rx_line(line)
+
+    benchmark(run)
+
+
+@bench("node.ack_match.miss", group="node")
+def bench_ack_match_miss(benchmark):
+    node = _make_node()
+    node.expected_ack = "ACK:2:14"
+    benchmark(node._handle_rx_line, "+RCV=1,8,ACK:2:13,-41,10")
+
+
+@bench("node.ack_match.housekeeping", group="node")
+def bench_ack_match_housekeeping(benchmark):
+    node = _make_node()
+    benchmark(node._handle_rx_line, "+OK")
+
+
+@bench("node.compute_retry_delay", group="node")
+def bench_compute_retry_delay(benchmark):
+    node = _make_node()
+
+    def run():
+        for attempt in (1, 2, 3):
+            node._compute_retry_delay(attempt)
+
+    benchmark(run)
+
+
+@bench("node.radio.send_confirmed", group="node")
+def bench_radio_send(benchmark):
+    radio = RYLR998(SimModule(), name="bench").start()
+
+    def send():
+        return radio.send(1, "2:14:33.686268,-117.788997").result(1.0)
+
+    benchmark(send)
+    radio.stop()
+    benchmark.extra_info["timeouts"] = radio.timeouts
+
+
+@bench("node.radio.send_metered", group="node")
+def bench_radio_send_metered(benchmark):
+    # Same send with airtime accounting and a (never reached) duty-cycle budget check
+    radio = RYLR998(SimModule(), name="bench", meter=AirtimeMeter(window_s=1e6, duty_cycle=1.0)).start()
+
+    def send():
+        return radio.send(1, "2:14:33.686268,-117.788997").result(1.0)
+
+    benchmark(send)
+    radio.stop()
+    benchmark.extra_info["deferred"] = radio.deferred
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: bench_pico.py
+Description: Pico hot paths run on CPython through the Sim/ hardware fakes:
+             NMEA parsing in GPS_LatLon.py, BNO055IMU.read_euler against the
+             emulated I2C register map, and SensorFrame JSON encode/decode.
+             CPython numbers are for relative (commit-to-commit) tracking only;
+             the RP2040 is roughly two orders of magnitude slower.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import itertools
+import json
+
+from benchlib import add_paths, bench
+
+# Fakes first so they shadow any real CircuitPython modules
+add_paths(("Raspberry Pi", "USB_Comm"), ("AMU---Automated-Mobile-Unit", "Sensors"),
+          ("AMU---Automated-Mobile-Unit", "Sim"))
+
+from vclock import VirtualClock  # noqa: E402
+
+GGA = "$GPGGA,161229.00,3341.18262,N,11747.37918,W,1,08,0.9,30.0,M,-34.0,M,,*63"
+RMC = "$GPRMC,161229.00,A,3341.18262,N,11747.37918,W,0.816,87.20,191026,,,A*46"
+GLL = "$GPGLL,3341.18262,N,11747.37918,W,161229.00,A,A*7E"
+BURST = [
+    (GGA + "\r\n").encode(),
+    b"$GPGSA,A,3,04,05,09,12,17,20,25,29,1.6,0.9,1.3*3D\r\n",
+    (RMC + "\r\n").encode(),
+    b"$GPVTG,87.20,T,,M,0.816,N,1.511,K,A*0B\r\n",
+    (GLL + "\r\n").encode(),
+]
+
+FRAME_T = {
+    "v": 1, "type": "telemetry:T", "node_id": 2, "seq": 145, "ts_ms": 582341, "Q": "0x03",
+    "imu": {"heading": 92.4, "compass": "E", "roll": -1.0, "pitch": 0.5},
+    "gps": {"lat": 33.686377, "lon": -117.789653, "spd_mps": 0.84, "hdop": 0.9, "fix": 3},
+    "rng": {"f_cm": 85, "l_cm": None, "r_cm": 120},
+    "batt": {"v": 7.46},
+    "nav": {"state": "PATROL", "wp_idx": 3, "bearing_to_wp": 87.2, "heading_error": 5.2,
+            "distance_m": 12.4, "motor_l": 0.48, "motor_r": 0.52},
+}
+
+
+class _LineCycle:
+    """Stand-in for gps_uart: endless NMEA bursts with no pacing."""
+
+    def __init__(self, lines):
+        self._it = itertools.cycle(lines)
+
+    def readline(self):
+        return next(self._it)
+
+
+def _gps():
+    import GPS_LatLon
+    return GPS_LatLon
+
+
+@bench("pico.nmea.parse_gpgga", group="pico")
+def bench_parse_gpgga(benchmark):
+    benchmark(_gps().parse_gpgga, GGA)
+
+
+@bench("pico.nmea.parse_gprmc", group="pico")
+def bench_parse_gprmc(benchmark):
+    benchmark(_gps().parse_gprmc, RMC)
+
+
+@bench("pico.nmea.get_lat_lon_burst", group="pico")
+def bench_get_lat_lon_burst(benchmark):
+    gps = _gps()
+    saved = gps.gps_uart
+    gps.gps_uart = _LineCycle(BURST)
+    try:
+        # One call consumes lines until the next fix sentence (mixed burst)
+        benchmark(gps.get_lat_lon)
+    finally:
+        gps.gps_uart = saved
+
+
+@bench("pico.imu.read_euler", group="pico")
+def bench_read_euler(benchmark):
+    import busio
+    from imu_bno055 import BNO055IMU
+
+    clock = VirtualClock().install()  # the driver's 1 ms register-select sleep costs nothing here
+    try:
+        imu = BNO055IMU(i2c=busio.I2C())
+        imu.initialize(mode_name="NDOF_FMC_OFF", ext_crystal=True)
+        imu.set_roll_lpf(alpha=0.30)
+        benchmark(imu.read_euler)
+    finally:
+        clock.uninstall()
+
+
+@bench("pico.frame.json_encode", group="pico")
+def bench_frame_encode(benchmark):
+    benchmark(lambda: (json.dumps(FRAME_T, separators=(",", ":")) + "\n").encode("utf-8"))
+
+
+@bench("pico.frame.json_decode", group="pico")
+def bench_frame_decode(benchmark):
+    line = (json.dumps(FRAME_T, separators=(",", ":")) + "\n").encode("utf-8")
+    benchmark(lambda: json.loads(line))
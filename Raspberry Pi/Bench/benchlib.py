@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: benchlib.py
+Description: Minimal pytest-benchmark style harness (no third-party deps).
+             bench_*.py modules register functions with @bench; each receives a
+             Benchmark object and calls benchmark(fn, *args) exactly once, like
+             the pytest-benchmark fixture. Results are saved as JSON baselines
+             under baselines/ and compared between commits by run_bench.py.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PI_DIR = os.path.normpath(os.path.join(BENCH_DIR, ".."))
+REPO_DIR = os.path.normpath(os.path.join(PI_DIR, ".."))
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+
+REGISTRY = []  # (name, group, fn)
+
+
+def bench(name, group="misc"):
+    """Register a benchmark function taking a Benchmark argument."""
+    def deco(fn):
+        REGISTRY.append((name, group, fn))
+        return fn
+    return deco
+
+
+def add_paths(*parts_list):
+    """Prepend repo-relative directories to sys.path (idempotent)."""
+    for parts in parts_list:
+        path = os.path.join(REPO_DIR, *parts)
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+class _NullWriter(io.TextIOBase):
+    def write(self, s):
+        return len(s)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence program print() output while a benchmark runs."""
+    with contextlib.redirect_stdout(_NullWriter()):
+        yield
+
+
+class Benchmark:
+    """
+    Calibrates an inner loop so each round lasts at least min_round_s, then
+    runs rounds until max_time_s (bounded by min_rounds/max_rounds). Times are
+    per call. extra_info holds derived figures such as packets/sec.
+    """
+
+    def __init__(self, min_round_s=0.02, max_time_s=0.5, min_rounds=5, max_rounds=200):
+        self.min_round_s = min_round_s
+        self.max_time_s = max_time_s
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.extra_info = {}
+        self.stats = None
+
+    def __call__(self, fn, *args, **kwargs):
+        result = fn(*args, **kwargs)  # warm-up (and the value returned to the caller)
+        loops = 1
+        while True:
+            t0 = time.perf_counter()
+            for _ in range(loops):
+                fn(*args, **kwargs)
+            dt = time.perf_counter() - t0
+            if dt >= self.min_round_s or loops >= 1 << 20:
+                break
+            loops *= 2 if dt <= 0 else max(2, min(10, int(self.min_round_s / dt) + 1))
+        samples = []
+        start = time.perf_counter()
+        while len(samples) < self.max_rounds:
+            t0 = time.perf_counter()
+            for _ in range(loops):
+                fn(*args, **kwargs)
+            samples.append((time.perf_counter() - t0) / loops)
+            if len(samples) >= self.min_rounds and time.perf_counter() - start >= self.max_time_s:
+                break
+        median = statistics.median(samples)
+        self.stats = {
+            "min": min(samples),
+            "median": median,
+            "mean": statistics.fmean(samples),
+            "stddev": statistics.pstdev(samples),
+            "rounds": len(samples),
+            "loops": loops,
+            "ops": 1.0 / median if median > 0 else float("inf"),
+        }
+        return result
+
+
+def run_all(name_filter=None):
+    """Run every registered benchmark; returns {name: stats+extra_info}."""
+    results = {}
+    for name, group, fn in REGISTRY:
+        if name_filter and name_filter not in name:
+            continue
+        b = Benchmark()
+        try:
+            fn(b)
+        except Exception as e:
+            print(f"[Bench] {name}: ERROR {e}")
+            continue
+        if b.stats is None:
+            print(f"[Bench] {name}: benchmark() was never called")
+            continue
+        entry = dict(b.stats, group=group)
+        entry.update(b.extra_info)
+        results[name] = entry
+        print(f"[Bench] {name:42s} median {fmt_time(entry['median']):>10s}  "
+              f"({entry['ops']:>12,.0f} ops/s){_fmt_extra(b.extra_info)}")
+    return results
+
+
+def _fmt_extra(extra):
+    return "".join(f"  {k}={v:,.0f}" if isinstance(v, (int, float)) else f"  {k}={v}" for k, v in extra.items())
+
+
+def fmt_time(seconds):
+    if seconds >= 1.0:
+        return f"{seconds:.3f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f} ms"
+    if seconds >= 1e-6:
+        return f"{seconds * 1e6:.3f} us"
+    return f"{seconds * 1e9:.1f} ns"
+
+
+def git_label():
+    try:
+        import subprocess
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ("-dirty" if dirty else "")
+    except Exception:
+        return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def save_results(results, label):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = os.path.join(BASELINE_DIR, f"{label}.json")
+    doc = {
+        "meta": {
+            "label": label,
+            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()} {platform.node()}",
+        },
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=1, sort_keys=True)
+    return path
+
+
+def load_results(label_or_path):
+    path = label_or_path
+    if not os.path.exists(path):
+        path = os.path.join(BASELINE_DIR, f"{label_or_path}.json")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(base_doc, head_doc, threshold=0.10, stat="min", name_filter=None):
+    """
+    Print a per-call time comparison table. A benchmark regresses when its head
+    `stat` (min by default: least sensitive to scheduler noise) exceeds the
+    base value by more than `threshold` (fraction).
+    Returns the list of regressed benchmark names.
+    """
+    base, head = base_doc["results"], head_doc["results"]
+    print(f"[Bench] base={base_doc['meta']['label']}  head={head_doc['meta']['label']}  "
+          f"stat={stat}  threshold={threshold * 100:.0f}%")
+    print(f"{'benchmark':42s} {'base':>11s} {'head':>11s} {'change':>8s}")
+    regressed = []
+    for name in sorted(set(base) | set(head)):
+        if name_filter and name_filter not in name:
+            continue
+        if name not in base or name not in head:
+            print(f"{name:42s} {'(only in ' + ('head' if name in head else 'base') + ')':>32s}")
+            continue
+        b, h = base[name][stat], head[name][stat]
+        change = (h - b) / b if b > 0 else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:42s} {fmt_time(b):>11s} {fmt_time(h):>11s} {change * 100:+7.1f}%{flag}")
+    return regressed
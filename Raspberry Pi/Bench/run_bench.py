@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: run_bench.py
+Description: Runs the benchmark suite and manages tracked baselines.
+
+Usage:
+  python3 run_bench.py run [-k FILTER] [--save [LABEL]]     # LABEL defaults to the git short hash
+  python3 run_bench.py compare BASE [HEAD] [--threshold 10] [--stat min]  # no HEAD = run now
+  python3 run_bench.py list
+
+compare exits with status 1 when any benchmark's per-call statistic (--stat,
+minimum by default) regresses by more than the threshold, so it can gate a
+commit or CI job.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+
+import benchlib
+
+BENCH_MODULES = ("bench_base", "bench_node", "bench_pico", "bench_nav", "bench_fleet", "bench_assign", "bench_fse", "bench_metrics",
+                 "bench_dashboard")
+
+
+def load_benchmarks():
+    # Programs under test create ./logs and read configs from the working
+    # directory, so run them somewhere disposable.
+    os.chdir(tempfile.mkdtemp(prefix="amu_bench_"))
+    for name in BENCH_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"[Bench] Skipping {name}: {e}")
+
+
+def main():
+    sys.path.insert(0, benchlib.BENCH_DIR)
+    ap = argparse.ArgumentParser(description="AMU benchmark suite")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run")
+    r.add_argument("-k", dest="filter", default=None, help="only benchmarks whose name contains this")
+    r.add_argument("--save", nargs="?", const="", default=None, help="save as baselines/<LABEL>.json")
+    c = sub.add_parser("compare")
+    c.add_argument("base")
+    c.add_argument("head", nargs="?")
+    c.add_argument("-k", dest="filter", default=None)
+    c.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    c.add_argument("--stat", choices=("min", "median", "mean"), default="min")
+    sub.add_parser("list")
+    a = ap.parse_args()
+
+    load_benchmarks()
+    if a.cmd == "list":
+        for name, group, _ in benchlib.REGISTRY:
+            print(f"{group:6s} {name}")
+        return 0
+    if a.cmd == "run":
+        results = benchlib.run_all(a.filter)
+        if a.save is not None:
+            path = benchlib.save_results(results, a.save or benchlib.git_label())
+            print(f"[Bench] Saved {path}")
+        return 0
+
+    base = benchlib.load_results(a.base)
+    if a.head:
+        head = benchlib.load_results(a.head)
+    else:
+        head = {"meta": {"label": benchlib.git_label() + " (now)"}, "results": benchlib.run_all(a.filter)}
+    regressed = benchlib.compare(base, head, a.threshold / 100.0, a.stat, a.filter)
+    if regressed:
+        print(f"[Bench] {len(regressed)} regression(s): {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: ack_scheduler.py
+Description: Half-duplex-aware ACK scheduling for the BaseStation. The RYLR998
+             cannot receive while it transmits, so an ACK sent straight after a
+             +RCV can blank out another unit's frame. ChannelEstimator learns
+             each unit's periodic streams (FS telemetry, NV status...) from
+             receive times and predicts their next busy windows; AckScheduler
+             queues ACKs, releases each one in the next predicted gap (never
+             later than max_hold_s after it was queued), and coalesces ACKs for
+             the same unit (duplicates dropped, an older waypoint ACK replaced
+             by the newer one). All methods take the current time, so the same
+             code runs against time.monotonic() or a simulated clock.
+             It assumes units transmit periodically. Today only units with a
+             Pico link send FS (paced by report_rate, so periodic only while
+             parked), plus their MS heartbeats; without such streams there is
+             nothing to predict and ACKs leave at once anyway, which is why
+             the BaseStation's Ack_Scheduling defaults to N.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+from lora_airtime import RFParams, time_on_air
+
+INF = float("inf")
+
+
+class _Stream:
+    """Periodic transmit pattern of one (unit, message kind)."""
+    __slots__ = ("last_start", "period", "dev", "airtime", "n")
+
+    def __init__(self, start, airtime):
+        self.last_start = start
+        self.period = None
+        self.dev = 0.0
+        self.airtime = airtime
+        self.n = 1
+
+
+class ChannelEstimator:
+    """
+    Busy/idle model of the channel from what the base hears and sends.
+    A stream is predictable once its inter-arrival jitter is under
+    max_jitter_s; missed frames (gaps of 2-4 periods) keep it. Aperiodic
+    traffic (waypoints paced by ACKs and backoff) never settles and is
+    left out of the prediction.
+    """
+
+    def __init__(self, rf=None, alpha=0.25, max_jitter_s=0.1, guard_s=0.05, window_s=60.0):
+        self.rf = rf or RFParams()
+        self.alpha = alpha
+        self.max_jitter_s = max_jitter_s
+        self.guard_s = guard_s
+        self.window_s = window_s
+        self.streams = {}            # (node_id, kind) -> _Stream
+        self.own_busy_until = 0.0    # base TX in progress (deaf until then)
+        self._recent = []            # (start, end) of heard frames and own TX, for utilization
+        self._toa = {}
+
+    def set_rf(self, rf):
+        self.rf = rf
+        self._toa = {}
+        for s in self.streams.values():
+            s.period = None      # frame timing changes with the data rate; relearn
+
+    def airtime(self, length):
+        t = self._toa.get(length)
+        if t is None:
+            t = self._toa[length] = time_on_air(length, self.rf)
+        return t
+
+    def observe_rx(self, node_id, kind, t_end, length):
+        """A frame of length bytes from node_id finished arriving at t_end."""
+        air = self.airtime(length)
+        start = t_end - air
+        self._recent.append((start, t_end))
+        key = (node_id, kind)
+        s = self.streams.get(key)
+        if s is None:
+            self.streams[key] = _Stream(start, air)
+            return
+        dt = start - s.last_start
+        s.last_start = start
+        s.airtime = air
+        s.n += 1
+        if dt <= 0:
+            return
+        if s.period is None or dt < 0.75 * s.period:
+            # first interval, or the first one was stretched by a lost frame
+            s.period = dt
+            s.dev = 0.0
+            return
+        # Fold gaps of 2..4 periods (lost or blanked frames) back onto one period
+        k = max(1, min(4, round(dt / s.period)))
+        err = dt / k - s.period
+        s.period += self.alpha * err
+        s.dev += self.alpha * (abs(err) - s.dev)
+
+    def observe_tx(self, t_start, length):
+        """Base transmit of length bytes starting at t_start; returns when it ends."""
+        end = max(t_start, self.own_busy_until) + self.airtime(length)
+        self._recent.append((end - self.airtime(length), end))
+        self.own_busy_until = end
+        return end
+
+    def busy_windows(self, now, horizon_s):
+        """Predicted (start, end) windows of other units' frames within [now, now + horizon_s]."""
+        out = []
+        g = self.guard_s
+        for s in self.streams.values():
+            p = s.period
+            if p is None or s.n < 3 or s.dev > self.max_jitter_s or now - s.last_start > 4.5 * p:
+                continue
+            pad = g + 2.0 * s.dev
+            t = s.last_start + p
+            while t + s.airtime + pad < now:
+                t += p
+            while t - pad <= now + horizon_s:
+                out.append((t - pad, t + s.airtime + pad))
+                t += p
+        out.sort()
+        return out
+
+    def next_gap(self, now, duration, horizon_s):
+        """Earliest start >= now (and after our own TX) for duration seconds clear of predicted frames."""
+        t = max(now, self.own_busy_until)
+        for a, b in self.busy_windows(t, horizon_s + duration):
+            if b <= t:
+                continue
+            if a >= t + duration:
+                break
+            t = b
+        return t
+
+    def utilization(self, now):
+        """Fraction of the last window_s the channel was busy (heard frames + own TX)."""
+        cut = now - self.window_s
+        self._recent = [(a, b) for a, b in self._recent if b > cut]
+        busy = sum(max(0.0, min(b, now) - max(a, cut)) for a, b in self._recent if b > cut)
+        return busy / self.window_s
+
+
+class AckScheduler:
+    """ACK queue released into predicted channel gaps; see module docstring."""
+
+    def __init__(self, estimator, max_hold_s=0.5):
+        self.est = estimator
+        self.max_hold_s = float(max_hold_s)
+        self.pending = []           # [dest, msg, node_id, t_queued, deadline]
+        self.released = 0
+        self.coalesced = 0
+        self.forced = 0
+        self.hold_total_s = 0.0
+
+    def enqueue(self, dest, msg, node_id, now):
+        """Queue an ACK; coalesces with one already waiting for the same unit."""
+        for e in self.pending:
+            if e[2] != node_id:
+                continue
+            if e[1] == msg:
+                self.coalesced += 1
+                return
+            # A newer waypoint ACK makes the older one moot (the unit has moved on)
+            if msg.startswith("ACK:") and e[1].startswith("ACK:"):
+                e[0], e[1] = dest, msg
+                self.coalesced += 1
+                return
+        self.pending.append([dest, msg, node_id, now, now + self.max_hold_s])
+
+    def due(self, now):
+        """ACKs to transmit now as [(dest, msg), ...], oldest first."""
+        out = []
+        keep = []
+        for e in self.pending:
+            dest, msg, _, t_q, deadline = e
+            air = self.est.airtime(len(msg))
+            start = self.est.next_gap(now, air, self.max_hold_s)
+            if start <= now or now >= deadline:
+                if start > now:
+                    self.forced += 1
+                self.est.observe_tx(now, len(msg))
+                self.released += 1
+                self.hold_total_s += now - t_q
+                out.append((dest, msg))
+            else:
+                keep.append(e)
+        self.pending = keep
+        return out
+
+    def flush(self, now):
+        """Release everything still queued (shutdown), ignoring the channel model."""
+        out = [(e[0], e[1]) for e in self.pending]
+        for e in self.pending:
+            self.released += 1
+            self.hold_total_s += now - e[3]
+        self.pending = []
+        return out
+
+    def next_due(self, now):
+        """Time of the next release check (INF when nothing is queued)."""
+        t = INF
+        for dest, msg, _, t_q, deadline in self.pending:
+            start = self.est.next_gap(now, self.est.airtime(len(msg)), self.max_hold_s)
+            t = min(t, start, deadline)
+        return t
+
+    def stats(self, now=None):
+        out = {"released": self.released, "coalesced": self.coalesced, "forced": self.forced,
+               "pending": len(self.pending),
+               "mean_hold_ms": 1e3 * self.hold_total_s / self.released if self.released else 0.0}
+        if now is not None:
+            out["utilization"] = self.est.utilization(now)
+        return out
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: adr.py
+Description: Adaptive LoRa data rate for the fleet. The base has one radio and
+             hears every unit on the same AT+PARAMETER profile, so the rate is
+             chosen per channel, not per unit: RateController keeps the last
+             SNR readings of each unit's frames, predicts each unit's SNR
+             margin on every profile of the ladder (demodulation floor per SF,
+             noise bandwidth per BW) and picks the fastest profile the worst
+             unit can still hold with margin_db to spare. Slowing down is
+             immediate; speeding up needs hysteresis_db extra and hold_s since
+             the last change. NodeRate is the unit side: it applies the base's
+             DR command and, after consecutive ACK timeouts, scans the ladder
+             (fallback profile first) until the base is heard again.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import math
+import time
+from collections import deque
+
+from lora_airtime import DEFAULT_PARAMETER, RFParams, time_on_air
+
+# SX126x demodulator SNR floor per spreading factor (dB)
+SNR_FLOOR_DB = {5: -2.5, 6: -5.0, 7: -7.5, 8: -10.0, 9: -12.5, 10: -15.0, 11: -17.5, 12: -20.0}
+
+# AT+PARAMETER profiles the fleet may use (any order; sorted fastest first)
+DEFAULT_LADDER = ("7,9,1,12", "7,8,1,12", "7,7,1,12", "8,7,1,12", "9,7,1,12", "10,7,1,12", "11,7,1,12")
+
+REF_LEN = 28  # waypoint-sized frame, used to order the ladder by airtime
+
+
+def normalize(param):
+    """Canonical "sf,bw,cr,preamble" string for comparisons."""
+    return ",".join(str(int(x)) for x in str(param).split("=", 1)[-1].split(","))
+
+
+def ladder(profiles=DEFAULT_LADDER):
+    """Profiles as (param, RFParams), fastest (least airtime) first."""
+    out = [(normalize(p), RFParams.from_parameter(p)) for p in profiles]
+    out.sort(key=lambda pr: time_on_air(REF_LEN, pr[1]))
+    return out
+
+
+def predicted_margin(snr_db, rf_now, rf_to):
+    """SNR margin above the demodulation floor on rf_to, for a reading taken on rf_now."""
+    snr = snr_db + 10.0 * math.log10(rf_now.bw_hz / rf_to.bw_hz)
+    return snr - SNR_FLOOR_DB.get(rf_to.sf, -20.0)
+
+
+class RateController:
+    """Fleet-wide data rate from per-unit uplink SNR (see module docstring)."""
+
+    def __init__(self, profiles=DEFAULT_LADDER, current=DEFAULT_PARAMETER, margin_db=10.0, hysteresis_db=3.0,
+                 window=10, min_samples=5, hold_s=300.0, active_s=300.0, clock=time.monotonic):
+        self.ladder = ladder(profiles)
+        self.params = [p for p, _ in self.ladder]
+        current = normalize(current)
+        if current not in self.params:
+            raise ValueError(f"current profile {current} is not in the ladder")
+        self.current = current
+        self.margin_db = float(margin_db)
+        self.hysteresis_db = float(hysteresis_db)
+        self.window = int(window)
+        self.min_samples = int(min_samples)
+        self.hold_s = float(hold_s)
+        self.active_s = float(active_s)
+        self.clock = clock
+        self.samples = {}        # unit -> deque of SNR on the current profile
+        self.last_heard = {}
+        self.changed_at = clock()
+        self.changes = 0
+
+    @property
+    def rf(self):
+        return self.ladder[self.params.index(self.current)][1]
+
+    def observe(self, unit, snr, now=None):
+        if snr is None:
+            return
+        now = self.clock() if now is None else now
+        q = self.samples.get(unit)
+        if q is None:
+            q = self.samples[unit] = deque(maxlen=self.window)
+        q.append(float(snr))
+        self.last_heard[unit] = now
+
+    def active_units(self, now=None):
+        now = self.clock() if now is None else now
+        return [u for u, t in self.last_heard.items() if now - t <= self.active_s]
+
+    def margins(self, now=None):
+        """{unit: (worst recent SNR, samples)} for active units."""
+        return {u: (min(self.samples[u]), len(self.samples[u])) for u in self.active_units(now) if self.samples.get(u)}
+
+    def decide(self, now=None):
+        """New profile string when the fleet should change rate, else None."""
+        now = self.clock() if now is None else now
+        worst = self.margins(now)
+        if not worst:
+            return None
+        snr = min(s for s, _ in worst.values())
+        settled = all(n >= self.min_samples for _, n in worst.values())
+        rf_now = self.rf
+        cur = self.params.index(self.current)
+        pick = None
+        for i, (param, rf) in enumerate(self.ladder):
+            need = self.margin_db + (self.hysteresis_db if i < cur else 0.0)
+            if predicted_margin(snr, rf_now, rf) >= need:
+                pick = i
+                break
+        if pick is None:
+            pick = len(self.ladder) - 1          # nothing holds the margin: most robust profile
+        if pick == cur:
+            return None
+        if pick < cur and (not settled or now - self.changed_at < self.hold_s):
+            return None                          # speed up only on settled data, not too often
+        return self.params[pick]
+
+    def commit(self, param, now=None):
+        """The fleet switched to param: readings from the old profile no longer apply."""
+        self.current = normalize(param)
+        self.changed_at = self.clock() if now is None else now
+        self.samples.clear()
+        self.changes += 1
+
+
+class NodeRate:
+    """Unit side: current profile, ACK-timeout fallback and ladder scan."""
+
+    def __init__(self, profiles=DEFAULT_LADDER, current=DEFAULT_PARAMETER, fallback=DEFAULT_PARAMETER,
+                 fallback_after=3):
+        params = [p for p, _ in ladder(profiles)]
+        self.current = normalize(current)
+        self.fallback = normalize(fallback)
+        self.fallback_after = int(fallback_after)
+        # Scan order after losing the base: fallback first, then slowest to fastest
+        self.scan = [self.fallback] + [p for p in reversed(params) if p != self.fallback]
+        self.misses = 0
+        self._scan_i = -1
+
+    def on_ack(self):
+        self.misses = 0
+        self._scan_i = -1
+
+    def on_timeout(self):
+        """Profile to switch to after this timeout, or None to stay."""
+        self.misses += 1
+        if self.fallback_after <= 0 or self.misses < self.fallback_after:
+            return None
+        self.misses = 0
+        self._scan_i = (self._scan_i + 1) % len(self.scan)
+        nxt = self.scan[self._scan_i]
+        if nxt == self.current:
+            self._scan_i = (self._scan_i + 1) % len(self.scan)
+            nxt = self.scan[self._scan_i]
+        self.current = nxt
+        return nxt
+
+    def on_command(self, param):
+        self.current = normalize(param)
+        self.misses = 0
+        self._scan_i = -1
+        return self.current
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: airtime_meter.py
+Description: Channel-time accounting for the RYLR998 driver. Every AT+SEND and
+             every +RCV is charged its time on air (lora_airtime.py) to the
+             peer's LoRa address and the message type (FS, ACK, WP, REG...),
+             in sliding windows of fixed buckets. The meter also answers how
+             long a transmit must wait to stay inside a duty-cycle budget, and
+             estimates how many units the channel can carry at the current
+             per-unit load.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import threading
+import time
+from collections import deque
+
+from lora_airtime import RFParams, time_on_air
+
+TX = 0
+RX = 1
+
+# Pure ALOHA peaks at 18.4% channel load; past that, collisions eat throughput
+ALOHA_MAX_LOAD = 0.18
+
+
+def message_kind(payload: str) -> str:
+    """Token of a LoRa payload ("FS", "ACK", "ACKREG"...); bare waypoints are "WP"."""
+    head = payload.split(":", 1)[0]
+    return head if head.replace("_", "").isalpha() else "WP"
+
+
+class _Window:
+    """Seconds per bucket for the last window_s, oldest first."""
+    __slots__ = ("buckets", "total")
+
+    def __init__(self):
+        self.buckets = deque()   # [bucket index, seconds]
+        self.total = 0.0
+
+    def add(self, b, seconds):
+        if self.buckets and self.buckets[-1][0] == b:
+            self.buckets[-1][1] += seconds
+        else:
+            self.buckets.append([b, seconds])
+        self.total += seconds
+
+    def prune(self, first):
+        while self.buckets and self.buckets[0][0] < first:
+            self.total -= self.buckets.popleft()[1]
+        if not self.buckets:
+            self.total = 0.0
+
+
+class AirtimeMeter:
+    """
+    duty_cycle is the allowed fraction of window_s this radio may transmit
+    (0 = no limit). Totals are kept per (direction, address, kind).
+    """
+
+    def __init__(self, rf=None, window_s=3600.0, bucket_s=10.0, duty_cycle=0.0, clock=time.monotonic):
+        self.rf = rf or RFParams()
+        self.window_s = float(window_s)
+        self.bucket_s = float(bucket_s)
+        self.duty_cycle = float(duty_cycle)
+        self.clock = clock
+        self.t0 = clock()
+        self._lock = threading.Lock()
+        self._tx = _Window()            # all own transmits (duty-cycle budget)
+        self._keys = {}                 # (TX/RX, address, kind) -> _Window
+        self._toa = {}
+        self.frames = [0, 0]
+
+    def set_rf(self, rf):
+        """Data rate changed (ADR): new frames are charged at the new airtime."""
+        self.rf = rf
+        self._toa = {}
+
+    def airtime(self, length):
+        t = self._toa.get(length)
+        if t is None:
+            t = self._toa[length] = time_on_air(length, self.rf)
+        return t
+
+    def _first(self, now):
+        return int((now - self.window_s) // self.bucket_s) + 1
+
+    def record(self, direction, now, address, kind, seconds):
+        b = int(now // self.bucket_s)
+        key = (direction, address, kind)
+        with self._lock:
+            w = self._keys.get(key)
+            if w is None:
+                w = self._keys[key] = _Window()
+            w.add(b, seconds)
+            if direction == TX:
+                self._tx.add(b, seconds)
+            self.frames[direction] += 1
+
+    def record_tx(self, now, address, payload):
+        self.record(TX, now, address, message_kind(payload), self.airtime(len(payload.encode("utf-8"))))
+
+    def record_rx(self, now, address, length, payload):
+        self.record(RX, now, address, message_kind(payload), self.airtime(length))
+
+    # ---------------- duty-cycle budget ----------------
+    def defer_s(self, now, seconds):
+        """How long a transmit of `seconds` on air must wait to stay within the budget (0 = send now)."""
+        if self.duty_cycle <= 0:
+            return 0.0
+        allowed = self.duty_cycle * self.window_s
+        if seconds > allowed:
+            return 0.0   # can never fit; do not hold it forever
+        with self._lock:
+            self._tx.prune(self._first(now))
+            excess = self._tx.total + seconds - allowed
+            if excess <= 0:
+                return 0.0
+            for b, s in self._tx.buckets:
+                excess -= s
+                if excess <= 0:
+                    return max(0.0, (b + 1) * self.bucket_s + self.window_s - now)
+        return 0.0
+
+    def duty(self, now=None):
+        """Own transmit time as a fraction of window_s."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            self._tx.prune(self._first(now))
+            return self._tx.total / self.window_s
+
+    # ---------------- reporting ----------------
+    def totals(self, now=None, by="kind"):
+        """{kind or address: [tx_s, rx_s]} over the window."""
+        now = self.clock() if now is None else now
+        first = self._first(now)
+        out = {}
+        with self._lock:
+            for (d, addr, kind), w in self._keys.items():
+                w.prune(first)
+                k = kind if by == "kind" else addr
+                out.setdefault(k, [0.0, 0.0])[d] += w.total
+        return out
+
+    def utilization(self, now=None):
+        """{"tx", "rx", "channel"} fractions of the elapsed window (what this radio sent / heard)."""
+        now = self.clock() if now is None else now
+        span = max(min(self.window_s, now - self.t0), 1e-9)
+        tx = rx = 0.0
+        for t, r in self.totals(now, by="address").values():
+            tx += t
+            rx += r
+        return {"tx": tx / span, "rx": rx / span, "channel": (tx + rx) / span}
+
+    def capacity(self, now=None, max_load=ALOHA_MAX_LOAD):
+        """Units the channel could carry at today's mean per-unit airtime (None before any traffic)."""
+        now = self.clock() if now is None else now
+        per_unit = [t + r for t, r in self.totals(now, by="address").values() if t + r > 0]
+        if not per_unit:
+            return None
+        span = max(min(self.window_s, now - self.t0), 1e-9)
+        mean = sum(per_unit) / len(per_unit) / span
+        return int(max_load / mean) if mean > 0 else None
+
+    def format_report(self, now=None):
+        now = self.clock() if now is None else now
+        u = self.utilization(now)
+        kinds = sorted(self.totals(now).items(), key=lambda kv: -(kv[1][0] + kv[1][1]))
+        parts = [f"tx {100 * u['tx']:.2f}% rx {100 * u['rx']:.2f}% (channel {100 * u['channel']:.2f}%)"]
+        if self.duty_cycle > 0:
+            parts.append(f"duty {100 * self.duty(now):.2f}% of {100 * self.duty_cycle:g}% budget")
+        if kinds:
+            parts.append("by type " + " ".join(f"{k}={t + r:.1f}s" for k, (t, r) in kinds[:8]))
+        cap = self.capacity(now)
+        if cap is not None:
+            parts.append(f"~{cap} units at {100 * ALOHA_MAX_LOAD:.0f}% load")
+        return ", ".join(parts)
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: assignment.py
+Description: Min-cost ASSIST dispatch. Builds an incidents x units cost matrix
+             (travel time from the node registry positions, weighted by
+             incident priority, plus battery and mission-state penalties) and
+             solves it with the Hungarian algorithm (shortest augmenting path,
+             Jonker-Volgenant style potentials). The inner loop is vectorised
+             with NumPy when available; a pure-Python path is kept for small
+             fleets and machines without NumPy.
+
+             Incremental: rows are augmented one at a time and the dual
+             potentials are kept, so a newly arrived incident costs one
+             O(units x assigned) augmentation instead of a full O(n^3) solve.
+             Unit moves / availability changes trigger a full re-solve (at most
+             every resolve_interval_s), with a small bonus for keeping current
+             assignments so units are not bounced between incidents.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import math
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Finite stand-in for "not allowed" (inf breaks the potential arithmetic)
+FORBID = 1e9
+# Below this many columns the per-step NumPy call overhead outweighs the vector work
+NUMPY_MIN_COLS = 100
+EARTH_R_M = 6371008.8
+
+# Mission-state penalties (seconds of extra ETA); None = not available for ASSIST
+STATE_PENALTY_S = {
+    None: 0.0,
+    "STANDBY": 0.0,
+    "PATROL": 30.0,
+    "RETURN_HOME": 60.0,
+    "INVESTIGATE": None,
+    "REPORT": None,
+    "ASSIST": None,
+    "SAFE": None,
+    "FAULT": None,
+}
+
+
+class Hungarian:
+    """
+    Rectangular min-cost assignment, rows <= cols; every row gets a column.
+    add_row() augments a single row and keeps the potentials (u, v), so rows
+    can arrive one at a time. Columns are fixed for the life of the object.
+    """
+
+    def __init__(self, n_cols, use_numpy=None):
+        self.m = int(n_cols)
+        if use_numpy is None:
+            use_numpy = self.m >= NUMPY_MIN_COLS
+        self.use_numpy = bool(use_numpy) and np is not None
+        self.rows = []
+        m1 = self.m + 1
+        if self.use_numpy:
+            self.u = np.zeros(16)
+            self.v = np.zeros(m1)
+            self.p = np.zeros(m1, dtype=np.int64)
+        else:
+            self.u = [0.0]
+            self.v = [0.0] * m1
+            self.p = [0] * m1
+
+    @property
+    def n(self):
+        return len(self.rows)
+
+    def add_row(self, costs):
+        if self.n >= self.m:
+            raise ValueError("more rows than columns; transpose the problem")
+        if self.use_numpy:
+            row = np.asarray(costs, dtype=float)
+            self.rows.append(row)
+            if self.n >= len(self.u):
+                self.u = np.concatenate((self.u, np.zeros(len(self.u))))
+            self._augment_np(self.n)
+        else:
+            self.rows.append([float(c) for c in costs])
+            self.u.append(0.0)
+            self._augment_py(self.n)
+
+    def _augment_py(self, i):
+        m, u, v, p, rows = self.m, self.u, self.v, self.p, self.rows
+        inf = float("inf")
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        way = [0] * (m + 1)
+        p[0] = i
+        j0 = 0
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = rows[i0 - 1]
+            ui0 = u[i0]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - ui0 - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    def _augment_np(self, i):
+        m, u, v, p, rows = self.m, self.u, self.v, self.p, self.rows
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        way = np.zeros(m + 1, dtype=np.int64)
+        p[0] = i
+        j0 = 0
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used
+            free[0] = False
+            cur = rows[i0 - 1] - u[i0] - v[1:]
+            better = free[1:] & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+            masked = np.where(free, minv, np.inf)
+            j1 = int(masked.argmin())
+            delta = masked[j1]
+            u[p[used]] += delta           # matched rows of used columns are distinct
+            v[used] -= delta
+            minv[free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    def copy(self):
+        """Independent solver state (for what-if rows); cost rows are shared, not copied."""
+        h = Hungarian.__new__(Hungarian)
+        h.m, h.use_numpy, h.rows = self.m, self.use_numpy, list(self.rows)
+        h.u = self.u.copy() if self.use_numpy else list(self.u)
+        h.v = self.v.copy() if self.use_numpy else list(self.v)
+        h.p = self.p.copy() if self.use_numpy else list(self.p)
+        return h
+
+    def assignment(self):
+        """[(row, col), ...] 0-based."""
+        return sorted((int(self.p[j]) - 1, j - 1) for j in range(1, self.m + 1) if self.p[j])
+
+    def total_cost(self):
+        return sum(self.rows[r][c] for r, c in self.assignment())
+
+
+def solve(cost):
+    """
+    Min-cost assignment for any rectangular cost matrix (list of rows or 2-D
+    array). Returns [(row, col), ...] covering min(n_rows, n_cols) pairs.
+    """
+    if np is not None:
+        cost = np.asarray(cost, dtype=float)
+        n, m = cost.shape if cost.size else (len(cost), 0)
+    else:
+        cost = [list(r) for r in cost]
+        n, m = len(cost), (len(cost[0]) if cost else 0)
+    if n == 0 or m == 0:
+        return []
+    if n > m:
+        t = cost.T if np is not None else [list(c) for c in zip(*cost)]
+        return sorted((r, c) for c, r in solve(t))
+    h = Hungarian(m)
+    for r in range(n):
+        h.add_row(cost[r])
+    return h.assignment()
+
+
+def greedy(cost):
+    """Baseline: repeatedly take the globally cheapest remaining pair."""
+    pairs = sorted((cost[r][c], r, c) for r in range(len(cost)) for c in range(len(cost[r])))
+    rows, cols, out = set(), set(), []
+    for _, r, c in pairs:
+        if r not in rows and c not in cols:
+            rows.add(r)
+            cols.add(c)
+            out.append((r, c))
+    return sorted(out)
+
+
+# ---------------- Costs ----------------
+class Incident:
+    __slots__ = ("incident_id", "lat", "lon", "priority", "t", "exclude")
+
+    def __init__(self, incident_id, lat, lon, priority=1.0, t=None, exclude=()):
+        self.incident_id = str(incident_id)
+        self.lat = float(lat)
+        self.lon = float(lon)
+        self.priority = float(priority)
+        self.t = time.time() if t is None else t
+        self.exclude = set(str(x) for x in exclude)
+
+
+def distance_m(lat1, lon1, lat2, lon2):
+    """Equirectangular distance; fine for a campus-sized operating area."""
+    kx = math.cos((lat1 + lat2) * 0.5 * math.pi / 180.0)
+    dx = (lon2 - lon1) * kx
+    dy = lat2 - lat1
+    return math.sqrt(dx * dx + dy * dy) * EARTH_R_M * math.pi / 180.0
+
+
+class CostModel:
+    def __init__(self, speed_mps=0.8, low_battery_v=6.6, full_battery_v=8.4, battery_weight_s=120.0,
+                 state_penalty_s=None):
+        self.speed_mps = float(speed_mps)
+        self.low_battery_v = float(low_battery_v)
+        self.full_battery_v = float(full_battery_v)
+        self.battery_weight_s = float(battery_weight_s)
+        self.state_penalty_s = STATE_PENALTY_S if state_penalty_s is None else state_penalty_s
+
+    def unit_penalty(self, rec, ignore_state=False):
+        """Per-unit additive cost in seconds, or None when the unit cannot ASSIST."""
+        if rec.lat is None:
+            return None
+        state_pen = 0.0 if ignore_state else self.state_penalty_s.get(rec.state, 0.0)
+        if state_pen is None:
+            return None
+        bat_pen = 0.0
+        if rec.battery_v is not None:
+            if rec.battery_v <= self.low_battery_v:
+                return None
+            span = max(self.full_battery_v - self.low_battery_v, 1e-6)
+            bat_pen = self.battery_weight_s * max(0.0, self.full_battery_v - rec.battery_v) / span
+        return state_pen + bat_pen
+
+    def matrix(self, incidents, units, on_task=()):
+        """
+        incidents x units cost matrix (seconds, priority-weighted). Units in
+        on_task are already assisting, so their ASSIST state is not held against them.
+        """
+        pens = [self.unit_penalty(u, u.node_id in on_task) for u in units]
+        rows = []
+        for inc in incidents:
+            w = 1.0 / max(inc.priority, 1e-3)
+            row = []
+            for u, pen in zip(units, pens):
+                if pen is None or u.node_id in inc.exclude:
+                    row.append(FORBID)
+                else:
+                    row.append(w * (distance_m(inc.lat, inc.lon, u.lat, u.lon) / self.speed_mps + pen))
+            rows.append(row)
+        return rows
+
+
+# ---------------- Dispatcher ----------------
+class AssistDispatcher:
+    """
+    Keeps open incidents and the current incident -> unit assignment.
+    Methods return command tuples for the BaseStation to send:
+        ("ASSIST", node_id, incident) / ("CANCEL_ASSIST", node_id, incident)
+    """
+
+    def __init__(self, registry, cost_model=None, resolve_interval_s=30.0, keep_bonus_s=20.0):
+        self.registry = registry
+        self.cost = cost_model or CostModel()
+        self.resolve_interval_s = float(resolve_interval_s)
+        self.keep_bonus_s = float(keep_bonus_s)
+        self.incidents = {}     # incident_id -> Incident (insertion order = row order)
+        self.assigned = {}      # incident_id -> node_id
+        self._solver = None
+        self._units = []        # unit records (columns) of the current solver
+        self._row_ids = []      # incident ids (rows) of the current solver
+        self._next_full = 0.0
+        self.full_solves = 0
+        self.incremental_solves = 0
+        self.solve_s = 0.0
+
+    def _candidate_units(self, now):
+        return [r for r in self.registry.live(now) if self.cost.unit_penalty(r) is not None]
+
+    def add_incident(self, incident, now=None):
+        now = time.time() if now is None else now
+        self.incidents[incident.incident_id] = incident
+        busy = set(self.assigned.values())
+        if (self._solver is not None and now < self._next_full
+                and self._solver.n < self._solver.m
+                and all(u.node_id in busy or self.cost.unit_penalty(u) is not None for u in self._units)):
+            t0 = time.perf_counter()
+            row = self.cost.matrix([incident], self._units, busy)[0]
+            self._solver.add_row(row)
+            self._row_ids.append(incident.incident_id)
+            self.incremental_solves += 1
+            self.solve_s = time.perf_counter() - t0
+            rows = self._solver.rows
+            pairs = [(r, c) for r, c in self._solver.assignment() if rows[r][c] < FORBID]
+            return self._apply(pairs, self._row_ids, self._units)
+        return self.resolve(now)
+
+    def close_incident(self, incident_id, now=None):
+        """Incident handled; frees its unit. Remaining incidents are re-solved."""
+        incident_id = str(incident_id)
+        self.incidents.pop(incident_id, None)
+        cmds = []
+        node = self.assigned.pop(incident_id, None)
+        if node is not None:
+            cmds.append(("CANCEL_ASSIST", node, incident_id))
+        if self.incidents:
+            cmds += self.resolve(now)
+        else:
+            self._solver = None
+        return cmds
+
+    def tick(self, now=None):
+        """Periodic full re-solve (units move); call from the listen loop."""
+        now = time.time() if now is None else now
+        if self.incidents and now >= self._next_full:
+            return self.resolve(now)
+        return []
+
+    def resolve(self, now=None):
+        now = time.time() if now is None else now
+        t0 = time.perf_counter()
+        units = self._candidate_units(now)
+        # Units already on an incident stay candidates even though their state reads ASSIST
+        on_task = set(self.assigned.values())
+        for rec in self.registry.live(now):
+            if rec.node_id in on_task and rec not in units and self.cost.unit_penalty(rec, True) is not None:
+                units.append(rec)
+        incidents = list(self.incidents.values())
+        self._next_full = now + self.resolve_interval_s
+        self.full_solves += 1
+        if not incidents or not units:
+            self._solver = None
+            return self._apply([], [i.incident_id for i in incidents], units)
+
+        cost = self.cost.matrix(incidents, units, on_task)
+        col = {u.node_id: j for j, u in enumerate(units)}
+        for r, inc in enumerate(incidents):
+            node = self.assigned.get(inc.incident_id)
+            if node in col and cost[r][col[node]] < FORBID:
+                cost[r][col[node]] = max(0.0, cost[r][col[node]] - self.keep_bonus_s)
+
+        row_ids = [i.incident_id for i in incidents]
+        if len(incidents) <= len(units):
+            h = Hungarian(len(units))
+            for row in cost:
+                h.add_row(row)
+            self._solver, self._units, self._row_ids = h, units, row_ids
+            pairs = h.assignment()
+        else:
+            self._solver = None
+            pairs = solve(cost)
+        self.solve_s = time.perf_counter() - t0
+        return self._apply([(r, c) for r, c in pairs if cost[r][c] < FORBID], row_ids, units)
+
+    def _apply(self, pairs, row_ids, units):
+        want = {}
+        for r, c in pairs:
+            want[row_ids[r]] = units[c].node_id
+        cmds = []
+        for inc_id, node in list(self.assigned.items()):
+            if want.get(inc_id) != node:
+                cmds.append(("CANCEL_ASSIST", node, inc_id))
+                del self.assigned[inc_id]
+        for inc_id, node in want.items():
+            if self.assigned.get(inc_id) != node:
+                self.assigned[inc_id] = node
+                cmds.append(("ASSIST", node, inc_id))
+        return cmds
+
+    def unserved(self):
+        return [i for i in self.incidents if i not in self.assigned]
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: at_command.py
+Description: Response-driven AT command engine for the RYLR998, shared by the
+             BaseStation and botCar radio bring-up. Each command is written
+             once and the engine reads until that command's own reply (+OK,
+             +ERR=<n> or +<NAME>=<value>) with a short timeout, so there are no
+             fixed sleeps. ensure() queries a setting first and only writes it
+             when the module holds a different value (settings live in the
+             module's flash, so unchanged ones cost one query and no write).
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import time
+
+# RYLR998 +ERR=<code> meanings (REYAX AT command guide)
+AT_ERRORS = {
+    1: "no CR/LF at end of command",
+    2: "command does not start with AT",
+    4: "unknown command",
+    5: "data length mismatch",
+    10: "TX timeout",
+    12: "CRC error",
+    13: "TX data longer than 240 bytes",
+    14: "failed to write flash",
+    15: "unknown failure",
+    17: "last TX not completed",
+    18: "preamble value not allowed",
+    19: "RX failed, header error",
+    20: "smart receiving power saving time not allowed",
+}
+
+
+class ATError(Exception):
+    """+ERR reply or missing reply for an AT command."""
+
+    def __init__(self, cmd, code=None, detail=None):
+        self.cmd = cmd
+        self.code = code
+        if detail is None:
+            detail = AT_ERRORS.get(code, "unknown error") if code is not None else "no reply"
+        self.detail = detail
+        tag = f"+ERR={code}" if code is not None else "timeout"
+        super().__init__(f"{cmd}: {tag} ({detail})")
+
+
+class ATEngine:
+    """
+    Runs AT commands on a serial-like port (write / readline / timeout).
+    Lines that are not replies (+RCV traffic arriving mid-setup) are passed to
+    on_unsolicited instead of being dropped.
+    """
+
+    def __init__(self, port, timeout=0.3, on_unsolicited=None):
+        self.port = port
+        self.timeout = float(timeout)
+        self.on_unsolicited = on_unsolicited
+        self.commands = 0
+        self.writes = 0
+        self.skipped = 0
+
+    def _readline(self, deadline):
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if hasattr(self.port, "timeout"):
+                self.port.timeout = min(remaining, self.timeout)
+            line = self.port.readline()
+            if line:
+                return line.decode(errors="ignore").strip()
+
+    def command(self, cmd, expect=None, timeout=None):
+        """
+        Send "AT+..." and wait for its reply. expect is the reply prefix for
+        queries (e.g. "+BAND="); without it the reply is +OK. Returns the reply
+        line; raises ATError on +ERR or timeout.
+        """
+        self.commands += 1
+        saved = getattr(self.port, "timeout", None)
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        try:
+            self.port.write(f"{cmd}\r\n".encode("utf-8"))
+            while True:
+                line = self._readline(deadline)
+                if line is None:
+                    raise ATError(cmd)
+                if line.startswith("+ERR="):
+                    try:
+                        code = int(line[5:])
+                    except ValueError:
+                        code = None
+                    raise ATError(cmd, code, None if code is not None else line)
+                if expect is None and line == "+OK":
+                    return line
+                if expect is not None and line.startswith(expect):
+                    return line
+                if self.on_unsolicited and line.startswith("+RCV="):
+                    self.on_unsolicited(line)
+                # anything else (stray +OK from an earlier send, blank) is skipped
+        finally:
+            if hasattr(self.port, "timeout"):
+                self.port.timeout = saved
+
+    def query(self, name):
+        """Current value of a setting: query("BAND") -> "915000000"."""
+        reply = self.command(f"AT+{name}?", expect=f"+{name}=")
+        return reply.split("=", 1)[1].strip()
+
+    def set(self, name, value):
+        self.writes += 1
+        return self.command(f"AT+{name}={value}")
+
+    def ensure(self, name, value):
+        """Write a setting only if the module holds a different value; returns True if written."""
+        value = str(value)
+        try:
+            current = self.query(name)
+        except ATError as e:
+            if e.code is None:
+                raise
+            current = None  # query not supported: just write
+        if current == value:
+            self.skipped += 1
+            return False
+        self.set(name, value)
+        return True
+
+    def configure(self, settings):
+        """
+        Apply [(name, value), ...] in order. Returns (changed names, errors, seconds);
+        one failing setting does not stop the others.
+        """
+        t0 = time.monotonic()
+        if hasattr(self.port, "reset_input_buffer"):
+            self.port.reset_input_buffer()
+        changed, errors = [], []
+        for name, value in settings:
+            try:
+                if self.ensure(name, value):
+                    changed.append(name)
+            except ATError as e:
+                errors.append(e)
+        return changed, errors, time.monotonic() - t0
+
+
+def format_setup(changed, errors, elapsed_s):
+    parts = [f"{elapsed_s * 1e3:.0f} ms"]
+    if changed:
+        parts.append(f"changed {', '.join(changed)}")
+    elif not errors:
+        parts.append("already configured")
+    if errors:
+        parts.append(f"{len(errors)} error(s)")
+    return ", ".join(parts)
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: dashboard.py
+Description: Live fleet dashboard backend for the BaseStation. An asyncio
+             HTTP/WebSocket server on its own thread serves the bundled static
+             page, /api/fleet (full snapshot) and /ws. The radio loop is not
+             touched: once per tick the server reads the node registry,
+             diffs it against what clients last saw, encodes one message and
+             writes the same frame to every client. A client that cannot keep
+             up is skipped and gets a fresh snapshot when its socket drains.
+             Standard library only (no CDN, no pip packages), so it works
+             offline in the field. With an on_command callback it also takes
+             POST /api/command (JSON) for downlink commands.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import operator
+import os
+import struct
+import threading
+import time
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# Per-unit fields sent to the browser (NodeRecord attributes) plus "stale"
+FIELDS = ("address", "registered", "lat", "lon", "yaw", "battery_v", "state", "rssi", "snr",
+          "last_seen", "msgs")
+
+CONTENT_TYPES = {".html": "text/html; charset=utf-8", ".js": "application/javascript; charset=utf-8",
+                 ".css": "text/css; charset=utf-8", ".json": "application/json", ".svg": "image/svg+xml",
+                 ".png": "image/png", ".ico": "image/x-icon"}
+
+
+class FleetView:
+    """
+    Registry state as the browser sees it. diff() returns only what changed
+    since the previous call; snapshot() is the state as of that call, so a
+    client that starts from a snapshot stays in step with the following diffs.
+    status() (optional) returns a small dict of base-level values (SF, load...).
+    """
+
+    def __init__(self, registry, status=None, clock=time.time):
+        self.registry = registry
+        self.status = status
+        self.clock = clock
+        self.seq = 0
+        self.units = {}      # node_id -> tuple of FIELDS values + stale, as last sent
+        self.base = {}
+        self._get = operator.attrgetter(*FIELDS)
+
+    @staticmethod
+    def _as_dict(row):
+        d = dict(zip(FIELDS, row))
+        d["stale"] = row[-1]
+        return d
+
+    def diff(self, now=None):
+        """{"seq", "t", "upd": {id: {field: value}}, "del": [ids], "base": {...}}, or None if nothing changed."""
+        now = self.clock() if now is None else now
+        upd = {}
+        seen = set()
+        get = self._get
+        stale_before = now - self.registry.stale_after_s
+        for rec in list(self.registry.nodes.values()):
+            nid = rec.node_id
+            seen.add(nid)
+            row = get(rec) + (rec.last_seen < stale_before,)
+            old = self.units.get(nid)
+            if old == row:
+                continue
+            if old is None:
+                upd[nid] = self._as_dict(row)
+            else:
+                ch = {f: row[i] for i, f in enumerate(FIELDS) if row[i] != old[i]}
+                if row[-1] != old[-1]:
+                    ch["stale"] = row[-1]
+                upd[nid] = ch
+            self.units[nid] = row
+        gone = [nid for nid in self.units if nid not in seen]
+        for nid in gone:
+            del self.units[nid]
+        base = {}
+        if self.status:
+            for k, v in self.status().items():
+                v = round(v, 4) if isinstance(v, float) else v
+                if self.base.get(k) != v:
+                    base[k] = self.base[k] = v
+        if not upd and not gone and not base:
+            return None
+        self.seq += 1
+        msg = {"type": "diff", "seq": self.seq, "t": now, "upd": upd}
+        if gone:
+            msg["del"] = gone
+        if base:
+            msg["base"] = base
+        return msg
+
+    def snapshot(self):
+        return {"type": "snapshot", "seq": self.seq, "t": self.clock(),
+                "units": {nid: self._as_dict(row) for nid, row in self.units.items()}, "base": dict(self.base)}
+
+
+def ws_frame(payload, opcode=0x1):
+    """Unmasked server-to-client WebSocket frame."""
+    n = len(payload)
+    if n < 126:
+        head = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 65536:
+        head = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        head = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return head + payload
+
+
+def ws_accept(key):
+    return base64.b64encode(hashlib.sha1((key + WS_GUID).encode("ascii")).digest()).decode("ascii")
+
+
+class _Client:
+    __slots__ = ("writer", "resync", "peer")
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.resync = False
+        self.peer = writer.get_extra_info("peername")
+
+
+class DashboardServer:
+    """
+    view is a FleetView; static_dir holds index.html and its assets. Clients
+    whose unsent output exceeds max_buffer bytes miss diffs and are resynced.
+    on_command(node, type, payload) -> dict enables POST /api/command; it runs
+    on the server thread and raises ValueError for a bad command.
+    """
+
+    def __init__(self, view, static_dir, tick_s=0.5, max_buffer=256 * 1024, on_command=None):
+        self.view = view
+        self.on_command = on_command
+        self.static_dir = os.path.abspath(static_dir)
+        self.tick_s = float(tick_s)
+        self.max_buffer = int(max_buffer)
+        self.clients = set()
+        self.sent = 0           # messages encoded (one per tick with changes)
+        self.skipped = 0        # per-client diffs dropped for slow sockets
+        self.loop = None
+        self._server = None
+        self._thread = None
+        self._started = threading.Event()
+        self._error = None
+
+    # ---------------- lifecycle ----------------
+    def start(self, port, addr="127.0.0.1"):
+        """Run the server on a daemon thread; raises OSError if the port cannot be bound."""
+        self._thread = threading.Thread(target=self._run, args=(addr, int(port)), name="dashboard", daemon=True)
+        self._thread.start()
+        self._started.wait(5.0)
+        if self._error:
+            raise self._error
+        return self
+
+    def _run(self, addr, port):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self._server = self.loop.run_until_complete(asyncio.start_server(self._handle, addr, port))
+        except OSError as e:
+            self._error = e
+            self._started.set()
+            return
+        self._started.set()
+        ticker = self.loop.create_task(self._tick_loop())
+        try:
+            self.loop.run_forever()
+        finally:
+            ticker.cancel()
+            self._server.close()
+            for c in list(self.clients):
+                c.writer.close()
+            self.loop.run_until_complete(asyncio.sleep(0))
+            self.loop.close()
+
+    def stop(self):
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self._thread:
+            self._thread.join(2.0)
+
+    # ---------------- fan-out ----------------
+    async def _tick_loop(self):
+        while True:
+            await asyncio.sleep(self.tick_s)
+            if self.clients:
+                self.tick()
+
+    def tick(self):
+        """One diff, encoded once, written to every client that can take it."""
+        msg = self.view.diff()
+        if msg is None:
+            return
+        frame = ws_frame(json.dumps(msg, separators=(",", ":")).encode("utf-8"))
+        self.sent += 1
+        snap = None
+        for c in list(self.clients):
+            buffered = c.writer.transport.get_write_buffer_size()
+            if buffered > self.max_buffer:
+                c.resync = True
+                self.skipped += 1
+                continue
+            if c.resync:
+                if snap is None:
+                    snap = ws_frame(json.dumps(self.view.snapshot(), separators=(",", ":")).encode("utf-8"))
+                c.writer.write(snap)
+                c.resync = False
+            else:
+                c.writer.write(frame)
+
+    # ---------------- HTTP ----------------
+    async def _handle(self, reader, writer):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        lines = request.decode("latin-1").split("\r\n")
+        parts = lines[0].split()
+        if len(parts) < 2 or parts[0] not in ("GET", "POST"):
+            await self._respond(writer, 405, b"method not allowed")
+            return
+        headers = {}
+        for ln in lines[1:]:
+            if ":" in ln:
+                k, v = ln.split(":", 1)
+                headers[k.strip().lower()] = v.strip()
+        path = parts[1].split("?", 1)[0]
+        if parts[0] == "POST":
+            await self._command(reader, writer, path, headers)
+        elif path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+            await self._websocket(reader, writer, headers)
+        elif path == "/api/fleet":
+            if not self.clients:
+                self.view.diff()     # nobody is ticking the view; bring it up to date
+            body = json.dumps(self.view.snapshot(), separators=(",", ":")).encode("utf-8")
+            await self._respond(writer, 200, body, CONTENT_TYPES[".json"])
+        else:
+            await self._static(writer, path)
+
+    async def _command(self, reader, writer, path, headers):
+        """POST /api/command {"node", "type", "payload"}; JSON only, so a plain HTML form cannot post it."""
+        if path != "/api/command" or not self.on_command:
+            await self._respond(writer, 405, b"method not allowed")
+            return
+        if not headers.get("content-type", "").startswith("application/json"):
+            await self._respond(writer, 400, b"expected application/json")
+            return
+        try:
+            n = int(headers.get("content-length", "0"))
+            if not 0 < n <= 4096:
+                raise ValueError("body must be 1..4096 bytes")
+            req = json.loads(await reader.readexactly(n))
+            reply = self.on_command(str(req["node"]), str(req["type"]), str(req.get("payload") or ""))
+        except (ValueError, KeyError, TypeError, asyncio.IncompleteReadError) as e:
+            await self._respond(writer, 400, f"bad command: {e}".encode("utf-8"))
+            return
+        await self._respond(writer, 200, json.dumps(reply).encode("utf-8"), CONTENT_TYPES[".json"])
+
+    async def _respond(self, writer, status, body, ctype="text/plain; charset=utf-8"):
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}.get(status, "")
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: {ctype}\r\nContent-Length: {len(body)}\r\n"
+                     f"Cache-Control: no-cache\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def _static(self, writer, path):
+        name = "index.html" if path in ("/", "") else path.lstrip("/")
+        full = os.path.abspath(os.path.join(self.static_dir, name))
+        if not full.startswith(self.static_dir + os.sep) or not os.path.isfile(full):
+            await self._respond(writer, 404, b"not found")
+            return
+        with open(full, "rb") as f:
+            body = f.read()
+        ctype = CONTENT_TYPES.get(os.path.splitext(full)[1], "application/octet-stream")
+        await self._respond(writer, 200, body, ctype)
+
+    # ---------------- WebSocket ----------------
+    async def _websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key")
+        if not key:
+            await self._respond(writer, 404, b"bad websocket request")
+            return
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {ws_accept(key)}\r\n\r\n").encode("latin-1"))
+        if not self.clients:
+            self.view.diff()         # state moved on while nobody was watching
+        writer.write(ws_frame(json.dumps(self.view.snapshot(), separators=(",", ":")).encode("utf-8")))
+        client = _Client(writer)
+        self.clients.add(client)
+        try:
+            await self._read_frames(reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients.discard(client)
+            writer.close()
+
+    async def _read_frames(self, reader, writer):
+        """Client frames are only control traffic: answer ping, end on close, ignore the rest."""
+        while True:
+            b0, b1 = await reader.readexactly(2)
+            opcode = b0 & 0x0F
+            n = b1 & 0x7F
+            if n == 126:
+                n = struct.unpack("!H", await reader.readexactly(2))[0]
+            elif n == 127:
+                n = struct.unpack("!Q", await reader.readexactly(8))[0]
+            if n > 65536:
+                return
+            mask = await reader.readexactly(4) if b1 & 0x80 else b"\0\0\0\0"
+            data = bytes(b ^ mask[i % 4] for i, b in enumerate(await reader.readexactly(n)))
+            if opcode == 0x8:
+                writer.write(ws_frame(data[:2], 0x8))
+                return
+            if opcode == 0x9:
+                writer.write(ws_frame(data, 0xA))
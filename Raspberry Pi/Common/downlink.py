@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: downlink.py
+Description: Base -> Node command channel. Commands go out as
+             DN:<TYPE>:<node_id>:<seq>:<payload> and the unit answers
+             ACKDN:<node_id>:<seq>:<OK|REJ> (REJ = its mission state machine
+             refused the command; it is still delivered). The base keeps a
+             FIFO per unit and at most `window` commands in flight to it;
+             unanswered commands are re-sent with exponential backoff until
+             max_attempts, then reported as failed. EMERGENCY_STOP skips the
+             queue and the window. Issue -> ACK latency is kept per command.
+             Pure bookkeeping: the caller does the radio sends.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import threading
+import time
+from collections import deque
+
+# ASSIST / CANCEL_ASSIST come from the base's ASSIST dispatcher (payload <incident>[:<lat>,<lon>])
+DN_TYPES = ("START_PATROL", "HALT", "RETURN_HOME", "EMERGENCY_STOP", "ASSIST", "CANCEL_ASSIST")
+URGENT = ("EMERGENCY_STOP",)
+
+ACK_OK = "OK"
+ACK_REJECTED = "REJ"
+
+
+def format_dn(kind, node_id, seq, payload=""):
+    return f"DN:{kind}:{node_id}:{seq}:{payload}"
+
+
+def parse_dn(msg):
+    """DN:<TYPE>:<node_id>:<seq>:<payload> -> (type, node_id, seq, payload), or None."""
+    p = msg.split(":", 4)
+    if len(p) < 4 or p[0] != "DN":
+        return None
+    try:
+        seq = int(p[3])
+    except ValueError:
+        return None
+    return p[1], p[2], seq, (p[4] if len(p) > 4 else "")
+
+
+def format_dn_ack(node_id, seq, admitted):
+    return f"ACKDN:{node_id}:{seq}:{ACK_OK if admitted else ACK_REJECTED}"
+
+
+def parse_dn_ack(msg):
+    """ACKDN:<node_id>:<seq>:<OK|REJ> -> (node_id, seq, result), or None."""
+    p = msg.split(":")
+    if len(p) < 3 or p[0] != "ACKDN":
+        return None
+    try:
+        seq = int(p[2])
+    except ValueError:
+        return None
+    return p[1], seq, (p[3] if len(p) > 3 else ACK_OK)
+
+
+class Command:
+    __slots__ = ("node_id", "kind", "payload", "seq", "t_issue", "t_sent", "attempts", "next_retry",
+                 "result", "latency")
+
+    def __init__(self, node_id, kind, payload, seq, t_issue):
+        self.node_id = node_id
+        self.kind = kind
+        self.payload = payload
+        self.seq = seq
+        self.t_issue = t_issue
+        self.t_sent = None
+        self.attempts = 0
+        self.next_retry = 0.0
+        self.result = None       # "OK" / "REJ" from the unit, "FAILED" after max_attempts
+        self.latency = None      # seconds from issue() to the unit's ACKDN
+
+    @property
+    def urgent(self):
+        return self.kind in URGENT
+
+    @property
+    def msg(self):
+        return format_dn(self.kind, self.node_id, self.seq, self.payload)
+
+
+class _Unit:
+    __slots__ = ("queue", "outstanding", "next_seq")
+
+    def __init__(self):
+        self.queue = deque()
+        self.outstanding = {}    # seq -> Command
+        self.next_seq = 1
+
+
+class DownlinkQueue:
+    """
+    issue() may be called from any thread; due() and ack() from the radio
+    loop. due(now) returns (to_send, failed): commands to put on air now
+    (first sends and retries, urgent ones first) and commands that ran out
+    of attempts. It is cheap to call every loop pass: nothing is scanned
+    until a command is issued, acknowledged or a retry timer expires.
+    """
+
+    def __init__(self, window=2, retry_s=5.0, max_attempts=3, clock=time.monotonic, history=1000):
+        self.window = max(1, int(window))
+        self.retry_s = float(retry_s)
+        self.max_attempts = max(1, int(max_attempts))
+        self.clock = clock
+        self.units = {}
+        self._urgent = deque()
+        self._lock = threading.Lock()
+        self._wake = float("inf")    # earliest time due() has work
+        self.latencies = deque(maxlen=history)
+        self.issued = self.sent = self.retries = self.acked = self.rejected = self.failed = 0
+
+    def issue(self, node_id, kind, payload="", now=None):
+        """Queue a command for one unit; returns the Command (its seq is final). Non-DN_TYPES raise ValueError."""
+        kind = str(kind).strip().upper()
+        if kind not in DN_TYPES:
+            raise ValueError(f"unknown command {kind!r} (expected one of {', '.join(DN_TYPES)})")
+        node_id = str(node_id)
+        now = self.clock() if now is None else now
+        with self._lock:
+            u = self.units.get(node_id)
+            if u is None:
+                u = self.units[node_id] = _Unit()
+            cmd = Command(node_id, kind, str(payload or ""), u.next_seq, now)
+            u.next_seq += 1
+            if cmd.urgent:
+                self._urgent.append(cmd)
+            else:
+                u.queue.append(cmd)
+            self.issued += 1
+            self._wake = 0.0
+        return cmd
+
+    def due(self, now=None):
+        now = self.clock() if now is None else now
+        if now < self._wake:
+            return (), ()
+        send, failed = [], []
+        wake = float("inf")
+        with self._lock:
+            while self._urgent:
+                cmd = self._urgent.popleft()
+                self.units[cmd.node_id].outstanding[cmd.seq] = cmd
+                self._mark_sent(cmd, now)
+                send.append(cmd)
+            for u in self.units.values():
+                for cmd in list(u.outstanding.values()):
+                    if cmd.t_sent is None or now < cmd.next_retry:
+                        continue
+                    if cmd.attempts >= self.max_attempts:
+                        del u.outstanding[cmd.seq]
+                        cmd.result = "FAILED"
+                        self.failed += 1
+                        failed.append(cmd)
+                        continue
+                    self.retries += 1
+                    self._mark_sent(cmd, now)
+                    send.append(cmd)
+                in_flight = sum(1 for c in u.outstanding.values() if not c.urgent)
+                while u.queue and in_flight < self.window:
+                    cmd = u.queue.popleft()
+                    u.outstanding[cmd.seq] = cmd
+                    self._mark_sent(cmd, now)
+                    send.append(cmd)
+                    in_flight += 1
+                for cmd in u.outstanding.values():
+                    wake = min(wake, cmd.next_retry)
+            self._wake = wake
+        return send, failed
+
+    def _mark_sent(self, cmd, now):
+        cmd.attempts += 1
+        cmd.t_sent = now
+        cmd.next_retry = now + self.retry_s * (2 ** (cmd.attempts - 1))
+        self.sent += 1
+
+    def ack(self, node_id, seq, result=ACK_OK, now=None):
+        """ACKDN from a unit; returns the completed Command, or None for duplicates / unknown seqs."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            u = self.units.get(str(node_id))
+            cmd = u.outstanding.pop(int(seq), None) if u else None
+            if cmd is None:
+                return None
+            cmd.result = result
+            cmd.latency = now - cmd.t_issue
+            self.latencies.append(cmd.latency)
+            self.acked += 1
+            if result != ACK_OK:
+                self.rejected += 1
+            if u.queue:
+                self._wake = 0.0     # the window has room again
+        return cmd
+
+    @property
+    def active(self):
+        """Anything queued or in flight (the radio loop skips due() otherwise)."""
+        return self._wake != float("inf")
+
+    def pending(self):
+        with self._lock:
+            return len(self._urgent) + sum(len(u.queue) + len(u.outstanding) for u in self.units.values())
+
+    def stats(self):
+        lat = sorted(self.latencies)
+        pick = (lambda q: lat[min(len(lat) - 1, int(q * len(lat)))]) if lat else (lambda q: 0.0)
+        return {"issued": self.issued, "sent": self.sent, "retries": self.retries, "acked": self.acked,
+                "rejected": self.rejected, "failed": self.failed, "pending": self.pending(),
+                "p50_s": pick(0.50), "p95_s": pick(0.95), "max_s": lat[-1] if lat else 0.0}
+
+    def format_stats(self):
+        s = self.stats()
+        return (f"issued={s['issued']}, acked={s['acked']} (rejected={s['rejected']}), failed={s['failed']}, "
+                f"retries={s['retries']}, pending={s['pending']}, latency p50={s['p50_s'] * 1e3:.0f} ms "
+                f"p95={s['p95_s'] * 1e3:.0f} ms max={s['max_s'] * 1e3:.0f} ms")
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: fleet_index.py
+Description: Spatial index over live AMU positions at the BaseStation. A uniform
+             grid in local metres (equirectangular about the first report)
+             maps cell -> set of node ids, so each FS / waypoint report is an
+             O(1) update. Queries: k-nearest units to a point (ring search
+             outward from the query cell), units within a radius, and units
+             inside a polygon geofence (bbox cells + ray-casting test).
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import heapq
+import math
+import time
+
+EARTH_R_M = 6371008.8
+DEG = math.pi / 180.0
+
+
+def point_in_polygon(x, y, xs, ys):
+    """Even-odd ray cast; polygon given as parallel vertex lists (closed implicitly)."""
+    inside = False
+    j = len(xs) - 1
+    for i in range(len(xs)):
+        yi, yj = ys[i], ys[j]
+        if (yi > y) != (yj > y):
+            if x < xs[i] + (y - yi) * (xs[j] - xs[i]) / (yj - yi):
+                inside = not inside
+        j = i
+    return inside
+
+
+class Geofence:
+    """Polygon in the index's local frame with a bounding box for quick rejection."""
+
+    def __init__(self, name, xs, ys):
+        self.name = name
+        self.xs = xs
+        self.ys = ys
+        self.x0, self.x1 = min(xs), max(xs)
+        self.y0, self.y1 = min(ys), max(ys)
+
+    def contains(self, x, y):
+        if x < self.x0 or x > self.x1 or y < self.y0 or y > self.y1:
+            return False
+        return point_in_polygon(x, y, self.xs, self.ys)
+
+
+class FleetIndex:
+    def __init__(self, cell_m=50.0, origin=None):
+        self.cell_m = float(cell_m)
+        self._inv = 1.0 / self.cell_m
+        self.ky = EARTH_R_M * DEG
+        self.kx = None
+        self.lat0 = self.lon0 = None
+        if origin:
+            self._set_origin(*origin)
+        self.cells = {}   # (cx, cy) -> set(node_id)
+        self.nodes = {}   # node_id -> [x, y, lat, lon, t, cell]
+        self.extent = None  # (min cx, min cy, max cx, max cy) of cells ever used; only grows
+        self.updates = 0
+        self.cell_moves = 0
+
+    def _set_origin(self, lat, lon):
+        self.lat0, self.lon0 = float(lat), float(lon)
+        self.kx = self.ky * math.cos(self.lat0 * DEG)
+
+    def to_xy(self, lat, lon):
+        if self.kx is None:
+            self._set_origin(lat, lon)
+        return (lon - self.lon0) * self.kx, (lat - self.lat0) * self.ky
+
+    def _cell(self, x, y):
+        return (math.floor(x * self._inv), math.floor(y * self._inv))
+
+    def _add_to_cell(self, cell, node_id):
+        members = self.cells.get(cell)
+        if members is None:
+            self.cells[cell] = {node_id}
+            e = self.extent
+            if e is None:
+                self.extent = (cell[0], cell[1], cell[0], cell[1])
+            elif not (e[0] <= cell[0] <= e[2] and e[1] <= cell[1] <= e[3]):
+                self.extent = (min(e[0], cell[0]), min(e[1], cell[1]), max(e[2], cell[0]), max(e[3], cell[1]))
+        else:
+            members.add(node_id)
+
+    # ---------------- updates ----------------
+    def update(self, node_id, lat, lon, t=None):
+        """Insert or move a node. O(1): at most one set removal and one insert."""
+        x, y = self.to_xy(lat, lon)
+        cell = self._cell(x, y)
+        t = time.time() if t is None else t
+        self.updates += 1
+        rec = self.nodes.get(node_id)
+        if rec is None:
+            self.nodes[node_id] = [x, y, lat, lon, t, cell]
+            self._add_to_cell(cell, node_id)
+            return
+        if rec[5] != cell:
+            self.cell_moves += 1
+            old = self.cells.get(rec[5])
+            if old is not None:
+                old.discard(node_id)
+                if not old:
+                    del self.cells[rec[5]]
+            self._add_to_cell(cell, node_id)
+        rec[0], rec[1], rec[2], rec[3], rec[4], rec[5] = x, y, lat, lon, t, cell
+
+    def remove(self, node_id):
+        rec = self.nodes.pop(node_id, None)
+        if rec is None:
+            return False
+        s = self.cells.get(rec[5])
+        if s is not None:
+            s.discard(node_id)
+            if not s:
+                del self.cells[rec[5]]
+        return True
+
+    def expire(self, max_age_s, now=None):
+        """Drop nodes not heard from within max_age_s; returns their ids."""
+        now = time.time() if now is None else now
+        stale = [nid for nid, rec in self.nodes.items() if now - rec[4] > max_age_s]
+        for nid in stale:
+            self.remove(nid)
+        return stale
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, node_id):
+        return node_id in self.nodes
+
+    def position(self, node_id):
+        rec = self.nodes.get(node_id)
+        return (rec[2], rec[3], rec[4]) if rec else None
+
+    # ---------------- queries ----------------
+    def nearest(self, lat, lon, k=1, max_dist_m=None, exclude=()):
+        """
+        k nearest nodes as [(dist_m, node_id), ...] sorted by distance.
+        Scans rings of cells around the query cell and stops once ring r can
+        no longer hold anything closer than the current k-th best.
+        """
+        if not self.nodes or k <= 0:
+            return []
+        x, y = self.to_xy(lat, lon)
+        cx, cy = self._cell(x, y)
+        # Rings nearer than, or beyond, the occupied extent are empty
+        e = self.extent
+        min_ring = max(e[0] - cx, cx - e[2], e[1] - cy, cy - e[3], 0)
+        max_ring = max(cx - e[0], e[2] - cx, cy - e[1], e[3] - cy, 0)
+        if max_dist_m is not None:
+            max_ring = min(max_ring, int(max_dist_m * self._inv) + 1)
+        limit2 = max_dist_m * max_dist_m if max_dist_m is not None else float("inf")
+
+        best = []  # max-heap of (-d2, node_id)
+        cells = self.cells
+        nodes = self.nodes
+        for r in range(min_ring, max_ring + 1):
+            if r == 0:
+                ring = ((cx, cy),)
+            else:
+                ring = [(cx + i, cy - r) for i in range(-r, r + 1)]
+                ring += [(cx + i, cy + r) for i in range(-r, r + 1)]
+                ring += [(cx - r, cy + j) for j in range(-r + 1, r)]
+                ring += [(cx + r, cy + j) for j in range(-r + 1, r)]
+            for c in ring:
+                members = cells.get(c)
+                if not members:
+                    continue
+                for nid in members:
+                    if nid in exclude:
+                        continue
+                    rec = nodes[nid]
+                    dx = rec[0] - x
+                    dy = rec[1] - y
+                    d2 = dx * dx + dy * dy
+                    if d2 > limit2:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-d2, nid))
+                    elif d2 < -best[0][0]:
+                        heapq.heapreplace(best, (-d2, nid))
+            # Anything in ring r+1 is at least r * cell_m away
+            if len(best) == k:
+                reach = r * self.cell_m
+                if reach * reach >= -best[0][0]:
+                    break
+        return sorted((math.sqrt(-nd2), nid) for nd2, nid in best)
+
+    def within_radius(self, lat, lon, radius_m):
+        x, y = self.to_xy(lat, lon)
+        r2 = radius_m * radius_m
+        out = []
+        for c in self._cells_in_box(x - radius_m, y - radius_m, x + radius_m, y + radius_m):
+            for nid in self.cells[c]:
+                rec = self.nodes[nid]
+                dx = rec[0] - x
+                dy = rec[1] - y
+                if dx * dx + dy * dy <= r2:
+                    out.append(nid)
+        return out
+
+    def make_geofence(self, name, polygon):
+        """polygon: [[lat, lon], ...] -> Geofence in this index's frame."""
+        xs, ys = [], []
+        for lat, lon in polygon:
+            x, y = self.to_xy(float(lat), float(lon))
+            xs.append(x)
+            ys.append(y)
+        if len(xs) < 3:
+            raise ValueError(f"geofence {name} needs at least 3 vertices")
+        return Geofence(name, xs, ys)
+
+    def within_polygon(self, fence):
+        """Node ids inside a Geofence (or a raw [[lat, lon], ...] polygon)."""
+        if not isinstance(fence, Geofence):
+            fence = self.make_geofence("query", fence)
+        out = []
+        for c in self._cells_in_box(fence.x0, fence.y0, fence.x1, fence.y1):
+            for nid in self.cells[c]:
+                rec = self.nodes[nid]
+                if fence.contains(rec[0], rec[1]):
+                    out.append(nid)
+        return out
+
+    def _cells_in_box(self, x0, y0, x1, y1):
+        """Occupied cells overlapping a box: walk the box or the occupied set, whichever is smaller."""
+        c0x, c0y = self._cell(x0, y0)
+        c1x, c1y = self._cell(x1, y1)
+        span = (c1x - c0x + 1) * (c1y - c0y + 1)
+        cells = self.cells
+        if span <= len(cells):
+            return [(gx, gy) for gx in range(c0x, c1x + 1) for gy in range(c0y, c1y + 1) if (gx, gy) in cells]
+        return [c for c in cells if c0x <= c[0] <= c1x and c0y <= c[1] <= c1y]
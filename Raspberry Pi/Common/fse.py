@@ -0,0 +1,328 @@
+# fse.py — Table-driven Finite State Engine (Pico + Pi)
+# Author: Steven Westermire (Maddog / Gunny)
+#
+# States, events and commands are small integers. A StateTable compiles a
+# readable definition into flat lists once:
+#   trans[state * n_events + event] -> next state (-1 = ignored)
+#   allow[state]                    -> bitset of commands legal in that state
+# so FSE.fire() is one list index and FSE.gate() is one shift-and-mask.
+# E_STOP is checked before the table on every event and command: it always
+# lands in SAFE. Transitions go to a fixed-size audit ring (parallel lists,
+# no per-event allocation), cheap enough for the Pico main loop.
+#
+# Two tables are defined: PLATFORM (FSE spec: INIT -> READY -> CALIBRATING ->
+# NAV -> HOLD -> SAFE -> FAULT, gating the command catalog) and MISSION
+# (README AMUStateMachine: STANDBY/PATROL/INVESTIGATE/REPORT/ASSIST/RETURN_HOME,
+# gating the core mission commands). Pure Python: copy to the Pico next to main.py.
+import time
+
+# ---------------- Platform (FSE spec) ----------------
+S_INIT = 0
+S_READY = 1
+S_CALIBRATING = 2
+S_NAV = 3
+S_HOLD = 4
+S_SAFE = 5
+S_FAULT = 6
+PLATFORM_STATES = ("INIT", "READY", "CALIBRATING", "NAV", "HOLD", "SAFE", "FAULT")
+
+E_STOP = 0            # shared by both tables: always -> SAFE
+E_BOOT_OK = 1
+E_CALIB_START = 2
+E_CALIB_DONE = 3
+E_CALIB_FAIL = 4
+E_NAV_START = 5
+E_HOLD = 6
+E_RESUME = 7
+E_MISSION_DONE = 8
+E_LINK_LOST = 9
+E_SENSOR_FAULT = 10
+E_FAULT = 11
+E_RESET = 12
+PLATFORM_EVENTS = ("E_STOP", "BOOT_OK", "CALIB_START", "CALIB_DONE", "CALIB_FAIL", "NAV_START", "HOLD",
+                   "RESUME", "MISSION_DONE", "LINK_LOST", "SENSOR_FAULT", "FAULT", "RESET")
+
+# Command catalog (downlink)
+C_ESTOP = 0
+C_MODE_AUTO = 1
+C_MODE_MANUAL = 2
+C_MODE_HOLD = 3
+C_MODE_SAFE = 4
+C_MISSION_UPLOAD = 5
+C_START = 6
+C_PAUSE = 7
+C_STOP = 8
+C_RATE = 9
+C_WPSET = 10
+C_PICO = 11
+C_RESET = 12
+PLATFORM_COMMANDS = ("ESTOP", "MODE_AUTO", "MODE_MANUAL", "MODE_HOLD", "MODE_SAFE", "MISSION_UPLOAD",
+                     "START", "PAUSE", "STOP", "RATE", "WPSET", "PICO", "RESET")
+
+PLATFORM_TRANSITIONS = (
+    (S_INIT, E_BOOT_OK, S_READY),
+    (S_READY, E_CALIB_START, S_CALIBRATING),
+    (S_READY, E_NAV_START, S_NAV),
+    (S_READY, E_HOLD, S_HOLD),
+    (S_CALIBRATING, E_CALIB_DONE, S_READY),
+    (S_CALIBRATING, E_CALIB_FAIL, S_FAULT),
+    (S_NAV, E_HOLD, S_HOLD),
+    (S_NAV, E_LINK_LOST, S_HOLD),
+    (S_NAV, E_MISSION_DONE, S_READY),
+    (S_NAV, E_SENSOR_FAULT, S_SAFE),
+    (S_HOLD, E_RESUME, S_NAV),
+    (S_HOLD, E_NAV_START, S_NAV),
+    (S_HOLD, E_MISSION_DONE, S_READY),
+    (S_HOLD, E_SENSOR_FAULT, S_SAFE),
+    (S_SAFE, E_RESET, S_READY),
+    (S_FAULT, E_RESET, S_INIT),
+)
+# Events valid from every state except the listed target (E_STOP is built in)
+PLATFORM_ANY = ((E_FAULT, S_FAULT),)
+
+PLATFORM_ALLOWED = {
+    S_INIT: (C_RATE, C_PICO),
+    S_READY: (C_MODE_AUTO, C_MODE_MANUAL, C_MODE_HOLD, C_MODE_SAFE, C_MISSION_UPLOAD, C_START,
+              C_RATE, C_WPSET, C_PICO),
+    S_CALIBRATING: (C_MODE_SAFE, C_RATE),
+    S_NAV: (C_MODE_HOLD, C_MODE_SAFE, C_PAUSE, C_STOP, C_RATE, C_WPSET),
+    S_HOLD: (C_MODE_AUTO, C_MODE_MANUAL, C_MODE_SAFE, C_MISSION_UPLOAD, C_START, C_STOP, C_RATE,
+             C_WPSET, C_PICO),
+    S_SAFE: (C_RATE, C_PICO, C_RESET),
+    S_FAULT: (C_PICO, C_RESET),
+}
+
+# Command -> event fired once the command is admitted (-1 = no state change)
+PLATFORM_COMMAND_EVENTS = {
+    C_ESTOP: E_STOP,
+    C_MODE_AUTO: E_RESUME,
+    C_MODE_HOLD: E_HOLD,
+    C_MODE_SAFE: E_STOP,
+    C_START: E_NAV_START,
+    C_PAUSE: E_HOLD,
+    C_STOP: E_MISSION_DONE,
+    C_RESET: E_RESET,
+}
+
+# ---------------- Mission (README AMUStateMachine) ----------------
+M_STANDBY = 0
+M_PATROL = 1
+M_INVESTIGATE = 2
+M_REPORT = 3
+M_ASSIST = 4
+M_RETURN_HOME = 5
+M_SAFE = 6
+MISSION_STATES = ("STANDBY", "PATROL", "INVESTIGATE", "REPORT", "ASSIST", "RETURN_HOME", "SAFE")
+
+# E_STOP = 0 as above
+ME_START_PATROL = 1
+ME_HALT = 2
+ME_THREAT = 3          # detection confidence > threshold
+ME_EVIDENCE_DONE = 4   # evidence collected or investigate timeout
+ME_REPORT_PATROL = 5
+ME_REPORT_STANDBY = 6
+ME_ASSIST = 7
+ME_CANCEL_ASSIST = 8
+ME_RETURN_HOME = 9
+ME_HOME_REACHED = 10
+ME_BATTERY_LOW = 11
+ME_RESET = 12
+MISSION_EVENTS = ("E_STOP", "START_PATROL", "HALT", "THREAT", "EVIDENCE_DONE", "REPORT_PATROL",
+                  "REPORT_STANDBY", "ASSIST", "CANCEL_ASSIST", "RETURN_HOME", "HOME_REACHED",
+                  "BATTERY_LOW", "RESET")
+
+MC_EMERGENCY_STOP = 0
+MC_START_PATROL = 1
+MC_HALT = 2
+MC_GOTO_WAYPOINT = 3
+MC_SET_MODE = 4
+MC_ASSIST = 5
+MC_RETURN_HOME = 6
+MC_CANCEL_ASSIST = 7
+MC_RESET = 8
+MISSION_COMMANDS = ("EMERGENCY_STOP", "START_PATROL", "HALT", "GOTO_WAYPOINT", "SET_MODE", "ASSIST",
+                    "RETURN_HOME", "CANCEL_ASSIST", "RESET")
+
+MISSION_TRANSITIONS = (
+    (M_STANDBY, ME_START_PATROL, M_PATROL),
+    (M_STANDBY, ME_ASSIST, M_ASSIST),
+    (M_STANDBY, ME_RETURN_HOME, M_RETURN_HOME),
+    (M_PATROL, ME_HALT, M_STANDBY),
+    (M_PATROL, ME_THREAT, M_INVESTIGATE),
+    (M_PATROL, ME_ASSIST, M_ASSIST),
+    (M_PATROL, ME_RETURN_HOME, M_RETURN_HOME),
+    (M_INVESTIGATE, ME_EVIDENCE_DONE, M_REPORT),
+    (M_INVESTIGATE, ME_HALT, M_STANDBY),
+    (M_REPORT, ME_REPORT_PATROL, M_PATROL),
+    (M_REPORT, ME_REPORT_STANDBY, M_STANDBY),
+    (M_REPORT, ME_ASSIST, M_ASSIST),
+    (M_ASSIST, ME_CANCEL_ASSIST, M_PATROL),
+    (M_ASSIST, ME_HALT, M_STANDBY),
+    (M_ASSIST, ME_RETURN_HOME, M_RETURN_HOME),
+    (M_RETURN_HOME, ME_HOME_REACHED, M_STANDBY),
+    (M_RETURN_HOME, ME_HALT, M_STANDBY),
+    (M_SAFE, ME_RESET, M_STANDBY),
+)
+# Low battery sends the unit home from any active state (not from SAFE)
+MISSION_TRANSITIONS += tuple((s, ME_BATTERY_LOW, M_RETURN_HOME)
+                             for s in (M_STANDBY, M_PATROL, M_INVESTIGATE, M_REPORT, M_ASSIST))
+
+MISSION_ALLOWED = {
+    M_STANDBY: (MC_START_PATROL, MC_GOTO_WAYPOINT, MC_SET_MODE, MC_ASSIST, MC_RETURN_HOME),
+    M_PATROL: (MC_HALT, MC_GOTO_WAYPOINT, MC_SET_MODE, MC_ASSIST, MC_RETURN_HOME),
+    M_INVESTIGATE: (MC_HALT,),
+    M_REPORT: (MC_START_PATROL, MC_HALT, MC_ASSIST),
+    M_ASSIST: (MC_HALT, MC_CANCEL_ASSIST, MC_RETURN_HOME, MC_ASSIST),
+    M_RETURN_HOME: (MC_HALT,),
+    M_SAFE: (MC_RESET,),
+}
+
+MISSION_COMMAND_EVENTS = {
+    MC_EMERGENCY_STOP: E_STOP,
+    MC_START_PATROL: ME_START_PATROL,
+    MC_HALT: ME_HALT,
+    MC_ASSIST: ME_ASSIST,
+    MC_RETURN_HOME: ME_RETURN_HOME,
+    MC_CANCEL_ASSIST: ME_CANCEL_ASSIST,
+    MC_RESET: ME_RESET,
+}
+
+# Report state -> REPORT_PATROL when the base sends START_PATROL
+MISSION_COMMAND_EVENTS_BY_STATE = {(M_REPORT, MC_START_PATROL): ME_REPORT_PATROL}
+
+
+class StateTable:
+    """Compiled transition and gating tables (built once, shared by every engine)."""
+
+    def __init__(self, name, states, events, commands, transitions, allowed, command_events,
+                 initial, safe_state, estop_command, any_transitions=(), state_command_events=None):
+        self.name = name
+        self.states = states
+        self.events = events
+        self.commands = commands
+        self.n_states = len(states)
+        self.n_events = len(events)
+        self.initial = initial
+        self.safe_state = safe_state
+        self.estop_command = estop_command
+
+        self.trans = [-1] * (self.n_states * self.n_events)
+        for ev, dst in any_transitions:
+            for s in range(self.n_states):
+                if s != dst:
+                    self.trans[s * self.n_events + ev] = dst
+        for src, ev, dst in transitions:
+            self.trans[src * self.n_events + ev] = dst
+
+        self.allow = [0] * self.n_states
+        for s, cmds in allowed.items():
+            mask = 0
+            for c in cmds:
+                mask |= 1 << c
+            self.allow[s] = mask | (1 << estop_command)
+
+        self.cmd_event = [-1] * len(commands)
+        for c, ev in command_events.items():
+            self.cmd_event[c] = ev
+        self.state_cmd_event = dict(state_command_events or {})
+
+        self.state_index = {n: i for i, n in enumerate(states)}
+        self.command_index = {n: i for i, n in enumerate(commands)}
+        self.event_index = {n: i for i, n in enumerate(events)}
+
+
+PLATFORM = StateTable("platform", PLATFORM_STATES, PLATFORM_EVENTS, PLATFORM_COMMANDS,
+                      PLATFORM_TRANSITIONS, PLATFORM_ALLOWED, PLATFORM_COMMAND_EVENTS,
+                      S_INIT, S_SAFE, C_ESTOP, PLATFORM_ANY)
+MISSION = StateTable("mission", MISSION_STATES, MISSION_EVENTS, MISSION_COMMANDS,
+                     MISSION_TRANSITIONS, MISSION_ALLOWED, MISSION_COMMAND_EVENTS,
+                     M_STANDBY, M_SAFE, MC_EMERGENCY_STOP, (),
+                     MISSION_COMMAND_EVENTS_BY_STATE)
+
+
+class FSE:
+    def __init__(self, table, audit_size=32, clock=None, on_transition=None):
+        self.table = table
+        self.state = table.initial
+        self.clock = clock or time.monotonic
+        self.on_transition = on_transition   # fn(old, event, new) after each state change
+        self._trans = table.trans
+        self._n_events = table.n_events
+        self._allow = table.allow
+        # Audit ring (preallocated)
+        self.audit_size = audit_size
+        self._a_t = [0.0] * audit_size
+        self._a_from = [0] * audit_size
+        self._a_event = [0] * audit_size
+        self._a_to = [0] * audit_size
+        self._a_n = 0
+        self.transitions = 0
+        self.ignored = 0
+        self.rejected = 0
+
+    @property
+    def state_name(self):
+        return self.table.states[self.state]
+
+    def fire(self, event):
+        """Apply an event; returns the new state, or -1 if the event is not valid here."""
+        old = self.state
+        if event == E_STOP:
+            new = self.table.safe_state
+        else:
+            new = self._trans[old * self._n_events + event]
+            if new < 0:
+                self.ignored += 1
+                return -1
+        i = self._a_n % self.audit_size
+        self._a_t[i] = self.clock()
+        self._a_from[i] = old
+        self._a_event[i] = event
+        self._a_to[i] = new
+        self._a_n += 1
+        self.transitions += 1
+        self.state = new
+        if self.on_transition:
+            self.on_transition(old, event, new)
+        return new
+
+    def gate(self, cmd):
+        """True if the command is legal in the current state."""
+        return (self._allow[self.state] >> cmd) & 1 == 1
+
+    def command(self, cmd):
+        """
+        Receive gating for a command code: E-STOP first, then the state bitset.
+        Returns (admitted, reason). Rejected commands have no side effects.
+        """
+        t = self.table
+        if cmd == t.estop_command:
+            self.fire(E_STOP)
+            return True, "SAFE"
+        if not (self._allow[self.state] >> cmd) & 1:
+            self.rejected += 1
+            return False, "illegal in " + t.states[self.state]
+        ev = t.state_cmd_event.get((self.state, cmd), t.cmd_event[cmd])
+        if ev >= 0:
+            self.fire(ev)
+        return True, t.states[self.state]
+
+    def command_name(self, name):
+        """command() by name; unknown names are rejected."""
+        cmd = self.table.command_index.get(name)
+        if cmd is None:
+            self.rejected += 1
+            return False, "unknown command " + str(name)
+        return self.command(cmd)
+
+    def audit(self):
+        """Transitions oldest first: [(t, from_name, event_name, to_name), ...]."""
+        t = self.table
+        n = min(self._a_n, self.audit_size)
+        start = self._a_n - n
+        out = []
+        for k in range(start, self._a_n):
+            i = k % self.audit_size
+            out.append((self._a_t[i], t.states[self._a_from[i]], t.events[self._a_event[i]],
+                        t.states[self._a_to[i]]))
+        return out
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: lora_airtime.py
+Description: LoRa time-on-air for the RYLR998 (Semtech SX1262 formula). RF
+             settings use the module's AT+PARAMETER order and codes:
+             <SF>,<BW code>,<CR code>,<preamble>, e.g. "9,7,1,12" (the factory
+             default: SF9, 125 kHz, 4/5, 12 symbols). The module sends with an
+             explicit header and CRC on; the payload length is the AT+SEND data
+             length.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import math
+
+# AT+PARAMETER bandwidth codes -> Hz
+BW_CODES = {7: 125000, 8: 250000, 9: 500000}
+DEFAULT_PARAMETER = "9,7,1,12"
+
+
+class RFParams:
+    """Spreading factor, bandwidth (Hz), coding rate (1..4 = 4/5..4/8), preamble symbols."""
+
+    def __init__(self, sf=9, bw_hz=125000, cr=1, preamble=12, crc=True, implicit_header=False):
+        self.sf = int(sf)
+        self.bw_hz = int(bw_hz)
+        self.cr = int(cr)
+        self.preamble = int(preamble)
+        self.crc = crc
+        self.implicit_header = implicit_header
+        self.t_sym = (1 << self.sf) / self.bw_hz
+        # Low data rate optimisation is mandated above 16 ms symbols (SF11/SF12 @ 125 kHz)
+        self.low_dr_opt = self.t_sym > 0.016
+
+    @classmethod
+    def from_parameter(cls, text=DEFAULT_PARAMETER):
+        """Parse an AT+PARAMETER string ("9,7,1,12" or "+PARAMETER=9,7,1,12")."""
+        text = str(text).strip()
+        if "=" in text:
+            text = text.split("=", 1)[1]
+        sf, bw, cr, pre = (int(x) for x in text.split(","))
+        if bw not in BW_CODES:
+            raise ValueError(f"unknown bandwidth code {bw}")
+        return cls(sf, BW_CODES[bw], cr, pre)
+
+    def __repr__(self):
+        return f"RFParams(SF{self.sf}, {self.bw_hz // 1000} kHz, CR 4/{self.cr + 4}, preamble {self.preamble})"
+
+
+def time_on_air(payload_len: int, rf: RFParams = None) -> float:
+    """Seconds on air for a payload of payload_len bytes."""
+    rf = rf or RFParams()
+    de = 1 if rf.low_dr_opt else 0
+    ih = 1 if rf.implicit_header else 0
+    crc = 1 if rf.crc else 0
+    num = 8 * payload_len - 4 * rf.sf + 28 + 16 * crc - 20 * ih
+    n_payload = 8 + max(math.ceil(num / (4 * (rf.sf - 2 * de))) * (rf.cr + 4), 0)
+    return (rf.preamble + 4.25 + n_payload) * rf.t_sym
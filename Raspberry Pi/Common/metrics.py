@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: metrics.py
+Description: Counters, gauges and histograms for the BaseStation and botCar,
+             served in Prometheus text format (0.0.4) on a local HTTP port.
+             Updates take no lock: each thread writes its own cell of a series
+             and a scrape sums the cells, so the RX / TX threads pay a
+             thread-local lookup and an add. Gauges can instead be computed at
+             scrape time (queue depths), costing nothing on the hot path.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Default histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RSSI_BUCKETS = (-120, -110, -100, -90, -80, -70, -60, -50, -40)
+SNR_BUCKETS = (-15, -10, -5, 0, 5, 10, 15)
+COUNT_BUCKETS = (1, 2, 3, 4, 5, 8)
+
+
+def _fmt(v):
+    if v == float("inf"):
+        return "+Inf"
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return repr(v)
+
+
+def _escape(v):
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Series:
+    """One label combination. Each writing thread owns one cell (a list) in self.cells."""
+    __slots__ = ("labels", "cells", "_tls", "size")
+
+    def __init__(self, labels, size):
+        self.labels = labels
+        self.size = size
+        self.cells = []
+        self._tls = threading.local()
+
+    def cell(self):
+        try:
+            return self._tls.c
+        except AttributeError:
+            c = self._tls.c = [0.0] * self.size
+            self.cells.append(c)   # list.append is atomic; scrapes copy the list first
+            return c
+
+    def inc(self, n=1):
+        self.cell()[0] += n
+
+    def sum(self):
+        out = [0.0] * self.size
+        for c in list(self.cells):
+            for i, v in enumerate(c):
+                out[i] += v
+        return out
+
+
+class _Metric:
+    kind = "untyped"
+    size = 1
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+        self._default = None if self.labelnames else self._new(())
+
+    def _new(self, values):
+        s = self._series[values] = _Series(tuple(str(v) for v in values), self.size)
+        return s
+
+    def labels(self, *values):
+        """
+        Series for these label values (positional, in labelnames order). Pass values
+        consistently (e.g. always str): the raw tuple is the lookup key.
+        """
+        s = self._series.get(values)
+        if s is None:
+            with self._lock:
+                s = self._series.get(values) or self._new(values)
+        return s
+
+    def _label_str(self, labels, extra=""):
+        parts = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, labels)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for s in list(self._series.values()):
+            lines.append(f"{self.name}{self._label_str(s.labels)} {_fmt(s.sum()[0])}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, n=1):
+        """Unlabelled counter; labelled ones use labels(...).inc()."""
+        self._default.cell()[0] += n
+
+
+class Gauge(_Metric):
+    """Last value set (any thread), or fn() evaluated at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=(), fn=None):
+        super().__init__(name, help_text, labelnames)
+        self.fn = fn
+        self._values = {}
+
+    def set(self, value, *labels):
+        self._values[labels] = value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        if self.fn is not None:
+            try:
+                value = self.fn()
+            except Exception:
+                return lines
+            items = value.items() if isinstance(value, dict) else [((), value)]
+        else:
+            items = list(self._values.items())
+        for labels, v in items:
+            labels = labels if isinstance(labels, tuple) else (labels,)
+            lines.append(f"{self.name}{self._label_str(labels)} {_fmt(float(v))}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.bounds = tuple(sorted(float(b) for b in buckets))
+        self.size = len(self.bounds) + 3   # per-bucket counts, +Inf, sum, count
+        super().__init__(name, help_text, labelnames)
+
+    def observe(self, value, series=None):
+        c = (series or self._default).cell()
+        c[bisect.bisect_left(self.bounds, value)] += 1
+        c[-2] += value
+        c[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for s in list(self._series.values()):
+            v = s.sum()
+            acc = 0.0
+            for i, b in enumerate(self.bounds + (float("inf"),)):
+                acc += v[i]
+                le = 'le="' + _fmt(b) + '"'
+                lines.append(f"{self.name}_bucket{self._label_str(s.labels, le)} {_fmt(acc)}")
+            lines.append(f"{self.name}_sum{self._label_str(s.labels)} {_fmt(v[-2])}")
+            lines.append(f"{self.name}_count{self._label_str(s.labels)} {_fmt(v[-1])}")
+        return lines
+
+
+class Registry:
+    def __init__(self, prefix="amu_"):
+        self.prefix = prefix
+        self.metrics = []
+
+    def _add(self, m):
+        self.metrics.append(m)
+        return m
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._add(Counter(self.prefix + name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=(), fn=None):
+        return self._add(Gauge(self.prefix + name, help_text, labelnames, fn))
+
+    def counter_fn(self, name, help_text, fn, labelnames=()):
+        """Counter read from an existing total at scrape time (e.g. driver stats)."""
+        g = Gauge(self.prefix + name, help_text, labelnames, fn)
+        g.kind = "counter"
+        return self._add(g)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(self.prefix + name, help_text, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for m in self.metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, addr="127.0.0.1"):
+        """Serve /metrics on a daemon thread; returns the server (shutdown() to stop)."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((addr, int(port)), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics_http", daemon=True).start()
+        return server
+
+
+def timed(histogram, series=None):
+    """Context manager observing the elapsed seconds into a histogram."""
+    return _Timer(histogram, series)
+
+
+class _Timer:
+    __slots__ = ("h", "s", "t0")
+
+    def __init__(self, h, s):
+        self.h, self.s = h, s
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.h.observe(time.perf_counter() - self.t0, self.s)
+        return False
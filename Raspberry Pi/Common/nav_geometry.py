@@ -0,0 +1,202 @@
+# nav_geometry.py — Precomputed route geometry for waypoint navigation (Pico + Pi)
+# Author: Steven Westermire (Maddog / Gunny)
+#
+# RouteTable does the trigonometry once, at route load: a local East/North
+# (ENU) projection anchored at the first waypoint, and a per-leg table of start
+# point, unit direction, length, bearing and cumulative distance. Navigator then
+# turns each GPS fix into the SensorFrame nav block (bearing_to_wp,
+# heading_error, distance_m) plus cross-track error and arrival checks with a
+# handful of multiplies, one atan2 and one sqrt.
+#
+# Pure `math` so it runs under CircuitPython: copy it to the Pico next to
+# main.py. The NumPy helpers at the bottom are for batch route analysis on the
+# Pi and are skipped when NumPy is not installed.
+#
+# The projection is equirectangular about the route origin; for routes of a
+# few km the error is far below GPS noise. Working in that local metric frame
+# lets every per-fix distance, bearing and cross-track error be plain planar
+# geometry in metres, accurate at these short ranges, instead of spherical
+# formulas on degrees.
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EARTH_R_M = 6371008.8
+DEG = math.pi / 180.0
+ARRIVE_RADIUS_M = 2.0
+
+
+class RouteTable:
+    """
+    Immutable per-leg geometry for a list of [lat, lon] waypoints.
+    Leg i runs from waypoint i to waypoint i+1. Parallel lists (not objects)
+    keep the footprint small on the Pico.
+    """
+
+    def __init__(self, waypoints):
+        pts = [(float(p[0]), float(p[1])) for p in waypoints]
+        if not pts:
+            raise ValueError("route needs at least one waypoint")
+        self.lat0, self.lon0 = pts[0]
+        # Metres per degree at the route origin
+        self.ky = EARTH_R_M * DEG
+        self.kx = self.ky * math.cos(self.lat0 * DEG)
+
+        self.east = []
+        self.north = []
+        for lat, lon in pts:
+            e, n = self.to_enu(lat, lon)
+            self.east.append(e)
+            self.north.append(n)
+
+        self.ux, self.uy = [], []          # unit direction of each leg
+        self.length = []                   # metres
+        self.bearing = []                  # degrees true, 0 = north
+        self.cum = [0.0]                   # distance along route at each waypoint
+        for i in range(len(pts) - 1):
+            de = self.east[i + 1] - self.east[i]
+            dn = self.north[i + 1] - self.north[i]
+            ln = math.sqrt(de * de + dn * dn)
+            self.length.append(ln)
+            if ln > 0.0:
+                self.ux.append(de / ln)
+                self.uy.append(dn / ln)
+            else:
+                self.ux.append(0.0)
+                self.uy.append(0.0)
+            self.bearing.append((math.atan2(de, dn) / DEG) % 360.0)
+            self.cum.append(self.cum[-1] + ln)
+
+    @property
+    def legs(self):
+        return len(self.length)
+
+    @property
+    def total_m(self):
+        return self.cum[-1]
+
+    def to_enu(self, lat, lon):
+        """(lat, lon) degrees -> (east_m, north_m) relative to the route origin."""
+        return (lon - self.lon0) * self.kx, (lat - self.lat0) * self.ky
+
+    def to_latlon(self, east, north):
+        return self.lat0 + north / self.ky, self.lon0 + east / self.kx
+
+    def leg_metrics(self, i, e, n):
+        """
+        Position (e, n) relative to leg i.
+        Returns (along_m, xtrack_m, dist_to_end_m, bearing_to_end_deg);
+        xtrack is positive when the unit is right of the leg.
+        """
+        ex = e - self.east[i]
+        ny = n - self.north[i]
+        ux = self.ux[i]
+        uy = self.uy[i]
+        along = ex * ux + ny * uy
+        xtrack = ex * uy - ny * ux
+        de = self.east[i + 1] - e
+        dn = self.north[i + 1] - n
+        return along, xtrack, math.sqrt(de * de + dn * dn), (math.atan2(de, dn) / DEG) % 360.0
+
+
+def wrap_180(deg):
+    """Wrap an angle difference into [-180, 180)."""
+    return (deg + 180.0) % 360.0 - 180.0
+
+
+class Navigator:
+    """
+    Tracks progress along a RouteTable. update() takes a fix and heading and
+    returns the nav block; it advances to the next waypoint when the unit is
+    within arrive_radius_m of it or has crossed the perpendicular at its end.
+    """
+
+    def __init__(self, route, arrive_radius_m=ARRIVE_RADIUS_M, loop=False):
+        self.route = route if isinstance(route, RouteTable) else RouteTable(route)
+        self.arrive_radius_m = arrive_radius_m
+        self.loop = loop
+        self.leg = 0
+        self.done = self.route.legs == 0
+
+    @property
+    def wp_idx(self):
+        """Index of the waypoint currently being steered to."""
+        return self.leg + 1 if not self.done else self.route.legs
+
+    def reset(self, leg=0):
+        self.leg = leg
+        self.done = self.route.legs == 0
+
+    def update(self, lat, lon, heading):
+        r = self.route
+        e, n = r.to_enu(lat, lon)
+        arrived = False
+        while not self.done:
+            along, xtrack, dist, brg = r.leg_metrics(self.leg, e, n)
+            if dist > self.arrive_radius_m and along < r.length[self.leg]:
+                break
+            arrived = True
+            if self.leg + 1 < r.legs:
+                self.leg += 1
+            elif self.loop:
+                self.leg = 0
+            else:
+                self.done = True
+        if self.done:
+            last = r.legs
+            de = r.east[last] - e
+            dn = r.north[last] - n
+            dist = math.sqrt(de * de + dn * dn)
+            brg = (math.atan2(de, dn) / DEG) % 360.0
+            along = r.length[-1] if r.legs else 0.0
+            xtrack = 0.0
+        return {
+            "wp_idx": self.wp_idx,
+            "bearing_to_wp": round(brg, 1),
+            "heading_error": round(wrap_180(brg - heading), 1) if heading is not None else None,
+            "distance_m": round(dist, 1),
+            "xtrack_m": round(xtrack, 2),
+            "remaining_m": round(r.total_m - r.cum[self.leg] - along if not self.done else dist, 1),
+            "arrived": arrived,
+            "done": self.done,
+        }
+
+
+# ---------------- NumPy batch path (Pi only) ----------------
+def route_arrays(route):
+    """Leg table of a RouteTable as NumPy arrays: (start_en[L,2], unit[L,2], length[L], cum[L+1])."""
+    if np is None:
+        raise ImportError("numpy is required for batch route analysis")
+    start = np.column_stack((route.east[:-1], route.north[:-1]))
+    unit = np.column_stack((route.ux, route.uy))
+    return start, unit, np.asarray(route.length), np.asarray(route.cum)
+
+
+def track_against_route(route, lats, lons):
+    """
+    Vectorised analysis of many fixes (a recorded track) against a route.
+    For each fix, finds the nearest leg (clamped to the segment) and returns
+    (leg_idx[N], along_m[N], xtrack_m[N], route_pos_m[N]).
+    """
+    start, unit, length, cum = route_arrays(route)
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    p = np.column_stack(((lons - route.lon0) * route.kx, (lats - route.lat0) * route.ky))
+    rel = p[:, None, :] - start[None, :, :]                          # N x L x 2
+    along = np.einsum("nlk,lk->nl", rel, unit)
+    xtrack = rel[:, :, 0] * unit[None, :, 1] - rel[:, :, 1] * unit[None, :, 0]
+    clamped = np.clip(along, 0.0, length[None, :])
+    foot = start[None, :, :] + clamped[:, :, None] * unit[None, :, :]
+    d2 = ((p[:, None, :] - foot) ** 2).sum(axis=2)
+    leg = d2.argmin(axis=1)
+    rows = np.arange(len(p))
+    a = along[rows, leg]
+    return leg, a, xtrack[rows, leg], cum[leg] + np.clip(a, 0.0, length[leg])
+
+
+def route_summary(route):
+    """Per-leg table as plain rows for printing: (leg, bearing_deg, length_m, cum_m)."""
+    return [(i, route.bearing[i], route.length[i], route.cum[i + 1]) for i in range(route.legs)]
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: node_registry.py
+Description: BaseStation view of every AMU it has heard: LoRa address, link
+             quality, last position, battery and mission state. Updated from
+             REG / FS / MS / PR / waypoint reports; read by ASSIST dispatch
+             and the other fleet-level features.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import time
+
+
+class NodeRecord:
+    __slots__ = ("node_id", "address", "registered", "first_seen", "last_seen", "rssi", "snr",
+                 "lat", "lon", "yaw", "pos_t", "pos_src", "battery_v", "state", "state_t", "msgs")
+
+    def __init__(self, node_id, t):
+        self.node_id = node_id
+        self.address = None
+        self.registered = False
+        self.first_seen = t
+        self.last_seen = t
+        self.rssi = None
+        self.snr = None
+        self.lat = None
+        self.lon = None
+        self.yaw = None
+        self.pos_t = None
+        self.pos_src = None       # "FS" (live fix) or "WP" (last route point uploaded, until FS arrives)
+        self.battery_v = None
+        self.state = None
+        self.state_t = None
+        self.msgs = 0
+
+    def as_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+class NodeRegistry:
+    def __init__(self, stale_after_s=120.0):
+        self.stale_after_s = float(stale_after_s)
+        self.nodes = {}  # node_id (str) -> NodeRecord
+
+    def _rec(self, node_id, t):
+        node_id = str(node_id)
+        rec = self.nodes.get(node_id)
+        if rec is None:
+            rec = self.nodes[node_id] = NodeRecord(node_id, t)
+        return rec
+
+    def heard(self, node_id, address=None, rssi=None, snr=None, t=None):
+        """Any message from node_id (address is the LoRa source address it came from)."""
+        t = time.time() if t is None else t
+        rec = self._rec(node_id, t)
+        rec.last_seen = t
+        rec.msgs += 1
+        if address is not None:
+            rec.address = address
+        if rssi is not None:
+            rec.rssi = rssi
+            rec.snr = snr
+        return rec
+
+    def register(self, node_id, address=None, t=None):
+        rec = self.heard(node_id, address, t=t)
+        rec.registered = True
+        return rec
+
+    def set_position(self, node_id, lat, lon, yaw=None, t=None, src="FS"):
+        t = time.time() if t is None else t
+        rec = self._rec(node_id, t)
+        rec.lat, rec.lon, rec.pos_t, rec.pos_src = float(lat), float(lon), t, src
+        if yaw is not None:
+            rec.yaw = yaw
+        return rec
+
+    def set_state(self, node_id, state, t=None):
+        t = time.time() if t is None else t
+        rec = self._rec(node_id, t)
+        if rec.state != state:
+            rec.state = state
+            rec.state_t = t
+        return rec
+
+    def set_battery(self, node_id, volts, t=None):
+        rec = self._rec(node_id, time.time() if t is None else t)
+        rec.battery_v = float(volts)
+        return rec
+
+    def get(self, node_id):
+        return self.nodes.get(str(node_id))
+
+    def address_of(self, node_id):
+        rec = self.nodes.get(str(node_id))
+        return rec.address if rec else None
+
+    def is_stale(self, rec, now=None):
+        now = time.time() if now is None else now
+        return now - rec.last_seen > self.stale_after_s
+
+    def live(self, now=None):
+        """Records heard from within stale_after_s."""
+        now = time.time() if now is None else now
+        return [r for r in self.nodes.values() if now - r.last_seen <= self.stale_after_s]
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __iter__(self):
+        return iter(self.nodes.values())
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: path_planner.py
+Description: Grid planner for RETURN_HOME. Keep-out polygons are rasterized
+             onto a local occupancy grid (metres, centred on home, inflated by
+             the unit's clearance), and one Dijkstra pass from home produces a
+             distance field over every free cell. A path home from any position
+             is then a gradient descent on that field (no per-request search),
+             compressed to corner waypoints with line-of-sight smoothing.
+             The field is cached and rebuilt only when the map version changes
+             (a keep-out zone added, replaced or removed).
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import heapq
+import math
+import time
+
+EARTH_R_M = 6371008.8
+DEG = math.pi / 180.0
+SQRT2 = math.sqrt(2.0)
+INF = float("inf")
+
+# 8-connected moves: (dx, dy, cost in cells)
+_MOVES = ((1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+          (1, 1, SQRT2), (1, -1, SQRT2), (-1, 1, SQRT2), (-1, -1, SQRT2))
+
+
+class GridMap:
+    """
+    Occupancy grid of size (2*half_size_m / cell_m)^2 centred on home.
+    blocked is a flat bytearray indexed [y * nx + x]; version bumps on every change.
+    """
+
+    def __init__(self, home, half_size_m=300.0, cell_m=2.0, clearance_m=0.5):
+        self.home = (float(home[0]), float(home[1]))
+        self.cell_m = float(cell_m)
+        self.clearance_m = float(clearance_m)
+        self.ky = EARTH_R_M * DEG
+        self.kx = self.ky * math.cos(self.home[0] * DEG)
+        self.n = int(math.ceil(2.0 * half_size_m / self.cell_m))
+        self.nx = self.ny = self.n
+        self.half_m = self.n * self.cell_m / 2.0
+        self.keep_out = {}          # name -> [(x, y), ...] metres
+        self.blocked = bytearray(self.nx * self.ny)
+        self.version = 0
+
+    # ---------------- coordinates ----------------
+    def to_xy(self, lat, lon):
+        return (lon - self.home[1]) * self.kx, (lat - self.home[0]) * self.ky
+
+    def to_latlon(self, x, y):
+        return self.home[0] + y / self.ky, self.home[1] + x / self.kx
+
+    def cell_of(self, lat, lon):
+        """(cx, cy) for a position, or None when outside the grid."""
+        x, y = self.to_xy(lat, lon)
+        cx = int(math.floor((x + self.half_m) / self.cell_m))
+        cy = int(math.floor((y + self.half_m) / self.cell_m))
+        if 0 <= cx < self.nx and 0 <= cy < self.ny:
+            return cx, cy
+        return None
+
+    def cell_center(self, cx, cy):
+        return (cx + 0.5) * self.cell_m - self.half_m, (cy + 0.5) * self.cell_m - self.half_m
+
+    # ---------------- map edits ----------------
+    def add_keep_out(self, name, polygon):
+        """polygon: [[lat, lon], ...]; replaces an existing zone of the same name."""
+        pts = [self.to_xy(float(lat), float(lon)) for lat, lon in polygon]
+        if len(pts) < 3:
+            raise ValueError(f"keep-out {name} needs at least 3 vertices")
+        self.keep_out[name] = pts
+        self._rebuild()
+
+    def remove_keep_out(self, name):
+        if self.keep_out.pop(name, None) is not None:
+            self._rebuild()
+
+    def _rebuild(self):
+        self.blocked = bytearray(self.nx * self.ny)
+        for pts in self.keep_out.values():
+            self._fill_polygon(pts)
+        if self.clearance_m > 0:
+            self._inflate(int(math.ceil(self.clearance_m / self.cell_m)))
+        self.version += 1
+
+    def _fill_polygon(self, pts):
+        """Scanline fill: for each cell row centre, mark cells between edge crossings."""
+        ys = [p[1] for p in pts]
+        cm, h, nx = self.cell_m, self.half_m, self.nx
+        row0 = max(0, int((min(ys) + h) / cm))
+        row1 = min(self.ny - 1, int((max(ys) + h) / cm))
+        edges = list(zip(pts, pts[1:] + pts[:1]))
+        for cy in range(row0, row1 + 1):
+            yc = (cy + 0.5) * cm - h
+            xs = []
+            for (x0, y0), (x1, y1) in edges:
+                if (y0 > yc) != (y1 > yc):
+                    xs.append(x0 + (yc - y0) * (x1 - x0) / (y1 - y0))
+            xs.sort()
+            for a, b in zip(xs[0::2], xs[1::2]):
+                c0 = max(0, int(math.ceil((a + h) / cm - 0.5)))
+                c1 = min(nx - 1, int(math.floor((b + h) / cm - 0.5)))
+                base = cy * nx
+                for cx in range(c0, c1 + 1):
+                    self.blocked[base + cx] = 1
+
+    def _inflate(self, r):
+        """Grow blocked cells by r cells (square kernel) for unit clearance."""
+        nx, ny, src = self.nx, self.ny, self.blocked
+        out = bytearray(src)
+        for idx in range(nx * ny):
+            if src[idx]:
+                cx, cy = idx % nx, idx // nx
+                for y in range(max(0, cy - r), min(ny, cy + r + 1)):
+                    base = y * nx
+                    for x in range(max(0, cx - r), min(nx, cx + r + 1)):
+                        out[base + x] = 1
+        self.blocked = out
+
+    def is_blocked(self, cx, cy):
+        return bool(self.blocked[cy * self.nx + cx])
+
+
+class ReturnHomePlanner:
+    """Distance field from home over a GridMap, cached per map version."""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.dist = None            # flat list, metres to home (INF = unreachable/blocked)
+        self._field_version = None
+        self.builds = 0
+        self.build_s = 0.0
+
+    def distance_field(self):
+        g = self.grid
+        if self.dist is not None and self._field_version == g.version:
+            return self.dist
+        t0 = time.perf_counter()
+        nx, ny, blocked = g.nx, g.ny, g.blocked
+        dist = [INF] * (nx * ny)
+        home = g.cell_of(*g.home)
+        hx, hy = home
+        start = hy * nx + hx
+        dist[start] = 0.0
+        heap = [(0.0, start)]
+        pop, push = heapq.heappop, heapq.heappush
+        while heap:
+            d, idx = pop(heap)
+            if d > dist[idx]:
+                continue
+            cx, cy = idx % nx, idx // nx
+            for dx, dy, w in _MOVES:
+                x, y = cx + dx, cy + dy
+                if x < 0 or y < 0 or x >= nx or y >= ny:
+                    continue
+                j = y * nx + x
+                if blocked[j]:
+                    continue
+                # No corner cutting past a blocked cell
+                if dx and dy and (blocked[cy * nx + x] or blocked[y * nx + cx]):
+                    continue
+                nd = d + w
+                if nd < dist[j]:
+                    dist[j] = nd
+                    push(heap, (nd, j))
+        cm = g.cell_m
+        self.dist = [d * cm for d in dist]
+        self._field_version = g.version
+        self.builds += 1
+        self.build_s = time.perf_counter() - t0
+        return self.dist
+
+    def distance_home_m(self, lat, lon):
+        """Path length home (metres) from a position; INF if unreachable or off-grid."""
+        c = self.grid.cell_of(lat, lon)
+        if c is None:
+            return INF
+        return self.distance_field()[c[1] * self.grid.nx + c[0]]
+
+    def path_cells(self, lat, lon):
+        """Gradient descent on the distance field: list of (cx, cy) from start to home, or None."""
+        g = self.grid
+        dist = self.distance_field()
+        c = g.cell_of(lat, lon)
+        if c is None or dist[c[1] * g.nx + c[0]] == INF:
+            return None
+        nx, ny, blocked = g.nx, g.ny, g.blocked
+        cx, cy = c
+        cells = [c]
+        d = dist[cy * nx + cx]
+        while d > 0.0:
+            best, bx, by = d, cx, cy
+            for dx, dy, _ in _MOVES:
+                x, y = cx + dx, cy + dy
+                if 0 <= x < nx and 0 <= y < ny:
+                    if dx and dy and (blocked[cy * nx + x] or blocked[y * nx + cx]):
+                        continue
+                    dj = dist[y * nx + x]
+                    if dj < best:
+                        best, bx, by = dj, x, y
+            if (bx, by) == (cx, cy):
+                return None  # cannot happen on a Dijkstra field; guard against loops
+            cx, cy, d = bx, by, best
+            cells.append((cx, cy))
+        return cells
+
+    def _line_free(self, a, b):
+        """
+        Bresenham walk between cells a and b over free cells only. A diagonal step
+        must not cut a blocked corner (same rule as the distance field), so the
+        smoothed path never squeezes between two blocked cells that touch diagonally.
+        """
+        g = self.grid
+        nx, blocked = g.nx, g.blocked
+        x0, y0 = a
+        x1, y1 = b
+        dx, dy = abs(x1 - x0), -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        while True:
+            if blocked[y0 * nx + x0]:
+                return False
+            if x0 == x1 and y0 == y1:
+                return True
+            e2 = 2 * err
+            x, y = x0, y0
+            if e2 >= dy:
+                err += dy
+                x += sx
+            if e2 <= dx:
+                err += dx
+                y += sy
+            if x != x0 and y != y0 and (blocked[y0 * nx + x] or blocked[y * nx + x0]):
+                return False
+            x0, y0 = x, y
+
+    def path_home(self, lat, lon, smooth=True):
+        """
+        RETURN_HOME waypoints [[lat, lon], ...] from a position (home included,
+        start excluded), or None when the position is off-grid, blocked or cut off.
+        """
+        cells = self.path_cells(lat, lon)
+        if cells is None:
+            return None
+        if smooth:
+            # Greedy line-of-sight: jump to the farthest visible cell on the descent path
+            keep = [cells[0]]
+            i = 0
+            while i < len(cells) - 1:
+                j = len(cells) - 1
+                while j > i + 1 and not self._line_free(cells[i], cells[j]):
+                    j -= 1
+                keep.append(cells[j])
+                i = j
+        else:
+            # Corners only: drop cells where the step direction does not change
+            keep = [cells[0]]
+            for k in range(1, len(cells) - 1):
+                d0 = (cells[k][0] - cells[k - 1][0], cells[k][1] - cells[k - 1][1])
+                d1 = (cells[k + 1][0] - cells[k][0], cells[k + 1][1] - cells[k][1])
+                if d0 != d1:
+                    keep.append(cells[k])
+            if len(cells) > 1:
+                keep.append(cells[-1])
+        g = self.grid
+        out = []
+        for cx, cy in keep[1:]:
+            lat_c, lon_c = g.to_latlon(*g.cell_center(cx, cy))
+            out.append([round(lat_c, 6), round(lon_c, 6)])
+        if out:
+            out[-1] = [g.home[0], g.home[1]]
+        return out
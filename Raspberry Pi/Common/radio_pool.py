@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: radio_pool.py
+Description: Multi-radio front end for the BaseStation. Each LoRa module runs
+             in its own worker process, which owns the serial port, the AT
+             setup, the RYLR998 driver and the channel-local state: airtime
+             meter, duty-cycle budget and ACK scheduler. The BaseStation
+             process aggregates. Workers forward every +RCV line, and
+             RadioPool merges them into one line queue for the existing
+             listen loop. It also remembers which radio each LoRa address was
+             last heard on, and routes ACKs and downlink sends back out that
+             radio. RadioPool has the RYLR998 calls the base uses (lines,
+             send, depth, timeouts...), so receive, registry and logging code
+             is shared with the single-radio setup.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import itertools
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+
+from ack_scheduler import AckScheduler, ChannelEstimator
+from airtime_meter import AirtimeMeter
+from at_command import ATEngine, ATError, format_setup
+from lora_airtime import RFParams, time_on_air
+from rylr998 import PRIO_ACK, PRIO_NORMAL, RYLR998, LineQueue, TxFuture
+from serial_capture import maybe_tap
+
+# Per-radio keys; anything not given in a Radios entry comes from the top-level config
+RADIO_KEYS = ("Serial_Port", "Baud_Rate", "Timeout", "NetworkID", "Band", "Base_Address", "Radio_Setup",
+              "AT_Timeout", "LoRa_Parameter", "Ack_Scheduling", "Ack_Max_Hold_S", "Ack_Guard_S",
+              "Duty_Cycle_Pct", "Airtime_Window_S", "Serial_Capture", "Log_Directory")
+
+STATS_S = 1.0   # worker -> aggregator stats period
+POLL_S = 0.1    # worker wakes at least this often (held ACKs, stats, port health)
+
+
+def _yes(v):
+    return bool(v) if isinstance(v, bool) else str(v).strip().upper() == "Y"
+
+
+def radio_specs(radios, cfg):
+    """One dict per Radios entry: its own keys over the top-level ones, plus a Name."""
+    specs = []
+    for i, r in enumerate(radios or []):
+        spec = {k: cfg.get(k) for k in RADIO_KEYS}
+        spec.update(r or {})
+        spec["Name"] = str(spec.get("Name") or f"radio{i + 1}")
+        specs.append(spec)
+    names = [s["Name"] for s in specs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Radios: duplicate Name in {names}")
+    return specs
+
+
+def open_serial(spec):
+    import serial   # only the worker needs pyserial
+    return serial.Serial(spec["Serial_Port"], int(spec["Baud_Rate"]), timeout=float(spec["Timeout"]))
+
+
+# ---------------- worker process ----------------
+def radio_worker(index, spec, events, commands, opener=None):
+    """
+    Body of one radio's process. events: tuples to the aggregator ("up", "rx",
+    "done", "stats", "down"); commands: ("send", tx_id, dest, payload, priority),
+    ("ack", tx_id, dest, payload, node_id) or ("stop",).
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # Ctrl+C is for the aggregator; it stops us
+    name = spec["Name"]
+    tag = f"[Radio {name}]"
+    try:
+        port = opener(spec) if opener else open_serial(spec)
+        port = maybe_tap(port, _yes(spec["Serial_Capture"]), spec["Log_Directory"], f"base_{name}")
+        info = f"{spec['Serial_Port']}"
+        if _yes(spec["Radio_Setup"]):
+            engine = ATEngine(port, timeout=float(spec["AT_Timeout"]),
+                              on_unsolicited=lambda line: print(f"{tag} RX during setup ignored: {line}"))
+            changed, errors, elapsed = engine.configure([
+                ("ADDRESS", int(spec["Base_Address"])),
+                ("NETWORKID", int(spec["NetworkID"])),
+                ("BAND", int(spec["Band"])),
+            ])
+            for e in errors:
+                print(f"{tag} Radio setup error: {e}")
+            info += (f", ADDRESS={spec['Base_Address']}, NETWORKID={spec['NetworkID']}, BAND={spec['Band']} "
+                     f"({format_setup(changed, errors, elapsed)})")
+    except Exception as e:
+        events.put(("down", index, type(e).__name__, f"{e}"))
+        events.put(("exit", index))
+        return
+
+    rf = RFParams.from_parameter(spec["LoRa_Parameter"])
+    meter = AirtimeMeter(rf, float(spec["Airtime_Window_S"]), duty_cycle=float(spec["Duty_Cycle_Pct"]) / 100.0)
+    acks = AckScheduler(ChannelEstimator(rf, guard_s=float(spec["Ack_Guard_S"])),
+                        float(spec["Ack_Max_Hold_S"])) if _yes(spec["Ack_Scheduling"]) else None
+    lock = threading.Lock()
+    ack_ids = {}    # ack payload -> tx_id while it waits in the scheduler
+    radio = RYLR998(port, name=f"Radio {name}", rf=rf, meter=meter)
+
+    def on_rcv(line):
+        now = time.monotonic()
+        events.put(("rx", index, line, now))
+        if acks:
+            try:
+                src, length, rest = line[5:].split(",", 2)
+                data = rest.rsplit(",", 2)[0]
+                with lock:
+                    acks.est.observe_rx(src, data.split(":", 1)[0], now, int(length))
+            except ValueError:
+                pass
+
+    def transmit(tx_id, dest, payload, priority):
+        fut = radio.send(dest, payload, priority)
+        fut.add_done_callback(lambda f: events.put(
+            ("done", index, tx_id, None if f.error is None else f"{f.error}", f.t_sent, f.t_done)))
+
+    def release(now):
+        with lock:
+            due = acks.due(now) if acks else []
+        for dest, msg in due:
+            transmit(ack_ids.pop(msg, None), dest, msg, PRIO_ACK)
+
+    radio.subscribe(on_rcv)
+    radio.start()
+    events.put(("up", index, info))
+    next_stats = 0.0
+    down = False
+    while True:
+        wait = POLL_S
+        if acks and acks.pending:
+            with lock:
+                wait = max(0.002, min(wait, acks.next_due(time.monotonic()) - time.monotonic()))
+        try:
+            cmd = commands.get(timeout=wait)
+        except queue.Empty:
+            cmd = None
+        now = time.monotonic()
+        if cmd is not None:
+            if cmd[0] == "stop":
+                break
+            if cmd[0] == "ack" and acks:
+                _, tx_id, dest, payload, node_id = cmd
+                with lock:
+                    acks.enqueue(dest, payload, node_id, now)
+                    waiting = {e[1] for e in acks.pending}
+                # ACKs coalesced away (duplicate, or replaced by a newer waypoint ACK) are done
+                old = ack_ids.get(payload)
+                ack_ids[payload] = tx_id
+                if old is not None:
+                    events.put(("done", index, old, None, now, now))
+                for p in [p for p in ack_ids if p not in waiting]:
+                    events.put(("done", index, ack_ids.pop(p), None, now, now))
+            else:
+                transmit(cmd[1], cmd[2], cmd[3], cmd[4] if cmd[0] == "send" else PRIO_ACK)
+        release(now)
+        if now >= next_stats:
+            next_stats = now + STATS_S
+            events.put(("stats", index, _stats(radio, meter, acks, now)))
+        if not down and not radio.alive:
+            down = True
+            err = radio.reader_error
+            events.put(("down", index, type(err).__name__ if err else "EOFError", f"{err}"))
+
+    with lock:
+        rest = acks.flush(time.monotonic()) if acks else []
+    for dest, msg in rest:
+        transmit(ack_ids.pop(msg, None), dest, msg, PRIO_ACK)
+    radio.stop()
+    events.put(("stats", index, _stats(radio, meter, acks, time.monotonic())))
+    try:
+        port.close()
+    except Exception:
+        pass
+    events.put(("exit", index))
+
+
+def _stats(radio, meter, acks, now):
+    s = {"depth": radio.depth(), "sent": radio.sent, "errors": radio.errors, "timeouts": radio.timeouts,
+         "deferred": radio.deferred, "utilization": meter.utilization(now)["channel"],
+         "duty": meter.duty(now), "airtime": meter.format_report(now)}
+    if acks:
+        s["acks"] = acks.stats(now)
+    return s
+
+
+# ---------------- aggregator ----------------
+class _MergedLines(LineQueue):
+    """
+    +RCV lines from every radio, in arrival order. The route is updated as the
+    listen loop takes each line, so the ACK for a frame goes out the radio that
+    heard it even when the unit has since been heard on another one.
+    """
+
+    def __init__(self, pool):
+        super().__init__(pool)
+        self.pool = pool
+
+    def get(self, timeout=None):
+        try:
+            item = self.q.get(timeout=timeout)
+        except queue.Empty:
+            return ""
+        if item is None:
+            self.q.put(None)
+            raise self.pool.reader_error or EOFError("radio pool stopped")
+        line, i, src = item
+        if src is not None:
+            self.pool._heard(src, i)
+        return line
+
+
+class RadioPool:
+    """
+    Worker per spec (see radio_specs). The listen loop reads pool.lines(); sends
+    go out the radio their address was last heard on (the first radio for an
+    address never heard). on_route(address, old_name, new_name) is called when
+    a unit moves to another radio; on_done(fut) for every completed send.
+    """
+
+    def __init__(self, specs, opener=None, on_done=None, on_route=None, meter=None, name="BaseStation"):
+        self.specs = list(specs)
+        self.names = [s["Name"] for s in self.specs]
+        self.rf = [RFParams.from_parameter(s["LoRa_Parameter"]) for s in self.specs]
+        self.opener = opener
+        self.on_done = on_done
+        self.on_route = on_route
+        self.meter = meter            # fleet-wide AirtimeMeter in the aggregator (optional)
+        self.name = name
+        self.ctx = multiprocessing.get_context("fork")
+        self.events = self.ctx.Queue()
+        self.commands = [self.ctx.Queue() for _ in self.specs]
+        self.procs = []
+        self.route = {}               # LoRa address -> radio index last heard on
+        self.up = [False] * len(self.specs)
+        self.down = [False] * len(self.specs)
+        self.stats = [{} for _ in self.specs]
+        self.rx_frames = [0] * len(self.specs)
+        self.handovers = 0
+        self.reader_error = None
+        self._lq = _MergedLines(self)
+        self._futs = {}               # tx_id -> (radio index, TxFuture)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # ---------------- lifecycle ----------------
+    def start(self):
+        """Fork the workers. Call before starting other threads (metrics, dashboard)."""
+        for i, spec in enumerate(self.specs):
+            p = self.ctx.Process(target=radio_worker, args=(i, spec, self.events, self.commands[i], self.opener),
+                                 name=f"radio_{spec['Name']}", daemon=True)
+            p.start()
+            self.procs.append(p)
+        self._thread = threading.Thread(target=self._event_loop, name=f"{self.name}_pool", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=3.0):
+        """Workers release held ACKs, drain their TX queues and close their ports."""
+        for q in self.commands:
+            q.put(("stop",))
+        for p in self.procs:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        if self._thread:
+            self._thread.join(1.0)
+        with self._lock:
+            left, self._futs = list(self._futs.values()), {}
+        for _, fut in left:
+            self._complete(fut, "radio pool stopped")
+
+    @property
+    def alive(self):
+        return not all(self.down)
+
+    def lines(self, prefix="+RCV="):
+        """The merged +RCV stream (one consumer: the listen loop)."""
+        return self._lq
+
+    # ---------------- TX ----------------
+    def radio_for(self, dest):
+        try:
+            return self.route.get(int(dest), 0)
+        except (TypeError, ValueError):
+            return 0
+
+    def _queue(self, kind, dest, payload, extra, priority):
+        i = self.radio_for(dest)
+        airtime = time_on_air(len(payload.encode("utf-8")), self.rf[i])
+        fut = TxFuture(f"AT+SEND={dest},{len(payload)},{payload}", priority, 0.0, dest, payload, airtime)
+        if self.down[i] and not self.procs[i].is_alive():
+            self._complete(fut, f"radio {self.names[i]} is down")
+            return fut
+        tx_id = next(self._ids)
+        with self._lock:
+            self._futs[tx_id] = (i, fut)
+        self.commands[i].put((kind, tx_id, dest, payload, extra))
+        return fut
+
+    def send(self, dest, payload, priority=PRIO_NORMAL):
+        """AT+SEND through the radio dest was last heard on; returns a TxFuture."""
+        return self._queue("send", dest, payload, priority, priority)
+
+    def send_ack(self, dest, payload, node_id):
+        """ACK through that radio's own ACK scheduler (or straight out if it has none)."""
+        return self._queue("ack", dest, payload, node_id, PRIO_ACK)
+
+    def depth(self):
+        """Sends handed to the workers and not completed yet."""
+        return len(self._futs)
+
+    @property
+    def timeouts(self):
+        return sum(s.get("timeouts", 0) for s in self.stats)
+
+    @property
+    def deferred(self):
+        return sum(s.get("deferred", 0) for s in self.stats)
+
+    def _complete(self, fut, error=None):
+        fut.error = ATError(fut.cmd, detail=error) if error else None
+        fut.reply = None if error else "+OK"
+        fut.t_done = time.monotonic()
+        fut._event.set()
+        for fn in fut._callbacks + ([self.on_done] if self.on_done else []):
+            try:
+                fn(fut)
+            except Exception as e:
+                print(f"[{self.name}] TX callback error: {e}")
+
+    # ---------------- events from the workers ----------------
+    def _event_loop(self):
+        exited = 0
+        while exited < len(self.procs):
+            try:
+                ev = self.events.get(timeout=1.0)
+            except queue.Empty:
+                if not any(p.is_alive() for p in self.procs):
+                    break
+                continue
+            kind, i = ev[0], ev[1]
+            if kind == "rx":
+                line = ev[2]
+                try:
+                    src = int(line[5:line.index(",")])
+                except ValueError:
+                    src = None
+                if self.meter is not None and src is not None:
+                    try:
+                        length, rest = line[5:].split(",", 2)[1:]
+                        self.meter.record_rx(ev[3], src, int(length), rest.rsplit(",", 2)[0])
+                    except ValueError:
+                        pass
+                self.rx_frames[i] += 1
+                self._lq.q.put((line, i, src))
+            elif kind == "done":
+                _, _, tx_id, error, t_sent, t_done = ev
+                with self._lock:
+                    entry = self._futs.pop(tx_id, None)
+                if entry is None:
+                    continue
+                fut = entry[1]
+                fut.t_sent = t_sent
+                if self.meter is not None and error is None:
+                    self.meter.record_tx(t_sent or time.monotonic(), fut.dest, fut.payload)
+                self._complete(fut, error)
+            elif kind == "stats":
+                self.stats[i] = ev[2]
+            elif kind == "up":
+                self.up[i] = True
+                print(f"[{self.name}] Radio {self.names[i]} up: {ev[2]}")
+            elif kind == "down":
+                self.down[i] = True
+                print(f"[{self.name}] Radio {self.names[i]} down: {ev[2]} {ev[3]}".rstrip())
+                self._fail(i, f"radio {self.names[i]} is down")
+                if all(self.down):
+                    # Same contract as a single driver: the listen loop gets the reader's exception
+                    self.reader_error = KeyboardInterrupt() if ev[2] == "KeyboardInterrupt" \
+                        else EOFError(f"all radios down ({ev[3]})")
+                    self._lq.q.put(None)
+            elif kind == "exit":
+                exited += 1
+
+    def _heard(self, src, i):
+        old = self.route.get(src)
+        self.route[src] = i
+        if old is not None and old != i:
+            self.handovers += 1
+            if self.on_route:
+                self.on_route(src, self.names[old], self.names[i])
+
+    def _fail(self, i, why):
+        """Sends still waiting on radio i when its port failed (its writer keeps draining the rest)."""
+        if self.procs[i].is_alive():
+            return
+        with self._lock:
+            mine = [k for k, (r, _) in self._futs.items() if r == i]
+            futs = [self._futs.pop(k)[1] for k in mine]
+        for fut in futs:
+            self._complete(fut, why)
+
+    def format_report(self):
+        """One line per radio for the periodic stats print."""
+        out = []
+        for i, name in enumerate(self.names):
+            s = self.stats[i]
+            state = "down" if self.down[i] else ("up" if self.up[i] else "starting")
+            line = f"{name} ({state}): rx={self.rx_frames[i]} tx={s.get('sent', 0)} err={s.get('errors', 0)}"
+            if "airtime" in s:
+                line += f", {s['airtime']}"
+            if "acks" in s:
+                a = s["acks"]
+                line += f", ACKs released={a['released']} coalesced={a['coalesced']} forced={a['forced']}"
+            out.append(line)
+        return out
@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: radio_sim.py
+Description: Software stand-ins for the RYLR998 LoRa module's serial interface,
+             used by the benchmarks and bench tools. LoopbackRadio replays
+             scripted module output (+RCV lines) and records what the program
+             writes (AT+SEND commands) without any timing model. SimModule
+             adds the module's AT command replies for radio bring-up runs.
+             ChannelSim is a discrete-event model of a shared half-duplex
+             channel (collisions, base deaf while transmitting) for comparing
+             ACK strategies against fleet size. FleetSim runs virtual AMUs that
+             speak the real tokens (REG, waypoints, FS, PR, MS) against a
+             virtual base built from the BaseStation Receive stage, node
+             registry and ACK rules, for capacity curves (../Tools/fleet_load.py).
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+
+
+def rcv_line(src: int, data: str, rssi: int = -40, snr: int = 11) -> bytes:
+    """Format module output for a received packet: +RCV=<src>,<len>,<data>,<RSSI>,<SNR>."""
+    return f"+RCV={src},{len(data)},{data},{rssi},{snr}\r\n".encode("utf-8")
+
+
+class LoopbackRadio:
+    """
+    Serial-like port backed by a queue of lines.
+    When the queue runs dry, readline() returns b"" (a serial timeout) or, with
+    stop_when_empty=True, raises KeyboardInterrupt so a program's listen loop
+    exits through its normal Ctrl-C path.
+    """
+
+    def __init__(self, lines=(), stop_when_empty=False):
+        self._rx = deque(lines)
+        self.stop_when_empty = stop_when_empty
+        self.written = []
+        self.is_open = True
+        self.port = "loopback"
+
+    def feed(self, line: bytes):
+        self._rx.append(line)
+
+    @property
+    def in_waiting(self):
+        return len(self._rx[0]) if self._rx else 0
+
+    def readline(self):
+        if self._rx:
+            return self._rx.popleft()
+        if self.stop_when_empty:
+            raise KeyboardInterrupt
+        return b""
+
+    def read(self, n=1):
+        return self.readline()
+
+    def write(self, data):
+        self.written.append(data)
+        return len(data)
+
+    def reset_input_buffer(self):
+        self._rx.clear()
+
+    def close(self):
+        self.is_open = False
+
+
+class SimModule(LoopbackRadio):
+    """
+    LoopbackRadio that answers AT commands the way the RYLR998 does:
+    AT+<NAME>=<v> -> +OK (counted as a flash write), AT+<NAME>? -> +<NAME>=<v>,
+    AT+SEND=... -> +OK, unknown names -> +ERR=4. reply_delay_s models the
+    module's turnaround on a real UART. Like a serial port, readline() blocks up
+    to timeout for a line, so a driver's reader thread wakes on each reply.
+    """
+
+    SETTINGS = ("ADDRESS", "NETWORKID", "BAND", "PARAMETER", "CPIN", "CRFOP", "MODE", "IPR")
+
+    def __init__(self, lines=(), stop_when_empty=False, settings=None, reply_delay_s=0.0):
+        super().__init__(lines, stop_when_empty)
+        self.settings = {"ADDRESS": "0", "NETWORKID": "18", "BAND": "915000000", "PARAMETER": "9,7,1,12",
+                         "CRFOP": "22", "MODE": "0", "IPR": "115200"}
+        self.settings.update({k: str(v) for k, v in (settings or {}).items()})
+        self.reply_delay_s = reply_delay_s
+        self.flash_writes = 0
+        self.timeout = 1
+        self._cv = threading.Condition()
+
+    def feed(self, line: bytes):
+        with self._cv:
+            self._rx.append(line)
+            self._cv.notify()
+
+    def readline(self):
+        with self._cv:
+            if not self._rx and not self.stop_when_empty and self.timeout:
+                self._cv.wait_for(lambda: self._rx, self.timeout)
+            return super().readline()
+
+    def _reply(self, line):
+        if self.reply_delay_s:
+            time.sleep(self.reply_delay_s)
+        with self._cv:
+            self._rx.appendleft(f"{line}\r\n".encode("utf-8"))
+            self._cv.notify()
+
+    def write(self, data):
+        super().write(data)
+        cmd = data.decode("utf-8", errors="ignore").strip()
+        if cmd == "AT":
+            self._reply("+OK")
+        elif cmd.startswith("AT+SEND="):
+            self._reply("+OK")
+        elif cmd.startswith("AT+") and cmd.endswith("?"):
+            name = cmd[3:-1]
+            self._reply(f"+{name}={self.settings[name]}" if name in self.settings else "+ERR=4")
+        elif cmd.startswith("AT+") and "=" in cmd:
+            name, value = cmd[3:].split("=", 1)
+            if name in self.SETTINGS:
+                self.settings[name] = value
+                self.flash_writes += 1
+                self._reply("+OK")
+            else:
+                self._reply("+ERR=4")
+        elif cmd:
+            self._reply("+ERR=2")
+        return len(data)
+
+
+class ChannelSim:
+    """
+    Discrete-event model of one LoRa channel: n_nodes units and a half-duplex
+    base. Each unit sends periodic FS telemetry (not ACKed) and a stream of
+    waypoint frames, each waiting for its ACK (randomized retry backoff as in
+    BotCarNode, next waypoint wp_gap_s after the ACK). A frame is lost at the
+    base if another unit's frame overlaps it (collision) or the base is
+    transmitting during any part of it (deaf). ACKs go out straight after the +RCV, or
+    through scheduler (an ack_scheduler.AckScheduler) when one is given.
+    """
+
+    def __init__(self, n_nodes, rf=None, scheduler=None, fs_period_s=10.0, fs_len=40, wp_len=28,
+                 wp_gap_s=5.0, ack_timeout_s=2.0, retry_min_s=3.0, retry_max_s=5.0, turnaround_s=0.02, jitter_s=0.01, seed=1):
+        from lora_airtime import RFParams, time_on_air
+        self.toa = lambda n: time_on_air(n, self.rf)
+        self.rf = rf or RFParams()
+        self.n = n_nodes
+        self.scheduler = scheduler
+        self.fs_period_s = fs_period_s
+        self.fs_len = fs_len
+        self.wp_len = wp_len
+        self.wp_gap_s = wp_gap_s
+        self.ack_timeout_s = ack_timeout_s
+        self.retry_min_s = retry_min_s
+        self.retry_max_s = retry_max_s
+        self.turnaround_s = turnaround_s
+        self.jitter_s = jitter_s
+        self.rng = random.Random(seed)
+
+    def run(self, duration_s=600.0):
+        rng = self.rng
+        events = []            # (t, seq, kind, payload)
+        seq = itertools.count()
+        txs = []               # every transmission: [start, end, sender]  (sender -1 = base)
+        stats = {"sent": 0, "received": 0, "lost_collision": 0, "lost_deaf": 0,
+                 "acks_sent": 0, "acks_lost": 0, "wp_acked": 0, "retries": 0}
+        base_busy = [0.0]
+        waiting = {}           # node -> waypoint index awaiting ACK
+        wp_idx = [0] * self.n
+        ack_lat = []
+
+        def push(t, kind, data):
+            heapq.heappush(events, (t, next(seq), kind, data))
+
+        def overlaps(a, b, who):
+            for s, e, w in txs:
+                if e > a and s < b and w in who:
+                    return True
+            return False
+
+        def base_send(t, node, msg):
+            start = max(t + self.turnaround_s, base_busy[0])
+            end = start + self.toa(len(msg))
+            base_busy[0] = end
+            txs.append((start, end, -1))
+            stats["acks_sent"] += 1
+            push(end, "ack_end", (start, end, node, msg))
+
+        for node in range(self.n):
+            push(rng.uniform(0, self.fs_period_s), "fs", node)
+            push(rng.uniform(0, self.wp_gap_s), "wp", node)
+        # units start in random phase, each with its own clock drift
+        drift = [self.fs_period_s * (1 + rng.uniform(-0.002, 0.002)) for _ in range(self.n)]
+
+        while events:
+            t, _, kind, data = heapq.heappop(events)
+            if t > duration_s:
+                break
+            if kind in ("fs", "wp"):
+                node = data
+                if kind == "wp":
+                    if node in waiting:   # stale event: still waiting for an ACK
+                        continue
+                    waiting[node] = wp_idx[node]
+                    push(t + self.ack_timeout_s, "timeout", (node, wp_idx[node]))
+                length = self.fs_len if kind == "fs" else self.wp_len
+                end = t + self.toa(length)
+                txs.append((t, end, node))
+                stats["sent"] += 1
+                push(end, "rx_end", (t, end, node, kind, length))
+                if kind == "fs":
+                    push(t + drift[node] + rng.gauss(0, self.jitter_s), "fs", node)
+            elif kind == "rx_end":
+                start, end, node, fkind, length = data
+                others = set(range(self.n)) - {node}
+                if overlaps(start, end, others):
+                    stats["lost_collision"] += 1
+                    continue
+                if overlaps(start, end, {-1}):
+                    stats["lost_deaf"] += 1
+                    continue
+                stats["received"] += 1
+                if self.scheduler:
+                    self.scheduler.est.observe_rx(node, fkind, end, length)
+                if fkind == "wp":
+                    msg = f"ACK:{node}:{wp_idx[node]}"
+                    if self.scheduler:
+                        self.scheduler.enqueue(node, msg, node, end)
+                        push(end, "poll", None)
+                    else:
+                        base_send(end, node, msg)
+            elif kind == "poll":
+                for dest, msg in self.scheduler.due(t):
+                    base_send(t, dest, msg)
+                nxt = self.scheduler.next_due(t)
+                if nxt != float("inf"):
+                    push(max(nxt, t + 1e-4), "poll", None)
+            elif kind == "ack_end":
+                start, end, node, msg = data
+                if overlaps(start, end, set(range(self.n))):
+                    stats["acks_lost"] += 1
+                    continue
+                idx = int(msg.rsplit(":", 1)[1])
+                if waiting.get(node) == idx:
+                    del waiting[node]
+                    stats["wp_acked"] += 1
+                    wp_idx[node] += 1
+                    push(end + self.wp_gap_s, "wp", node)
+            elif kind == "timeout":
+                node, idx = data
+                if waiting.get(node) == idx:
+                    del waiting[node]
+                    stats["retries"] += 1
+                    push(t + rng.uniform(self.retry_min_s, self.retry_max_s), "wp", node)
+            # keep the overlap scan short
+            if len(txs) > 4 * self.n + 16:
+                cut = t - 10.0
+                txs[:] = [x for x in txs if x[1] > cut]
+        stats["loss"] = 1.0 - stats["received"] / stats["sent"] if stats["sent"] else 0.0
+        stats["deaf_loss"] = stats["lost_deaf"] / stats["sent"] if stats["sent"] else 0.0
+        return stats
+
+
+class FleetSim:
+    """
+    n_nodes virtual AMUs (LoRa addresses 2..n+1) and a virtual base on one
+    channel, in simulated time. Each unit registers (REG), then sends route_len
+    waypoints "<id>:<i>:<lat>,<lon>" one at a time and waits for each ACK like
+    BotCarNode: ack_timeout_s after the frame, then a randomized backoff that
+    doubles per attempt; after max_retries the waypoint is dropped, or with
+    spool=True probed again until it gets through. Alongside, units send
+    occasional PR alerts (ACKed, jumping the waypoint queue) and MS state
+    reports. mix gives seconds per message kind: fs = FS period, wp = pause
+    after an ACKed waypoint, pr / ms = mean interval (0 = off). The default
+    MIX is what BotCarNode sends with the shipped botcar_config.yaml
+    (tx_interval 0, heartbeat_interval 60, no pico_port so no FS); an fs
+    period projects a fleet whose units all have a Pico link.
+
+    The base runs every frame it hears through a receive.ReceivePipeline with
+    the BaseStation validators and answers admitted REG / waypoints / PR with
+    ACKREG / ACK / ACKPR, immediately or through scheduler (an AckScheduler).
+    A frame is lost if it overlaps another frame its receiver can hear, if the
+    receiver is transmitting, or at random with probability loss.
+    """
+
+    MIX = {"fs": 0.0, "wp": 0.0, "pr": 1800.0, "ms": 60.0}
+    STATES = ("STANDBY", "PATROL")
+
+    def __init__(self, n_nodes, rf=None, scheduler=None, route_len=50, mix=None, loss=0.0,
+                 ack_timeout_s=5.0, retry_min_s=3.0, retry_max_s=5.0, max_retries=3, spool=True,
+                 validators="length,seq_window,coords,state", turnaround_s=0.02, seed=1):
+        from lora_airtime import RFParams, time_on_air
+        from node_registry import NodeRegistry
+        from receive import ReceivePipeline, build_validators
+        self.rf = rf or RFParams()
+        self.toa = lambda n: time_on_air(n, self.rf)
+        self.n = n_nodes
+        self.scheduler = scheduler
+        self.route_len = int(route_len)
+        self.mix = dict(self.MIX, **(mix or {}))
+        self.loss = float(loss)
+        self.ack_timeout_s = ack_timeout_s
+        self.retry_min_s = retry_min_s
+        self.retry_max_s = retry_max_s
+        self.max_retries = max(1, int(max_retries))
+        self.spool = spool
+        self.turnaround_s = turnaround_s
+        self.rng = random.Random(seed)
+        self.registry = NodeRegistry(stale_after_s=1e9)
+        self.latencies = []    # first send -> ACK heard, per ACKed message, after run()
+        # Tuples straight from the channel: the sim never builds +RCV text
+        self.receive = ReceivePipeline(lambda pkt: pkt, build_validators(validators, self.registry))
+
+    def _backoff(self, node, attempt):
+        """BotCarNode._compute_retry_delay: window doubled per attempt plus a stable per-node jitter."""
+        f = 2 ** (attempt - 1)
+        return self.rng.uniform(self.retry_min_s * f, self.retry_max_s * f) + node % 3
+
+    def run(self, duration_s=600.0):
+        rng = self.rng
+        events = []            # (t, seq, kind, data)
+        seq = itertools.count()
+        txs = []               # (start, end, sender)  sender 1 = base
+        stats = {"sent": 0, "received": 0, "lost_collision": 0, "lost_deaf": 0, "lost_random": 0,
+                 "quarantined": 0, "rejected": 0, "acks_sent": 0, "acks_lost": 0, "acked": 0,
+                 "telemetry": 0, "offered": 0, "failed": 0, "retries": 0, "airtime_s": 0.0,
+                 "wp_acked": 0, "routes_done": 0}
+        latencies = self.latencies
+        units = range(2, self.n + 2)
+        busy = {u: 0.0 for u in units}         # unit radio busy until
+        base_busy = [0.0]
+        outbox = {u: deque() for u in units}   # [kind, payload, expected ACK] waiting to be sent
+        current = {}                           # unit -> exchange dict while waiting for an ACK
+        wp_next = {u: 0 for u in units}
+        pos = {u: (33.6863 + (u - 2) * 1e-3, -117.7896) for u in units}
+        mix = self.mix
+        step = 5.0 / 111195.0                  # 5 m between waypoints (well under the base's speed check)
+
+        def push(t, kind, data):
+            heapq.heappush(events, (t, next(seq), kind, data))
+
+        def heard(s, e, receiver):
+            """'ok', 'collision', 'deaf' or 'random' for a frame [s, e) at receiver."""
+            for a, b, w in txs:
+                if b > s and a < e and w != receiver and (a, b) != (s, e):
+                    return "collision"
+            for a, b, w in txs:
+                if w == receiver and b > s and a < e:
+                    return "deaf"
+            return "random" if self.loss and rng.random() < self.loss else "ok"
+
+        def unit_send(t, u, payload, kind):
+            start = max(t, busy[u])
+            end = start + self.toa(len(payload))
+            busy[u] = end
+            txs.append((start, end, u))
+            stats["sent"] += 1
+            stats["airtime_s"] += end - start
+            push(end, "rx_end", (start, end, u, payload, kind))
+            return end
+
+        def base_send(t, dest, msg):
+            start = max(t + self.turnaround_s, base_busy[0])
+            end = start + self.toa(len(msg))
+            base_busy[0] = end
+            txs.append((start, end, 1))
+            stats["acks_sent"] += 1
+            stats["airtime_s"] += end - start
+            push(end, "ack_end", (start, end, dest, msg))
+
+        def attempt(t, u):
+            ex = current[u]
+            ex["attempt"] += 1
+            ex["token"] = next(seq)
+            if ex["t_first"] is None:
+                ex["t_first"] = t
+            end = unit_send(t, u, ex["payload"], ex["kind"])
+            push(end + self.ack_timeout_s, "timeout", (u, ex["token"]))
+
+        def kick(t, u):
+            if u in current or not outbox[u]:
+                return
+            kind, payload, ack = outbox[u].popleft()
+            current[u] = {"kind": kind, "payload": payload, "ack": ack, "attempt": 0, "t_first": None,
+                          "token": None, "round": 0}
+            attempt(t, u)
+
+        def queue_wp(u):
+            i = wp_next[u]
+            if i >= self.route_len:
+                stats["routes_done"] += 1
+                return
+            wp_next[u] = i + 1
+            lat, lon = pos[u]
+            pos[u] = (lat + step, lon)
+            outbox[u].append(("WP", f"{u}:{i}:{lat + step:.6f},{lon:.6f}", f"ACK:{u}:{i}"))
+            stats["offered"] += 1
+
+        for u in units:
+            t0 = rng.uniform(0, 5.0)
+            outbox[u].append(("REG", f"REG:{u}", f"ACKREG:{u}"))
+            stats["offered"] += 1
+            push(t0, "kick", u)
+            if mix["fs"] > 0:
+                push(rng.uniform(0, mix["fs"]), "fs", u)
+            for k in ("pr", "ms"):
+                if mix[k] > 0:
+                    push(rng.expovariate(1.0 / mix[k]), k, u)
+        drift = {u: 1 + rng.uniform(-0.002, 0.002) for u in units}
+
+        while events:
+            t, _, kind, data = heapq.heappop(events)
+            if t > duration_s:
+                break
+            if kind == "kick":
+                kick(t, data)
+            elif kind == "fs":
+                lat, lon = pos[data]
+                unit_send(t, data, f"FS:{data}:{rng.randint(0, 359)}:{lat:.6f},{lon:.6f}", "FS")
+                stats["offered"] += 1
+                push(t + mix["fs"] * drift[data] + rng.gauss(0, 0.01), "fs", data)
+            elif kind == "ms":
+                state = self.STATES[1 if wp_next[data] < self.route_len else 0]
+                unit_send(t, data, f"MS:{data}:{state}:0", "MS")
+                stats["offered"] += 1
+                push(t + rng.expovariate(1.0 / mix["ms"]), "ms", data)
+            elif kind == "pr":
+                lat, lon = pos[data]
+                outbox[data].appendleft(("PR", f"PR:{data}:ASSIST:{lat:.6f},{lon:.6f}", f"ACKPR:{data}:ASSIST"))
+                stats["offered"] += 1
+                kick(t, data)
+                push(t + rng.expovariate(1.0 / mix["pr"]), "pr", data)
+            elif kind == "wp":
+                queue_wp(data)
+                kick(t, data)
+            elif kind == "rx_end":
+                start, end, u, payload, fkind = data
+                verdict = heard(start, end, 1)
+                if verdict != "ok":
+                    stats["lost_" + verdict] += 1
+                    continue
+                stats["received"] += 1
+                if self.scheduler:
+                    self.scheduler.est.observe_rx(u, fkind, end, len(payload))
+                f = self.receive.process((u, len(payload), payload, -80, 5), end)
+                if f.decision != 0:
+                    stats["quarantined" if f.decision == 1 else "rejected"] += 1
+                    continue
+                ack = None
+                if f.kind == "REG":
+                    self.registry.register(f.node_id, u, t=end)
+                    ack = f"ACKREG:{f.node_id}"
+                elif f.kind == "PR":
+                    self.registry.heard(f.node_id, u, t=end)
+                    ack = f"ACKPR:{f.node_id}:{payload.split(':')[2]}"
+                else:
+                    self.registry.heard(f.node_id, u, t=end)
+                    if f.kind == "MS":
+                        self.registry.set_state(f.node_id, f.state, t=end)
+                    elif f.lat not in (None, "N/A"):
+                        rec = self.registry.get(f.node_id)
+                        if f.kind == "FS" or rec.pos_src != "FS":   # as the base: route points until FS
+                            self.registry.set_position(f.node_id, float(f.lat), float(f.lon), src=f.kind)
+                    if f.kind == "WP":
+                        ack = f"ACK:{f.node_id}:{f.seq}"
+                    else:
+                        stats["telemetry"] += 1
+                if ack is None:
+                    continue
+                if self.scheduler:
+                    self.scheduler.enqueue(u, ack, f.node_id, end)
+                    push(end, "poll", None)
+                else:
+                    base_send(end, u, ack)
+            elif kind == "poll":
+                for dest, msg in self.scheduler.due(t):
+                    base_send(t, dest, msg)
+                nxt = self.scheduler.next_due(t)
+                if nxt != float("inf"):
+                    push(max(nxt, t + 1e-4), "poll", None)
+            elif kind == "ack_end":
+                start, end, u, msg = data
+                verdict = heard(start, end, u)
+                if verdict != "ok":
+                    stats["acks_lost"] += 1
+                    continue
+                ex = current.get(u)
+                if ex is None or msg != ex["ack"]:
+                    continue               # late ACK: the unit stopped waiting for it
+                del current[u]
+                stats["acked"] += 1
+                latencies.append(end - ex["t_first"])
+                if ex["kind"] == "REG":
+                    queue_wp(u)
+                elif ex["kind"] == "WP":
+                    stats["wp_acked"] += 1
+                    push(end + mix["wp"], "wp", u)
+                    continue
+                kick(end, u)
+            elif kind == "timeout":
+                u, token = data
+                ex = current.get(u)
+                if ex is None or ex["token"] != token:
+                    continue
+                a = ex["attempt"]
+                if a < self.max_retries:
+                    stats["retries"] += 1
+                    push(t + self._backoff(u, a), "retry", (u, token))
+                elif self.spool and ex["kind"] == "WP":
+                    # Spool: the waypoint stays at the head; probe again after the longest backoff
+                    stats["retries"] += 1
+                    ex["attempt"] = 0
+                    push(t + self._backoff(u, self.max_retries), "retry", (u, token))
+                else:
+                    stats["failed"] += 1
+                    push(t + self._backoff(u, a), "give_up", (u, token))
+            elif kind == "retry":
+                u, token = data
+                ex = current.get(u)
+                if ex is not None and ex["token"] == token:
+                    attempt(t, u)
+            elif kind == "give_up":
+                u, token = data
+                ex = current.get(u)
+                if ex is None or ex["token"] != token:
+                    continue
+                del current[u]
+                if ex["kind"] in ("REG", "WP"):
+                    queue_wp(u)       # BotCarNode carries on with the route after a failed REG too
+                kick(t, u)
+            # keep the overlap scan short
+            if len(txs) > 4 * self.n + 16:
+                cut = t - 10.0
+                txs[:] = [x for x in txs if x[1] > cut]
+
+        latencies.sort()
+        pick = (lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]) if latencies else (lambda q: 0.0)
+        stats.update(duration_s=duration_s, ack_p50_s=pick(0.50), ack_p99_s=pick(0.99),
+                     delivered=stats["acked"] + stats["telemetry"],
+                     utilization=stats["airtime_s"] / duration_s if duration_s else 0.0)
+        stats["loss"] = 1.0 - stats["received"] / stats["sent"] if stats["sent"] else 0.0
+        return stats
+
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: receive.py
+Description: BaseStation Receive stage, run on every +RCV line before any ACK
+             logic. Acquire parses the line once into a Frame (kind, node id,
+             seq, position, state); Validate runs a chain of pluggable checks
+             (length field, registration, seq window, coordinate sanity, state
+             legality); Decide admits the frame, quarantines it to a bounded
+             on-disk store for triage, or rejects it. A check can also admit a
+             frame as an anomaly (logged and counted, not held back). Per-stage
+             timings and reason counters are kept for the stats line.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import json
+import math
+import os
+import time
+from collections import Counter
+
+from fse import MISSION, MISSION_STATES
+from tracing import split_trace
+
+ADMIT = 0
+QUARANTINE = 1
+REJECT = 2
+DECISIONS = ("ADMIT", "QUARANTINE", "REJECT")
+
+EARTH_R_M = 6371008.8
+DEG = math.pi / 180.0
+
+# Payloads that carry no position ("N/A" before the first GPS fix)
+NO_POSITION = ("", "N/A", "None", "nan")
+
+
+class Frame:
+    __slots__ = ("raw", "t_rx", "src", "length", "data", "rssi", "snr", "tid",
+                 "kind", "node_id", "seq", "lat", "lon", "state", "decision", "reason")
+
+    def __init__(self, raw, t_rx):
+        self.raw = raw
+        self.t_rx = t_rx
+        self.src = self.length = self.data = self.rssi = self.snr = self.tid = None
+        self.kind = self.node_id = self.seq = self.lat = self.lon = self.state = None
+        self.decision = ADMIT
+        self.reason = None
+
+    def as_dict(self):
+        return {"t": time.time(), "src": self.src, "len": self.length, "data": self.data,
+                "rssi": self.rssi, "snr": self.snr, "kind": self.kind, "node_id": self.node_id,
+                "decision": DECISIONS[self.decision], "reason": self.reason, "raw": self.raw}
+
+
+def classify(frame, payload):
+    """Fill kind/node_id/seq/lat/lon/state from the payload token; False if malformed."""
+    if payload.startswith("TP:"):
+        p = payload.split(":")
+        if len(p) != 3:
+            return False
+        frame.kind, frame.node_id = "TP", p[1]
+    elif payload.startswith("REG:"):
+        frame.kind, frame.node_id = "REG", payload[4:]
+        return bool(frame.node_id)
+    elif payload.startswith("FS:"):
+        p = payload.split(":")
+        if len(p) < 4:
+            return False
+        frame.kind, frame.node_id = "FS", p[1]
+        frame.lat, frame.lon = (p[3].split(",", 1) + ["N/A"])[:2]
+    elif payload.startswith("MS:"):
+        p = payload.split(":", 4)
+        if len(p) < 4:
+            return False
+        frame.kind, frame.node_id, frame.state = "MS", p[1], p[2]
+    elif payload.startswith("PR:"):
+        p = payload.split(":", 3)
+        if len(p) < 3:
+            return False
+        frame.kind, frame.node_id = "PR", p[1]
+    elif payload.startswith("ACKDN:"):
+        p = payload.split(":")
+        if len(p) < 3:
+            return False
+        frame.kind, frame.node_id, frame.seq = "ACKDN", p[1], p[2]
+    else:
+        p = payload.split(":")
+        if len(p) < 3:
+            return False
+        frame.kind, frame.node_id, frame.seq = "WP", p[0], p[1]
+        frame.lat, frame.lon = (p[2].split(",", 1) + ["N/A"])[:2]
+    return True
+
+
+# ---------------- Validators ----------------
+# A validator has a name, is called with a Frame and returns None (pass) or
+# (decision, reason). (ADMIT, reason) passes the frame on as an anomaly: the
+# reason is kept on the frame and the remaining checks still run. An optional
+# commit(frame) is called once a frame is admitted, so stateful checks only
+# learn from frames that made it through.
+
+class LengthCheck:
+    """+RCV <len> must equal the payload size in bytes (truncated or merged UART lines)."""
+    name = "length"
+
+    def __call__(self, f):
+        if len(f.data) != f.length and len(f.data.encode("utf-8")) != f.length:
+            return REJECT, f"length {f.length} != {len(f.data.encode('utf-8'))}"
+        return None
+
+
+class RegistrationCheck:
+    """
+    FS / MS / PR / ACKDN / waypoint frames only from units that have sent REG.
+    Not in the default chain: the registry is in memory and units send REG only
+    at startup, so after a base restart every unit would stay quarantined.
+    """
+    name = "registration"
+    KINDS = ("FS", "MS", "PR", "ACKDN", "WP")
+
+    def __init__(self, registry):
+        self.registry = registry
+
+    def __call__(self, f):
+        if f.kind in self.KINDS:
+            rec = self.registry.get(f.node_id)
+            if rec is None or not rec.registered:
+                return QUARANTINE, "unregistered"
+        return None
+
+
+class SeqWindowCheck:
+    """
+    Waypoint index must stay within +/- window of the last admitted index for
+    that node. Indexes at or behind it are retransmits (ACK lost) and are
+    admitted so the node gets its ACK again; 0 restarts the route; REG resets.
+    A jump more than window ahead (the node's spool dropped records when full)
+    is a resync: admitted as an anomaly and the window moves to it.
+    """
+    name = "seq_window"
+
+    def __init__(self, window=16):
+        self.window = int(window)
+        self.last = {}  # node_id -> last admitted waypoint index
+
+    def __call__(self, f):
+        if f.kind != "WP":
+            return None
+        try:
+            seq = int(f.seq)
+        except ValueError:
+            return REJECT, f"seq '{f.seq}'"
+        f.seq = seq
+        last = self.last.get(f.node_id)
+        if last is None or seq == 0 or abs(seq - last) <= self.window:
+            return None
+        if seq > last:
+            return ADMIT, f"seq gap {last} -> {seq} (resync)"
+        return QUARANTINE, f"seq {seq} outside window of {last}"
+
+    def commit(self, f):
+        if f.kind == "WP":
+            last = self.last.get(f.node_id)
+            if last is None or f.seq == 0 or f.seq > last:
+                self.last[f.node_id] = f.seq
+        elif f.kind == "REG":
+            self.last.pop(f.node_id, None)
+
+
+class CoordinateCheck:
+    """
+    FS / waypoint positions must parse, be finite and in range. FS (live
+    position) must also not imply a jump faster than max_speed_mps from the
+    unit's last FS position; waypoints are planned route points uploaded
+    back to back, not where the unit is, so they are not speed-checked and a
+    route-point stand-in position is not a reference for the check.
+    """
+    name = "coords"
+
+    def __init__(self, registry, max_speed_mps=15.0):
+        self.registry = registry
+        self.max_speed_mps = float(max_speed_mps)
+
+    def __call__(self, f):
+        if f.kind not in ("FS", "WP") or f.lat in NO_POSITION:
+            return None
+        try:
+            lat, lon = float(f.lat), float(f.lon)
+        except ValueError:
+            return REJECT, "coords unparseable"
+        if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):  # also false for NaN
+            return REJECT, "coords out of range"
+        if lat == 0.0 and lon == 0.0:
+            return QUARANTINE, "coords 0,0 (no fix)"
+        if f.kind != "FS":
+            return None
+        rec = self.registry.get(f.node_id)
+        if rec is not None and rec.lat is not None and rec.pos_src == "FS" and self.max_speed_mps > 0:
+            dy = (lat - rec.lat) * EARTH_R_M * DEG
+            dx = (lon - rec.lon) * EARTH_R_M * DEG * math.cos(lat * DEG)
+            dt = max(time.time() - rec.pos_t, 1.0)
+            speed = math.sqrt(dx * dx + dy * dy) / dt
+            if speed > self.max_speed_mps:
+                return QUARANTINE, f"coords jump {speed:.0f} m/s"
+        return None
+
+
+class StateCheck:
+    """
+    MS state must be a mission state. MS frames are not ACKed, so one lost
+    report can hide a step: a state not reachable from the last reported one
+    is admitted as an anomaly (the registry follows the unit) rather than
+    quarantined.
+    """
+    name = "state"
+
+    def __init__(self, registry):
+        self.registry = registry
+        t = MISSION
+        # legal[(from, to)] from the mission transition table; E-STOP reaches SAFE from anywhere
+        self.legal = set()
+        for s in range(t.n_states):
+            for ev in range(t.n_events):
+                dst = t.trans[s * t.n_events + ev]
+                if dst >= 0:
+                    self.legal.add((t.states[s], t.states[dst]))
+            self.legal.add((t.states[s], t.states[t.safe_state]))
+            self.legal.add((t.states[s], t.states[s]))
+
+    def __call__(self, f):
+        if f.kind != "MS":
+            return None
+        if f.state not in MISSION_STATES:
+            return REJECT, f"state '{f.state}'"
+        rec = self.registry.get(f.node_id)
+        prev = rec.state if rec is not None else None
+        if prev in MISSION_STATES and (prev, f.state) not in self.legal:
+            return ADMIT, f"state {prev} -> {f.state} (skipped transition)"
+        return None
+
+
+def build_validators(names, registry, seq_window=16, max_speed_mps=15.0):
+    """Validator chain from config names (list or comma string), in the order given."""
+    if isinstance(names, str):
+        names = [n.strip() for n in names.split(",")]
+    make = {
+        "length": lambda: LengthCheck(),
+        "registration": lambda: RegistrationCheck(registry),
+        "seq_window": lambda: SeqWindowCheck(seq_window),
+        "coords": lambda: CoordinateCheck(registry, max_speed_mps),
+        "state": lambda: StateCheck(registry),
+    }
+    out = []
+    for n in names:
+        if not n:
+            continue
+        if n not in make:
+            raise ValueError(f"unknown receive validator '{n}' (expected one of {', '.join(make)})")
+        out.append(make[n]())
+    return out
+
+
+# ---------------- Quarantine store ----------------
+class QuarantineStore:
+    """
+    Bounded JSON-lines store: quarantine_<label>.jsonl plus one rolled-over
+    generation (.1), each holding at most max_records / 2 frames.
+    """
+
+    def __init__(self, log_dir, label="base", max_records=1000):
+        self.path = os.path.join(log_dir, f"quarantine_{label}.jsonl")
+        self.prev_path = self.path + ".1"
+        self.per_file = max(1, int(max_records) // 2)
+        self.count = 0
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.count = sum(1 for _ in f)
+        self._fh = None
+        self.stored = 0
+
+    def put(self, frame):
+        if self.count >= self.per_file:
+            self.close()
+            os.replace(self.path, self.prev_path)
+            self.count = 0
+        if self._fh is None:
+            self._fh = open(self.path, "a", buffering=1, encoding="utf-8")
+        self._fh.write(json.dumps(frame.as_dict(), separators=(",", ":")) + "\n")
+        self.count += 1
+        self.stored += 1
+
+    def records(self):
+        """Stored frames oldest first (for triage)."""
+        out = []
+        for p in (self.prev_path, self.path):
+            if os.path.exists(p):
+                with open(p, "r", encoding="utf-8") as f:
+                    out.extend(json.loads(line) for line in f if line.strip())
+        return out
+
+    def close(self):
+        if self._fh:
+            self._fh.close()
+            self._fh = None
+
+
+# ---------------- Pipeline ----------------
+class ReceivePipeline:
+    def __init__(self, parse, validators=(), quarantine=None):
+        self.parse = parse              # +RCV parser -> (src, len, data, rssi, snr) or None
+        self.validators = list(validators)
+        self.quarantine = quarantine
+        self._commit = [v.commit for v in self.validators if hasattr(v, "commit")]
+        self.stages = ("acquire", "validate", "decide")
+        self.stage_ns = [0] * len(self.stages)
+        self.stage_n = [0] * len(self.stages)
+        self.stage_max_ns = [0] * len(self.stages)
+        self.decisions = [0, 0, 0]
+        self.anomalies = 0               # admitted with a reason
+        self.reasons = Counter()         # "<DECISION>:<validator>" / "ANOMALY:<validator>" -> count
+
+    def process(self, line, t_rx=None):
+        """Run one UART line through the pipeline; None for non-+RCV lines (+OK, +ERR, echoes)."""
+        clock = time.perf_counter_ns
+        ns, cnt, mx = self.stage_ns, self.stage_n, self.stage_max_ns
+        t0 = clock()
+        pkt = self.parse(line)
+        if not pkt:
+            return None
+        f = Frame(line, t_rx)
+        f.src, f.length, raw_data, f.rssi, f.snr = pkt
+        # Length is checked on the payload as sent, so keep it until the validators run
+        f.data = raw_data
+        payload, f.tid = split_trace(raw_data)
+        stage = "acquire"
+        noted = None
+        if not classify(f, payload):
+            f.decision, f.reason = REJECT, "format"
+        t1 = clock()
+        d = t1 - t0
+        ns[0] += d
+        cnt[0] += 1
+        if d > mx[0]:
+            mx[0] = d
+
+        if f.decision == ADMIT:
+            for v in self.validators:
+                r = v(f)
+                if r is not None:
+                    if r[0] == ADMIT:
+                        f.reason, noted = r[1], v.name
+                        continue
+                    f.decision, f.reason = r
+                    stage = v.name
+                    break
+            t2 = clock()
+            d = t2 - t1
+            ns[1] += d
+            cnt[1] += 1
+            if d > mx[1]:
+                mx[1] = d
+            t1 = t2
+        f.data = payload
+
+        # Decide
+        self.decisions[f.decision] += 1
+        if f.decision == ADMIT:
+            for commit in self._commit:
+                commit(f)
+            if noted:
+                self.anomalies += 1
+                self.reasons[f"ANOMALY:{noted}"] += 1
+        else:
+            self.reasons[f"{DECISIONS[f.decision]}:{stage}"] += 1
+            if f.decision == QUARANTINE and self.quarantine:
+                self.quarantine.put(f)
+        d = clock() - t1
+        ns[-1] += d
+        cnt[-1] += 1
+        if d > mx[-1]:
+            mx[-1] = d
+        return f
+
+    def stats(self):
+        out = {"decisions": dict(zip(DECISIONS, self.decisions)), "anomalies": self.anomalies,
+               "reasons": dict(self.reasons), "stages": {}}
+        for name, ns, n, mx in zip(self.stages, self.stage_ns, self.stage_n, self.stage_max_ns):
+            out["stages"][name] = {"n": n, "mean_us": (ns / n / 1e3) if n else 0.0, "max_us": mx / 1e3}
+        return out
+
+    def format_stats(self):
+        s = self.stats()
+        d = s["decisions"]
+        parts = [f"admit={d['ADMIT']} quarantine={d['QUARANTINE']} reject={d['REJECT']}"]
+        parts += [f"{k}={v}" for k, v in sorted(s["reasons"].items())]
+        parts += [f"{name} {st['mean_us']:.1f}/{st['max_us']:.0f} us" for name, st in s["stages"].items() if st["n"]]
+        return ", ".join(parts)
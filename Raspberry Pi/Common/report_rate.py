@@ -0,0 +1,116 @@
+# report_rate.py — Motion-aware telemetry / heartbeat rate (Pico + Pi)
+# Author: Steven Westermire (Maddog / Gunny)
+#
+# ReportRate decides, once per sensor loop pass, whether a telemetry frame
+# goes out now. A change since the last frame sent (moved further than the
+# GPS drift band, turned, tilted, mission/platform state changed, an alert)
+# sends at once, no faster than min_s, and snaps the rate back to min_s. With
+# nothing changing, a heartbeat goes out after the current interval and each
+# heartbeat multiplies the interval by `decay` up to max_s, so a parked AMU
+# slows to one frame every max_s while a moving one reports every few metres.
+# Position changes are measured on low-pass filtered fixes so a parked unit's
+# GPS wander stays inside the drift band. update() returns the reason a frame
+# is sent; main.py puts it in the frame as "why".
+#
+# Pure `math` so it runs under CircuitPython: copy it to the Pico next to
+# main.py. Tools/telemetry_rate_report.py replays a recorded patrol through it
+# to compare frames and LoRa airtime against a fixed period.
+import math
+
+EARTH_R_M = 6371008.8
+DEG = math.pi / 180.0
+
+REASONS = ("first", "alert", "state", "motion", "heading", "tilt", "heartbeat")
+
+
+def wrap_180(deg):
+    return (deg + 180.0) % 360.0 - 180.0
+
+
+class ReportRate:
+    """
+    min_s / max_s bound the interval between frames. move_m is the GPS drift
+    band: position changes smaller than this (from the last frame sent) are
+    treated as noise. heading_deg / tilt_deg are the IMU yaw and roll/pitch
+    changes that count as motion. gps_alpha is the fix low-pass weight (1 = raw).
+    """
+
+    def __init__(self, min_s=0.5, max_s=30.0, move_m=3.0, heading_deg=10.0, tilt_deg=15.0, decay=2.0,
+                 gps_alpha=0.3):
+        if min_s <= 0 or max_s < min_s:
+            raise ValueError("need 0 < min_s <= max_s")
+        self.min_s = float(min_s)
+        self.max_s = float(max_s)
+        self.move_m = float(move_m)
+        self.heading_deg = float(heading_deg)
+        self.tilt_deg = float(tilt_deg)
+        self.decay = max(1.0, float(decay))
+        self.gps_alpha = min(1.0, max(0.01, float(gps_alpha)))
+        self.lat = self.lon = None     # filtered position
+        self.interval = self.min_s
+        self.t_last = None
+        self.ref = None            # (lat, lon, heading, roll, pitch, state) at the last frame sent
+        self._alert = False
+        self.counts = {}           # reason -> frames sent
+
+    def alert(self):
+        """Send the next frame as soon as min_s allows (command received, fault, ...)."""
+        self._alert = True
+
+    def _filter(self, lat, lon):
+        if lat is None or lon is None:
+            return
+        if self.lat is None:
+            self.lat, self.lon = lat, lon
+            return
+        a = self.gps_alpha
+        self.lat += a * (lat - self.lat)
+        self.lon += a * (lon - self.lon)
+
+    def _moved_m(self):
+        lat0, lon0 = self.ref[0], self.ref[1]
+        lat, lon = self.lat, self.lon
+        if lat is None or lat0 is None:
+            return 0.0
+        dy = (lat - lat0) * EARTH_R_M * DEG
+        dx = (lon - lon0) * EARTH_R_M * DEG * math.cos(lat0 * DEG)
+        return math.sqrt(dx * dx + dy * dy)
+
+    def _change(self, heading, roll, pitch, state):
+        if self._alert:
+            return "alert"
+        r = self.ref
+        if state != r[5]:
+            return "state"
+        if self.move_m > 0 and self._moved_m() >= self.move_m:
+            return "motion"
+        if heading is not None and r[2] is not None and abs(wrap_180(heading - r[2])) >= self.heading_deg:
+            return "heading"
+        if roll is not None and r[3] is not None and (abs(roll - r[3]) >= self.tilt_deg
+                                                      or abs(pitch - r[4]) >= self.tilt_deg):
+            return "tilt"
+        return None
+
+    def update(self, now, lat, lon, heading=None, roll=None, pitch=None, state=None):
+        """Reason to send a frame now (see REASONS), or None. A non-None answer counts as sent."""
+        self._filter(lat, lon)
+        if self.t_last is None:
+            why = "first"
+        else:
+            elapsed = now - self.t_last
+            if elapsed < self.min_s:
+                return None
+            why = self._change(heading, roll, pitch, state)
+            if why is None:
+                if elapsed < self.interval:
+                    return None
+                why = "heartbeat"
+        if why == "heartbeat":
+            self.interval = min(self.max_s, self.interval * self.decay)
+        else:
+            self.interval = self.min_s
+        self.t_last = now
+        self.ref = (self.lat, self.lon, heading, roll, pitch, state)
+        self._alert = False
+        self.counts[why] = self.counts.get(why, 0) + 1
+        return why
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: route_prep.py
+Description: Route preprocessing before LoRa upload. Each waypoint costs one
+             AT+SEND frame plus an ACK, so points that carry no geometric
+             information are removed first:
+               1. quantize lat/lon to the precision the GPS can deliver
+               2. drop consecutive duplicates and a closing point equal to the start
+               3. Douglas-Peucker simplification with a tolerance in metres
+             prepare_route() returns the new list and a report of the frames and
+             estimated airtime saved.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+from lora_airtime import RFParams, time_on_air
+from nav_geometry import RouteTable
+
+# 5 decimals is ~1.1 m of latitude, already finer than a NEO-6M fix (~2.5 m CEP)
+DEFAULT_DECIMALS = 5
+
+
+def quantize(waypoints, decimals=DEFAULT_DECIMALS):
+    return [[round(float(lat), decimals), round(float(lon), decimals)] for lat, lon in waypoints]
+
+
+def dedupe(waypoints, drop_closing=True):
+    """Remove consecutive repeats; optionally drop a last point equal to the first."""
+    out = []
+    for wp in waypoints:
+        if not out or wp != out[-1]:
+            out.append(wp)
+    closing = drop_closing and len(out) > 2 and out[-1] == out[0]
+    if closing:
+        out.pop()
+    return out, closing
+
+
+def _seg_dist(px, py, ax, ay, bx, by):
+    """Distance from P to segment AB (metres, ENU)."""
+    dx = bx - ax
+    dy = by - ay
+    l2 = dx * dx + dy * dy
+    if l2 == 0.0:
+        ex, ey = px - ax, py - ay
+    else:
+        t = ((px - ax) * dx + (py - ay) * dy) / l2
+        t = 0.0 if t < 0.0 else 1.0 if t > 1.0 else t
+        ex, ey = px - (ax + t * dx), py - (ay + t * dy)
+    return (ex * ex + ey * ey) ** 0.5
+
+
+def douglas_peucker(waypoints, tolerance_m):
+    """
+    Keep the endpoints and every point needed so that no dropped point lies
+    more than tolerance_m from the simplified path. Iterative (explicit stack)
+    so long survey routes cannot hit the recursion limit.
+    """
+    n = len(waypoints)
+    if n < 3 or tolerance_m <= 0:
+        return list(waypoints)
+    geo = RouteTable(waypoints)
+    xs, ys = geo.east, geo.north
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        worst, worst_d = -1, tolerance_m
+        for i in range(a + 1, b):
+            d = _seg_dist(xs[i], ys[i], xs[a], ys[a], xs[b], ys[b])
+            if d > worst_d:
+                worst, worst_d = i, d
+        if worst >= 0:
+            keep[worst] = True
+            stack.append((a, worst))
+            stack.append((worst, b))
+    return [wp for wp, k in zip(waypoints, keep) if k]
+
+
+def upload_airtime(waypoints, node_id, rf=None):
+    """Estimated airtime (s) to upload a route once: one waypoint frame plus one ACK each."""
+    rf = rf or RFParams()
+    total = 0.0
+    for i, (lat, lon) in enumerate(waypoints):
+        total += time_on_air(len(f"{node_id}:{i}:{lat},{lon}"), rf)
+        total += time_on_air(len(f"ACK:{node_id}:{i}"), rf)
+    return total
+
+
+def prepare_route(waypoints, tolerance_m=0.0, decimals=DEFAULT_DECIMALS, drop_closing=True,
+                  node_id=1, rf=None):
+    """Returns (prepared_waypoints, report dict)."""
+    raw = [[float(lat), float(lon)] for lat, lon in waypoints]
+    pts = quantize(raw, decimals) if decimals is not None else raw
+    pts, closing = dedupe(pts, drop_closing)
+    deduped = len(pts)
+    pts = douglas_peucker(pts, tolerance_m)
+
+    air_in = upload_airtime(raw, node_id, rf)
+    air_out = upload_airtime(pts, node_id, rf)
+    report = {
+        "points_in": len(raw),
+        "duplicates": len(raw) - deduped - (1 if closing else 0),
+        "closing_dropped": closing,
+        "simplified": deduped - len(pts),
+        "points_out": len(pts),
+        "frames_saved": len(raw) - len(pts),
+        "airtime_in_s": air_in,
+        "airtime_out_s": air_out,
+        "airtime_saved_s": air_in - air_out,
+    }
+    return pts, report
+
+
+def format_report(report):
+    saved_pct = 100.0 * report["airtime_saved_s"] / report["airtime_in_s"] if report["airtime_in_s"] else 0.0
+    return (f"{report['points_in']} -> {report['points_out']} waypoints "
+            f"({report['duplicates']} duplicate, {'1' if report['closing_dropped'] else '0'} closing, "
+            f"{report['simplified']} simplified); {report['frames_saved']} frames and "
+            f"{report['airtime_saved_s']:.2f} s airtime saved ({saved_pct:.0f}%)")
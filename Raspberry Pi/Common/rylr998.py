@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: rylr998.py
+Description: Thread-safe RYLR998 driver that owns the LoRa serial port. One
+             writer thread drains a priority TX queue and keeps a single AT
+             command in flight (the module answers commands strictly in order
+             and refuses a new AT+SEND until the last TX completes); one reader
+             thread resolves the in-flight command from its +OK / +ERR / +NAME=
+             reply and hands every other line (+RCV traffic) to subscribers.
+             Callers get a TxFuture per command, so concurrent senders never
+             interleave bytes on the UART. With an AirtimeMeter attached, every
+             send and receive is charged its time on air, and sends at
+             defer_priority or lower are held while the duty-cycle budget is
+             spent (ACKs and E-STOP always go).
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import heapq
+import itertools
+import queue
+import threading
+import time
+
+from at_command import ATError
+from lora_airtime import time_on_air
+
+# TX priorities (lower goes first; FIFO within a priority)
+PRIO_ESTOP = 0
+PRIO_ACK = 1
+PRIO_HIGH = 2
+PRIO_NORMAL = 5
+
+
+class TxFuture:
+    """Completion of one queued AT command: reply line, or an ATError / port exception."""
+
+    __slots__ = ("cmd", "priority", "timeout", "dest", "payload", "airtime", "reply", "error",
+                 "t_queued", "t_sent", "t_done", "_event", "_callbacks")
+
+    def __init__(self, cmd, priority, timeout, dest=None, payload=None, airtime=0.0):
+        self.cmd = cmd
+        self.priority = priority
+        self.timeout = timeout
+        self.dest = dest
+        self.payload = payload
+        self.airtime = airtime
+        self.reply = None
+        self.error = None
+        self.t_queued = time.monotonic()
+        self.t_sent = None
+        self.t_done = None
+        self._event = threading.Event()
+        self._callbacks = []
+
+    def done(self):
+        return self._event.is_set()
+
+    def ok(self):
+        return self._event.is_set() and self.error is None
+
+    def wait(self, timeout=None):
+        return self._event.wait(timeout)
+
+    def result(self, timeout=None):
+        """Reply line; raises the command's error, or TimeoutError if still pending."""
+        if not self._event.wait(timeout):
+            raise TimeoutError(f"{self.cmd}: still queued or in flight")
+        if self.error is not None:
+            raise self.error
+        return self.reply
+
+    def add_done_callback(self, fn):
+        """fn(future), called on the thread that completes it (or now if already done)."""
+        if self._event.is_set():
+            fn(self)
+        else:
+            self._callbacks.append(fn)
+
+
+class LineQueue:
+    """Subscriber that buffers lines for a consumer loop; raises once the reader has stopped."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.q = queue.Queue()
+
+    def __call__(self, line):
+        self.q.put(line)
+
+    def get(self, timeout=None):
+        """Next line, "" on timeout. After the reader stops, raises its exception (or EOFError)."""
+        try:
+            line = self.q.get(timeout=timeout)
+        except queue.Empty:
+            return ""
+        if line is None:
+            self.q.put(None)  # keep raising for later calls
+            raise self.driver.reader_error or EOFError("radio reader stopped")
+        return line
+
+
+class RYLR998:
+    def __init__(self, port, name="radio", rf=None, reply_timeout=0.5, confirm=True, meter=None,
+                 defer_priority=PRIO_NORMAL, on_done=None):
+        self.port = port
+        self.name = name
+        self.rf = rf
+        self.reply_timeout = float(reply_timeout)
+        self.confirm = confirm          # wait for each command's reply before the next write
+        self.meter = meter              # AirtimeMeter (airtime_meter.py) or None
+        self.defer_priority = defer_priority
+        self.on_done = on_done          # fn(future) for every completed command (metrics)
+
+        self._cv = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._inflight = None
+        self._subs = []                 # (prefix, fn)
+        self._queues = []
+        self._running = False
+        self._writer = None
+        self._reader = None
+        self.reader_error = None
+
+        self.sent = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.stray = 0
+        self.deferred = 0
+        self.max_depth = 0
+
+    # ---------------- lifecycle ----------------
+    def start(self):
+        self._running = True
+        self._reader = threading.Thread(target=self._read_loop, name=f"{self.name}_RX", daemon=True)
+        self._writer = threading.Thread(target=self._write_loop, name=f"{self.name}_TX", daemon=True)
+        self._reader.start()
+        self._writer.start()
+        return self
+
+    def stop(self, drain_s=1.0):
+        """Let queued commands go out (up to drain_s), then stop both threads. The port stays open."""
+        deadline = time.monotonic() + drain_s
+        with self._cv:
+            while (self._heap or self._inflight) and time.monotonic() < deadline:
+                self._cv.wait(0.05)
+            self._running = False
+            pending, self._heap = self._heap, []
+            self._cv.notify_all()
+        for _, _, fut in pending:
+            self._finish(fut, error=ATError(fut.cmd, detail="driver stopped"))
+        if self._writer and self._writer is not threading.current_thread():
+            self._writer.join(timeout=1.0)
+        if self._reader and self._reader is not threading.current_thread():
+            self._reader.join(timeout=1.5)
+
+    @property
+    def alive(self):
+        return bool(self._reader and self._reader.is_alive())
+
+    # ---------------- subscribers ----------------
+    def subscribe(self, fn, prefix="+RCV="):
+        """
+        fn(line) on the reader thread for every line starting with prefix ("" = all
+        lines). Subscribe before start() so no early line is missed.
+        """
+        self._subs.append((prefix, fn))
+        return fn
+
+    def unsubscribe(self, fn):
+        self._subs = [(p, f) for p, f in self._subs if f is not fn]
+
+    def lines(self, prefix="+RCV="):
+        """LineQueue subscribed to prefix, for a program's own receive loop."""
+        lq = LineQueue(self)
+        self._queues.append(lq)
+        self.subscribe(lq, prefix)
+        if self._reader is not None and not self._reader.is_alive():
+            lq.q.put(None)
+        return lq
+
+    # ---------------- TX ----------------
+    def submit(self, cmd, priority=PRIO_NORMAL, timeout=None):
+        """Queue a raw AT command ("AT+BAND?"); returns its TxFuture."""
+        return self._queue(TxFuture(cmd, priority, self.reply_timeout if timeout is None else timeout))
+
+    def send(self, dest, payload, priority=PRIO_NORMAL):
+        """AT+SEND to a LoRa address; the reply timeout covers the packet's airtime."""
+        airtime = time_on_air(len(payload.encode("utf-8")), self.rf)
+        return self._queue(TxFuture(f"AT+SEND={dest},{len(payload)},{payload}", priority,
+                                    self.reply_timeout + airtime, dest, payload, airtime))
+
+    def _queue(self, fut):
+        cmd, priority = fut.cmd, fut.priority
+        with self._cv:
+            if not self._running:
+                fut.error = ATError(cmd, detail="driver not running")
+                fut.t_done = time.monotonic()
+                fut._event.set()
+                return fut
+            heapq.heappush(self._heap, (priority, next(self._seq), fut))
+            if len(self._heap) > self.max_depth:
+                self.max_depth = len(self._heap)
+            self._cv.notify_all()
+        return fut
+
+    def depth(self):
+        with self._cv:
+            return len(self._heap)
+
+    def _finish(self, fut, reply=None, error=None):
+        with self._cv:
+            if fut._event.is_set():
+                return
+            if self._inflight is fut:
+                self._inflight = None
+            fut.reply = reply
+            fut.error = error
+            fut.t_done = time.monotonic()
+            fut._event.set()
+            if error is not None:
+                self.errors += 1
+            self._cv.notify_all()
+        for fn in fut._callbacks + ([self.on_done] if self.on_done else []):
+            try:
+                fn(fut)
+            except Exception as e:
+                print(f"[{self.name}] TX callback error: {e}")
+
+    def _hold_s(self, fut):
+        """Seconds the duty-cycle budget holds this send back (0 for commands, ACKs, E-STOP)."""
+        if self.meter is None or not fut.airtime or fut.priority < self.defer_priority:
+            return 0.0
+        return self.meter.defer_s(time.monotonic(), fut.airtime)
+
+    def _write_loop(self):
+        held = None
+        while True:
+            with self._cv:
+                while True:
+                    while not self._heap and self._running:
+                        self._cv.wait()
+                    if not self._heap:
+                        return
+                    # The heap top is the most urgent entry: if it is held, everything queued is
+                    # low priority too. A new ACK / E-STOP wakes us and goes out first.
+                    hold = self._hold_s(self._heap[0][2])
+                    if hold <= 0 or not self._running:
+                        break
+                    if self._heap[0][2] is not held:
+                        held = self._heap[0][2]
+                        self.deferred += 1
+                    self._cv.wait(hold)
+                _, _, fut = heapq.heappop(self._heap)
+                self._inflight = fut
+            fut.t_sent = time.monotonic()
+            try:
+                self.port.write(f"{fut.cmd}\r\n".encode("utf-8"))
+                self.sent += 1
+            except Exception as e:
+                self._finish(fut, error=e)
+                continue
+            if self.meter is not None and fut.payload is not None:
+                self.meter.record_tx(fut.t_sent, fut.dest, fut.payload)
+            if not self.confirm or not self.alive:
+                # Nobody can read the reply (simulated port, or the reader has stopped)
+                self._finish(fut)
+                continue
+            if not fut._event.wait(fut.timeout):
+                self.timeouts += 1
+                self._finish(fut, error=ATError(fut.cmd))
+
+    # ---------------- RX ----------------
+    def _read_loop(self):
+        try:
+            while self._running:
+                raw = self.port.readline()
+                if not raw:
+                    time.sleep(0.002)  # serial readline already waited; simulated ports return at once
+                    continue
+                line = raw.decode(errors="ignore").strip()
+                if not line:
+                    continue
+                if not line.startswith("+RCV=") and line.startswith("+"):
+                    self._on_reply(line)
+                elif self.meter is not None and line.startswith("+RCV="):
+                    self._meter_rx(line)
+                for prefix, fn in self._subs:
+                    if line.startswith(prefix):
+                        try:
+                            fn(line)
+                        except Exception as e:
+                            print(f"[{self.name}] Subscriber error: {e}")
+        except BaseException as e:  # port closed, serial error, or a simulated port's end of script
+            self.reader_error = e
+        finally:
+            with self._cv:
+                fut = self._inflight
+            if fut is not None:
+                self._finish(fut, error=ATError(fut.cmd, detail="reader stopped"))
+            for lq in self._queues:
+                lq.q.put(None)
+
+    def _on_reply(self, line):
+        with self._cv:
+            fut = self._inflight
+        if fut is None:
+            self.stray += 1
+            return
+        if line.startswith("+ERR="):
+            try:
+                code = int(line[5:])
+            except ValueError:
+                code = None
+            self._finish(fut, line, ATError(fut.cmd, code, None if code is not None else line))
+        else:
+            self._finish(fut, line)
+
+    def _meter_rx(self, line):
+        try:
+            src, length, rest = line[5:].split(",", 2)
+            self.meter.record_rx(time.monotonic(), int(src), int(length), rest.rsplit(",", 2)[0])
+        except ValueError:
+            pass
+
+    def stats(self):
+        return {"sent": self.sent, "errors": self.errors, "timeouts": self.timeouts, "stray": self.stray,
+                "deferred": self.deferred, "max_depth": self.max_depth}
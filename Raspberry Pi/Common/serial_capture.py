@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: serial_capture.py
+Description: Timestamped serial capture and replay for the LoRa UART and USB CDC links.
+             Capture file (.amucap) layout, append-only:
+                 b"AMUCAP1\\n" + one JSON metadata line
+                 then records: <t:float64 LE><dir:1 byte 'R'|'W'><len:uint16 LE><bytes>
+             t is seconds since capture start (time.monotonic based), 'R' is
+             device -> program, 'W' is program -> device.
+             TapSerial records a live port (opt-in hook); ReplaySerial feeds a
+             capture back into a program at 1x, Nx or maximum speed.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import json
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+
+MAGIC = b"AMUCAP1\n"
+_REC = struct.Struct("<dcH")
+RX = b"R"   # device -> program
+TX = b"W"   # program -> device
+MAX_CHUNK = 0xFFFF
+FLUSH_INTERVAL_S = 0.5
+
+
+class CaptureWriter:
+    """Append records to a capture file; flushed at most every FLUSH_INTERVAL_S."""
+
+    def __init__(self, path: str, meta: dict = None):
+        self.path = path
+        self._fh = open(path, "ab")
+        if self._fh.tell() == 0:
+            self._fh.write(MAGIC)
+            self._fh.write((json.dumps(meta or {}, separators=(",", ":")) + "\n").encode("utf-8"))
+        self._t0 = time.monotonic()
+        self._next_flush = self._t0 + FLUSH_INTERVAL_S
+        self._lock = threading.Lock()
+        self.records = 0
+
+    def record(self, direction: bytes, data: bytes, t: float = None):
+        if not data:
+            return
+        now = time.monotonic() if t is None else t
+        with self._lock:
+            for i in range(0, len(data), MAX_CHUNK):
+                chunk = data[i:i + MAX_CHUNK]
+                self._fh.write(_REC.pack(now - self._t0, direction, len(chunk)))
+                self._fh.write(chunk)
+                self.records += 1
+            if now >= self._next_flush:
+                self._fh.flush()
+                self._next_flush = now + FLUSH_INTERVAL_S
+
+    def close(self):
+        with self._lock:
+            try:
+                self._fh.close()
+            except Exception:
+                pass
+
+
+def read_capture(path: str):
+    """Return (meta: dict, records: list of (t, direction, bytes)). A torn final record is dropped."""
+    with open(path, "rb") as f:
+        blob = f.read()
+    if not blob.startswith(MAGIC):
+        raise ValueError(f"{path}: not an AMU capture file")
+    nl = blob.index(b"\n", len(MAGIC))
+    meta = json.loads(blob[len(MAGIC):nl].decode("utf-8") or "{}")
+    records, pos, size = [], nl + 1, _REC.size
+    while pos + size <= len(blob):
+        t, direction, n = _REC.unpack_from(blob, pos)
+        pos += size
+        if pos + n > len(blob):
+            break
+        records.append((t, direction, blob[pos:pos + n]))
+        pos += n
+    return meta, records
+
+
+class TapSerial:
+    """
+    Pass-through wrapper for a pyserial port that records every read and write.
+    Anything not overridden (in_waiting, is_open, ...) is delegated; timeout is
+    a property so setting it (ATEngine does, per reply) reaches the real port.
+    """
+
+    def __init__(self, ser, writer: CaptureWriter):
+        self._ser = ser
+        self._writer = writer
+
+    def __getattr__(self, name):
+        return getattr(self._ser, name)
+
+    @property
+    def timeout(self):
+        return self._ser.timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        self._ser.timeout = value
+
+    def readline(self, *args, **kwargs):
+        data = self._ser.readline(*args, **kwargs)
+        self._writer.record(RX, data)
+        return data
+
+    def read(self, *args, **kwargs):
+        data = self._ser.read(*args, **kwargs)
+        self._writer.record(RX, data)
+        return data
+
+    def write(self, data):
+        self._writer.record(TX, bytes(data))
+        return self._ser.write(data)
+
+    def close(self):
+        try:
+            self._ser.close()
+        finally:
+            self._writer.close()
+
+
+def maybe_tap(ser, enabled: bool, log_dir: str, label: str):
+    """
+    Opt-in hook for the programs: when enabled, wrap `ser` so its traffic is
+    recorded to <log_dir>/capture_<label>_<timestamp>.amucap.
+    """
+    if ser is None or not enabled:
+        return ser
+    os.makedirs(log_dir, exist_ok=True)
+    ts_stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(log_dir, f"capture_{label}_{ts_stamp}.amucap")
+    writer = CaptureWriter(path, {"label": label, "port": getattr(ser, "port", None), "started": ts_stamp})
+    print(f"[Capture] Recording {label} serial traffic to {path}")
+    return TapSerial(ser, writer)
+
+
+class ReplaySerial:
+    """
+    Serial-like port that plays back the RX side of a capture.
+    speed: 1.0 = captured timing, N = N times faster, None = as fast as the
+    program reads. Program writes are collected in .written for comparison with
+    the captured TX side. .finished is set once every RX byte has been consumed.
+    """
+
+    def __init__(self, path: str, speed=1.0, timeout=1.0):
+        self.meta, records = read_capture(path)
+        self.rx = [(t, data) for t, d, data in records if d == RX]
+        self.captured_tx = [data for t, d, data in records if d == TX]
+        self.speed = speed
+        self.timeout = timeout
+        self.written = []
+        self.finished = threading.Event()
+        self.is_open = True
+        self.port = path
+        self._buf = bytearray()
+        self._i = 0
+        self._start = None
+        self._lock = threading.Lock()
+
+    def _due(self, t):
+        return self._start + (t / self.speed if self.speed else 0.0)
+
+    def _pull(self, block: bool):
+        """Move due RX records into the buffer; optionally wait up to timeout for one."""
+        if self._start is None:
+            self._start = time.monotonic()
+        while self._i < len(self.rx):
+            due = self._due(self.rx[self._i][0])
+            now = time.monotonic()
+            if due > now:
+                if not block or due - now > self.timeout:
+                    if block:
+                        time.sleep(self.timeout)
+                    return
+                time.sleep(due - now)
+            self._buf.extend(self.rx[self._i][1])
+            self._i += 1
+            block = False
+        if not self._buf:
+            self.finished.set()
+            if block:
+                time.sleep(min(self.timeout, 0.05))
+
+    @property
+    def in_waiting(self):
+        with self._lock:
+            self._pull(block=False)
+            return len(self._buf)
+
+    def readline(self):
+        with self._lock:
+            if b"\n" not in self._buf:
+                self._pull(block=True)
+            i = self._buf.find(b"\n")
+            n = i + 1 if i >= 0 else len(self._buf)
+            out = bytes(self._buf[:n])
+            del self._buf[:n]
+            return out
+
+    def read(self, n=1):
+        with self._lock:
+            if len(self._buf) < n:
+                self._pull(block=True)
+            out = bytes(self._buf[:n])
+            del self._buf[:n]
+            return out
+
+    def write(self, data):
+        self.written.append(bytes(data))
+        return len(data)
+
+    def reset_input_buffer(self):
+        pass
+
+    def close(self):
+        self.is_open = False
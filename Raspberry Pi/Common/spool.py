@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: spool.py
+Description: Crash-safe outbound message spool for BotCarNode: an append-only
+             ring of records in a memory-mapped file. The ack cursor (tail)
+             marks the oldest message the base has not acknowledged, head is
+             where the next record goes, and a producer cursor lets the route
+             feeder resume after a restart without queueing waypoints twice
+             (it advances in the same header write as each record it counts).
+             The header is written to two slots in turn (generation counter and
+             CRC), and every record carries its own CRC and sequence number. On
+             open, a torn record is cut off at head, and records appended just
+             before a crash but missing from the header are recovered. When the
+             ring is full the oldest message is dropped and counted.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+
+MAGIC = b"AMUSPOOL"
+VERSION = 1
+SLOT = 128                 # two header slots, written alternately
+DATA_OFF = 4096            # records start on their own page
+
+_HDR = struct.Struct("<8sIQQQQQQQQ")   # magic, version, capacity, gen, head, tail, next_seq, prod_key, prod_pos, dropped
+_CRC = struct.Struct("<I")
+_REC = struct.Struct("<IIQd")          # payload length | flags, crc32(seq, t, payload), seq, enqueue time (epoch s)
+_PRODUCED = 0x80000000                 # length flag: record counted by the producer cursor
+
+
+class SpoolError(Exception):
+    pass
+
+
+class Spool:
+    """
+    Records are (seq, t, payload bytes). Offsets head / tail are logical byte
+    positions that only grow; the ring position is offset % capacity. sync=True
+    msyncs after every append and ack (survives power loss, not just a crash
+    of the process); sync=False leaves write-back to the kernel. Records
+    appended with producer=True carry a flag, so one recovered past the saved
+    head also moves the producer cursor it never got to write.
+    """
+
+    def __init__(self, path, capacity=1 << 20, sync=True, clock=time.time):
+        self.path = path
+        self.sync = sync
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.index = deque()       # (offset, seq, t, size) for every pending record, oldest first
+        self.recovered = 0         # records found past the saved head on open
+        self.cut_bytes = 0         # torn / corrupt bytes cut from the end on open
+        d = os.path.dirname(os.path.abspath(path))
+        os.makedirs(d, exist_ok=True)
+        new = not os.path.exists(path) or os.path.getsize(path) < DATA_OFF
+        self._f = open(path, "r+b" if not new else "w+b")
+        if new:
+            self._f.truncate(DATA_OFF + int(capacity))
+        self._mm = mmap.mmap(self._f.fileno(), 0)
+        if new:
+            self.capacity = int(capacity)
+            self.gen = self.head = self.tail = self.prod_key = self.prod_pos = self.dropped = 0
+            self.next_seq = 1
+            self._write_header()
+            self._write_header()   # both slots valid
+            self._flush()
+        else:
+            self._load()
+
+    # ---------------- header ----------------
+    def _write_header(self):
+        self.gen += 1
+        body = _HDR.pack(MAGIC, VERSION, self.capacity, self.gen, self.head, self.tail, self.next_seq,
+                         self.prod_key, self.prod_pos, self.dropped)
+        off = (self.gen % 2) * SLOT
+        self._mm[off:off + _HDR.size + _CRC.size] = body + _CRC.pack(zlib.crc32(body))
+
+    def _read_slot(self, off):
+        body = self._mm[off:off + _HDR.size]
+        (crc,) = _CRC.unpack(self._mm[off + _HDR.size:off + _HDR.size + _CRC.size])
+        if zlib.crc32(body) != crc:
+            return None
+        fields = _HDR.unpack(body)
+        return fields if fields[0] == MAGIC else None
+
+    def _load(self):
+        slots = [s for s in (self._read_slot(0), self._read_slot(SLOT)) if s]
+        if not slots:
+            raise SpoolError(f"{self.path}: no valid header")
+        (_, version, self.capacity, self.gen, self.head, self.tail, self.next_seq,
+         self.prod_key, self.prod_pos, self.dropped) = max(slots, key=lambda s: s[3])
+        if version != VERSION:
+            raise SpoolError(f"{self.path}: version {version}, expected {VERSION}")
+        if len(self._mm) < DATA_OFF + self.capacity:
+            raise SpoolError(f"{self.path}: file shorter than its capacity")
+        self._recover()
+
+    def _recover(self):
+        """Rebuild the index from tail; cut a torn record, pick up appends the header missed."""
+        off = self.tail
+        seq = None if self.tail < self.head else self.next_seq   # an empty ring may hold old laps
+        while True:
+            rec = self._read_record(off, expect_seq=seq)
+            if rec is None:
+                break
+            r_seq, t, size, produced = rec
+            if off >= self.head and off + size - self.tail > self.capacity:
+                break
+            if off >= self.head and produced:
+                self.prod_pos += 1
+            self.index.append((off, r_seq, t, size))
+            off += size
+            seq = r_seq + 1
+        if off > self.head:
+            self.recovered = sum(1 for o, _, _, _ in self.index if o >= self.head)
+        elif off < self.head:
+            self.cut_bytes = self.head - off
+        if self.index:
+            self.next_seq = max(self.next_seq, self.index[-1][1] + 1)
+        if off != self.head:
+            self.head = off
+            self._write_header()
+            self._flush()
+
+    # ---------------- ring I/O ----------------
+    def _write_at(self, off, data):
+        pos = off % self.capacity
+        first = min(len(data), self.capacity - pos)
+        self._mm[DATA_OFF + pos:DATA_OFF + pos + first] = data[:first]
+        if first < len(data):
+            self._mm[DATA_OFF:DATA_OFF + len(data) - first] = data[first:]
+
+    def _read_at(self, off, n):
+        pos = off % self.capacity
+        first = min(n, self.capacity - pos)
+        data = self._mm[DATA_OFF + pos:DATA_OFF + pos + first]
+        if first < n:
+            data += self._mm[DATA_OFF:DATA_OFF + n - first]
+        return data
+
+    def _read_record(self, off, expect_seq=None):
+        """(seq, t, size, produced) of a valid record at off, else None."""
+        length, crc, seq, t = _REC.unpack(self._read_at(off, _REC.size))
+        produced = bool(length & _PRODUCED)
+        length &= ~_PRODUCED
+        if length > self.capacity - _REC.size or (expect_seq is not None and seq != expect_seq):
+            return None
+        payload = self._read_at(off + _REC.size, length)
+        if zlib.crc32(struct.pack("<Qd", seq, t) + payload) != crc:
+            return None
+        return seq, t, _REC.size + length, produced
+
+    def _flush(self):
+        if self.sync:
+            self._mm.flush()
+
+    # ---------------- API ----------------
+    def append(self, payload, t=None, producer=False):
+        """
+        Store a message; returns its sequence number. Drops the oldest messages if the
+        ring is full. producer=True also advances the producer cursor by one, in the
+        same header write, so a crash never leaves the record without the cursor.
+        """
+        data = payload.encode("utf-8") if isinstance(payload, str) else bytes(payload)
+        t = self.clock() if t is None else float(t)
+        size = _REC.size + len(data)
+        if size > self.capacity:
+            raise SpoolError(f"message of {len(data)} bytes does not fit a {self.capacity}-byte spool")
+        with self._lock:
+            while self.capacity - (self.head - self.tail) < size:
+                self.tail += self.index.popleft()[3]
+                self.dropped += 1
+            seq = self.next_seq
+            crc = zlib.crc32(struct.pack("<Qd", seq, t) + data)
+            self._write_at(self.head, _REC.pack(len(data) | (_PRODUCED if producer else 0), crc, seq, t) + data)
+            self.index.append((self.head, seq, t, size))
+            self.head += size
+            self.next_seq = seq + 1
+            if producer:
+                self.prod_pos += 1
+            self._write_header()
+            self._flush()
+            return seq
+
+    def peek(self):
+        """Oldest unacknowledged message as (seq, t, payload str), or None."""
+        with self._lock:
+            if not self.index:
+                return None
+            off, seq, t, size = self.index[0]
+            return seq, t, self._read_at(off + _REC.size, size - _REC.size).decode("utf-8", errors="replace")
+
+    def ack(self, seq):
+        """The base acknowledged everything up to and including seq; advance the ack cursor."""
+        with self._lock:
+            moved = False
+            while self.index and self.index[0][1] <= seq:
+                self.tail += self.index.popleft()[3]
+                moved = True
+            if moved:
+                if not self.index:
+                    self.tail = self.head
+                self._write_header()
+                self._flush()
+            return moved
+
+    def set_producer(self, key, pos):
+        """Producer cursor: key identifies what is being fed (e.g. a route), pos how far it got. (0, 0) clears it."""
+        with self._lock:
+            self.prod_key, self.prod_pos = int(key), int(pos)
+            self._write_header()
+            self._flush()
+
+    def producer_pos(self, key):
+        """Where a producer with this key left off (0 for a different key)."""
+        return self.prod_pos if self.prod_key == int(key) else 0
+
+    def __len__(self):
+        return len(self.index)
+
+    def backlog(self, now=None):
+        """{"messages", "bytes", "oldest_age_s", "dropped"} for reports and metrics."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            oldest = now - self.index[0][2] if self.index else 0.0
+            return {"messages": len(self.index), "bytes": self.head - self.tail,
+                    "oldest_age_s": max(0.0, oldest), "dropped": self.dropped}
+
+    def format_backlog(self, now=None):
+        b = self.backlog(now)
+        line = f"{b['messages']} pending ({b['bytes']} B of {self.capacity})"
+        if b["messages"]:
+            line += f", oldest {b['oldest_age_s']:.0f}s"
+        if b["dropped"]:
+            line += f", {b['dropped']} dropped when full"
+        return line
+
+    def close(self):
+        with self._lock:
+            if self._mm.closed:
+                return
+            self._mm.flush()
+            self._mm.close()
+            self._f.close()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: tracing.py
+Description: End-to-end latency tracing shared by the Pi uplink and the BaseStation.
+             A trace id (tid) rides along each message; every hop appends a
+             timestamp record to a JSON-lines trace log. Clocks differ per device,
+             so each link also runs an NTP-style ping/pong and logs its offset;
+             latency_report.py (Tools/) joins the logs into per-hop percentiles.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import os
+import time
+from datetime import datetime
+
+# Hops in path order: Pico sample -> Pi receive -> LoRa send -> Base receive -> Base log
+HOPS = ("pico_tx", "pi_rx", "lora_tx", "base_rx", "base_log")
+
+# LoRa payload trailer: "<payload>|<tid>" (payloads never contain '|')
+TRACE_SEP = "|"
+
+
+def make_trace_id(node_id, seq):
+    return f"{node_id}.{seq}"
+
+
+def attach_trace(payload: str, tid) -> str:
+    return f"{payload}{TRACE_SEP}{tid}" if tid is not None else payload
+
+
+def split_trace(data: str):
+    """Return (payload, tid or None). Cheap no-op when no trailer is present."""
+    if TRACE_SEP not in data:
+        return data, None
+    payload, tid = data.rsplit(TRACE_SEP, 1)
+    return payload, (tid or None)
+
+
+# ---------------- Clock offset (NTP-style) ----------------
+class ClockOffsetEstimator:
+    """
+    Offset of a remote clock relative to ours from ping/pong exchanges.
+      t0: ping sent (local)     t1: ping received (remote)
+      t2: pong sent (remote)    t3: pong received (local)
+    offset = remote - local; the sample with the smallest round-trip delay in the
+    recent window wins (least queueing error).
+    """
+
+    def __init__(self, window=8):
+        self.window = window
+        self._samples = []  # (delay, offset)
+
+    def add_sample(self, t0, t1, t2, t3):
+        delay = (t3 - t0) - (t2 - t1)
+        offset = ((t1 - t0) + (t2 - t3)) / 2.0
+        self._samples.append((delay, offset))
+        if len(self._samples) > self.window:
+            self._samples.pop(0)
+        return offset, delay
+
+    def best(self):
+        """Return (offset, delay) of the lowest-delay sample, or None."""
+        if not self._samples:
+            return None
+        delay, offset = min(self._samples)
+        return offset, delay
+
+    def offset(self):
+        b = self.best()
+        return b[0] if b else None
+
+
+# LoRa ping/pong tokens:  TP:<node_id>:<t0>   ->   TQ:<node_id>:<t0>:<t1>:<t2>
+def format_ping(node_id, t0):
+    return f"TP:{node_id}:{t0:.4f}"
+
+
+def format_pong(node_id, t0_str, t1, t2):
+    return f"TQ:{node_id}:{t0_str}:{t1:.4f}:{t2:.4f}"
+
+
+def parse_pong(msg: str):
+    """Parse 'TQ:<node>:<t0>:<t1>:<t2>' -> (node_id, t0, t1, t2) or None."""
+    try:
+        _, node_id, t0, t1, t2 = msg.split(":")
+        return node_id, float(t0), float(t1), float(t2)
+    except ValueError:
+        return None
+
+
+# ---------------- Trace log ----------------
+class TraceLog:
+    """
+    Append-only JSON-lines trace file, one record per hop or offset sample.
+    Records are formatted by hand (no json.dumps) to keep the hot path cheap.
+    """
+
+    def __init__(self, log_dir: str, label: str, clock: str):
+        os.makedirs(log_dir, exist_ok=True)
+        ts_stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.path = os.path.join(log_dir, f"trace_{label}_{ts_stamp}.jsonl")
+        self.clock = clock
+        self._fh = open(self.path, "a", buffering=1, encoding="utf-8")
+
+    def hop(self, tid, hop: str, t=None, clk=None):
+        if tid is None:
+            return
+        t = time.monotonic() if t is None else t
+        self._fh.write(f'{{"tid":"{tid}","hop":"{hop}","t":{t:.6f},"clk":"{clk or self.clock}"}}\n')
+
+    def offset(self, clk: str, ref: str, offset: float, delay: float):
+        """Record that t_ref = t_clk + offset (delay = round trip used)."""
+        self._fh.write(
+            f'{{"kind":"offset","clk":"{clk}","ref":"{ref}","offset":{offset:.6f},"delay":{delay:.6f}}}\n'
+        )
+
+    def close(self):
+        try:
+            self._fh.close()
+        except Exception:
+            pass
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: fleet_load.py
+Description: Fleet load generator: N virtual AMUs against one BaseStation on a
+             simulated LoRa channel (../Common/radio_sim.py FleetSim), swept
+             over fleet sizes to get a capacity curve. Units speak the real
+             tokens (REG, waypoints, PR, MS, and FS when --mix gives it a
+             period: a projection for units with a Pico link, off by
+             default as on a stock BotCarNode) with BotCarNode's ACK wait,
+             retries and backoff; the base side is the BaseStation Receive
+             stage, node registry and ACK rules, optionally with the ACK
+             scheduler. Each (fleet size, seed) run is one job in a process
+             pool. Prints delivered messages/s, p50/p99 ACK latency and retries
+             per message for each N, and the largest N that stays within the
+             latency and delivery limits.
+
+Usage:  python3 fleet_load.py --nodes 1 2 4 8 16 32 --duration 900 --seeds 3
+        python3 fleet_load.py --mix fs=30,wp=10,pr=0,ms=0 --loss 0.05 --lora-parameter 7,9,1,12   (FS projection)
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import argparse
+import csv
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Common"))
+from ack_scheduler import AckScheduler, ChannelEstimator
+from lora_airtime import DEFAULT_PARAMETER, RFParams
+from radio_sim import FleetSim
+
+COLUMNS = ("nodes", "offered_per_s", "delivered_per_s", "wp_per_s", "ack_p50_s", "ack_p99_s",
+           "retries_per_msg", "failed", "loss", "channel")
+
+
+def parse_mix(text):
+    """"fs=10,wp=5,pr=1800,ms=60" -> {"fs": 10.0, ...} (seconds per message kind, 0 = off)."""
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        kind, _, value = part.partition("=")
+        if kind not in FleetSim.MIX or not value:
+            raise argparse.ArgumentTypeError(f"bad mix entry '{part}' (kinds: {', '.join(FleetSim.MIX)})")
+        mix[kind] = float(value)
+    return mix
+
+
+def run_one(job):
+    """One simulation in a pool worker; returns (n, stats, latencies)."""
+    n, seed, a = job
+    rf = RFParams.from_parameter(a.lora_parameter)
+    sched = AckScheduler(ChannelEstimator(rf, guard_s=a.ack_guard), a.ack_max_hold) if a.ack_scheduling else None
+    sim = FleetSim(n, rf, sched, route_len=a.route_len, mix=a.mix, loss=a.loss, ack_timeout_s=a.ack_timeout,
+                   retry_min_s=a.retry_min, retry_max_s=a.retry_max, max_retries=a.max_retries,
+                   spool=not a.no_spool, validators=a.validators, seed=seed)
+    return n, sim.run(a.duration), sim.latencies
+
+
+def summarize(n, runs, duration):
+    """Pool the seeds of one fleet size into a COLUMNS row."""
+    tot = {}
+    lat = []
+    for stats, latencies in runs:
+        for k, v in stats.items():
+            tot[k] = tot.get(k, 0) + v
+        lat.extend(latencies)
+    lat.sort()
+    pick = (lambda q: lat[min(len(lat) - 1, int(q * len(lat)))]) if lat else (lambda q: float("nan"))
+    span = duration * len(runs)
+    return {"nodes": n, "offered_per_s": tot["offered"] / span, "delivered_per_s": tot["delivered"] / span,
+            "wp_per_s": tot["wp_acked"] / span, "ack_p50_s": pick(0.50), "ack_p99_s": pick(0.99),
+            "retries_per_msg": tot["retries"] / max(tot["acked"] + tot["failed"], 1),
+            "failed": tot["failed"] / len(runs), "loss": 1.0 - tot["received"] / max(tot["sent"], 1),
+            "channel": tot["utilization"] / len(runs)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Capacity curve: N virtual AMUs against one BaseStation")
+    ap.add_argument("--nodes", type=int, nargs="+", default=[1, 2, 4, 8, 12, 16, 24, 32])
+    ap.add_argument("--duration", type=float, default=900.0, help="simulated seconds per run")
+    ap.add_argument("--seeds", type=int, default=3)
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    ap.add_argument("--route-len", type=int, default=1000, help="waypoints per unit (then PR/MS, and FS if set, only)")
+    ap.add_argument("--mix", type=parse_mix, default={},
+                    help="seconds per kind: fs=FS period (projection: units with a Pico link), wp=pause after an "
+                         "ACKed waypoint, pr/ms=mean interval (default fs=0,wp=0,pr=1800,ms=60 as BotCarNode "
+                         "sends; 0 = off)")
+    ap.add_argument("--loss", type=float, default=0.0, help="random frame loss on top of collisions (0..1)")
+    ap.add_argument("--lora-parameter", default=DEFAULT_PARAMETER)
+    ap.add_argument("--ack-scheduling", action="store_true", help="base ACKs through the ACK scheduler")
+    ap.add_argument("--ack-max-hold", type=float, default=0.5, help="Ack_Max_Hold_S")
+    ap.add_argument("--ack-guard", type=float, default=0.05, help="Ack_Guard_S")
+    ap.add_argument("--ack-timeout", type=float, default=5.0, help="unit ACK wait per attempt (s)")
+    ap.add_argument("--retry-min", type=float, default=3.0, help="retry_delay_min")
+    ap.add_argument("--retry-max", type=float, default=5.0, help="retry_delay_max")
+    ap.add_argument("--max-retries", type=int, default=3)
+    ap.add_argument("--no-spool", action="store_true", help="drop a waypoint after max_retries (spool: false)")
+    ap.add_argument("--validators", default="length,seq_window,coords,state",
+                    help="BaseStation Receive_Validators")
+    ap.add_argument("--p99-limit", type=float, default=30.0, help="capacity limit: p99 ACK latency (s), ~2 retries")
+    ap.add_argument("--min-delivery", type=float, default=0.9, help="capacity limit: delivered / offered")
+    ap.add_argument("--csv", help="also write the curve to this CSV file")
+    a = ap.parse_args()
+    a.mix = dict(FleetSim.MIX, **a.mix)
+    rf = RFParams.from_parameter(a.lora_parameter)
+
+    print(f"[FleetLoad] {rf}, mix " + ",".join(f"{k}={v:g}" for k, v in a.mix.items())
+          + (" (FS projection)" if a.mix["fs"] > 0 else "") + f", loss {100 * a.loss:g}%, ACKs {'scheduled' if a.ack_scheduling else 'immediate'}, "
+          f"{a.duration:g}s x {a.seeds} seeds, {a.jobs} workers")
+    jobs = [(n, seed, a) for n in a.nodes for seed in range(1, a.seeds + 1)]
+    results = {}
+    with multiprocessing.Pool(min(a.jobs, len(jobs))) as pool:
+        for n, stats, latencies in pool.imap_unordered(run_one, jobs):
+            results.setdefault(n, []).append((stats, latencies))
+
+    print(f"{'nodes':>5s} | {'offered':>8s} {'delivered':>9s} {'wp':>7s} | {'ack p50':>8s} {'ack p99':>8s} | "
+          f"{'retry/msg':>9s} {'failed':>7s} {'loss':>6s} {'chan':>6s}")
+    rows = []
+    capacity = None
+    within = True      # capacity is the last N before the first one over the limits
+    for n in a.nodes:
+        r = summarize(n, results[n], a.duration)
+        rows.append(r)
+        ok = r["ack_p99_s"] <= a.p99_limit and r["delivered_per_s"] >= a.min_delivery * r["offered_per_s"]
+        within = within and ok
+        if within:
+            capacity = n
+        print(f"{n:5d} | {r['offered_per_s']:6.2f}/s {r['delivered_per_s']:7.2f}/s {r['wp_per_s']:5.2f}/s | "
+              f"{r['ack_p50_s']:7.2f}s {r['ack_p99_s']:7.2f}s | {r['retries_per_msg']:9.2f} {r['failed']:7.1f} "
+              f"{100 * r['loss']:5.1f}% {100 * r['channel']:5.1f}%{'' if ok else '  *'}")
+    if capacity is None:
+        print(f"[FleetLoad] Even {a.nodes[0]} unit(s) miss the limits (p99 ACK <= {a.p99_limit:g}s, "
+              f">= {100 * a.min_delivery:.0f}% delivered)")
+    else:
+        print(f"[FleetLoad] Capacity: {capacity} units per base channel at {a.lora_parameter} "
+              f"(p99 ACK <= {a.p99_limit:g}s, >= {100 * a.min_delivery:.0f}% delivered; * = over the limits)")
+
+    if a.csv:
+        with open(a.csv, "w", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=COLUMNS)
+            w.writeheader()
+            w.writerows(rows)
+        print(f"[FleetLoad] Curve written to {a.csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
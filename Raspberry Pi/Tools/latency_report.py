@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: latency_report.py
+Description: Joins trace_*.jsonl files from the Pi bridge, BotCarNode and the
+             BaseStation by trace id, maps every timestamp onto the base clock
+             using the logged clock offsets, and prints per-hop latency
+             percentiles (Pico sample -> Pi -> LoRa -> Base log).
+
+Usage:  python3 latency_report.py logs/trace_*.jsonl
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import json
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Common"))
+from tracing import HOPS
+
+# Clock chain: pico -> pi -> base
+CLOCK_PARENT = {"pico": "pi", "pi": "base"}
+
+
+def load_traces(paths):
+    """Return (hops: {tid: {hop: (t, clk)}}, offsets: {(clk, ref): [(delay, offset)]})."""
+    hops, offsets = {}, {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if rec.get("kind") == "offset":
+                    offsets.setdefault((rec["clk"], rec["ref"]), []).append((rec["delay"], rec["offset"]))
+                    continue
+                per_tid = hops.setdefault(rec["tid"], {})
+                prev = per_tid.get(rec["hop"])
+                # Keep the earliest stamp per hop (first attempt, before retries)
+                if prev is None or rec["t"] < prev[0]:
+                    per_tid[rec["hop"]] = (rec["t"], rec["clk"])
+    return hops, offsets
+
+
+def best_offsets(offsets):
+    """Lowest-delay sample per link: {clk: offset to its parent clock}."""
+    return {clk: min(samples)[1] for (clk, _ref), samples in offsets.items()}
+
+
+def to_base(t, clk, link_offset):
+    while clk != "base":
+        if clk not in link_offset:
+            return None
+        t += link_offset[clk]
+        clk = CLOCK_PARENT[clk]
+    return t
+
+
+def percentile(sorted_vals, pct):
+    if not sorted_vals:
+        return None
+    # Nearest-rank percentile
+    k = max(0, min(len(sorted_vals) - 1, math.ceil(pct / 100.0 * len(sorted_vals)) - 1))
+    return sorted_vals[k]
+
+
+def hop_latencies(hops, link_offset):
+    """Return {"a->b": [ms, ...]} for consecutive hops present in each trace, plus end-to-end."""
+    out = {}
+    for stamps in hops.values():
+        seq = []
+        for hop in HOPS:
+            if hop in stamps:
+                t = to_base(stamps[hop][0], stamps[hop][1], link_offset)
+                if t is not None:
+                    seq.append((hop, t))
+        for (h0, t0), (h1, t1) in zip(seq, seq[1:]):
+            out.setdefault(f"{h0}->{h1}", []).append((t1 - t0) * 1000.0)
+        if len(seq) >= 2:
+            out.setdefault(f"{seq[0][0]}->{seq[-1][0]} (e2e)", []).append((seq[-1][1] - seq[0][1]) * 1000.0)
+    return out
+
+
+def print_report(latencies):
+    print(f"{'segment':32s} {'n':>6s} {'p50':>9s} {'p90':>9s} {'p99':>9s} {'max':>9s}  (ms)")
+    for name in sorted(latencies, key=lambda n: (n.endswith("(e2e)"), n)):
+        vals = sorted(latencies[name])
+        print(f"{name:32s} {len(vals):6d} {percentile(vals, 50):9.1f} {percentile(vals, 90):9.1f} "
+              f"{percentile(vals, 99):9.1f} {vals[-1]:9.1f}")
+
+
+def main(argv):
+    if not argv:
+        print("Usage: latency_report.py <trace_*.jsonl> [...]")
+        return 2
+    hops, offsets = load_traces(argv)
+    link_offset = best_offsets(offsets)
+    for clk in CLOCK_PARENT:
+        if clk not in link_offset:
+            print(f"[LatencyReport] No {clk}->{CLOCK_PARENT[clk]} offset samples; hops on '{clk}' clock skipped.")
+    print_report(hop_latencies(hops, link_offset))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
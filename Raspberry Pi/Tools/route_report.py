@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: route_report.py
+Description: Shows what route preprocessing (../Common/route_prep.py) does to
+             the waypoints in a botcar_config.yaml at several Douglas-Peucker
+             tolerances: waypoints kept, frames saved and estimated upload
+             airtime, using the config's lora_parameter and precision settings.
+
+Usage:  python3 route_report.py ../botCar/botcar_config.yaml --tolerances 0 0.5 1 2 5
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import argparse
+import os
+import sys
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Common"))
+from lora_airtime import DEFAULT_PARAMETER, RFParams
+from route_prep import prepare_route
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Route simplification report for a botCar config")
+    ap.add_argument("config")
+    ap.add_argument("--tolerances", type=float, nargs="+", default=[0.0, 0.5, 1.0, 2.0, 5.0])
+    a = ap.parse_args()
+
+    with open(a.config, "r") as f:
+        cfg = yaml.safe_load(f) or {}
+    waypoints = cfg.get("waypoints") or []
+    if not waypoints:
+        print(f"[RouteReport] No waypoints in {a.config}")
+        return 1
+    node_id = int(cfg.get("node_id", 1))
+    decimals = cfg.get("route_precision_decimals", 6)
+    drop_closing = cfg.get("route_drop_closing", False)
+    drop_closing = bool(drop_closing) if isinstance(drop_closing, bool) else str(drop_closing).strip().upper() == "Y"
+    rf = RFParams.from_parameter(cfg.get("lora_parameter", DEFAULT_PARAMETER))
+
+    print(f"[RouteReport] {a.config}: {len(waypoints)} waypoints, {rf}, decimals={decimals}, drop_closing={drop_closing}")
+    print(f"{'tol_m':>6s} {'points':>7s} {'frames_saved':>13s} {'airtime_s':>10s} {'saved_s':>8s} {'saved':>6s}")
+    for tol in a.tolerances:
+        _, r = prepare_route(waypoints, tol, decimals, drop_closing, node_id, rf)
+        pct = 100.0 * r["airtime_saved_s"] / r["airtime_in_s"] if r["airtime_in_s"] else 0.0
+        print(f"{tol:6.1f} {r['points_out']:7d} {r['frames_saved']:13d} {r['airtime_out_s']:10.2f} "
+              f"{r['airtime_saved_s']:8.2f} {pct:5.0f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
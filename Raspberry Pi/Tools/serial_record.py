@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: serial_record.py
+Description: Pass-through pty recorder. Opens the real serial device, creates a
+             pseudo-terminal, and shuttles bytes both ways while recording them
+             (with monotonic timestamps and direction) to a .amucap file. Point
+             the program's serial port setting at the printed /dev/pts/N path;
+             no code change is needed on the program side.
+
+Usage:  python3 serial_record.py /dev/ttyS0 --baud 115200 --out logs/field.amucap
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import argparse
+import os
+import select
+import sys
+import tty
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Common"))
+from serial_capture import RX, TX, CaptureWriter
+
+
+def record(device, baud, out_path):
+    import serial
+
+    ser = serial.Serial(device, baud, timeout=0)
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    link = os.ttyname(slave)
+    writer = CaptureWriter(out_path, {"label": "pty", "port": device, "baud": baud})
+    print(f"[Record] {device} @ {baud} <-> {link}  (capturing to {out_path})")
+    print(f"[Record] Set the program's serial port to {link}; Ctrl-C to stop.")
+
+    dev_fd = ser.fileno()
+    try:
+        while True:
+            ready, _, _ = select.select([dev_fd, master], [], [], 1.0)
+            if dev_fd in ready:
+                data = ser.read(ser.in_waiting or 1)
+                if data:
+                    writer.record(RX, data)
+                    os.write(master, data)
+            if master in ready:
+                try:
+                    data = os.read(master, 4096)
+                except OSError:
+                    data = b""  # program closed the pty; keep waiting for a reopen
+                if data:
+                    writer.record(TX, data)
+                    ser.write(data)
+    except KeyboardInterrupt:
+        print(f"[Record] Stopped. {writer.records} records written.")
+    finally:
+        writer.close()
+        ser.close()
+        os.close(master)
+        os.close(slave)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Record serial traffic through a pass-through pty")
+    ap.add_argument("device")
+    ap.add_argument("--baud", type=int, default=115200)
+    ap.add_argument("--out", required=True)
+    a = ap.parse_args()
+    record(a.device, a.baud, a.out)
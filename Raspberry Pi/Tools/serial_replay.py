@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: serial_replay.py
+Description: Feeds a .amucap capture back into the BaseStation listener or a
+             BotCarNode in place of the real LoRa UART, at captured speed (1x),
+             N times faster, or as fast as the program reads ("max"). Prints
+             throughput and compares the program's writes (ACKs, AT commands)
+             with the writes in the capture, so field traffic can be used as a
+             repeatable performance regression run.
+
+Usage:  python3 serial_replay.py base logs/capture_base_*.amucap --speed max
+        python3 serial_replay.py node logs/capture_AMU_02_*.amucap --speed 4 --config botcar_config.yaml
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import threading
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+PI_DIR = os.path.join(TOOLS_DIR, "..")
+sys.path.insert(0, os.path.join(PI_DIR, "Common"))
+from serial_capture import ReplaySerial
+
+
+def replay_base(port: ReplaySerial):
+    sys.path.insert(0, os.path.join(PI_DIR, "BaseStation"))
+    base = importlib.import_module("botcarBaseStation")
+    worker = threading.Thread(target=base.listen_for_botcar_transmissions, args=(port,), daemon=True)
+    worker.start()
+    port.finished.wait()
+
+
+def replay_node(port: ReplaySerial, config_path: str):
+    sys.path.insert(0, os.path.join(PI_DIR, "botCar"))
+    node_mod = importlib.import_module("_BotCarNode")
+    node = node_mod.BotCarNode(config_path=config_path)
+    node.lora = port
+    worker = threading.Thread(target=node.start, daemon=True)
+    worker.start()
+    port.finished.wait()
+    node.running = False
+
+
+def summarize(port: ReplaySerial, wall_s: float, show: int = 5):
+    rx_lines = sum(data.count(b"\n") for _, data in port.rx)
+    span = port.rx[-1][0] if port.rx else 0.0
+    print(f"[Replay] {len(port.rx)} RX records ({rx_lines} lines) spanning {span:.1f} s, replayed in {wall_s:.2f} s "
+          f"({rx_lines / max(wall_s, 1e-9):.0f} lines/s)")
+    got = b"".join(port.written).splitlines()
+    want = b"".join(port.captured_tx).splitlines()
+    print(f"[Replay] program wrote {len(got)} lines; capture holds {len(want)} TX lines")
+    mismatches = [(i, w, g) for i, (w, g) in enumerate(zip(want, got)) if w != g]
+    if len(got) != len(want):
+        mismatches.append((min(len(got), len(want)), b"<len>", b"<len>"))
+    for i, w, g in mismatches[:show]:
+        print(f"[Replay]   TX line {i}: captured={w!r} replayed={g!r}")
+    if not mismatches:
+        print("[Replay] TX stream matches the capture.")
+    return len(mismatches)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay a serial capture into BaseStation or BotCarNode")
+    ap.add_argument("target", choices=("base", "node"))
+    ap.add_argument("capture")
+    ap.add_argument("--speed", default="1", help="1 = captured timing, N = N x faster, max = no pacing")
+    ap.add_argument("--config", default="botcar_config.yaml", help="node config (target=node)")
+    a = ap.parse_args()
+
+    speed = None if a.speed == "max" else float(a.speed)
+    port = ReplaySerial(a.capture, speed=speed, timeout=0.05 if speed is None else 1.0)
+    t0 = time.perf_counter()
+    if a.target == "base":
+        replay_base(port)
+    else:
+        replay_node(port, a.config)
+    summarize(port, time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: telemetry_rate_report.py
+Description: Replays a patrol through the motion-aware telemetry rate
+             (../Common/report_rate.py) and compares it with the fixed period.
+             Pico telemetry only crosses USB, so the first table is Pico -> Pi
+             frames and what the Pi loses for them (longest gap between frames,
+             p95 / max distance between the unit and its last reported
+             position). The LoRa cost is the FS uplink BotCarNode sends when
+             pico_port is set: its own fs_* pacing on top of the frames the Pi
+             gets, with airtime at the given lora_parameter and the same error
+             stats as seen by the base. The patrol is a pi_bridge.py --record
+             file of fixed-rate telemetry frames, or a simulated one (route laps
+             with the Sim motion model, GPS / IMU noise, then a parked spell).
+
+Usage:  python3 telemetry_rate_report.py logs/patrol.jsonl --max-s 10 30 60
+        python3 telemetry_rate_report.py --simulate --laps 3 --park-s 1800 --lora-parameter 9,7,1,12
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Common"))
+from lora_airtime import DEFAULT_PARAMETER, RFParams, time_on_air
+from report_rate import DEG, EARTH_R_M, REASONS, ReportRate
+
+SIM_DIR = os.path.join(HERE, "..", "..", "AMU---Automated-Mobile-Unit", "Sim")
+
+
+def load_patrol(path):
+    """Telemetry frames from a pi_bridge.py --record file -> [(t, lat, lon, heading, roll, pitch, state)]."""
+    samples = []
+    adaptive = False
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                fr = json.loads(line)
+            except ValueError:
+                continue
+            if not str(fr.get("type", "")).startswith("telemetry") or "ts" not in fr:
+                continue
+            adaptive = adaptive or "why" in fr
+            imu, gps, nav = fr.get("imu") or {}, fr.get("gps") or {}, fr.get("nav") or {}
+            samples.append((float(fr["ts"]), gps.get("lat"), gps.get("lon"), imu.get("heading"),
+                            imu.get("roll"), imu.get("pitch"), (fr.get("fse"), nav.get("wp_idx"))))
+    if adaptive:
+        print(f"[RateReport] {path} was recorded with report_rate.py on the Pico; the fixed-period row "
+              f"and the savings are understated (record without it for a fair baseline)")
+    samples.sort(key=lambda s: s[0])
+    return samples
+
+
+def simulate_patrol(laps, park_s, speed, dwell, gps_noise_m, seed):
+    """1 Hz fixes (the GPS burst rate): `laps` of the default route, then parked for park_s."""
+    sys.path.append(SIM_DIR)
+    from motion import RouteMotion
+
+    motion = RouteMotion(speed_mps=speed, dwell_s=dwell)
+    rng = random.Random(seed)
+    k_lat = 1.0 / (EARTH_R_M * DEG)
+    samples = []
+    drive = laps * motion.period
+    t = 0.0
+    while t < drive + park_s:
+        lat, lon, heading, v = motion.state(min(t, drive - 1e-6))
+        k_lon = k_lat / math.cos(lat * DEG)
+        lat += rng.gauss(0.0, gps_noise_m) * k_lat
+        lon += rng.gauss(0.0, gps_noise_m) * k_lon
+        elapsed, wp = t % motion.period, len(motion.legs)
+        for i, leg in enumerate(motion.legs):
+            if elapsed < leg[4]:
+                wp = i + 1
+                break
+            elapsed -= leg[4]
+        moving = t < drive
+        samples.append((t, lat, lon, (heading + rng.gauss(0.0, 1.0)) % 360.0, rng.gauss(0.0, 0.5),
+                        rng.gauss(0.0, 0.5), ("NAV" if moving else "HOLD", wp if moving else None)))
+        t += 1.0
+    return samples
+
+
+def _dist_m(a, b):
+    if None in (a[0], a[1], b[0], b[1]):
+        return 0.0
+    dy = (a[0] - b[0]) * EARTH_R_M * DEG
+    dx = (a[1] - b[1]) * EARTH_R_M * DEG * math.cos(a[0] * DEG)
+    return math.sqrt(dx * dx + dy * dy)
+
+
+def replay(samples, decide):
+    """decide(sample) -> reason or None for each sample; returns sent times, reasons and base-side error stats."""
+    sent, reasons, err = [], {}, []
+    last = None
+    for s in samples:
+        why = decide(s)
+        if why:
+            sent.append(s[0])
+            reasons[why] = reasons.get(why, 0) + 1
+            last = s
+        if last is not None:
+            err.append(_dist_m(s[1:3], last[1:3]))
+    err.sort()
+    gaps = [b - a for a, b in zip(sent, sent[1:])]
+    return {"frames": len(sent), "reasons": reasons, "max_gap_s": max(gaps) if gaps else 0.0,
+            "err_p95_m": err[int(0.95 * (len(err) - 1))] if err else 0.0, "err_max_m": err[-1] if err else 0.0}
+
+
+def fixed(period):
+    state = {"t": None}
+
+    def decide(s):
+        if state["t"] is None or s[0] - state["t"] >= period:
+            state["t"] = s[0]
+            return "period"
+        return None
+    return decide
+
+
+def adaptive(rate):
+    return lambda s: rate.update(*s)
+
+
+def fs_uplink(pico, rate):
+    """BotCarNode._on_pico_frame: fs_rate sees only the frames the Pico sent (mission state left out)."""
+    return lambda s: rate.update(*s[:6], None) if pico(s) else None
+
+
+def main():
+    ap = argparse.ArgumentParser(description="USB frames and FS uplink airtime saved by the motion-aware telemetry rate")
+    ap.add_argument("patrol", nargs="?", help="pi_bridge.py --record file (JSON lines)")
+    ap.add_argument("--simulate", action="store_true", help="simulated patrol instead of a recording")
+    ap.add_argument("--laps", type=int, default=3)
+    ap.add_argument("--park-s", type=float, default=1800.0, help="parked time after the laps (simulation)")
+    ap.add_argument("--speed", type=float, default=0.8, help="m/s (simulation)")
+    ap.add_argument("--dwell", type=float, default=5.0, help="stop at each waypoint, s (simulation)")
+    ap.add_argument("--gps-noise-m", type=float, default=1.0, help="per-fix GPS noise sigma (simulation)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--fixed-s", type=float, default=0.5, help="fixed period (TELEMETRY_MIN_S without report_rate.py)")
+    ap.add_argument("--min-s", type=float, default=0.5, help="TELEMETRY_MIN_S")
+    ap.add_argument("--max-s", type=float, nargs="+", default=[10.0, 30.0, 60.0], help="TELEMETRY_MAX_S values")
+    ap.add_argument("--move-m", type=float, default=3.0, help="MOTION_BAND_M")
+    ap.add_argument("--heading-deg", type=float, default=10.0, help="HEADING_CHANGE_DEG")
+    ap.add_argument("--tilt-deg", type=float, default=15.0, help="TILT_CHANGE_DEG")
+    ap.add_argument("--fs-min-s", type=float, default=5.0, help="fs_min_s (botcar_config.yaml)")
+    ap.add_argument("--fs-max-s", type=float, default=60.0, help="fs_max_s")
+    ap.add_argument("--fs-move-m", type=float, default=5.0, help="fs_move_m")
+    ap.add_argument("--fs-heading-deg", type=float, default=20.0, help="fs_heading_deg")
+    ap.add_argument("--node-id", type=int, default=2, help="node id in the FS payload")
+    ap.add_argument("--lora-parameter", default=DEFAULT_PARAMETER)
+    a = ap.parse_args()
+    if not a.simulate and not a.patrol:
+        ap.error("give a recorded patrol or --simulate")
+
+    if a.simulate:
+        samples = simulate_patrol(a.laps, a.park_s, a.speed, a.dwell, a.gps_noise_m, a.seed)
+        source = f"simulated: {a.laps} laps at {a.speed:g} m/s, parked {a.park_s:g}s, GPS noise {a.gps_noise_m:g} m"
+    else:
+        samples = load_patrol(a.patrol)
+        source = a.patrol
+    if len(samples) < 2:
+        print(f"[RateReport] {source}: not enough telemetry frames")
+        return 1
+    rf = RFParams.from_parameter(a.lora_parameter)
+    lat, lon = next(((s[1], s[2]) for s in samples if s[1] is not None), (0.0, 0.0))
+    fs_air = time_on_air(len(f"FS:{a.node_id}:359:{lat:.6f},{lon:.6f}"), rf)
+    span = samples[-1][0] - samples[0][0]
+
+    policies = [(f"fixed {a.fixed_s:g}s", lambda: fixed(a.fixed_s))]
+    for max_s in a.max_s:
+        policies.append((f"adaptive {a.min_s:g}-{max_s:g}s",
+                         lambda m=max_s: adaptive(ReportRate(a.min_s, m, a.move_m, a.heading_deg, a.tilt_deg))))
+
+    print(f"[RateReport] {source}; {len(samples)} fixes over {span / 60:.1f} min")
+    print("Pico -> Pi USB frames")
+    print(f"{'policy':>18s} {'frames':>7s} {'saved':>6s} {'max_gap_s':>9s} {'err_p95_m':>9s} {'err_max_m':>9s}  reasons")
+    base = None
+    for name, make in policies:
+        r = replay(samples, make())
+        base = base or r
+        saved = 1.0 - r["frames"] / max(base["frames"], 1)
+        reasons = " ".join(f"{k}={r['reasons'][k]}" for k in REASONS + ("period",) if k in r["reasons"])
+        print(f"{name:>18s} {r['frames']:7d} {100 * saved:5.1f}% "
+              f"{r['max_gap_s']:9.1f} {r['err_p95_m']:9.1f} {r['err_max_m']:9.1f}  {reasons}")
+
+    print(f"FS uplink (BotCarNode with pico_port, fs {a.fs_min_s:g}-{a.fs_max_s:g}s, {a.fs_move_m:g} m, "
+          f"{a.fs_heading_deg:g} deg); {rf}, FS frame {fs_air * 1e3:.0f} ms on air")
+    print(f"{'Pico policy':>18s} {'frames':>7s} {'airtime_s':>10s} {'duty':>6s} "
+          f"{'max_gap_s':>9s} {'err_p95_m':>9s} {'err_max_m':>9s}  reasons")
+    for name, make in policies:
+        rate = ReportRate(a.fs_min_s, a.fs_max_s, a.fs_move_m, a.fs_heading_deg)
+        r = replay(samples, fs_uplink(make(), rate))
+        air = r["frames"] * fs_air
+        reasons = " ".join(f"{k}={r['reasons'][k]}" for k in REASONS if k in r["reasons"])
+        print(f"{name:>18s} {r['frames']:7d} {air:10.1f} {100 * air / max(span, 1e-9):5.2f}% "
+              f"{r['max_gap_s']:9.1f} {r['err_p95_m']:9.1f} {r['err_max_m']:9.1f}  {reasons}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
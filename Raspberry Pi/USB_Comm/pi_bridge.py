@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: pi_bridge.py
+Description: Pi side of the Pico USB CDC link. Reads SensorFrame JSON lines from
+             the Pico, de-duplicates resends, and returns cumulative ACK:<seq>
+             lines so the Pico TransportLink can release its retransmit ring.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Common"))
+from tracing import ClockOffsetEstimator, TraceLog, make_trace_id
+
+SERIAL_PORT = "/dev/ttyACM0"
+BAUD_RATE = 115200
+CLOCK_SYNC_INTERVAL_S = 10.0
+
+
+class PicoLinkReceiver:
+    """
+    Sequence bookkeeping for frames arriving from TransportLink.
+    ACKs are cumulative: the highest seq below which everything has arrived.
+    A gap that is not filled within gap_timeout_s (the Pico gave up on it) is
+    skipped so the cumulative ACK keeps moving.
+    """
+
+    def __init__(self, gap_timeout_s=1.5, reorder_limit=32):
+        self.gap_timeout_s = gap_timeout_s
+        self.reorder_limit = reorder_limit
+        self.expected = None      # next seq needed for contiguity
+        self.above = set()        # received seqs beyond a gap (bounded)
+        self.gap_since = None
+        self.duplicates = 0
+        self.skipped = 0
+
+    def _advance(self):
+        while self.expected in self.above:
+            self.above.discard(self.expected)
+            self.expected += 1
+        if not self.above:
+            self.gap_since = None
+
+    def _skip_gap(self):
+        lowest = min(self.above)
+        self.skipped += lowest - self.expected
+        self.expected = lowest
+        self._advance()
+
+    def on_frame(self, frame, now=None):
+        """
+        Account for one decoded frame.
+        Returns (frame_or_None, ack_seq_or_None); frame is None for duplicates.
+        """
+        now = time.monotonic() if now is None else now
+        seq = frame.get("seq")
+        if not isinstance(seq, int):
+            return frame, None
+
+        # First frame, Pico restart (hello), or seq far behind: re-anchor
+        if (self.expected is None or frame.get("type") == "hello"
+                or seq < self.expected - 1024):
+            self.expected = seq
+            self.above.clear()
+            self.gap_since = None
+
+        if seq < self.expected or seq in self.above:
+            # Resend of something we already have: our ACK was lost, repeat it
+            self.duplicates += 1
+            return None, self.expected - 1
+
+        self.above.add(seq)
+        if seq != self.expected and self.gap_since is None:
+            self.gap_since = now
+        self._advance()
+
+        if self.above and (len(self.above) > self.reorder_limit
+                           or now - self.gap_since > self.gap_timeout_s):
+            self._skip_gap()
+
+        return frame, self.expected - 1
+
+    def poll(self, now=None):
+        """Skip a stale gap even when no new frames arrive. Returns ack_seq or None."""
+        now = time.monotonic() if now is None else now
+        if self.above and now - self.gap_since > self.gap_timeout_s:
+            self._skip_gap()
+            return self.expected - 1
+        return None
+
+
+class PiBridge:
+    """
+    One Pi-side link endpoint: reads Pico lines from a serial-like port, ACKs
+    them through PicoLinkReceiver, answers clock sync, and optionally traces.
+    send_command() writes a {"cmd", "seq", ...} line the Pico answers with a
+    mission:M frame. Works with pyserial or any object exposing readline()/write().
+    """
+
+    def __init__(self, ser, node_id=None, tracer=None, verbose=True):
+        self.ser = ser
+        self.node_id = node_id
+        self.tracer = tracer
+        self.verbose = verbose
+        self.receiver = PicoLinkReceiver()
+        self.clock = ClockOffsetEstimator()
+        self.next_sync = 0.0
+        self.frames = 0
+        self.on_frame = None  # optional callback(frame) for delivered frames (frame["tid"] set when tracing)
+        self.cmd_seq = 0
+        self.write_lock = threading.Lock()  # ACKs from the service loop, commands from any thread
+
+    def _write(self, line):
+        with self.write_lock:
+            self.ser.write(line.encode("utf-8"))
+
+    def send_command(self, name, **fields):
+        """Send {"cmd": name, "seq": n, **fields} to the Pico; returns n (echoed as ack_seq)."""
+        with self.write_lock:
+            self.cmd_seq += 1
+            seq = self.cmd_seq
+            line = json.dumps(dict(fields, cmd=name, seq=seq), separators=(",", ":"))
+            self.ser.write((line + "\r\n").encode("utf-8"))
+        return seq
+
+    def _handle_pong(self, line, now):
+        # TPONG:<t0>:<t1>:<t2> (t1/t2 on the Pico clock)
+        try:
+            t0, t1, t2 = (float(x) for x in line[6:].split(":"))
+        except ValueError:
+            return
+        self.clock.add_sample(t0, t1, t2, now)
+        offset, delay = self.clock.best()
+        if self.tracer:
+            # estimator gives pico - pi; the log wants t_pi = t_pico + x
+            self.tracer.offset("pico", "pi", -offset, delay)
+
+    def service_once(self):
+        """Read at most one line and do the bookkeeping for it."""
+        raw = self.ser.readline()
+        now = time.monotonic()
+        ack_seq = None
+        if raw:
+            line = raw.decode("utf-8", errors="ignore").strip()
+            if line.startswith("TPONG:"):
+                self._handle_pong(line, now)
+                return
+            try:
+                frame = json.loads(line)
+            except ValueError:
+                if self.verbose:
+                    print(f"[PiBridge] Non-JSON from Pico: {line}")
+                return
+            frame, ack_seq = self.receiver.on_frame(frame, now)
+            if frame is not None:
+                self.frames += 1
+                if self.tracer and isinstance(frame.get("seq"), int):
+                    tid = make_trace_id(self.node_id, frame["seq"])
+                    frame["tid"] = tid  # the id an uplink carries on (BotCarNode's FS), so the hops join
+                    if "ts" in frame:
+                        self.tracer.hop(tid, "pico_tx", frame["ts"], "pico")
+                    self.tracer.hop(tid, "pi_rx", now)
+                if self.on_frame:
+                    self.on_frame(frame)
+                if self.verbose:
+                    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    print(f"[{ts}] {frame.get('type')} seq={frame.get('seq')}")
+        else:
+            ack_seq = self.receiver.poll(now)
+        if ack_seq is not None and ack_seq >= 0:
+            self._write(f"ACK:{ack_seq}\r\n")
+        if self.tracer and now >= self.next_sync:
+            self.next_sync = now + CLOCK_SYNC_INTERVAL_S
+            self._write(f"TPING:{time.monotonic():.6f}\r\n")
+
+
+def run_bridge(port=SERIAL_PORT, baud=BAUD_RATE, node_id=None, trace_dir=None, record=None):
+    import serial
+
+    tracer = TraceLog(trace_dir, f"pi_{node_id}", "pi") if trace_dir else None
+    ser = serial.Serial(port, baud, timeout=0.1)
+    bridge = PiBridge(ser, node_id, tracer)
+    rec = open(record, "a") if record else None
+    if rec:
+        # One delivered frame per line, e.g. a patrol for ../Tools/telemetry_rate_report.py
+        bridge.on_frame = lambda frame: rec.write(json.dumps(frame, separators=(",", ":")) + "\n")
+        print(f"[PiBridge] Recording frames to {record}")
+    print(f"[PiBridge] Connected to {port} at {baud} baud.")
+    try:
+        while True:
+            bridge.service_once()
+    except KeyboardInterrupt:
+        print("[PiBridge] Stopped by user.")
+    finally:
+        ser.close()
+        if tracer:
+            tracer.close()
+        if rec:
+            rec.close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Pi side of the Pico USB CDC link")
+    ap.add_argument("--port", default=SERIAL_PORT)
+    ap.add_argument("--baud", type=int, default=BAUD_RATE)
+    ap.add_argument("--node-id", type=int, default=None, help="LoRa node_id, used in trace ids")
+    ap.add_argument("--trace-dir", default=None, help="enable latency tracing into this directory")
+    ap.add_argument("--record", default=None, help="append delivered frames to this JSON-lines file")
+    args = ap.parse_args()
+    run_bridge(args.port, args.baud, args.node_id, args.trace_dir, args.record)
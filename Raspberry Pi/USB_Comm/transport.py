@@ -1,6 +1,6 @@
 # Transport.py - USB CDC communication handler for Pico→Pi
-# Version: 1.0
-# Date: 2026-01-14
+# Version: 1.1 (adds TransportLink)
+# Date: 2026-10-19
 # Author: Gunny / Claude
 
 import usb_cdc
@@ -42,10 +42,27 @@ class PicoTransport:
         try:
             # Convert to compact JSON with newline terminator
             message = json.dumps(telemetry_dict, separators=(",", ":")) + "\n"
-            usb_cdc.data.write(message.encode('utf-8'))
+            return self.send_raw(message.encode('utf-8'))
+        except Exception as e:
+            print(f"[Transport] Send error: {e}")
+            return False
+    
+    def send_raw(self, line_bytes):
+        """
+        Write an already-encoded, newline-terminated frame to the Pi.
+        Used by TransportLink to resend stored frames without re-encoding.
+        
+        Returns:
+            bool: True if written, False otherwise
+        """
+        if not self.enabled:
+            return False
+        
+        try:
+            usb_cdc.data.write(line_bytes)
             
             if self.debug:
-                print(f"[Transport] Sent: {message.strip()}")
+                print(f"[Transport] Sent: {line_bytes.strip()}")
             
             return True
         except Exception as e:
@@ -84,4 +101,183 @@ class PicoTransport:
     
     def is_ready(self):
         """Check if transport is enabled and ready."""
-        return self.enabled
\ No newline at end of file
+        return self.enabled
+
+class TransportLink:
+    """
+    Reliable framing layer on top of PicoTransport.
+    Stamps each frame with a seq, keeps it in a fixed-size ring until the Pi
+    returns a cumulative ACK:<seq>, and resends on timeout with bounded retries.
+    Priority frames (type "priority:P" or priority=True) use a shorter ACK window
+    and are always resent ahead of ordinary frames.
+    
+    Memory is bounded by window * max_frame_bytes; the ring is allocated once.
+    """
+    
+    def __init__(self, transport, window=16, ack_timeout_s=0.25, priority_timeout_s=0.05,
+                 max_retries=3, max_frame_bytes=512, debug=False):
+        self.transport = transport
+        self.window = window
+        self.ack_timeout_s = ack_timeout_s
+        self.priority_timeout_s = priority_timeout_s
+        self.max_retries = max_retries
+        self.max_frame_bytes = max_frame_bytes
+        self.debug = debug
+        
+        self.next_seq = 0
+        self.last_ack = -1
+        
+        # Fixed ring of unACKed frames (parallel lists; a None seq marks a free slot)
+        self._seq = [None] * window
+        self._line = [None] * window
+        self._sent_at = [0.0] * window
+        self._tries = [0] * window
+        self._prio = [False] * window
+        self._count = 0
+        
+        # Counters for diagnostics
+        self.stats = {"sent": 0, "resent": 0, "acked": 0, "evicted": 0, "expired": 0, "oversize": 0}
+    
+    # ---------- Ring helpers ----------
+    def _free_slot(self, i):
+        self._seq[i] = None
+        self._line[i] = None
+        self._count -= 1
+    
+    def _claim_slot(self):
+        """Return a free slot index, evicting the oldest ordinary frame if the ring is full."""
+        if self._count < self.window:
+            for i in range(self.window):
+                if self._seq[i] is None:
+                    return i
+        # Ring full: drop the oldest non-priority frame (or the oldest overall)
+        victim = None
+        for i in range(self.window):
+            if self._prio[i]:
+                continue
+            if victim is None or self._seq[i] < self._seq[victim]:
+                victim = i
+        if victim is None:
+            for i in range(self.window):
+                if victim is None or self._seq[i] < self._seq[victim]:
+                    victim = i
+        if self.debug:
+            print(f"[Link] Ring full; evicting seq {self._seq[victim]}")
+        self._free_slot(victim)
+        self.stats["evicted"] += 1
+        return victim
+    
+    # ---------- Public API ----------
+    def send(self, frame, priority=False):
+        """
+        Stamp frame["seq"], transmit it, and hold it for retransmit until ACKed.
+        
+        Args:
+            frame: Dictionary in SensorFrame form (mutated with "seq")
+            priority: Force priority handling (also implied by type "priority:P")
+        
+        Returns:
+            int: The seq assigned, or None if the transport is not ready
+        """
+        if not self.transport.is_ready():
+            return None
+        
+        seq = self.next_seq
+        self.next_seq += 1
+        frame["seq"] = seq
+        line = (json.dumps(frame, separators=(",", ":")) + "\n").encode('utf-8')
+        if not priority:
+            priority = str(frame.get("type", "")).startswith("priority")
+        
+        if len(line) > self.max_frame_bytes:
+            # Too large to retain; send best-effort so the ring stays bounded
+            self.stats["oversize"] += 1
+            self.transport.send_raw(line)
+            return seq
+        
+        i = self._claim_slot()
+        self._seq[i] = seq
+        self._line[i] = line
+        self._sent_at[i] = time.monotonic()
+        self._tries[i] = 1
+        self._prio[i] = priority
+        self._count += 1
+        
+        self.transport.send_raw(line)
+        self.stats["sent"] += 1
+        return seq
+    
+    def handle_ack(self, acked_seq):
+        """Release every held frame with seq <= acked_seq (cumulative ACK)."""
+        if acked_seq <= self.last_ack:
+            return 0
+        self.last_ack = acked_seq
+        released = 0
+        for i in range(self.window):
+            s = self._seq[i]
+            if s is not None and s <= acked_seq:
+                self._free_slot(i)
+                released += 1
+        self.stats["acked"] += released
+        return released
+    
+    def _resend_due(self, now, want_prio):
+        # Oldest-first within a class keeps the Pi's cumulative window moving
+        while True:
+            pick = None
+            for i in range(self.window):
+                if self._seq[i] is None or self._prio[i] != want_prio:
+                    continue
+                timeout = self.priority_timeout_s if want_prio else self.ack_timeout_s
+                if now - self._sent_at[i] < timeout:
+                    continue
+                if pick is None or self._seq[i] < self._seq[pick]:
+                    pick = i
+            if pick is None:
+                return
+            if self._tries[pick] > self.max_retries:
+                if self.debug:
+                    print(f"[Link] seq {self._seq[pick]} expired after {self.max_retries} retries")
+                self._free_slot(pick)
+                self.stats["expired"] += 1
+                continue
+            self._tries[pick] += 1
+            self._sent_at[pick] = now
+            self.transport.send_raw(self._line[pick])
+            self.stats["resent"] += 1
+    
+    def poll(self, max_lines=8):
+        """
+        Service the link: consume ACK:<seq> lines, answer TPING clock probes,
+        then resend overdue frames (priority first). Call once per main-loop tick.
+        
+        Returns:
+            str: First non-ACK line from the Pi (a command), or None
+        """
+        command = None
+        for _ in range(max_lines):
+            line = self.transport.receive_command()
+            if not line:
+                break
+            if line.startswith("ACK:"):
+                try:
+                    self.handle_ack(int(line[4:]))
+                except ValueError:
+                    pass
+                continue
+            if line.startswith("TPING:"):
+                # Clock-offset probe from the Pi: echo t0 with our receive/send times
+                t1 = time.monotonic()
+                self.transport.send_raw(f"TPONG:{line[6:]}:{t1:.4f}:{time.monotonic():.4f}\n".encode('utf-8'))
+                continue
+            command = line
+            break
+        
+        now = time.monotonic()
+        self._resend_due(now, True)
+        self._resend_due(now, False)
+        return command
+    
+    def pending(self):
+        """Number of frames awaiting ACK."""
+        return self._count
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project: AMU / botCar
+File: _AsyncBotCarNode.py
+Description: BotCarNode on a single asyncio event loop (node_core: asyncio).
+             Registration, route upload, heartbeat and alerts run as
+             concurrent tasks, so a PR alert no longer waits behind a
+             waypoint's ACK window. Each exchange waits on its own future,
+             keyed by the ACK it expects (ACKREG, ACK:<id>:<i>, ACKPR); frames
+             from the radio reader are handed to the loop, so all node logic
+             (ACK matching, DN, DR, clock pongs) runs on the loop thread.
+             Same YAML, start()/stop(), log lines and metrics as BotCarNode;
+             the RYLR998 driver still owns the serial port with its own
+             reader and writer threads.
+
+Version: v1.0.0
+Date: 2026-10-19
+Author: Steven Westermire (Maddog / Gunny)
+
+Copyright (c) 2026 Steven Westermire. All rights reserved.
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+from _BotCarNode import BotCarNode
+from fse import MISSION
+from report_rate import ReportRate
+from rylr998 import PRIO_HIGH, PRIO_NORMAL
+from tracing import format_ping, split_trace
+
+
+class AsyncBotCarNode(BotCarNode):
+    def __init__(self, config_path="botcar_config.yaml"):
+        super().__init__(config_path)
+        # MS:<id>:<state>:HB once registered (heartbeat_interval 0 = off): at once on a mission state
+        # change or alert (no faster than heartbeat_min_s), then backing off to one every heartbeat_interval
+        self.heartbeat_interval = float(self.config.get("heartbeat_interval", 60))
+        self.heartbeat_min_s = min(float(self.config.get("heartbeat_min_s", 5)), self.heartbeat_interval)
+        self.hb_rate = ReportRate(self.heartbeat_min_s, self.heartbeat_interval, move_m=0) \
+            if self.heartbeat_interval > 0 else None
+        self.hb_wake = None            # asyncio.Event: state change or alert, re-check the heartbeat rate
+        self.loop = None
+        self.tasks = set()
+        self.registered = None         # asyncio.Event: registration ACKed or given up
+        self._waiters = {}             # expected ACK -> [asyncio.Future, ...]
+        self._clock_waiter = None
+
+    # -------------------- Loop plumbing --------------------
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            pending = [t for t in asyncio.all_tasks(self.loop) if not t.done()]
+            for t in pending:
+                t.cancel()
+            if pending:
+                self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.close()
+
+    def _spawn(self, coro, name):
+        """Start a task on the loop (loop thread only); failures are printed, not lost."""
+        task = self.loop.create_task(coro, name=f"{name}_{self.node_id}")
+        self.tasks.add(task)
+        task.add_done_callback(self._on_task_done)
+        return task
+
+    def _on_task_done(self, task):
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"[Node {self.node_id}] Task {task.get_name()} failed: {task.exception()!r}")
+
+    def _threadsafe(self, fn, *args):
+        """Hand a call to the loop from another thread; dropped once the loop is closed."""
+        try:
+            self.loop.call_soon_threadsafe(fn, *args)
+        except RuntimeError:
+            pass
+
+    def _call_later(self, delay, fn, *args):
+        self.loop.call_later(delay, fn, *args)
+
+    def _run_worker(self, fn, *args):
+        self._spawn(asyncio.to_thread(fn, *args), "PLAN")
+
+    def _on_air(self, fut):
+        """Awaitable for a radio TxFuture (completed on the driver's writer thread)."""
+        done = self.loop.create_future()
+
+        def resolve(_):
+            if not done.done():
+                done.set_result(None)
+
+        fut.add_done_callback(lambda f: self._threadsafe(resolve, f))
+        return done
+
+    # -------------------- RX (reader thread -> loop) --------------------
+    def _handle_rx_line(self, line: str, t_rx=None):
+        if not line.startswith("+RCV="):
+            return
+        self._threadsafe(super()._handle_rx_line, line, time.monotonic() if t_rx is None else t_rx)
+
+    def _on_ack_frame(self, msg, rssi, snr, t_rx, peer):
+        waiters = self._waiters.get(msg)
+        if not waiters:
+            return
+        self._note_ack(msg, rssi, snr, t_rx, peer)
+        for w in waiters:
+            if not w.done():
+                w.set_result((rssi, snr, t_rx))
+
+    def _handle_clock_pong(self, msg, t_rx):
+        super()._handle_clock_pong(msg, t_rx)
+        if self._clock_waiter is not None and not self._clock_waiter.done() and self.clock_event.is_set():
+            self._clock_waiter.set_result(True)
+
+    # -------------------- Exchanges --------------------
+    async def _exchange(self, kind, msg, ack, timeout, attempt, priority=PRIO_NORMAL):
+        """One attempt: send msg, wait until it is on air, then up to timeout for ack. Returns True if ACKed."""
+        waiter = self.loop.create_future()
+        self._waiters.setdefault(ack, []).append(waiter)
+        try:
+            fut = self._send_to_base(msg, priority)
+            await self._on_air(fut)  # ACK timer starts once the frame is on air (may be held by the budget)
+            try:
+                self.last_rssi, self.last_snr, self.last_ack_t = await asyncio.wait_for(waiter, timeout)
+                acknowledged = True
+            except asyncio.TimeoutError:
+                acknowledged = False
+        finally:
+            waiters = self._waiters.get(ack)
+            if waiters is not None:
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._waiters[ack]
+        self._record_exchange(kind, fut, acknowledged, attempt)
+        self._adr_after_exchange(acknowledged)
+        return acknowledged
+
+    async def _register_task(self):
+        reg_msg = f"REG:{self.node_id}"
+        try:
+            for attempt in range(1, self.max_retries + 1):
+                ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                print(f"[Node {self.node_id}] REG attempt {attempt}")
+                acknowledged = await self._exchange("REG", reg_msg, f"ACKREG:{self.node_id}", 5.0, attempt)
+                self._log_exchange(ts, "REG", None, None, None, "Received" if acknowledged else "Timeout")
+                if acknowledged:
+                    print(f"[Node {self.node_id}] Registration acknowledged.")
+                    return
+                delay = self._compute_retry_delay(attempt)
+                print(f"[Node {self.node_id}] REG backoff {delay}s...")
+                await asyncio.sleep(delay)
+            print(f"[Node {self.node_id}] REG failed after {self.max_retries} attempts")
+        finally:
+            self.registered.set()   # like the threaded node, the route goes out either way
+
+    async def _send_waypoint_async(self, i, lat, lon, msg):
+        """Send one waypoint until ACKed or max_retries attempts (with backoff); returns True if ACKed."""
+        tid = split_trace(msg)[1]
+        for attempt in range(1, self.max_retries + 1):
+            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"[Node {self.node_id} TX] WP {i}, attempt {attempt}")
+            if self.tracer and tid:
+                self.tracer.hop(tid, "lora_tx")
+            acknowledged = await self._exchange("WP", msg, f"ACK:{self.node_id}:{i}",
+                                                self._ack_timeout_for_payload(msg), attempt)
+            self._log_exchange(ts, "WAYPOINT", i, lat, lon, "Received" if acknowledged else "Timeout")
+            if acknowledged:
+                print(f"[Node {self.node_id} SUCCESS] WP {i} acknowledged.")
+                return True
+            if attempt < self.max_retries or self.spool is None:
+                delay = self._compute_retry_delay(attempt)
+                print(f"[Node {self.node_id}] WP {i} backoff {delay}s before retry...")
+                await asyncio.sleep(delay)
+        return False
+
+    async def _route_task(self):
+        await self.registered.wait()
+        if self.spool is not None:
+            self._spool_waypoints()
+            await self._drain_spool_async()
+            return
+
+        for i, (lat, lon) in enumerate(self.waypoints):
+            await self._maybe_sync_clock_async()
+            delivered = await self._send_waypoint_async(i, lat, lon, self._waypoint_payload(i, lat, lon))
+            if not delivered:
+                print(f"[Node {self.node_id}] WP {i} failed after {self.max_retries} retries")
+            if delivered and self.tx_interval > 0:
+                print(f"[Node {self.node_id}] Waiting tx_interval={self.tx_interval}s before next WP...")
+                await asyncio.sleep(self.tx_interval)
+
+    async def _drain_spool_async(self):
+        """BotCarNode._drain_spool on the loop: keep the head through an outage, then catch up back to back."""
+        catching_up = False
+        while True:
+            rec = self.spool.peek()
+            if rec is None:
+                self._spool_drained(catching_up)
+                return
+            seq, _, msg = rec
+            await self._maybe_sync_clock_async()
+            body = split_trace(msg)[0]
+            try:
+                _, idx, coords = body.split(":", 2)
+                i = int(idx)
+                lat, lon = (float(v) for v in coords.split(","))
+            except ValueError:
+                print(f"[Node {self.node_id}] Spool: dropping unreadable record {seq}: {msg!r}")
+                self.spool.ack(seq)
+                continue
+
+            if not await self._send_waypoint_async(i, lat, lon, msg):
+                if self.outage_since is None:
+                    self.outage_since = time.time()
+                    print(f"[Node {self.node_id}] WP {i} kept in spool after {self.max_retries} retries; "
+                          f"link down, backlog {self.spool.format_backlog()}")
+                delay = self._compute_retry_delay(self.max_retries)
+                print(f"[Node {self.node_id}] Spool: probing again in {delay}s")
+                await asyncio.sleep(delay)
+                continue
+
+            self.spool.ack(seq)
+            if self.outage_since is not None:
+                print(f"[Node {self.node_id}] Link back after {time.time() - self.outage_since:.0f}s; "
+                      f"draining {self.spool.format_backlog()}")
+                self.write_txt_log(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] node_id={self.node_id}, "
+                                   f"type=SPOOL, outage_s={time.time() - self.outage_since:.0f}, "
+                                   f"backlog={len(self.spool)}")
+                self.outage_since = None
+                catching_up = True
+            elif not catching_up and self.tx_interval > 0 and len(self.spool):
+                print(f"[Node {self.node_id}] Waiting tx_interval={self.tx_interval}s before next WP...")
+                await asyncio.sleep(self.tx_interval)
+
+    async def _heartbeat_task(self):
+        """
+        Mission state heartbeat; the base logs MS frames and does not ACK them. The Pico's
+        report_rate.py policy without the motion inputs (the Pi has no GPS / IMU feed here):
+        a state change or alert goes out once min_s allows, a quiet unit backs off to max_s.
+        """
+        rate = self.hb_rate
+        await self.registered.wait()
+        while True:
+            state = MISSION.states[self.mission.state]
+            if rate.update(time.monotonic(), None, None, state=state):
+                self._send_to_base(f"MS:{self.node_id}:{state}:HB")
+            self.hb_wake.clear()
+            try:
+                await asyncio.wait_for(self.hb_wake.wait(), max(0.0, rate.t_last + rate.interval - time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.sleep(max(0.0, rate.t_last + rate.min_s - time.monotonic()))
+
+    def _wake_heartbeat(self, alert=False):
+        if self.hb_rate is None or self.hb_wake is None:
+            return
+        if alert:
+            self.hb_rate.alert()
+        self.hb_wake.set()
+
+    def _on_mission_transition(self, old, event, new):
+        super()._on_mission_transition(old, event, new)
+        if self.loop is not None:
+            self._threadsafe(self._wake_heartbeat)
+
+    async def _alert_task(self, code, args):
+        """PR:<id>:<code>[:args] until ACKPR:<id>:<code> or max_retries attempts."""
+        await self.registered.wait()
+        msg = f"PR:{self.node_id}:{code}" + (f":{args}" if args else "")
+        for attempt in range(1, self.max_retries + 1):
+            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"[Node {self.node_id} TX] PR {code}, attempt {attempt}")
+            acknowledged = await self._exchange("PR", msg, f"ACKPR:{self.node_id}:{code}", 5.0, attempt, PRIO_HIGH)
+            self.write_txt_log(
+                f"[{ts}] node_id={self.node_id}, type=PR, code={code}, args={args or 'N/A'}, "
+                f"RSSI={self.last_rssi if self.last_rssi is not None else 'N/A'}, "
+                f"SNR={self.last_snr if self.last_snr is not None else 'N/A'}, "
+                f"ACK={'Received' if acknowledged else 'Timeout'}"
+            )
+            if acknowledged:
+                print(f"[Node {self.node_id} SUCCESS] PR {code} acknowledged.")
+                return True
+            if attempt < self.max_retries:
+                delay = self._compute_retry_delay(attempt)
+                print(f"[Node {self.node_id}] PR {code} backoff {delay}s before retry...")
+                await asyncio.sleep(delay)
+        print(f"[Node {self.node_id}] PR {code} failed after {self.max_retries} attempts")
+        return False
+
+    def alert(self, code, args=""):
+        """Send a PR alert alongside the route upload; safe to call from any thread."""
+        if self.loop is None or not self.running:
+            print(f"[Node {self.node_id}] Not running; alert {code} dropped")
+            return
+        code, args = str(code).strip(), str(args or "")
+        self._threadsafe(lambda: self._spawn(self._alert_task(code, args), "PR"))
+        self._threadsafe(self._wake_heartbeat, True)
+
+    # -------------------- Clock sync (tracing) --------------------
+    async def _maybe_sync_clock_async(self, timeout=2.0):
+        if not (self.tracer and self.clock_sync_interval > 0 and time.monotonic() >= self._next_clock_sync):
+            return
+        self.clock_event.clear()
+        self._clock_waiter = self.loop.create_future()
+        self._send_to_base(format_ping(self.node_id, time.monotonic()))
+        self._next_clock_sync = time.monotonic() + self.clock_sync_interval
+        try:
+            await asyncio.wait_for(self._clock_waiter, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._clock_waiter = None
+
+    # -------------------- Lifecycle --------------------
+    def _start_tasks(self):
+        self.registered = asyncio.Event()
+        self.hb_wake = asyncio.Event()
+        self._spawn(self._register_task(), "REG")
+        self._spawn(self._route_task(), "WP_TX")
+        if self.heartbeat_interval > 0:
+            self._spawn(self._heartbeat_task(), "HB")
+
+    def start(self):
+        """Returns once the loop is running; registration and the route go on as tasks."""
+        if not self._start_radio():
+            return
+        self.loop = asyncio.new_event_loop()
+        self.tx_thread = threading.Thread(target=self._run_loop, name=f"LOOP_{self.node_id}", daemon=True)
+        self.tx_thread.start()
+        self._threadsafe(self._start_tasks)
+
+    def stop(self):
+        self.running = False
+        if self.loop is not None:
+            self._threadsafe(self.loop.stop)   # _run_loop cancels what is still pending
+            if self.tx_thread and self.tx_thread.is_alive():
+                self.tx_thread.join(timeout=1.5)
+        super().stop()
@@ -24,8 +24,30 @@ import yaml
 import os
 import csv
 import random
+import sys
+import zlib
+from collections import OrderedDict
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Common"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "USB_Comm"))
+from adr import DEFAULT_LADDER, NodeRate, normalize
+from airtime_meter import AirtimeMeter, message_kind
+from at_command import ATEngine, format_setup
+from downlink import format_dn_ack, parse_dn
+from fse import FSE, MISSION
+from lora_airtime import DEFAULT_PARAMETER, RFParams
+from metrics import COUNT_BUCKETS, RSSI_BUCKETS, SNR_BUCKETS, Registry, timed
+from path_planner import GridMap, ReturnHomePlanner
+from pi_bridge import PiBridge
+from report_rate import ReportRate
+from route_prep import format_report, prepare_route
+from rylr998 import PRIO_HIGH, PRIO_NORMAL, RYLR998
+from serial_capture import maybe_tap
+from spool import Spool, SpoolError
+from tracing import (ClockOffsetEstimator, TraceLog, attach_trace, format_ping,
+                     make_trace_id, parse_pong, split_trace)
+
 class BotCarNode:
     def __init__(self, config_path="botcar_config.yaml"):
         # Load configuration (snake_case expected)
@@ -39,6 +61,7 @@ class BotCarNode:
         self.baud          = int(self.config.get("baud_rate", 115200))
         self.network_id    = int(self.config.get("network_id", 6))
         self.band          = int(self.config.get("band", 915000000))
+        self.at_timeout    = float(self.config.get("at_timeout", 0.3))  # per AT command reply
 
         # Mission and transmission controls
         self.role          = str(self.config.get("role", "scout"))
@@ -47,6 +70,52 @@ class BotCarNode:
         self.tx_interval   = float(self.config.get("tx_interval", 0))  # optional spacing between ACKed waypoints
         self.max_retries   = int(self.config.get("max_retries", 3))
 
+        # Route preprocessing before upload (see ../Common/route_prep.py)
+        self.route_simplify_m = float(self.config.get("route_simplify_m", 0))
+        _dec = self.config.get("route_precision_decimals", 6)
+        self.route_decimals = int(_dec) if _dec is not None else None
+        _close = self.config.get("route_drop_closing", False)
+        self.route_drop_closing = bool(_close) if isinstance(_close, bool) else str(_close).strip().upper() == "Y"
+        self.lora_parameter = str(self.config.get("lora_parameter", DEFAULT_PARAMETER))
+        self.rf = RFParams.from_parameter(self.lora_parameter)
+
+        # Adaptive data rate: follow the base's DR commands; scan profiles after repeated ACK timeouts
+        _adr = self.config.get("adr", False)
+        self.adr_enabled = bool(_adr) if isinstance(_adr, bool) else str(_adr).strip().upper() == "Y"
+        self.adr = NodeRate(self.config.get("adr_profiles") or DEFAULT_LADDER, self.lora_parameter,
+                            self.lora_parameter, int(self.config.get("adr_fallback_timeouts", 3))) \
+            if self.adr_enabled else None
+
+        # Airtime accounting; a duty-cycle budget holds waypoints/REG (never ACK-class traffic)
+        self.duty_cycle_pct = float(self.config.get("duty_cycle_pct", 0))
+        self.meter = AirtimeMeter(self.rf, float(self.config.get("airtime_window_s", 3600)),
+                                  duty_cycle=self.duty_cycle_pct / 100.0)
+
+        # Outbound spool: waypoints wait on disk until the base ACKs them (see ../Common/spool.py)
+        _spool = self.config.get("spool", True)
+        self.spool_enabled = bool(_spool) if isinstance(_spool, bool) else str(_spool).strip().upper() == "Y"
+        _ssync = self.config.get("spool_sync", True)
+        self.spool_sync = bool(_ssync) if isinstance(_ssync, bool) else str(_ssync).strip().upper() == "Y"
+        self.spool_path = str(self.config.get("spool_path", "./spool/{node_label}.amuspool")).format(node_label=self.node_label)
+        self.spool = None
+        if self.spool_enabled:
+            try:
+                self.spool = Spool(self.spool_path, int(self.config.get("spool_bytes", 1 << 20)), sync=self.spool_sync)
+                if self.spool.recovered or self.spool.cut_bytes:
+                    print(f"[Node {self.node_id}] Spool recovery: {self.spool.recovered} record(s) past the saved head, "
+                          f"{self.spool.cut_bytes} torn byte(s) cut")
+                if len(self.spool):
+                    print(f"[Node {self.node_id}] Spool {self.spool_path}: {self.spool.format_backlog()}")
+            except (OSError, SpoolError) as e:
+                print(f"[Node {self.node_id}] Spool not opened ({e}); undelivered waypoints will not survive a restart")
+        self.outage_since = None
+
+        # Metrics endpoint (Prometheus text on metrics_port, 0 = off; started in start())
+        self.metrics_port = int(self.config.get("metrics_port", 9109))
+        self.metrics_bind = str(self.config.get("metrics_bind", "127.0.0.1"))
+        self.metrics_server = None
+        self._init_metrics()
+
         # --- YAML-driven retry window (BASE for exponential backoff) ---
         self.retry_min     = int(self.config.get("retry_delay_min", 15))
         self.retry_max     = int(self.config.get("retry_delay_max", 80))
@@ -79,9 +148,71 @@ class BotCarNode:
         if self.csv_logging and self.csv_log_path:
             print(f"[BotCarNode] Mission CSV log: {self.csv_log_path}")
 
+        # Route prep (quantize, dedupe, simplify) before upload
+        self.route_report = None
+        if self.waypoints:
+            self.waypoints, self.route_report = prepare_route(
+                self.waypoints, self.route_simplify_m, self.route_decimals,
+                self.route_drop_closing, self.node_id, self.rf)
+            print(f"[BotCarNode] Route prep: {format_report(self.route_report)}")
+
+        # RETURN_HOME planner: keep-out zones on a grid around home (distance field built on first use)
+        home = self.config.get("home") or (self.waypoints[0] if self.waypoints else None)
+        self.planner = None
+        self.plan_lock = threading.Lock()   # planning runs on a worker; keep-out edits wait for it
+        if home:
+            grid = GridMap(home,
+                           half_size_m=float(self.config.get("planner_half_size_m", 300)),
+                           cell_m=float(self.config.get("planner_cell_m", 2.0)),
+                           clearance_m=float(self.config.get("planner_clearance_m", 0.5)))
+            for name, poly in (self.config.get("keep_out") or {}).items():
+                try:
+                    grid.add_keep_out(name, poly)
+                except Exception as e:
+                    print(f"[BotCarNode] Keep-out '{name}' ignored: {e}")
+            self.planner = ReturnHomePlanner(grid)
+
+        # Mission state engine: every base command is gated against the current state
+        self.mission = FSE(MISSION, on_transition=self._on_mission_transition)
+        # Recent DN (seq, type, payload) -> (admitted, t): a retried command is ACKed again but not run twice.
+        # Entries expire after dn_dedupe_s so a restarted base (seq from 1 again) is not mistaken for a retry.
+        self.dn_seen = OrderedDict()
+        self.dn_dedupe_s = float(self.config.get("dn_dedupe_s", 120))
+        # Incident this unit was dispatched to by DN:ASSIST: (incident_id, lat, lon); None once it leaves ASSIST
+        self.assist = None
+
+        # Latency tracing (trace id trailer on LoRa payloads + LoRa clock sync)
+        _trace = self.config.get("trace_logging", False)
+        self.trace_logging = bool(_trace) if isinstance(_trace, bool) else str(_trace).strip().upper() == "Y"
+        self.clock_sync_interval = float(self.config.get("clock_sync_interval", 60))
+        self.tracer = TraceLog(self.log_dir, self.node_label, "pi") if self.trace_logging else None
+        self.base_clock = ClockOffsetEstimator()
+        self.clock_event = threading.Event()
+        self._next_clock_sync = 0.0
+        if self.tracer:
+            print(f"[BotCarNode] Trace log: {self.tracer.path}")
+
+        # FS uplink: Pico SensorFrames over USB (pi_bridge.PiBridge in-process) become
+        # FS:<id>:<yaw>:<lat>,<lon> frames to the base, paced by report_rate.py; "" = no Pico link
+        self.pico_port = str(self.config.get("pico_port", "") or "")
+        self.pico_baud = int(self.config.get("pico_baud", 115200))
+        self.fs_rate = ReportRate(min_s=float(self.config.get("fs_min_s", 5)),
+                                  max_s=float(self.config.get("fs_max_s", 60)),
+                                  move_m=float(self.config.get("fs_move_m", 5.0)),
+                                  heading_deg=float(self.config.get("fs_heading_deg", 20.0)))
+        self.position = None       # (lat, lon, heading) from the last Pico fix
+        self.active_route = None   # [[lat, lon], ...] last route loaded on the Pico (RETURN_HOME path)
+        self.pico_bridge = None
+        self.pico_thread = None
+
+        # Optional raw serial capture for bench replay
+        _cap = self.config.get("serial_capture", False)
+        self.serial_capture = bool(_cap) if isinstance(_cap, bool) else str(_cap).strip().upper() == "Y"
+
         # Initialize LoRa serial
         try:
             self.lora = serial.Serial(self.port, self.baud, timeout=1)
+            self.lora = maybe_tap(self.lora, self.serial_capture, self.log_dir, self.node_label)
             print(f"[BotCarNode] LoRa initialized on {self.port} at {self.baud} baud.")
         except Exception as e:
             print(f"[BotCarNode] Error initializing LoRa: {e}")
@@ -96,9 +227,10 @@ class BotCarNode:
         self.expected_ack = None
         self.last_rssi = None
         self.last_snr = None
+        self.last_ack_t = None
 
-        # Threads
-        self.rx_thread = None
+        # Radio driver (single TX queue + reader thread; created in start()) and TX thread
+        self.radio = None
         self.tx_thread = None
 
     # -------------------- Config & Logging --------------------
@@ -112,86 +244,209 @@ class BotCarNode:
 
     def write_txt_log(self, entry):
         if self.mission_logging and self.txt_log_path:
-            with open(self.txt_log_path, "a") as f:
+            with timed(self.m_log), open(self.txt_log_path, "a") as f:
                 f.write(entry + "\n")
 
     def write_csv_log(self, ts, msg_type, wp_index, lat, lon, ack_status):
         if self.csv_logging and self.csv_writer and self.csv_fh:
-            self.csv_writer.writerow([
-                ts, self.node_id, self.node_label, msg_type,
-                wp_index if wp_index is not None else "N/A",
-                lat if lat is not None else "N/A",
-                lon if lon is not None else "N/A",
-                self.last_rssi if self.last_rssi is not None else "N/A",
-                self.last_snr if self.last_snr is not None else "N/A",
-                ack_status
-            ])
-            self.csv_fh.flush()
+            with timed(self.m_log):
+                self.csv_writer.writerow([
+                    ts, self.node_id, self.node_label, msg_type,
+                    wp_index if wp_index is not None else "N/A",
+                    lat if lat is not None else "N/A",
+                    lon if lon is not None else "N/A",
+                    self.last_rssi if self.last_rssi is not None else "N/A",
+                    self.last_snr if self.last_snr is not None else "N/A",
+                    ack_status
+                ])
+                self.csv_fh.flush()
+
+    def _log_exchange(self, ts, msg_type, wp_index, lat, lon, ack_status):
+        """TXT + CSV line for one REG / WAYPOINT attempt."""
+        self.write_txt_log(
+            f"[{ts}] node_id={self.node_id}, type={msg_type}, "
+            f"wp_index={wp_index if wp_index is not None else 'N/A'}, "
+            f"lat={lat if lat is not None else 'N/A'}, lon={lon if lon is not None else 'N/A'}, "
+            f"RSSI={self.last_rssi if self.last_rssi is not None else 'N/A'}, "
+            f"SNR={self.last_snr if self.last_snr is not None else 'N/A'}, ACK={ack_status}"
+        )
+        self.write_csv_log(ts, msg_type, wp_index, lat, lon, ack_status)
+
+    # -------------------- Metrics --------------------
+    def _init_metrics(self):
+        m = self.metrics = Registry()
+        self.m_rx = m.counter("rx_frames_total", "Frames received by token type", ("type",))
+        self.m_tx = m.counter("tx_frames_total", "AT+SEND commands completed by token type and result", ("type", "result"))
+        self.m_tx_lat = m.histogram("tx_latency_seconds", "Queue to module reply per AT+SEND", ("type",))
+        self.m_ack_rtt = m.histogram("ack_rtt_seconds", "Frame on air to matching ACK", ("type",))
+        self.m_attempts = m.histogram("attempts_per_message", "Attempts until ACK or give-up", ("type",), COUNT_BUCKETS)
+        self.m_retries = m.counter("retries_total", "Retransmissions after an ACK timeout", ("type",))
+        self.m_rssi = m.histogram("rssi_dbm", "RSSI of matched ACKs", ("peer",), RSSI_BUCKETS)
+        self.m_snr = m.histogram("snr_db", "SNR of matched ACKs", ("peer",), SNR_BUCKETS)
+        self.m_log = m.histogram("log_write_seconds", "Mission TXT/CSV append time",
+                                 buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1))
+        self.m_fs = m.counter("fs_frames_total", "FS position frames sent, by report_rate reason", ("reason",))
+        m.gauge("tx_queue_depth", "Commands waiting in the radio TX queue", fn=lambda: self.radio.depth())
+        m.counter_fn("radio_timeouts_total", "AT commands with no module reply", lambda: self.radio.timeouts)
+        m.counter_fn("radio_deferred_total", "Sends held by the duty-cycle budget", lambda: self.radio.deferred)
+        m.gauge("duty_cycle", "Own transmit time over the airtime window", fn=lambda: self.meter.duty())
+        m.gauge("mission_state", "Mission state index (see fse.MISSION_STATES)", fn=lambda: self.mission.state)
+        if self.spool is not None:
+            m.gauge("spool_backlog_messages", "Spooled messages not yet ACKed by the base", fn=lambda: len(self.spool))
+            m.gauge("spool_backlog_bytes", "Bytes held in the outbound spool",
+                    fn=lambda: self.spool.backlog()["bytes"])
+            m.gauge("spool_oldest_age_seconds", "Age of the oldest unACKed spooled message",
+                    fn=lambda: self.spool.backlog()["oldest_age_s"])
+            m.counter_fn("spool_dropped_total", "Spooled messages dropped because the ring was full",
+                         lambda: self.spool.dropped)
+
+    def _on_tx_complete(self, fut):
+        kind = message_kind(fut.payload) if fut.payload is not None else "AT"
+        self.m_tx.labels(kind, "ok" if fut.error is None else "error").inc()
+        self.m_tx_lat.observe(fut.t_done - fut.t_queued, self.m_tx_lat.labels(kind))
+
+    def _record_exchange(self, kind, fut, acknowledged, attempt):
+        """Per-attempt ACK metrics for REG / WP exchanges."""
+        if acknowledged and fut.t_sent is not None and self.last_ack_t is not None:
+            self.m_ack_rtt.observe(self.last_ack_t - fut.t_sent, self.m_ack_rtt.labels(kind))
+        if acknowledged or attempt == self.max_retries:
+            self.m_attempts.observe(attempt, self.m_attempts.labels(kind))
+        if not acknowledged and attempt < self.max_retries:
+            self.m_retries.labels(kind).inc()
 
     # -------------------- Radio setup --------------------
     def setup_lora(self):
+        """Bring the module to ADDRESS/NETWORKID/BAND, writing only what differs (see ../Common/at_command.py)."""
         if not self.lora:
-            return
-        cmds = [
-            f"AT+ADDRESS={self.node_id}\r\n",
-            f"AT+NETWORKID={self.network_id}\r\n",
-            f"AT+BAND={self.band}\r\n",
-            "AT+ADDRESS?\r\n",
-            "AT+NETWORKID?\r\n",
-            "AT+BAND?\r\n"
+            return False
+        engine = ATEngine(self.lora, timeout=self.at_timeout,
+                          on_unsolicited=lambda line: print(f"[Node {self.node_id}] RX during setup ignored: {line}"))
+        settings = [
+            ("ADDRESS", self.node_id),
+            ("NETWORKID", self.network_id),
+            ("BAND", self.band),
         ]
-        for cmd in cmds:
-            self.lora.write(cmd.encode())
-            time.sleep(0.15)
-        # Drain any echoes to start clean
-        time.sleep(0.1)
-        while self.lora.in_waiting:
-            _ = self.lora.read(self.lora.in_waiting)
-
-        print(f"[Node {self.node_id}] Radio configured: ADDRESS={self.node_id}, NETWORKID={self.network_id}, BAND={self.band}")
-
-    # -------------------- RX listener (ACKs) --------------------
-    def listen_for_ack(self):
-        while self.running and self.lora:
-            try:
-                if self.lora.in_waiting > 0:
-                    line = self.lora.readline().decode(errors="ignore").strip()
-                    if not line:
-                        time.sleep(0.02)
-                        continue
-
-                    # Expect +RCV=<sender>,<len>,<msg>,<rssi>,<snr>
-                    if line.startswith("+RCV="):
-                        parts = line.split(",")
-                        if len(parts) >= 5:
-                            msg = parts[2].strip()
-                            try:
-                                rssi = int(parts[3].strip())
-                            except Exception:
-                                rssi = None
-                            try:
-                                snr = int(parts[4].strip())
-                            except Exception:
-                                snr = None
-
-                            # Only accept exact expected ACK
-                            with self.ack_lock:
-                                if self.expected_ack and msg == self.expected_ack:
-                                    # Update link metrics only on matched ACK
-                                    self.last_rssi = rssi
-                                    self.last_snr = snr
-                                    self.ack_event.set()
-                                    # For operator visibility
-                                    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                                    print(f"[Node {self.node_id} RX {ts}] ACK matched: {msg} (RSSI={rssi}, SNR={snr})")
-                    else:
-                        # Ignore module housekeeping (+OK, +ERR=...)
-                        pass
-
-                time.sleep(0.05)
-            except Exception as e:
-                print(f"[Node {self.node_id}] RX error: {e}")
-                time.sleep(0.1)
+        if self.adr_enabled:
+            settings.append(("PARAMETER", self.lora_parameter))  # ADR may have left another profile in flash
+        changed, errors, elapsed = engine.configure(settings)
+        for e in errors:
+            print(f"[Node {self.node_id}] Radio setup error: {e}")
+        print(f"[Node {self.node_id}] Radio configured: ADDRESS={self.node_id}, NETWORKID={self.network_id}, "
+              f"BAND={self.band} ({format_setup(changed, errors, elapsed)})")
+        return not errors
+
+    # -------------------- Radio I/O (driver owns the port) --------------------
+    def _send_to_base(self, msg, priority=PRIO_NORMAL):
+        """Queue an AT+SEND to the base on the radio driver; TX errors are reported when the module answers."""
+        fut = self.radio.send(self.base_id, msg, priority)
+        fut.add_done_callback(self._on_tx_done)
+        return fut
+
+    def _on_tx_done(self, fut):
+        if fut.error is not None:
+            print(f"[Node {self.node_id}] TX error: {fut.error}")
+
+    def _handle_rx_line(self, line: str, t_rx=None):
+        """Match one decoded module line against the expected ACK (RX hot path)."""
+        # Expect +RCV=<sender>,<len>,<msg>,<rssi>,<snr>
+        if not line.startswith("+RCV="):
+            # Ignore module housekeeping (+OK, +ERR=...)
+            return
+        t_rx = time.monotonic() if t_rx is None else t_rx
+        # Split RSSI/SNR from the right: base commands (DR, ASSIST) carry commas in <msg>
+        parts = line.rsplit(",", 2)
+        head = parts[0].split(",", 2)
+        if len(parts) < 3 or len(head) < 3:
+            return
+        msg = head[2].strip()
+        self.m_rx.labels(message_kind(msg)).inc()
+
+        # Clock-offset reply from the base (not an ACK)
+        if msg.startswith("TQ:"):
+            self._handle_clock_pong(msg, t_rx)
+            return
+        if msg.startswith("DR:"):
+            self._handle_data_rate(msg)
+            return
+        if msg.startswith("DN:"):
+            self._handle_downlink(msg)
+            return
+        try:
+            rssi = int(parts[1].strip())
+        except Exception:
+            rssi = None
+        try:
+            snr = int(parts[2].strip())
+        except Exception:
+            snr = None
+        self._on_ack_frame(msg, rssi, snr, t_rx, head[0][5:])
+
+    def _on_ack_frame(self, msg, rssi, snr, t_rx, peer):
+        # Only accept exact expected ACK
+        with self.ack_lock:
+            if self.expected_ack and msg == self.expected_ack:
+                self._note_ack(msg, rssi, snr, t_rx, peer)
+                self.ack_event.set()
+
+    def _note_ack(self, msg, rssi, snr, t_rx, peer):
+        """Link metrics and operator line for a matched ACK."""
+        self.last_rssi = rssi
+        self.last_snr = snr
+        self.last_ack_t = t_rx
+        if rssi is not None:
+            self.m_rssi.observe(rssi, self.m_rssi.labels(peer))
+        if snr is not None:
+            self.m_snr.observe(snr, self.m_snr.labels(peer))
+        # For operator visibility
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"[Node {self.node_id} RX {ts}] ACK matched: {msg} (RSSI={rssi}, SNR={snr})")
+
+    # -------------------- Adaptive data rate --------------------
+    def _handle_data_rate(self, msg):
+        """DR:<node_id>:<sf,bw,cr,preamble>:<delay_s> from the base: switch profile after delay_s."""
+        p = msg.split(":")
+        if not self.adr or len(p) < 4 or p[1] != str(self.node_id):
+            return
+        try:
+            param, delay = normalize(p[2]), float(p[3])
+            RFParams.from_parameter(param)
+        except ValueError:
+            print(f"[Node {self.node_id}] Bad DR command ignored: {msg}")
+            return
+        self.adr.on_command(param)
+        print(f"[Node {self.node_id}] DR: switching to {param} in {delay:g}s")
+        self._call_later(delay, self.set_data_rate, param, "base")
+
+    def _call_later(self, delay, fn, *args):
+        timer = threading.Timer(delay, fn, args)
+        timer.daemon = True
+        timer.start()
+
+    def _run_worker(self, fn, *args):
+        """Run slow work (route planning) off the radio reader thread so ACK matching is not held up."""
+        threading.Thread(target=fn, args=args, name=f"Worker_{self.node_id}", daemon=True).start()
+
+    def set_data_rate(self, param, reason):
+        """Apply an AT+PARAMETER profile on the module and in the airtime models."""
+        if not self.radio:
+            return
+        self.rf = RFParams.from_parameter(param)
+        self.radio.rf = self.rf
+        self.meter.set_rf(self.rf)
+        self.radio.submit(f"AT+PARAMETER={param}", PRIO_HIGH)
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"[Node {self.node_id}] Data rate {param} ({self.rf}, {reason})")
+        self.write_txt_log(f"[{ts}] node_id={self.node_id}, type=ADR, parameter={param}, reason={reason}")
+
+    def _adr_after_exchange(self, acknowledged):
+        if not self.adr:
+            return
+        if acknowledged:
+            self.adr.on_ack()
+            return
+        nxt = self.adr.on_timeout()
+        if nxt:
+            self.set_data_rate(nxt, f"{self.adr.fallback_after} timeouts, scanning")
 
     # -------------------- Exponential backoff (YAML-driven) --------------------
     def _compute_retry_delay(self, attempt: int) -> int:
@@ -217,12 +472,37 @@ class BotCarNode:
         delay = random.randint(delay_min, delay_max) + node_jitter
         return delay
 
+    # -------------------- Clock sync (tracing) --------------------
+    def sync_clock(self, timeout=2.0):
+        """Send one TP ping to the base and wait briefly for its TQ pong."""
+        if not (self.radio and self.tracer):
+            return False
+        self.clock_event.clear()
+        ping = format_ping(self.node_id, time.monotonic())
+        self._send_to_base(ping)
+        self._next_clock_sync = time.monotonic() + self.clock_sync_interval
+        return self.clock_event.wait(timeout)
+
+    def _maybe_sync_clock(self):
+        if self.tracer and self.clock_sync_interval > 0 and time.monotonic() >= self._next_clock_sync:
+            self.sync_clock()
+
+    def _handle_clock_pong(self, msg, t_rx):
+        pong = parse_pong(msg)
+        if not pong or pong[0] != str(self.node_id):
+            return
+        _, t0, t1, t2 = pong
+        self.base_clock.add_sample(t0, t1, t2, t_rx)
+        offset, delay = self.base_clock.best()
+        if self.tracer:
+            self.tracer.offset("pi", "base", offset, delay)
+        self.clock_event.set()
+
     # -------------------- Registration --------------------
     def send_registration(self):
-        if not self.lora:
+        if not self.radio:
             return
         reg_msg = f"REG:{self.node_id}"
-        payload = f"AT+SEND={self.base_id},{len(reg_msg)},{reg_msg}\r\n"
 
         for attempt in range(1, self.max_retries + 1):
             ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -231,19 +511,16 @@ class BotCarNode:
                 self.ack_event.clear()
 
             print(f"[Node {self.node_id}] REG attempt {attempt}")
-            self.lora.write(payload.encode())
+            fut = self._send_to_base(reg_msg)
+            fut.wait()  # ACK timer starts once the frame is on air
 
             # Wait for ACKREG with a bounded timeout
             acknowledged = self.ack_event.wait(5.0)
             ack_status = "Received" if acknowledged else "Timeout"
+            self._record_exchange("REG", fut, acknowledged, attempt)
+            self._adr_after_exchange(acknowledged)
 
-            # Log entry
-            self.write_txt_log(
-                f"[{ts}] node_id={self.node_id}, type=REG, wp_index=N/A, lat=N/A, lon=N/A, "
-                f"RSSI={self.last_rssi if self.last_rssi is not None else 'N/A'}, "
-                f"SNR={self.last_snr if self.last_snr is not None else 'N/A'}, ACK={ack_status}"
-            )
-            self.write_csv_log(ts, "REG", None, None, None, ack_status)
+            self._log_exchange(ts, "REG", None, None, None, ack_status)
 
             if acknowledged:
                 print(f"[Node {self.node_id}] Registration acknowledged.")
@@ -258,49 +535,22 @@ class BotCarNode:
 
     # -------------------- Waypoint TX --------------------
     def transmit_waypoints(self):
-        if not self.lora:
+        if not self.radio:
+            return
+        if self.spool is not None:
+            self._spool_waypoints()
+            self._drain_spool()
             return
 
         for i, wp in enumerate(self.waypoints):
             if not self.running:
                 break
 
+            self._maybe_sync_clock()
+
             lat, lon = wp
-            msg = f"{self.node_id}:{i}:{lat},{lon}"
-            payload = f"AT+SEND={self.base_id},{len(msg)},{msg}\r\n"
-
-            delivered = False
-            for attempt in range(1, self.max_retries + 1):
-                ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                with self.ack_lock:
-                    self.expected_ack = f"ACK:{self.node_id}:{i}"
-                    self.ack_event.clear()
-
-                print(f"[Node {self.node_id} TX] WP {i}, attempt {attempt}")
-                self.lora.write(payload.encode())
-
-                # Wait for matching ACK with timeout
-                acknowledged = self.ack_event.wait(self._ack_timeout_for_payload(msg))
-                ack_status = "Received" if acknowledged else "Timeout"
-
-                # Log attempt
-                self.write_txt_log(
-                    f"[{ts}] node_id={self.node_id}, type=WAYPOINT, wp_index={i}, "
-                    f"lat={lat}, lon={lon}, "
-                    f"RSSI={self.last_rssi if self.last_rssi is not None else 'N/A'}, "
-                    f"SNR={self.last_snr if self.last_snr is not None else 'N/A'}, ACK={ack_status}"
-                )
-                self.write_csv_log(ts, "WAYPOINT", i, lat, lon, ack_status)
-
-                if acknowledged:
-                    print(f"[Node {self.node_id} SUCCESS] WP {i} acknowledged.")
-                    delivered = True
-                    break
-                else:
-                    # Dynamic exponential backoff
-                    delay = self._compute_retry_delay(attempt)
-                    print(f"[Node {self.node_id}] WP {i} backoff {delay}s before retry...")
-                    time.sleep(delay)
+            msg = self._waypoint_payload(i, lat, lon)
+            delivered = self._send_waypoint(i, lat, lon, msg)
 
             if not delivered:
                 print(f"[Node {self.node_id}] WP {i} failed after {self.max_retries} retries")
@@ -310,6 +560,131 @@ class BotCarNode:
                 print(f"[Node {self.node_id}] Waiting tx_interval={self.tx_interval}s before next WP...")
                 time.sleep(self.tx_interval)
 
+    def _waypoint_payload(self, i, lat, lon):
+        # Route points start on the Pi (route.json), so their traces begin at lora_tx; the
+        # "w" keeps them apart from Pico frame ids (<node>.<seq>), which FS frames carry
+        msg = f"{self.node_id}:{i}:{lat},{lon}"
+        if self.tracer:
+            msg = attach_trace(msg, make_trace_id(self.node_id, f"w{i}"))
+        return msg
+
+    def _send_waypoint(self, i, lat, lon, msg):
+        """Send one waypoint until ACKed or max_retries attempts (with backoff); returns True if ACKed."""
+        tid = split_trace(msg)[1]
+        for attempt in range(1, self.max_retries + 1):
+            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            with self.ack_lock:
+                self.expected_ack = f"ACK:{self.node_id}:{i}"
+                self.ack_event.clear()
+
+            print(f"[Node {self.node_id} TX] WP {i}, attempt {attempt}")
+            if self.tracer and tid:
+                self.tracer.hop(tid, "lora_tx")
+            fut = self._send_to_base(msg)
+            fut.wait()  # may be held by the duty-cycle budget
+
+            # Wait for matching ACK with timeout
+            acknowledged = self.ack_event.wait(self._ack_timeout_for_payload(msg))
+            ack_status = "Received" if acknowledged else "Timeout"
+            self._record_exchange("WP", fut, acknowledged, attempt)
+            self._adr_after_exchange(acknowledged)
+
+            self._log_exchange(ts, "WAYPOINT", i, lat, lon, ack_status)
+
+            if acknowledged:
+                print(f"[Node {self.node_id} SUCCESS] WP {i} acknowledged.")
+                return True
+            if attempt < self.max_retries or self.spool is None:
+                # Dynamic exponential backoff
+                delay = self._compute_retry_delay(attempt)
+                print(f"[Node {self.node_id}] WP {i} backoff {delay}s before retry...")
+                self._sleep_running(delay)
+            if not self.running:
+                break
+        return False
+
+    def _sleep_running(self, seconds):
+        """time.sleep that returns early once stop() clears running."""
+        end = time.monotonic() + seconds
+        while self.running and time.monotonic() < end:
+            time.sleep(min(0.2, end - time.monotonic()))
+
+    # -------------------- Outbound spool --------------------
+    def _spool_waypoints(self):
+        """
+        Queue the route in the spool. The producer cursor moves with each append, so a run
+        that stopped before the route was delivered resumes where it left off instead of
+        queueing waypoints twice; once the spool drains the cursor is cleared and the next
+        start uploads the route again.
+        """
+        key = zlib.crc32(repr((self.node_id, self.waypoints)).encode())
+        first = self.spool.producer_pos(key)
+        if first >= len(self.waypoints) and not len(self.spool):
+            first = 0          # delivered, but stopped before the drain cleared the cursor
+        if first:
+            print(f"[Node {self.node_id}] Route already spooled up to WP {first - 1}; resuming")
+        else:
+            self.spool.set_producer(key, 0)
+        for i in range(first, len(self.waypoints)):
+            lat, lon = self.waypoints[i]
+            self.spool.append(self._waypoint_payload(i, lat, lon), producer=True)
+
+    def _spool_drained(self, catching_up):
+        """Everything spooled was ACKed: clear the producer cursor so the next start sends the route again."""
+        if catching_up:
+            print(f"[Node {self.node_id}] Spool drained")
+        if self.spool.prod_key or self.spool.prod_pos:
+            self.spool.set_producer(0, 0)
+
+    def _drain_spool(self):
+        """
+        Send the oldest spooled message until the base ACKs it, then the next. While the
+        link is down the head is kept and re-probed at the longest backoff; once it is
+        back the backlog goes out back to back (no tx_interval) until the spool is empty.
+        """
+        catching_up = False
+        while self.running:
+            rec = self.spool.peek()
+            if rec is None:
+                self._spool_drained(catching_up)
+                return
+            seq, _, msg = rec
+            self._maybe_sync_clock()
+            body = split_trace(msg)[0]
+            try:
+                _, idx, coords = body.split(":", 2)
+                i = int(idx)
+                lat, lon = (float(v) for v in coords.split(","))
+            except ValueError:
+                print(f"[Node {self.node_id}] Spool: dropping unreadable record {seq}: {msg!r}")
+                self.spool.ack(seq)
+                continue
+
+            if not self._send_waypoint(i, lat, lon, msg):
+                if not self.running:
+                    return
+                if self.outage_since is None:
+                    self.outage_since = time.time()
+                    print(f"[Node {self.node_id}] WP {i} kept in spool after {self.max_retries} retries; "
+                          f"link down, backlog {self.spool.format_backlog()}")
+                delay = self._compute_retry_delay(self.max_retries)
+                print(f"[Node {self.node_id}] Spool: probing again in {delay}s")
+                self._sleep_running(delay)
+                continue
+
+            self.spool.ack(seq)
+            if self.outage_since is not None:
+                print(f"[Node {self.node_id}] Link back after {time.time() - self.outage_since:.0f}s; "
+                      f"draining {self.spool.format_backlog()}")
+                self.write_txt_log(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] node_id={self.node_id}, "
+                                   f"type=SPOOL, outage_s={time.time() - self.outage_since:.0f}, "
+                                   f"backlog={len(self.spool)}")
+                self.outage_since = None
+                catching_up = True
+            elif not catching_up and self.tx_interval > 0 and len(self.spool):
+                print(f"[Node {self.node_id}] Waiting tx_interval={self.tx_interval}s before next WP...")
+                self._sleep_running(self.tx_interval)
+
     def _ack_timeout_for_payload(self, msg: str) -> float:
         """
         Heuristic timeout helper. LoRa airtime depends on RF parameters and payload length.
@@ -317,17 +692,125 @@ class BotCarNode:
         """
         return 5.0
 
+    # -------------------- RETURN_HOME planning --------------------
+    def plan_return_home(self, lat, lon):
+        """Waypoints [[lat, lon], ...] from a position back to home around keep-out zones, or None."""
+        if not self.planner:
+            return None
+        with self.plan_lock:
+            builds = self.planner.builds
+            path = self.planner.path_home(lat, lon)
+            if self.planner.builds != builds:
+                print(f"[Node {self.node_id}] Home distance field: {self.planner.grid.n}x{self.planner.grid.n} cells, "
+                      f"build {self.planner.build_s * 1e3:.0f} ms (builds={self.planner.builds})")
+            if path is None:
+                print(f"[Node {self.node_id}] RETURN_HOME: no path from {lat:.6f},{lon:.6f} (off-grid, blocked or cut off)")
+            else:
+                print(f"[Node {self.node_id}] RETURN_HOME: {len(path)} waypoints, "
+                      f"{self.planner.distance_home_m(lat, lon):.0f} m")
+            return path
+
+    def return_home(self, lat, lon):
+        """Plan the way home from a position and load it as the active route; returns the path or None."""
+        path = self.plan_return_home(lat, lon)
+        if path:
+            self.load_route(path, "RETURN_HOME")
+        return path
+
+    def load_route(self, route, reason):
+        """Hand a route to the Pico navigator (WPSET); without a Pico link it is only kept in active_route."""
+        self.active_route = [[round(lat, 6), round(lon, 6)] for lat, lon in route]
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if not self.pico_bridge:
+            print(f"[Node {self.node_id}] {reason}: {len(route)}-waypoint route not loaded (no Pico link)")
+            self.write_txt_log(f"[{ts}] node_id={self.node_id}, type=ROUTE, reason={reason}, "
+                               f"waypoints={len(route)}, loaded=N")
+            return None
+        seq = self.pico_bridge.send_command("WPSET", route=self.active_route)
+        print(f"[Node {self.node_id}] {reason}: {len(route)}-waypoint route sent to the Pico (WPSET #{seq})")
+        self.write_txt_log(f"[{ts}] node_id={self.node_id}, type=ROUTE, reason={reason}, "
+                           f"waypoints={len(route)}, loaded=Y, pico_seq={seq}")
+        return seq
+
+    def set_keep_out(self, name, polygon):
+        """Add or replace a keep-out zone; the home distance field is rebuilt on next use."""
+        if self.planner:
+            with self.plan_lock:
+                self.planner.grid.add_keep_out(name, polygon)
+
+    def clear_keep_out(self, name):
+        if self.planner:
+            with self.plan_lock:
+                self.planner.grid.remove_keep_out(name)
+
+    # -------------------- Mission state --------------------
+    def _on_mission_transition(self, old, event, new):
+        t = MISSION
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"[Node {self.node_id}] Mission {t.states[old]} -> {t.states[new]} ({t.events[event]})")
+        self.write_txt_log(f"{ts} | Node {self.node_id} | MISSION {t.states[old]} -> {t.states[new]} | {t.events[event]}")
+        self.write_csv_log(ts, "MISSION", None, None, None, t.states[new])
+
+    def handle_command(self, name):
+        """Gate a base command by name against the mission state; returns (admitted, reason)."""
+        ok, reason = self.mission.command_name(name)
+        if not ok:
+            print(f"[Node {self.node_id}] Command {name} rejected: {reason}")
+        return ok, reason
+
+    def _handle_downlink(self, msg):
+        """
+        DN:<TYPE>:<node_id>:<seq>:<payload> from the base: dispatch once, ACKDN every copy.
+        The ACKDN goes out first; RETURN_HOME planning then runs on a worker and the path is
+        loaded on the Pico as the active route (from the Pico's own fix when the base sends
+        no position). An admitted
+        ASSIST (payload <incident>:<lat>,<lon>) records the incident target in self.assist.
+        """
+        dn = parse_dn(msg)
+        if not dn or dn[1] != str(self.node_id):
+            return
+        kind, _, seq, payload = dn
+        key, now = (seq, kind, payload), time.monotonic()
+        seen = self.dn_seen.get(key)
+        home_from = None
+        if seen and now - seen[1] < self.dn_dedupe_s:
+            admitted = seen[0]
+            print(f"[Node {self.node_id}] DN {kind} #{seq} repeated; ACK resent")
+        else:
+            admitted, reason = self.handle_command(kind)
+            if admitted and kind == "RETURN_HOME" and payload:
+                try:
+                    home_from = tuple(float(v) for v in payload.split(",", 1))
+                except ValueError:
+                    print(f"[Node {self.node_id}] RETURN_HOME position '{payload}' ignored")
+            elif admitted and kind == "RETURN_HOME" and self.position:
+                home_from = self.position[:2]  # no position from the base: plan from the last Pico fix
+            if admitted and kind == "ASSIST":
+                inc_id, _, pos = payload.partition(":")
+                try:
+                    lat, lon = (float(v) for v in pos.split(",", 1))
+                    self.assist = (inc_id, lat, lon)
+                    print(f"[Node {self.node_id}] ASSIST incident {inc_id} at {lat:.6f},{lon:.6f}")
+                except ValueError:
+                    print(f"[Node {self.node_id}] ASSIST target '{payload}' ignored")
+            elif MISSION.states[self.mission.state] != "ASSIST":
+                self.assist = None  # cancelled, halted or sent home
+            self.dn_seen.pop(key, None)
+            self.dn_seen[key] = (admitted, now)
+            while len(self.dn_seen) > 64:
+                self.dn_seen.popitem(last=False)
+            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"[Node {self.node_id}] DN {kind} #{seq}: {'admitted' if admitted else 'rejected'} ({reason})")
+            self.write_txt_log(f"[{ts}] node_id={self.node_id}, type=DN, command={kind}, seq={seq}, "
+                               f"payload={payload or 'N/A'}, admitted={admitted}, result={reason}")
+        self._send_to_base(format_dn_ack(self.node_id, seq, admitted), PRIO_HIGH)
+        if home_from is not None:
+            self._run_worker(self.return_home, *home_from)
+
     # -------------------- Lifecycle --------------------
     def start(self):
-        if not self.lora:
-            print(f"[Node {self.node_id}] LoRa not available; abort start.")
+        if not self._start_radio():
             return
-        self.running = True
-        self.setup_lora()
-
-        # Start RX listener thread
-        self.rx_thread = threading.Thread(target=self.listen_for_ack, name=f"ACK_RX_{self.node_id}", daemon=True)
-        self.rx_thread.start()
 
         # Registration (blocking until done)
         self.send_registration()
@@ -336,17 +819,109 @@ class BotCarNode:
         self.tx_thread = threading.Thread(target=self.transmit_waypoints, name=f"WP_TX_{self.node_id}", daemon=True)
         self.tx_thread.start()
 
+    def _start_radio(self):
+        """Radio setup, metrics endpoint, the RYLR998 driver and the Pico link; False if there is no serial port."""
+        if not self.lora:
+            print(f"[Node {self.node_id}] LoRa not available; abort start.")
+            return False
+        self.running = True
+        self.setup_lora()
+        if self.metrics_port and not self.metrics_server:
+            try:
+                self.metrics_server = self.metrics.serve(self.metrics_port, self.metrics_bind)
+                print(f"[Node {self.node_id}] Metrics: http://{self.metrics_bind}:{self.metrics_port}/metrics")
+            except OSError as e:
+                print(f"[Node {self.node_id}] Metrics endpoint not started: {e}")
+
+        # Radio driver: its reader thread feeds ACKs/pongs to _handle_rx_line, all writes share one TX queue
+        self.radio = RYLR998(self.lora, name=f"Node {self.node_id}", rf=self.rf, meter=self.meter,
+                             on_done=self._on_tx_complete)
+        self.radio.subscribe(self._handle_rx_line)
+        self.radio.start()
+        self._start_pico_link()
+        return True
+
+    # -------------------- Pico link (FS uplink) --------------------
+    def _start_pico_link(self):
+        if not self.pico_port or self.pico_bridge:
+            return
+        try:
+            ser = serial.Serial(self.pico_port, self.pico_baud, timeout=0.1)
+        except Exception as e:
+            print(f"[Node {self.node_id}] Pico link not opened on {self.pico_port} ({e}); no FS uplink")
+            return
+        self.pico_bridge = PiBridge(ser, self.node_id, self.tracer, verbose=False)
+        self.pico_bridge.on_frame = self._on_pico_frame
+        self.pico_thread = threading.Thread(target=self._pico_loop, name=f"PICO_{self.node_id}", daemon=True)
+        self.pico_thread.start()
+        print(f"[Node {self.node_id}] Pico link on {self.pico_port}; FS uplink every "
+              f"{self.fs_rate.min_s:g}-{self.fs_rate.max_s:g}s")
+
+    def _pico_loop(self):
+        while self.running:
+            try:
+                self.pico_bridge.service_once()
+            except Exception as e:
+                print(f"[Node {self.node_id}] Pico link error: {e}")
+                self._sleep_running(1.0)
+
+    def _on_pico_frame(self, frame):
+        """
+        Pico telemetry -> FS uplink. report_rate.py sends one when the unit moved past the
+        drift band, turned, or its mission state changed, else backs off to fs_max_s. The
+        trace id pi_bridge gave the Pico frame rides on the LoRa payload, so its pico_tx and
+        pi_rx hops join the lora_tx here and the base's base_rx/base_log under one id.
+        A mission:M answer is only reported when the Pico refused the command (e.g. WPSET).
+        """
+        kind = str(frame.get("type", ""))
+        if kind == "mission:M":
+            ms = frame.get("ms") or {}
+            if ms.get("status") != "OK":
+                print(f"[Node {self.node_id}] Pico refused {ms.get('ack_cmd')} #{ms.get('ack_seq')}: "
+                      f"{ms.get('msg')} (state {ms.get('state')})")
+            return
+        if not kind.startswith("telemetry"):
+            return
+        gps, imu = frame.get("gps") or {}, frame.get("imu") or {}
+        lat, lon, heading = gps.get("lat"), gps.get("lon"), imu.get("heading")
+        if lat is None or lon is None:
+            return
+        self.position = (lat, lon, heading)
+        why = self.fs_rate.update(time.monotonic(), lat, lon, heading, imu.get("roll"), imu.get("pitch"),
+                                  MISSION.states[self.mission.state])
+        if not why:
+            return
+        yaw = f"{heading:.0f}" if heading is not None else "N/A"
+        tid = frame.get("tid")
+        if self.tracer and tid:
+            self.tracer.hop(tid, "lora_tx")
+        self._send_to_base(attach_trace(f"FS:{self.node_id}:{yaw}:{lat:.6f},{lon:.6f}", tid))
+        self.m_fs.labels(why).inc()
+
     def stop(self):
         self.running = False
+        if self.metrics_server:
+            self.metrics_server.shutdown()
+            self.metrics_server = None
         # Give threads a moment to unwind
         try:
             if self.tx_thread and self.tx_thread.is_alive():
                 self.tx_thread.join(timeout=1.5)
         except Exception:
             pass
+        # Pico link before the radio: its thread sends FS through the driver
+        if self.pico_bridge:
+            if self.pico_thread:
+                self.pico_thread.join(timeout=1.0)
+            try:
+                self.pico_bridge.ser.close()
+            except Exception:
+                pass
         try:
-            if self.rx_thread and self.rx_thread.is_alive():
-                self.rx_thread.join(timeout=1.5)
+            if self.radio:
+                self.radio.stop()
+                print(f"[Node {self.node_id}] Airtime: {self.meter.format_report()} "
+                      f"(held by budget: {self.radio.deferred})")
         except Exception:
             pass
         # Close serial
@@ -361,6 +936,11 @@ class BotCarNode:
                 self.csv_fh.close()
         except Exception:
             pass
+        if self.tracer:
+            self.tracer.close()
+        if self.spool is not None:
+            print(f"[Node {self.node_id}] Spool: {self.spool.format_backlog()}")
+            self.spool.close()
         print(f"[Node {self.node_id}] Shutdown complete.")
 
 if __name__ == "__main__":
@@ -16,10 +16,21 @@ Copyright (c) 2025 Steven Westermire. All rights reserved.
 
 from _BotCarNode import BotCarNode
 import time
+import yaml
 
 def main():
     config_file = "botcar_config.yaml"
-    botCar = BotCarNode(config_path=config_file)
+    # node_core: threads (default) or asyncio (single event loop, see _AsyncBotCarNode.py)
+    try:
+        with open(config_file, "r") as f:
+            core = str((yaml.safe_load(f) or {}).get("node_core", "threads")).strip().lower()
+    except Exception:
+        core = "threads"
+    if core == "asyncio":
+        from _AsyncBotCarNode import AsyncBotCarNode
+        botCar = AsyncBotCarNode(config_path=config_file)
+    else:
+        botCar = BotCarNode(config_path=config_file)
     botCar.start()
 
     try: